@@ -1,7 +1,6 @@
-import json
+from artifact_io import load_artifact
 
-with open('logs/unified_timeline.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_artifact('logs/unified_timeline.json', [])
 
 # Analyze different event types
 sms = [e for e in data if e['type'] == 'SMS']
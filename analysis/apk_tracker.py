@@ -1,9 +1,13 @@
 
 import os
+import sys
 import json
 import re
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from artifact_io import find_artifact, iter_artifact
+
 def analyze_apk_movements(logs_dir="logs", output_file="logs/apk_analysis.json"):
     """
     APK Tracker: Specifically filters for APK-related lifecycle events.
@@ -16,49 +20,46 @@ def analyze_apk_movements(logs_dir="logs", output_file="logs/apk_analysis.json")
     
     # 1. Check for Downloads (Intents & Network)
     intent_path = os.path.join(logs_dir, "intent_hunter.json")
-    if os.path.exists(intent_path):
+    if find_artifact(intent_path):
         try:
-            with open(intent_path, "r", encoding="utf-8") as f:
-                intents = json.load(f)
-                for item in intents:
-                    data = item.get("data", "").lower()
-                    if ".apk" in data:
-                        events.append({
-                            "stage": "DOWNLOAD_ATTEMPT",
-                            "timestamp": "See Log Line " + str(item.get("line")),
-                            "details": f"Intent to view/download APK: {data}",
-                            "source": item.get("action"),
-                            "risk": "HIGH"
-                        })
+            for item in iter_artifact(intent_path):
+                data = item.get("data", "").lower()
+                if ".apk" in data:
+                    events.append({
+                        "stage": "DOWNLOAD_ATTEMPT",
+                        "timestamp": "See Log Line " + str(item.get("line")),
+                        "details": f"Intent to view/download APK: {data}",
+                        "source": item.get("action"),
+                        "risk": "HIGH"
+                    })
         except: pass
     
     # 2. Check for Installs (From Unified Timeline)
     timeline_path = os.path.join(logs_dir, "unified_timeline.json")
-    if os.path.exists(timeline_path):
+    if find_artifact(timeline_path):
         try:
-            with open(timeline_path, "r", encoding="utf-8") as f:
-                timeline = json.load(f)
-                for item in timeline:
-                    if item.get("type") == "APP_LIFECYCLE":
-                        content = item.get("content", "")
-                        subtype = item.get("subtype", "")
+            # Streamed: the timeline can be hundreds of MB
+            for item in iter_artifact(timeline_path):
+                if item.get("type") == "APP_LIFECYCLE":
+                    content = item.get("content", "")
+                    subtype = item.get("subtype", "")
                         
-                        events.append({
-                            "stage": "INSTALLATION",
-                            "timestamp": item.get("timestamp"),
-                            "details": content,
-                            "source": subtype,
-                            "risk": "CRITICAL" if "Sideload" in subtype or "Unknown" in subtype else "LOW"
-                        })
+                    events.append({
+                        "stage": "INSTALLATION",
+                        "timestamp": item.get("timestamp"),
+                        "details": content,
+                        "source": subtype,
+                        "risk": "CRITICAL" if "Sideload" in subtype or "Unknown" in subtype else "LOW"
+                    })
                     
-                    if "application/vnd.android.package-archive" in item.get("content", ""):
-                         events.append({
-                            "stage": "MANUAL_OPEN",
-                            "timestamp": item.get("timestamp"),
-                            "details": "User manually opened an APK file",
-                            "source": "File Manager / Downloads",
-                            "risk": "MEDIUM"
-                        })
+                if "application/vnd.android.package-archive" in item.get("content", ""):
+                     events.append({
+                        "stage": "MANUAL_OPEN",
+                        "timestamp": item.get("timestamp"),
+                        "details": "User manually opened an APK file",
+                        "source": "File Manager / Downloads",
+                        "risk": "MEDIUM"
+                    })
         except: pass
 
     # 3. Scan Raw Logcat for DownloadManager
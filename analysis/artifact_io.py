@@ -0,0 +1,321 @@
+"""
+artifact_io.py
+
+Shared writer/loader for analyzer JSON artifacts.
+
+Writers stream records to disk as they are produced, either as the classic
+pretty-printed JSON list (default, byte-identical to json.dump(..., indent=4))
+or as NDJSON with a one-line metadata header, optionally gzip/zstd compressed:
+
+    {"_meta": {"artifact": "pii_leaks", "format": "ndjson", "created": "...", ...}}
+    {"line": 12, "type": "Email Address", ...}
+    ...
+
+The format is chosen with the FORENSIC_OUTPUT_FORMAT environment variable
+(json | ndjson | ndjson.gz | ndjson.zst) or the fmt argument. Loaders accept
+the canonical ".json" path and find whichever variant exists, so readers do
+not care which format a module wrote.
+"""
+
+import os
+import io
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import datetime
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+FORMATS = ("json", "ndjson", "ndjson.gz", "ndjson.zst")
+DEFAULT_FORMAT = "json"
+META_KEY = "_meta"
+
+
+def output_format(fmt=None):
+    """Resolve the artifact format (argument, then FORENSIC_OUTPUT_FORMAT, then json)."""
+    fmt = (fmt or os.environ.get("FORENSIC_OUTPUT_FORMAT") or DEFAULT_FORMAT).lower()
+    if fmt not in FORMATS:
+        print(f"⚠️  Unknown output format '{fmt}', using {DEFAULT_FORMAT}")
+        return DEFAULT_FORMAT
+    if fmt == "ndjson.zst" and not ZSTD_AVAILABLE:
+        print("⚠️  zstandard not available (pip install zstandard), using ndjson.gz")
+        return "ndjson.gz"
+    return fmt
+
+
+def artifact_path(path, fmt):
+    """Path of an artifact in a given format: logs/x.json -> logs/x.ndjson.gz"""
+    base = path[:-5] if path.endswith(".json") else path
+    return base + "." + fmt
+
+
+def find_artifact(path):
+    """Existing file for a canonical artifact path (newest variant wins), or None."""
+    candidates = [artifact_path(path, fmt) for fmt in FORMATS]
+    existing = [p for p in candidates if os.path.exists(p)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+def _open_text(path, mode):
+    """Open a (possibly compressed) artifact in text mode."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        if mode == "w":
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class ArtifactWriter:
+    """
+    Stream records into an artifact.
+
+    For dict-shaped artifacts pass container (the dict without its record list)
+    and records_key; NDJSON keeps the other fields in the header and the
+    records as lines, JSON writes the dict exactly as before. The container
+    may be filled in until close(), so a summary computed from the streamed
+    records still lands in the header (NDJSON records are spooled to a
+    temporary file meanwhile).
+    """
+
+    def __init__(self, path, fmt=None, meta=None, container=None, records_key=None):
+        self.fmt = output_format(fmt)
+        self.path = artifact_path(path, self.fmt)
+        self.container = container
+        self.records_key = records_key
+        self.count = 0
+        self._records = [] if container is not None and self.fmt == "json" else None
+        self._spool = None
+
+        # Drop stale variants so loaders never pick up an older format
+        for fmt in FORMATS:
+            other = artifact_path(path, fmt)
+            if other != self.path and os.path.exists(other):
+                try:
+                    os.remove(other)
+                except OSError:
+                    pass
+
+        self.f = _open_text(self.path, "w")
+        if self.fmt == "json":
+            return
+
+        self.header = {
+            "artifact": os.path.basename(path[:-5] if path.endswith(".json") else path),
+            "format": self.fmt,
+            "created": datetime.now().isoformat()
+        }
+        if meta:
+            self.header.update(meta)
+        if container is not None:
+            # Header fields are only final at close(); hold the records until then
+            self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        else:
+            self._write_header()
+
+    def _write_header(self):
+        header = dict(self.header)
+        if self.container is not None:
+            header["records_key"] = self.records_key
+            header["keys"] = list(self.container.keys())
+            header["fields"] = {k: v for k, v in self.container.items() if k != self.records_key}
+        self.f.write(json.dumps({META_KEY: header}) + "\n")
+
+    def write(self, record):
+        if self._records is not None:
+            self._records.append(record)
+        elif self.fmt == "json":
+            # Same bytes as json.dump(records, f, indent=4), one element at a time
+            self.f.write(",\n    " if self.count else "[\n    ")
+            self.f.write(json.dumps(record, indent=4).replace("\n", "\n    "))
+        else:
+            out = self._spool or self.f
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if self.f is None:
+            return
+        if self._records is not None:
+            data = dict(self.container)
+            data[self.records_key] = self._records
+            json.dump(data, self.f, indent=4)
+        elif self.fmt == "json":
+            self.f.write("\n]" if self.count else "[]")
+        elif self._spool is not None:
+            self._write_header()
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, self.f)
+            self._spool.close()
+            self._spool = None
+        self.f.close()
+        self.f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_artifact(path, records, fmt=None, meta=None, container=None, records_key=None):
+    """Write an iterable of records; returns the path actually written."""
+    with ArtifactWriter(path, fmt, meta, container, records_key) as writer:
+        writer.write_many(records)
+    return writer.path
+
+
+# ---- Loading ----
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON list without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        # Skip whitespace and separators
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            fill()
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of JSON artifact")
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Artifact is not a JSON list")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+            # A scalar at the end of the buffer may be cut short; make sure it's complete
+            if end >= len(buf) and not eof:
+                raise json.JSONDecodeError("incomplete", buf, end)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        pos = end
+        yield obj
+
+
+def _first_char(f):
+    """Peek the first non-whitespace character of a text stream, then rewind."""
+    while True:
+        ch = f.read(1)
+        if not ch or not ch.isspace():
+            f.seek(0)
+            return ch
+
+
+def read_artifact_meta(path):
+    """NDJSON header of an artifact ({} for plain JSON or missing files)."""
+    found = find_artifact(path)
+    if not found or found.endswith(".json"):
+        return {}
+    with _open_text(found, "r") as f:
+        first = f.readline()
+    try:
+        return json.loads(first).get(META_KEY, {})
+    except (ValueError, AttributeError):
+        return {}
+
+
+def iter_artifact(path):
+    """
+    Yield the records of an artifact one at a time.
+
+    List artifacts yield their elements; dict-shaped JSON artifacts yield their
+    records_key list if known from an NDJSON header, otherwise the dict itself.
+    """
+    found = find_artifact(path)
+    if not found:
+        return
+    with _open_text(found, "r") as f:
+        if found.endswith(".json"):
+            if _first_char(f) == "[":
+                yield from _iter_json_array(f)
+            else:
+                yield json.load(f)
+            return
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict) and META_KEY in record:
+                continue
+            yield record
+
+
+class ArtifactRecords:
+    """Re-iterable, lazily streamed records of a list artifact."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        return iter_artifact(self.path)
+
+    def __bool__(self):
+        for _ in self:
+            return True
+        return False
+
+
+def load_artifact(path, default=None, lazy=False):
+    """
+    Load an artifact in its original shape.
+
+    List artifacts come back as a list (or ArtifactRecords if lazy=True);
+    dict-shaped NDJSON artifacts are rebuilt from the header fields.
+    """
+    found = find_artifact(path)
+    if not found:
+        return default
+
+    if found.endswith(".json"):
+        with _open_text(found, "r") as f:
+            if lazy and _first_char(f) == "[":
+                return ArtifactRecords(path)
+            return json.load(f)
+
+    meta = read_artifact_meta(path)
+    if meta.get("records_key"):
+        data = {}
+        fields = meta.get("fields", {})
+        for key in meta.get("keys", list(fields) + [meta["records_key"]]):
+            data[key] = list(iter_artifact(path)) if key == meta["records_key"] else fields.get(key)
+        return data
+    return ArtifactRecords(path) if lazy else list(iter_artifact(path))
@@ -4,137 +4,146 @@ Extracts clipboard events and input method manager activity
 """
 
 import os
+import sys
 import json
 import re
-from datetime import datetime
 
-def analyze_clipboard(logs_dir="logs", output_file="logs/clipboard_forensics.json"):
-    logcat_path = os.path.join(logs_dir, "android_logcat.txt")
-    if not os.path.exists(logcat_path):
-        print("Logcat file not found")
-        return
-
-    clipboard_events = []
-    ime_events = []
-    seen_clipboard = set()
-    seen_ime = set()
-    
-    # Enhanced clipboard patterns
-    clipboard_patterns = [
-        # ClipboardService logs that sometimes leak actual text
-        re.compile(r'ClipboardService.*setPrimaryClip.*text[:\s=]+"?([^"<>\n]{3,100})"?', re.I),
-        re.compile(r'ClipboardService.*clip.*data[:\s=]+"?([^"<>\n]{3,100})"?', re.I),
-        # Apps accessing clipboard
-        re.compile(r'ClipboardManager.*getPrimaryClip.*uid[:\s=]+([\d]+)', re.I),
-        # Clipboard with package attribution
-        re.compile(r'ClipboardService.*from package[:\s=]+([a-z0-9\.]+)', re.I),
-    ]
-    
-    # Input Method Manager patterns
-    ime_patterns = [
-        # Text input events (sometimes logs text length or context)
-        re.compile(r'InputMethodManager.*updateSelection.*text length[:\s=]+([\d]+)', re.I),
-        re.compile(r'InputMethodManager.*setText.*length[:\s=]+([\d]+)', re.I),
-        re.compile(r'InputMethodManager.*commitText.*"([^"]{1,50})"', re.I),
-        # Keyboard suggestions (can reveal typed patterns)
-        re.compile(r'LatinIME.*suggestion.*"([^"]{1,30})"', re.I),
-        re.compile(r'InputMethod.*prediction.*word[:\s=]+"([^"]{1,30})"', re.I),
-    ]
-    
-    # Password/sensitive input patterns
-    sensitive_patterns = [
-        re.compile(r'password|passwd|pwd', re.I),
-        re.compile(r'otp|2fa|mfa|verification', re.I),
-        re.compile(r'cvv|credit.*card|debit.*card', re.I),
-        re.compile(r'pin|passcode', re.I),
-    ]
-    
-    # Timestamp regex
-    TS_REGEX = re.compile(r'^(\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}\.\d{3})')
-    
-    with open(logcat_path, "r", encoding="utf-8", errors="replace") as f:
-        for line_no, line in enumerate(f, 1):
-            line_content = line.strip()
-            
-            # Extract timestamp
-            ts_match = TS_REGEX.match(line)
-            timestamp = None
-            if ts_match:
-                current_year = datetime.now().year
-                try:
-                    ts = datetime.strptime(f"{current_year}-{ts_match.group(1)}", "%Y-%m-%d %H:%M:%S.%f")
-                    timestamp = ts.isoformat()
-                except:
-                    pass
-            
-            # Check for sensitive context
-            is_sensitive = any(pattern.search(line_content) for pattern in sensitive_patterns)
-            
-            # Search for clipboard events
-            for pattern in clipboard_patterns:
-                matches = pattern.findall(line_content)
-                for match in matches:
-                    if len(match) > 2 and match not in ['null', 'NULL']:
-                        # Extract package if present
-                        package_match = re.search(r'from package[:\s=]+([a-z0-9\.]+)', line_content, re.I)
-                        package = package_match.group(1) if package_match else "Unknown"
-                        
-                        key = f"{match}_{timestamp}"
-                        if key not in seen_clipboard:
-                            clipboard_events.append({
-                                "type": "CLIPBOARD",
-                                "content": match[:100],  # Truncate long content
-                                "package": package,
-                                "is_sensitive": is_sensitive,
-                                "timestamp": timestamp or "unknown",
-                                "line": line_no,
-                                "raw": line_content[:300]
-                            })
-                            seen_clipboard.add(key)
-            
-            # Search for IME events
-            for pattern in ime_patterns:
-                matches = pattern.findall(line_content)
-                for match in matches:
-                    if isinstance(match, str) and len(match) > 0:
-                        key = f"{match}_{timestamp}"
-                        if key not in seen_ime:
-                            # Determine event type
-                            event_type = "TEXT_LENGTH" if match.isdigit() else "TEXT_CONTENT"
-                            
-                            ime_events.append({
-                                "type": "IME",
-                                "event_type": event_type,
-                                "content": match if not match.isdigit() else f"{match} chars",
-                                "is_sensitive": is_sensitive,
-                                "timestamp": timestamp or "unknown",
-                                "line": line_no,
-                                "raw": line_content[:300]
-                            })
-                            seen_ime.add(key)
-    
-    # Sort by timestamp
-    clipboard_events.sort(key=lambda x: x["timestamp"])
-    ime_events.sort(key=lambda x: x["timestamp"])
-    
-    # Prepare output
-    output_data = {
-        "clipboard_events": clipboard_events,
-        "ime_events": ime_events,
-        "summary": {
-            "total_clipboard_events": len(clipboard_events),
-            "total_ime_events": len(ime_events),
-            "sensitive_clipboard_events": sum(1 for e in clipboard_events if e["is_sensitive"]),
-            "sensitive_ime_events": sum(1 for e in ime_events if e["is_sensitive"])
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_engine import LogcatPlugin, run_plugin
+
+# Enhanced clipboard patterns
+CLIPBOARD_PATTERNS = [
+    # ClipboardService logs that sometimes leak actual text
+    re.compile(r'ClipboardService.*setPrimaryClip.*text[:\s=]+"?([^"<>\n]{3,100})"?', re.I),
+    re.compile(r'ClipboardService.*clip.*data[:\s=]+"?([^"<>\n]{3,100})"?', re.I),
+    # Apps accessing clipboard
+    re.compile(r'ClipboardManager.*getPrimaryClip.*uid[:\s=]+([\d]+)', re.I),
+    # Clipboard with package attribution
+    re.compile(r'ClipboardService.*from package[:\s=]+([a-z0-9\.]+)', re.I),
+]
+
+# Input Method Manager patterns
+IME_PATTERNS = [
+    # Text input events (sometimes logs text length or context)
+    re.compile(r'InputMethodManager.*updateSelection.*text length[:\s=]+([\d]+)', re.I),
+    re.compile(r'InputMethodManager.*setText.*length[:\s=]+([\d]+)', re.I),
+    re.compile(r'InputMethodManager.*commitText.*"([^"]{1,50})"', re.I),
+    # Keyboard suggestions (can reveal typed patterns)
+    re.compile(r'LatinIME.*suggestion.*"([^"]{1,30})"', re.I),
+    re.compile(r'InputMethod.*prediction.*word[:\s=]+"([^"]{1,30})"', re.I),
+]
+
+# Password/sensitive input patterns
+SENSITIVE_PATTERNS = [
+    re.compile(r'password|passwd|pwd', re.I),
+    re.compile(r'otp|2fa|mfa|verification', re.I),
+    re.compile(r'cvv|credit.*card|debit.*card', re.I),
+    re.compile(r'pin|passcode', re.I),
+]
+
+PACKAGE_REGEX = re.compile(r'from package[:\s=]+([a-z0-9\.]+)', re.I)
+
+# Every clipboard/IME pattern above requires one of these markers
+CLIPBOARD_TAGS = ("clipboard", "inputmethod", "latinime")
+
+class ClipboardPlugin(LogcatPlugin):
+    name = "Clipboard Reconstruction"
+
+    def __init__(self, logs_dir="logs", output_file="logs/clipboard_forensics.json"):
+        super().__init__(logs_dir, output_file)
+        self.clipboard_events = []
+        self.ime_events = []
+        self.seen_clipboard = set()
+        self.seen_ime = set()
+
+    def feed(self, record):
+        line_content = record.content
+        line_lower = line_content.lower()
+        if not any(tag in line_lower for tag in CLIPBOARD_TAGS):
+            return
+
+        line_no = record.line_no
+
+        # Extract timestamp
+        ts = record.timestamp
+        timestamp = ts.isoformat() if ts else None
+
+        # Check for sensitive context
+        is_sensitive = any(pattern.search(line_content) for pattern in SENSITIVE_PATTERNS)
+
+        # Search for clipboard events
+        for pattern in CLIPBOARD_PATTERNS:
+            matches = pattern.findall(line_content)
+            for match in matches:
+                if len(match) > 2 and match not in ['null', 'NULL']:
+                    # Extract package if present
+                    package_match = PACKAGE_REGEX.search(line_content)
+                    package = package_match.group(1) if package_match else "Unknown"
+
+                    key = f"{match}_{timestamp}"
+                    if key not in self.seen_clipboard:
+                        self.clipboard_events.append({
+                            "type": "CLIPBOARD",
+                            "content": match[:100],  # Truncate long content
+                            "package": package,
+                            "is_sensitive": is_sensitive,
+                            "timestamp": timestamp or "unknown",
+                            "line": line_no,
+                            "raw": line_content[:300]
+                        })
+                        self.seen_clipboard.add(key)
+
+        # Search for IME events
+        for pattern in IME_PATTERNS:
+            matches = pattern.findall(line_content)
+            for match in matches:
+                if isinstance(match, str) and len(match) > 0:
+                    key = f"{match}_{timestamp}"
+                    if key not in self.seen_ime:
+                        # Determine event type
+                        event_type = "TEXT_LENGTH" if match.isdigit() else "TEXT_CONTENT"
+
+                        self.ime_events.append({
+                            "type": "IME",
+                            "event_type": event_type,
+                            "content": match if not match.isdigit() else f"{match} chars",
+                            "is_sensitive": is_sensitive,
+                            "timestamp": timestamp or "unknown",
+                            "line": line_no,
+                            "raw": line_content[:300]
+                        })
+                        self.seen_ime.add(key)
+
+    def finish(self, logcat_found):
+        if not logcat_found:
+            print("Logcat file not found")
+            return
+
+        # Sort by timestamp
+        self.clipboard_events.sort(key=lambda x: x["timestamp"])
+        self.ime_events.sort(key=lambda x: x["timestamp"])
+
+        # Prepare output
+        output_data = {
+            "clipboard_events": self.clipboard_events,
+            "ime_events": self.ime_events,
+            "summary": {
+                "total_clipboard_events": len(self.clipboard_events),
+                "total_ime_events": len(self.ime_events),
+                "sensitive_clipboard_events": sum(1 for e in self.clipboard_events if e["is_sensitive"]),
+                "sensitive_ime_events": sum(1 for e in self.ime_events if e["is_sensitive"])
+            }
         }
-    }
-    
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=4)
-    
-    print(f"Extracted {len(clipboard_events)} clipboard events and {len(ime_events)} IME events.")
-    print(f"Sensitive clipboard events: {output_data['summary']['sensitive_clipboard_events']}")
-    print(f"Sensitive IME events: {output_data['summary']['sensitive_ime_events']}")
+
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            json.dump(output_data, f, indent=4)
+
+        print(f"Extracted {len(self.clipboard_events)} clipboard events and {len(self.ime_events)} IME events.")
+        print(f"Sensitive clipboard events: {output_data['summary']['sensitive_clipboard_events']}")
+        print(f"Sensitive IME events: {output_data['summary']['sensitive_ime_events']}")
+
+def analyze_clipboard(logs_dir="logs", output_file="logs/clipboard_forensics.json"):
+    run_plugin(ClipboardPlugin(logs_dir, output_file), logs_dir)
 
 if __name__ == "__main__":
     analyze_clipboard()
@@ -4,10 +4,15 @@ Correlates events across SMS, Calls, Location, and Logcat to find patterns
 """
 
 import os
+import sys
 import json
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from artifact_io import load_artifact, ArtifactRecords
+from interval_join import JoinSpec, window_join
+
 class DataCorrelator:
     def __init__(self, logs_dir="logs"):
         self.logs_dir = logs_dir
@@ -42,12 +47,9 @@ class DataCorrelator:
         return self.correlations
     
     def load_json(self, filename):
-        """Load JSON file"""
+        """Load an artifact; list artifacts are streamed lazily (JSON or NDJSON)"""
         filepath = os.path.join(self.logs_dir, filename)
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        return load_artifact(filepath, default={}, lazy=True)
     
     def load_text_logs(self, filename):
         """Parse text log files"""
@@ -71,30 +73,24 @@ class DataCorrelator:
         """Find SMS messages sent/received near call times"""
         print("📱 Correlating SMS and Calls...")
         
+        spec = JoinSpec(
+            'SMS_CALL_PROXIMITY', sms_data, call_data, 300,  # 5 minutes
+            left_time=lambda sms: self.parse_timestamp(sms['timestamp']),
+            right_time=lambda call: self.parse_timestamp(call['timestamp'])
+        )
+        
         count = 0
-        for sms in sms_data:
-            sms_time = self.parse_timestamp(sms['timestamp'])
-            if not sms_time:
-                continue
-            
-            for call in call_data:
-                call_time = self.parse_timestamp(call['timestamp'])
-                if not call_time:
-                    continue
-                
-                # Check if within 5 minutes
-                time_diff = abs((sms_time - call_time).total_seconds())
-                if time_diff <= 300:  # 5 minutes
-                    self.correlations.append({
-                        'type': 'SMS_CALL_PROXIMITY',
-                        'confidence': 'HIGH' if time_diff <= 60 else 'MEDIUM',
-                        'description': f"SMS and call within {int(time_diff/60)} minutes",
-                        'sms_time': sms['timestamp'],
-                        'call_time': call['timestamp'],
-                        'time_diff_seconds': time_diff,
-                        'significance': 'Possible coordinated communication'
-                    })
-                    count += 1
+        for sms, call, time_diff in window_join(spec):
+            self.correlations.append({
+                'type': 'SMS_CALL_PROXIMITY',
+                'confidence': 'HIGH' if time_diff <= 60 else 'MEDIUM',
+                'description': f"SMS and call within {int(time_diff/60)} minutes",
+                'sms_time': sms['timestamp'],
+                'call_time': call['timestamp'],
+                'time_diff_seconds': time_diff,
+                'significance': 'Possible coordinated communication'
+            })
+            count += 1
         
         print(f"  ✓ Found {count} SMS-Call correlations")
     
@@ -106,31 +102,28 @@ class DataCorrelator:
             print("  ⚠️  No app session data")
             return
         
-        count = 0
         sessions = app_sessions.get('sessions', [])
-        events = power_data if isinstance(power_data, list) else []
+        events = power_data if isinstance(power_data, (list, ArtifactRecords)) else []
+        # Only wake-up events can correlate, so filter the right stream up front
+        wake_events = [e for e in events if e.get('event') in ['SCREEN_ON', 'USER_PRESENT']]
         
-        for session in sessions[:100]:  # Limit to avoid performance issues
-            start_time = self.parse_timestamp(session.get('start_time', ''))
-            if not start_time:
-                continue
-            
-            for event in events:
-                event_time = self.parse_timestamp(event.get('timestamp', ''))
-                if not event_time:
-                    continue
-                
-                time_diff = abs((start_time - event_time).total_seconds())
-                if time_diff <= 10 and event.get('event') in ['SCREEN_ON', 'USER_PRESENT']:
-                    self.correlations.append({
-                        'type': 'APP_POWER_CORRELATION',
-                        'confidence': 'HIGH',
-                        'description': f"App session started {int(time_diff)}s after {event['event']}",
-                        'app': session.get('package', 'Unknown'),
-                        'power_event': event['event'],
-                        'significance': 'User activity pattern'
-                    })
-                    count += 1
+        spec = JoinSpec(
+            'APP_POWER_CORRELATION', sessions, wake_events, 10,
+            left_time=lambda session: self.parse_timestamp(session.get('start_time', '')),
+            right_time=lambda event: self.parse_timestamp(event.get('timestamp', ''))
+        )
+        
+        count = 0
+        for session, event, time_diff in window_join(spec):
+            self.correlations.append({
+                'type': 'APP_POWER_CORRELATION',
+                'confidence': 'HIGH',
+                'description': f"App session started {int(time_diff)}s after {event['event']}",
+                'app': session.get('package', 'Unknown'),
+                'power_event': event['event'],
+                'significance': 'User activity pattern'
+            })
+            count += 1
         
         print(f"  ✓ Found {count} App-Power correlations")
     
@@ -146,7 +139,7 @@ class DataCorrelator:
         """Detect suspicious patterns like rapid-fire actions"""
         print("🚨 Detecting Suspicious Patterns...")
         
-        if not timeline or not isinstance(timeline, list):
+        if not timeline or not isinstance(timeline, (list, ArtifactRecords)):
             print("  ⚠️  No timeline data")
             return
         
@@ -178,7 +171,7 @@ class DataCorrelator:
         """Detect time-based activity clusters"""
         print("📊 Detecting Time-Based Activity Clusters...")
         
-        if not timeline or not isinstance(timeline, list):
+        if not timeline or not isinstance(timeline, (list, ArtifactRecords)):
             print("  ⚠️  No timeline data")
             return
         
@@ -1,11 +1,11 @@
 
-import json
 from collections import Counter
 from datetime import datetime
 
+from artifact_io import load_artifact
+
 def check_timestamps(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_artifact(file_path, [])
     
     if not data:
         return
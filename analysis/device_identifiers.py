@@ -5,11 +5,15 @@ Extracts IMEI, Serial Number, and device properties
 
 import os
 import re
+import sys
 import json
 import hashlib
 import hmac
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from merkle_manifest import MerkleManifest
+
 def parse_device_identifiers(identifiers_file="logs/device_identifiers.txt"):
     """
     Parse device identifiers from dumpsys iphonesubinfo and getprop
@@ -75,7 +79,8 @@ def generate_chain_of_custody(officer_id, evidence_hash, timestamp, secret_key="
 
 def calculate_master_hash(logs_dir="logs"):
     """
-    Calculate a master hash of all evidence file hashes
+    Calculate the case master hash: the Merkle root over the per-file
+    Merkle roots of the evidence files (see merkle_manifest.py)
     """
     evidence_files = [
         "android_logcat.txt",
@@ -87,30 +92,22 @@ def calculate_master_hash(logs_dir="logs"):
         "usage_stats.txt"
     ]
     
-    all_hashes = []
-    for filename in evidence_files:
-        filepath = os.path.join(logs_dir, filename)
-        if os.path.exists(filepath):
-            sha256 = hashlib.sha256()
-            with open(filepath, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)
-                    if not chunk:
-                        break
-                    sha256.update(chunk)
-            all_hashes.append(sha256.hexdigest())
+    existing = [f for f in evidence_files if os.path.exists(os.path.join(logs_dir, f))]
+    
+    # Chunks are hashed in parallel; the manifest also localizes later tampering
+    manifest = MerkleManifest(logs_dir)
+    manifest.seal_files(os.path.join(logs_dir, f) for f in existing)
+    manifest.save()
     
-    # Create master hash from all individual hashes
-    master_hash = hashlib.sha256('|'.join(all_hashes).encode()).hexdigest()
-    return master_hash
+    return manifest.master_root(existing)
 
-def generate_section_65b_data(officer_id="IO_TGCSB_001", case_number="TGCSB/2026/123456"):
+def generate_section_65b_data(officer_id="IO_TGCSB_001", case_number="TGCSB/2026/123456", logs_dir="logs"):
     """
     Generate complete Section 65B certificate data
     """
-    device_info = parse_device_identifiers()
+    device_info = parse_device_identifiers(os.path.join(logs_dir, "device_identifiers.txt"))
     timestamp = datetime.now().isoformat()
-    master_hash = calculate_master_hash()
+    master_hash = calculate_master_hash(logs_dir)
     
     chain_of_custody = generate_chain_of_custody(
         officer_id=officer_id,
@@ -130,7 +127,7 @@ def generate_section_65b_data(officer_id="IO_TGCSB_001", case_number="TGCSB/2026
     }
     
     # Save to JSON
-    with open("logs/section_65b_data.json", "w", encoding="utf-8") as f:
+    with open(os.path.join(logs_dir, "section_65b_data.json"), "w", encoding="utf-8") as f:
         json.dump(section_65b_data, f, indent=4)
     
     print(f"📜 Section 65B Certificate Data Generated:")
@@ -26,10 +26,11 @@ BANKING_APPS = [
     "com.phonepe.app.business"
 ]
 
-def parse_dual_space_apps(dual_space_file="logs/dual_space_apps.txt"):
+def parse_dual_space_apps(dual_space_file=None, logs_dir="logs"):
     """
     Parse dual space detection output
     """
+    dual_space_file = dual_space_file or os.path.join(logs_dir, "dual_space_apps.txt")
     if not os.path.exists(dual_space_file):
         print(f"⚠️ Dual space file not found: {dual_space_file}")
         return {
@@ -62,7 +63,7 @@ def parse_dual_space_apps(dual_space_file="logs/dual_space_apps.txt"):
     dual_apps_10 = extract_packages(dual_10_section.group(1) if dual_10_section else "")
 
     # 🆕 FALBACK: Parse full package dump for combined UIDs (e.g., uid:10xxx,999xxx)
-    full_dump_file = "logs/full_package_dump.txt"
+    full_dump_file = os.path.join(logs_dir, "full_package_dump.txt")
     if os.path.exists(full_dump_file):
         print(f"   ℹ️ Parsing full package dump for hidden clones...")
         with open(full_dump_file, "r", encoding="utf-8", errors="replace") as f:
@@ -110,11 +111,11 @@ def parse_dual_space_apps(dual_space_file="logs/dual_space_apps.txt"):
         "banking_clone_count": len(cloned_banking_apps)
     }
 
-def analyze_dual_space(output_file="logs/dual_space_analysis.json"):
+def analyze_dual_space(logs_dir="logs", output_file="logs/dual_space_analysis.json"):
     """
     Analyze dual space apps and generate mule risk assessment
     """
-    result = parse_dual_space_apps()
+    result = parse_dual_space_apps(logs_dir=logs_dir)
     
     # Mule risk assessment
     mule_indicators = []
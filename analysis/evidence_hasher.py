@@ -4,13 +4,28 @@ Generates and verifies SHA-256 hashes for all extracted log files
 """
 
 import os
+import sys
 import json
+import mmap
 import hashlib
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from merkle_manifest import MerkleManifest, MANIFEST_FILE, print_report
+from artifact_io import FORMATS, artifact_path
+
+# Read size for hashing; files at or above MMAP_THRESHOLD are hashed through mmap
+HASH_CHUNK_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# hashlib releases the GIL on large buffers, so threads hash files in parallel
+HASH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
 
 class EvidenceHasher:
-    def __init__(self, logs_dir="logs"):
+    def __init__(self, logs_dir="logs", max_workers=HASH_WORKERS):
         self.logs_dir = logs_dir
+        self.max_workers = max_workers
         self.metadata_file = os.path.join(logs_dir, "evidence_metadata.json")
         self.metadata = self.load_metadata()
     
@@ -22,10 +37,12 @@ class EvidenceHasher:
         return {"files": {}, "created": datetime.now().isoformat()}
     
     def save_metadata(self):
-        """Save metadata to file"""
+        """Save metadata to file (atomically, so a crash never leaves a half-written ledger)"""
         self.metadata["last_updated"] = datetime.now().isoformat()
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
+        tmp_file = self.metadata_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(self.metadata, f, indent=4)
+        os.replace(tmp_file, self.metadata_file)
     
     def hash_file(self, filepath):
         """Generate SHA-256 hash for a file"""
@@ -33,41 +50,67 @@ class EvidenceHasher:
         
         try:
             with open(filepath, 'rb') as f:
-                # Read in chunks to handle large files
-                for chunk in iter(lambda: f.read(8192), b''):
-                    sha256.update(chunk)
+                size = os.fstat(f.fileno()).st_size
+                if size >= MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        sha256.update(mm)
+                else:
+                    # Large reads into one reusable buffer
+                    buf = bytearray(HASH_CHUNK_SIZE)
+                    view = memoryview(buf)
+                    while True:
+                        n = f.readinto(buf)
+                        if not n:
+                            break
+                        sha256.update(view[:n])
             return sha256.hexdigest()
         except Exception as e:
             print(f"Error hashing {filepath}: {e}")
             return None
     
-    def register_file(self, filepath, description=""):
-        """Register a file and generate its hash"""
+    def hash_files(self, filepaths):
+        """Hash several files in parallel. Returns {filepath: hash or None}"""
+        filepaths = list(filepaths)
+        if self.max_workers <= 1 or len(filepaths) <= 1:
+            return {path: self.hash_file(path) for path in filepaths}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(filepaths, pool.map(self.hash_file, filepaths)))
+    
+    @staticmethod
+    def file_stat(filepath):
+        """(size, mtime_ns, inode) used by fast verification"""
+        st = os.stat(filepath)
+        return st.st_size, st.st_mtime_ns, st.st_ino
+    
+    def _record_file(self, filepath, file_hash, description=""):
+        """Store a file's hash and stat fingerprint in the metadata (not saved)"""
+        size, mtime_ns, inode = self.file_stat(filepath)
+        now = datetime.now().isoformat()
+        self.metadata["files"][os.path.basename(filepath)] = {
+            "hash": file_hash,
+            "size_bytes": size,
+            "created": now,
+            "modified": datetime.fromtimestamp(mtime_ns / 1e9).isoformat(),
+            "mtime_ns": mtime_ns,
+            "inode": inode,
+            "description": description,
+            "verified": True,
+            "last_verification": now
+        }
+    
+    def register_file(self, filepath, description="", file_hash=None):
+        """Register a file and generate its hash (file_hash: digest already computed while writing it)"""
         if not os.path.exists(filepath):
             print(f"File not found: {filepath}")
             return False
         
-        file_hash = self.hash_file(filepath)
+        file_hash = file_hash or self.hash_file(filepath)
         if not file_hash:
             return False
         
-        file_size = os.path.getsize(filepath)
-        file_mtime = datetime.fromtimestamp(os.path.getmtime(filepath)).isoformat()
-        
-        filename = os.path.basename(filepath)
-        
-        self.metadata["files"][filename] = {
-            "hash": file_hash,
-            "size_bytes": file_size,
-            "created": datetime.now().isoformat(),
-            "modified": file_mtime,
-            "description": description,
-            "verified": True,
-            "last_verification": datetime.now().isoformat()
-        }
-        
+        self._record_file(filepath, file_hash, description)
         self.save_metadata()
-        print(f"Registered: {filename} (SHA-256: {file_hash[:16]}...)")
+        print(f"Registered: {os.path.basename(filepath)} (SHA-256: {file_hash[:16]}...)")
         return True
     
     def verify_file(self, filepath):
@@ -78,74 +121,131 @@ class EvidenceHasher:
             print(f"No metadata found for {filename}")
             return False
         
-        stored_hash = self.metadata["files"][filename]["hash"]
         current_hash = self.hash_file(filepath)
-        
         if not current_hash:
             return False
         
+        verified = self._check_hash(filename, current_hash)
+        self.save_metadata()
+        return verified
+    
+    def _check_hash(self, filename, current_hash):
+        """Compare a fresh hash with the stored one and update the metadata (not saved)"""
+        entry = self.metadata["files"][filename]
+        stored_hash = entry["hash"]
+        
         if stored_hash == current_hash:
             # Update verification timestamp
-            self.metadata["files"][filename]["verified"] = True
-            self.metadata["files"][filename]["last_verification"] = datetime.now().isoformat()
-            self.save_metadata()
+            entry["verified"] = True
+            entry["last_verification"] = datetime.now().isoformat()
             print(f"✓ VERIFIED: {filename}")
             return True
         else:
             # Mark as tampered
-            self.metadata["files"][filename]["verified"] = False
-            self.metadata["files"][filename]["tampered_detected"] = datetime.now().isoformat()
-            self.save_metadata()
+            entry["verified"] = False
+            entry["tampered_detected"] = datetime.now().isoformat()
             print(f"✗ TAMPERED: {filename}")
             print(f"  Expected: {stored_hash}")
             print(f"  Got:      {current_hash}")
             return False
     
+    def _stat_unchanged(self, filename, filepath):
+        """True if size, mtime and inode all match what was recorded at hashing time"""
+        entry = self.metadata["files"][filename]
+        if "mtime_ns" not in entry or "inode" not in entry:
+            return False
+        return self.file_stat(filepath) == (entry["size_bytes"], entry["mtime_ns"], entry["inode"])
+    
     def hash_all_logs(self):
         """Hash all files in the logs directory"""
         if not os.path.exists(self.logs_dir):
             print(f"Logs directory not found: {self.logs_dir}")
             return
         
-        file_count = 0
-        for filename in os.listdir(self.logs_dir):
+        filepaths = []
+        for filename in sorted(os.listdir(self.logs_dir)):
             filepath = os.path.join(self.logs_dir, filename)
             
-            # Skip directories and metadata file itself
-            if os.path.isdir(filepath) or filename == "evidence_metadata.json":
+            # Skip directories, the ledger files themselves, their temp files and the
+            # incremental logcat state (rewritten on every capture)
+            if os.path.isdir(filepath) or filename.startswith(("evidence_metadata.json", MANIFEST_FILE, "logcat_state.json")):
                 continue
-            
+            filepaths.append(filepath)
+        
+        # Seal the chunked Merkle manifest; the same pass yields each file's SHA-256
+        manifest = MerkleManifest(self.logs_dir, max_workers=self.max_workers)
+        records = manifest.seal_files(filepaths)
+        manifest.save()
+        hashes = {path: (record or {}).get("sha256") for path, record in records.items()}
+        hashes.update(self.hash_files([path for path, digest in hashes.items() if not digest]))
+        
+        file_count = 0
+        for filepath in filepaths:
+            file_hash = hashes[filepath]
+            if not file_hash:
+                continue
+            filename = os.path.basename(filepath)
             # Determine description based on filename
-            description = self.get_file_description(filename)
-            
-            if self.register_file(filepath, description):
-                file_count += 1
+            self._record_file(filepath, file_hash, self.get_file_description(filename))
+            print(f"Registered: {filename} (SHA-256: {file_hash[:16]}...)")
+            file_count += 1
         
+        # One metadata write for the whole batch
+        self.save_metadata()
         print(f"\nTotal files hashed: {file_count}")
         return file_count
     
-    def verify_all_logs(self):
-        """Verify all registered files"""
-        results = {"verified": [], "tampered": [], "missing": []}
+    def verify_all_logs(self, fast=False):
+        """
+        Verify all registered files.
+        
+        fast=True trusts files whose size, mtime and inode are unchanged since they
+        were hashed and only re-hashes the rest; the default re-hashes every file
+        (court-grade verification).
+        """
+        results = {"verified": [], "tampered": [], "missing": [], "fast_checked": []}
         
+        to_hash = []
         for filename in self.metadata["files"]:
             filepath = os.path.join(self.logs_dir, filename)
             
             if not os.path.exists(filepath):
                 results["missing"].append(filename)
                 print(f"⚠ MISSING: {filename}")
-                continue
-            
-            if self.verify_file(filepath):
+            elif fast and self._stat_unchanged(filename, filepath):
+                self.metadata["files"][filename]["last_fast_check"] = datetime.now().isoformat()
+                results["verified"].append(filename)
+                results["fast_checked"].append(filename)
+                print(f"✓ UNCHANGED: {filename} (size/mtime/inode match)")
+            else:
+                to_hash.append(filepath)
+        
+        for filepath, current_hash in self.hash_files(to_hash).items():
+            filename = os.path.basename(filepath)
+            if current_hash and self._check_hash(filename, current_hash):
                 results["verified"].append(filename)
             else:
                 results["tampered"].append(filename)
         
+        self.save_metadata()
+        
+        # Localize tampering to byte/line ranges with the Merkle manifest
+        if results["tampered"]:
+            manifest = MerkleManifest(self.logs_dir, max_workers=self.max_workers)
+            results["changes"] = {}
+            for filename in results["tampered"]:
+                report = manifest.verify(filename)
+                if report["status"] in ("tampered", "appended"):
+                    print_report(report)
+                    results["changes"][filename] = report.get("changed", [])
+        
         # Print summary
         print("\n=== VERIFICATION SUMMARY ===")
         print(f"✓ Verified:  {len(results['verified'])}")
         print(f"✗ Tampered:  {len(results['tampered'])}")
         print(f"⚠ Missing:   {len(results['missing'])}")
+        if fast:
+            print(f"  Fast-checked (not re-hashed): {len(results['fast_checked'])}")
         
         return results
     
@@ -167,6 +267,12 @@ class EvidenceHasher:
             "clipboard_forensics.json": "Clipboard recovery data",
             "app_sessions.json": "App usage sessions"
         }
+        # Artifacts written as x.ndjson[.gz|.zst] are described like x.json
+        for fmt in FORMATS:
+            base = artifact_path("", fmt)
+            if filename.endswith(base) and fmt != "json":
+                filename = filename[:-len(base)] + ".json"
+                break
         return descriptions.get(filename, "Forensic evidence file")
     
     def generate_integrity_report(self):
@@ -208,7 +314,8 @@ def main():
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python evidence_hasher.py hash       - Hash all log files")
-        print("  python evidence_hasher.py verify     - Verify all log files")
+        print("  python evidence_hasher.py verify     - Verify all log files (full re-hash)")
+        print("  python evidence_hasher.py verify --fast - Re-hash only files whose size/mtime/inode changed")
         print("  python evidence_hasher.py report     - Generate integrity report")
         return
     
@@ -217,7 +324,7 @@ def main():
     if command == "hash":
         hasher.hash_all_logs()
     elif command == "verify":
-        hasher.verify_all_logs()
+        hasher.verify_all_logs(fast="--fast" in sys.argv[2:])
     elif command == "report":
         report = hasher.generate_integrity_report()
         print(json.dumps(report, indent=2))
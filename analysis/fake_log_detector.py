@@ -1,9 +1,13 @@
 import os
-import json
 import re
+import sys
+import json
 from datetime import datetime
 import time
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_parser import TimestampDecoder, timestamp_prefix
+
 LOGS_DIR = "logs"
 REPORT_FILE = os.path.join(LOGS_DIR, "fake_log_report.json")
 
@@ -17,10 +21,9 @@ def parse_logcat_timestamps(file_path):
     if not os.path.exists(file_path):
         return []
 
-    # Regex for standard logcat time: 02-03 16:29:10.123
+    # Standard logcat time: 02-03 16:29:10.123
     # We ignore year, assumes current year
-    time_pattern = re.compile(r"^(\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})")
-    current_year = datetime.now().year
+    decoder = TimestampDecoder()
 
     # Filter for relevant tags
     relevant_tags = ["Radio", "CallManager", "GsmCdmaPhone", "InCallUI", "Telecom", "SmsDispatch", "InboundSmsHandler", "ActivityManager"]
@@ -32,22 +35,65 @@ def parse_logcat_timestamps(file_path):
                 if not any(tag in line for tag in relevant_tags):
                     continue
                 
-                match = time_pattern.search(line)
-                if match:
-                    dt_str = f"{current_year}-{match.group(1)}"
-                    try:
-                        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
+                ts = timestamp_prefix(line)
+                if ts:
+                    # Whole seconds, as the comparison window is +/- 60 s
+                    epoch = decoder.epoch(ts[:14])
+                    if epoch is not None:
                         # Store tuple (timestamp, log_content)
-                        activity_timestamps.append((dt.timestamp(), line.strip()))
-                    except ValueError:
-                        continue
+                        activity_timestamps.append((epoch, line.strip()))
     except Exception as e:
         print(f"Error parsing logcat {file_path}: {e}")
 
     # Sort by timestamp
     return sorted(activity_timestamps, key=lambda x: x[0])
 
-# ... (Parsing functions remain same)
+def _user_log_records(file_path, prefix):
+    """
+    Call/SMS log entries as {id, timestamp, duration}. ids are "<prefix>_<epoch ms>"
+    (the web timeline matches report entries to events by that timestamp).
+    Reads content-query rows (date=<ms>) and "YYYY-MM-DD HH:MM:SS | ..." lines.
+    """
+    records = []
+    if not os.path.exists(file_path):
+        return records
+
+    seen = set()
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = re.search(r"\bdate=(\d+)", line)
+            if match:
+                ms = int(match.group(1))
+            elif re.match(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", line):
+                try:
+                    ms = int(datetime.strptime(line[:19], "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+                except ValueError:
+                    continue
+            else:
+                continue
+            duration = re.search(r"\bduration=(\d+)", line)
+
+            record_id = f"{prefix}_{ms}"
+            suffix = 1
+            while record_id in seen:
+                record_id = f"{prefix}_{ms}_{suffix}"
+                suffix += 1
+            seen.add(record_id)
+            records.append({
+                "id": record_id,
+                "timestamp": ms / 1000,
+                "duration": int(duration.group(1)) if duration else 0
+            })
+    return records
+
+
+def parse_call_logs(logs_dir=LOGS_DIR):
+    return _user_log_records(os.path.join(logs_dir, "call_logs.txt"), "call")
+
+
+def parse_sms_logs(logs_dir=LOGS_DIR):
+    return _user_log_records(os.path.join(logs_dir, "sms_logs.txt"), "sms")
+
 
 def verify_logs(logs, system_activity):
     """
@@ -108,21 +154,22 @@ def verify_logs(logs, system_activity):
 
     return results
 
-def main():
+def main(logs_dir=LOGS_DIR):
     print("🕵️  Mule Hunter: Fake Log Detector Running...")
+    report_file = os.path.join(logs_dir, "fake_log_report.json")
     
     # 1. Parse valid system radio times
-    radio_times = parse_logcat_timestamps(os.path.join(LOGS_DIR, "android_logcat_radio.txt"))
+    radio_times = parse_logcat_timestamps(os.path.join(logs_dir, "android_logcat_radio.txt"))
     # Fallback to main logcat if radio is empty
     if not radio_times:
         print("   ⚠️  Radio buffer empty, falling back to main logcat...")
-        radio_times = parse_logcat_timestamps(os.path.join(LOGS_DIR, "android_logcat.txt"))
+        radio_times = parse_logcat_timestamps(os.path.join(logs_dir, "android_logcat.txt"))
     
     print(f"   ✅ Loaded {len(radio_times)} system radio events")
 
     # 2. Parse User Logs
-    calls = parse_call_logs()
-    sms = parse_sms_logs()
+    calls = parse_call_logs(logs_dir)
+    sms = parse_sms_logs(logs_dir)
     print(f"   ✅ Loaded {len(calls)} calls and {len(sms)} SMS messages")
 
     # 3. Verify
@@ -135,16 +182,17 @@ def main():
         "metadata": {
             "generated_at": datetime.now().isoformat(),
             "system_log_count": len(radio_times),
-            "system_log_start": datetime.fromtimestamp(radio_times[0]).isoformat() if radio_times else None,
-            "system_log_end": datetime.fromtimestamp(radio_times[-1]).isoformat() if radio_times else None
+            "system_log_start": datetime.fromtimestamp(radio_times[0][0]).isoformat() if radio_times else None,
+            "system_log_end": datetime.fromtimestamp(radio_times[-1][0]).isoformat() if radio_times else None
         },
         "verification": verification_results
     }
     
-    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+    with open(report_file, "w", encoding="utf-8") as f:
         json.dump(report, f, indent=2)
     
-    print(f"✅ Fake Log Report generated: {REPORT_FILE}")
+    print(f"✅ Fake Log Report generated: {report_file}")
+    return report["metadata"]
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,201 @@
+"""
+gap_detector.py
+
+Vectorized gap ("ghost log") detection over sorted epoch timestamps.
+Shared by unified_timeline.py (GHOST events + ghost_gaps.json summary)
+and check_gaps.py (console report from that summary).
+"""
+
+import os
+import sys
+import json
+import bisect
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from timeline_store import us_to_iso
+
+US_PER_SECOND = 1000000
+
+# Minimum gap (seconds) per event family; a family is a timeline type prefix.
+# LOGCAT covers LOGCAT, LOGCAT_APP, LOGCAT_POWER, ... as one stream.
+GAP_THRESHOLDS = {
+    "LOGCAT": 60.0
+}
+
+# Right-closed histogram bins: (0, 1s], (1s, 1m], (1m, 5m], (5m, 1h], (1h, 1d], (1d, inf)
+HISTOGRAM_EDGES = [1, 60, 300, 3600, 86400]
+HISTOGRAM_LABELS = ["<=1s", "1s-1m", "1m-5m", "5m-1h", "1h-1d", ">1d"]
+
+# Largest raw gaps kept in the summary
+TOP_GAPS = 10
+
+FAMILY_LABELS = {
+    "LOGCAT": "system logs"
+}
+
+
+def pairwise_gaps(ts_us):
+    """Differences between consecutive sorted timestamps (microseconds)."""
+    if NUMPY_AVAILABLE:
+        return np.diff(np.asarray(ts_us, dtype=np.int64))
+    return [b - a for a, b in zip(ts_us, ts_us[1:])]
+
+
+def coalesce_gaps(ts_us, deltas, threshold_us):
+    """
+    Find gaps above threshold_us and merge runs of consecutive gaps into spans.
+
+    A run is a sequence of adjacent pairs that are all gaps (i.e. only isolated
+    events in between), reported once from the first to the last timestamp.
+    Returns a list of (start_us, end_us, gap_count, longest_gap_us).
+    """
+    if NUMPY_AVAILABLE:
+        idx = np.flatnonzero(np.asarray(deltas) > threshold_us)
+        if not len(idx):
+            return []
+        # Break the gap index list wherever two gaps are not adjacent pairs
+        breaks = np.flatnonzero(np.diff(idx) != 1) + 1
+        run_starts = idx[np.concatenate(([0], breaks))]
+        run_ends = idx[np.concatenate((breaks - 1, [len(idx) - 1]))]
+        ts = np.asarray(ts_us, dtype=np.int64)
+        longest = np.maximum.reduceat(np.asarray(deltas)[idx], np.concatenate(([0], breaks)))
+        return list(zip(ts[run_starts].tolist(), ts[run_ends + 1].tolist(),
+                        (run_ends - run_starts + 1).tolist(), longest.tolist()))
+
+    spans = []
+    run_start = None
+    longest = 0
+    for i, delta in enumerate(deltas):
+        if delta > threshold_us:
+            if run_start is None:
+                run_start = i
+                longest = delta
+            longest = max(longest, delta)
+        elif run_start is not None:
+            spans.append((ts_us[run_start], ts_us[i], i - run_start, longest))
+            run_start = None
+    if run_start is not None:
+        spans.append((ts_us[run_start], ts_us[len(deltas)], len(deltas) - run_start, longest))
+    return spans
+
+
+def gap_histogram(deltas):
+    """Count pairwise gaps per HISTOGRAM_LABELS bin."""
+    edges = [edge * US_PER_SECOND for edge in HISTOGRAM_EDGES]
+    if NUMPY_AVAILABLE:
+        bins = np.searchsorted(np.asarray(edges, dtype=np.int64), np.asarray(deltas, dtype=np.int64), side='left')
+        counts = np.bincount(bins, minlength=len(HISTOGRAM_LABELS)).tolist()
+    else:
+        counts = [0] * len(HISTOGRAM_LABELS)
+        for delta in deltas:
+            counts[bisect.bisect_left(edges, delta)] += 1
+    return dict(zip(HISTOGRAM_LABELS, counts))
+
+
+def largest_gaps(ts_us, deltas, count=TOP_GAPS):
+    """The `count` largest pairwise gaps, largest first."""
+    if NUMPY_AVAILABLE:
+        deltas = np.asarray(deltas)
+        order = np.argsort(-deltas, kind='stable')[:count].tolist()
+    else:
+        order = sorted(range(len(deltas)), key=lambda i: -deltas[i])[:count]
+    return [{
+        "gap_seconds": int(deltas[i]) / US_PER_SECOND,
+        "time1": us_to_iso(int(ts_us[i])),
+        "time2": us_to_iso(int(ts_us[i + 1]))
+    } for i in order]
+
+
+def format_duration(seconds):
+    """Human-readable gap size."""
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} hours"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} minutes"
+    return f"{seconds:.1f} seconds"
+
+
+def ghost_duration(seconds):
+    """Gap size in GHOST event wording ("12 min", "3.5 hrs")."""
+    minutes = int(seconds / 60)
+    return f"{minutes} min" if minutes < 60 else f"{round(seconds / 3600, 1)} hrs"
+
+
+def ghost_message(family, seconds, gap_count=1, longest_seconds=None):
+    """
+    GHOST event text. A single gap keeps the original per-pair wording; a
+    coalesced span has isolated events inside, so it reports the number of
+    gaps and the longest one instead of claiming there were no logs.
+    """
+    source = FAMILY_LABELS.get(family, f"{family} events")
+    if gap_count == 1:
+        return f"👻 GHOST GAP: No {source} for {ghost_duration(seconds)}. Possible device power-off or data removal."
+    longest = ghost_duration(seconds if longest_seconds is None else longest_seconds)
+    return (f"👻 GHOST GAP: {gap_count} gaps in {source} over {ghost_duration(seconds)} "
+            f"(longest {longest}). Possible device power-off or data removal.")
+
+
+def detect_ghost_gaps(store, thresholds=None):
+    """
+    Detect gaps per event family in a TimelineStore.
+
+    Returns (ghost_events, summary): GHOST event dicts for every coalesced gap
+    span, and a per-family summary with spans, histogram and largest gaps.
+    """
+    thresholds = GAP_THRESHOLDS if thresholds is None else thresholds
+    ghost_events = []
+    summary = {}
+
+    for family, threshold in thresholds.items():
+        rows = store.sort_order(store.rows_with_type_prefix(family))
+        if NUMPY_AVAILABLE:
+            ts_us = np.frombuffer(store.ts, dtype=np.int64)[np.asarray(rows, dtype=np.int64)]
+        else:
+            ts_us = [store.ts[row] for row in rows]
+        if len(ts_us) < 2:
+            continue
+
+        deltas = pairwise_gaps(ts_us)
+        spans = coalesce_gaps(ts_us, deltas, threshold * US_PER_SECOND)
+
+        family_spans = []
+        for start_us, end_us, gap_count, longest_us in spans:
+            seconds = (end_us - start_us) / US_PER_SECOND
+            longest_seconds = longest_us / US_PER_SECOND
+            family_spans.append({
+                "start": us_to_iso(start_us),
+                "end": us_to_iso(end_us),
+                "gap_seconds": seconds,
+                "gap_count": gap_count,
+                "longest_gap_seconds": longest_seconds
+            })
+            # Ghost event right after the last event before the gap
+            ghost_events.append({
+                "timestamp": us_to_iso(start_us + US_PER_SECOND),
+                "type": "GHOST",
+                "subtype": "Log Gap Detected",
+                "content": ghost_message(family, seconds, gap_count, longest_seconds),
+                "severity": "W"
+            })
+
+        summary[family] = {
+            "threshold_seconds": threshold,
+            "events": len(ts_us),
+            "pairs": len(ts_us) - 1,
+            "histogram": gap_histogram(deltas),
+            "largest_gaps": largest_gaps(ts_us, deltas),
+            "spans": family_spans
+        }
+
+    return ghost_events, summary
+
+
+def save_gap_summary(summary, output_file):
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4)
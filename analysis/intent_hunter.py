@@ -1,67 +1,79 @@
-
 import os
-import json
+import sys
 import re
 
-def analyze_intents(logs_dir="logs", output_file="logs/intent_hunter.json"):
-    logcat_path = os.path.join(logs_dir, "android_logcat.txt")
-    if not os.path.exists(logcat_path):
-        return
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_engine import LogcatPlugin, run_plugin
+from artifact_io import ArtifactWriter
+
+# 1. URL Pattern
+URL_REGEX = re.compile(r'(https?://[^\s<>"]+|content://[^\s<>"]+|file://[^\s<>"]+)')
+
+# 2. Intent Pattern (common ActivityManager output)
+# act=android.intent.action.VIEW dat=https://... cmp=...
+INTENT_REGEX = re.compile(r'act=([a-zA-Z0-9\._]+)(?:\s+dat=([^\s]+))?(?:\s+cmp=([^\s]+))?')
+
+class IntentPlugin(LogcatPlugin):
+    name = "Intent & URL Hunter"
 
-    findings = []
-    
-    # 1. URL Pattern
-    url_regex = re.compile(r'(https?://[^\s<>"]+|content://[^\s<>"]+|file://[^\s<>"]+)')
-    
-    # 2. Intent Pattern (common ActivityManager output)
-    # act=android.intent.action.VIEW dat=https://... cmp=...
-    intent_regex = re.compile(r'act=([a-zA-Z0-9\._]+)(?:\s+dat=([^\s]+))?(?:\s+cmp=([^\s]+))?')
+    def __init__(self, logs_dir="logs", output_file="logs/intent_hunter.json"):
+        super().__init__(logs_dir, output_file)
+        self.seen_items = set()
+        # Data values already captured as INTENT findings
+        self.intent_data = set()
 
-    seen_items = set()
+    def start(self):
+        self.writer = ArtifactWriter(self.output_file)
 
-    with open(logcat_path, "r", encoding="utf-8", errors="replace") as f:
-        for line_no, line in enumerate(f, 1):
-            line_content = line.strip()
-            
-            # Search for Intents
-            intent_match = intent_regex.search(line_content)
-            if intent_match:
-                action, data, component = intent_match.groups()
-                # Filter trivial intents
-                if action not in ['android.intent.action.MAIN'] and (data or component):
-                    item_key = f"{action}|{data}|{component}"
-                    if item_key not in seen_items:
-                        findings.append({
-                            "type": "INTENT",
-                            "action": action,
-                            "data": data or "N/A",
-                            "component": component or "N/A",
-                            "line": line_no,
+    def feed(self, record):
+        line_content = record.content
+
+        # Search for Intents
+        intent_match = INTENT_REGEX.search(line_content)
+        if intent_match:
+            action, data, component = intent_match.groups()
+            # Filter trivial intents
+            if action not in ['android.intent.action.MAIN'] and (data or component):
+                item_key = f"{action}|{data}|{component}"
+                if item_key not in self.seen_items:
+                    self.writer.write({
+                        "type": "INTENT",
+                        "action": action,
+                        "data": data or "N/A",
+                        "component": component or "N/A",
+                        "line": record.line_no,
+                        "raw": line_content
+                    })
+                    self.seen_items.add(item_key)
+                    self.intent_data.add(data or "N/A")
+
+        # Search for loose URLs not captured above
+        urls = URL_REGEX.findall(line_content)
+        for url in urls:
+            if len(url) > 10 and "android.com" not in url and "schemas.android.com" not in url:
+                # Look if we already captured this in intent
+                if url not in self.intent_data:
+                    if url not in self.seen_items:
+                        self.writer.write({
+                            "type": "URL",
+                            "action": "Discovery",
+                            "data": url,
+                            "component": "N/A",
+                            "line": record.line_no,
                             "raw": line_content
                         })
-                        seen_items.add(item_key)
+                        self.seen_items.add(url)
+
+    def finish(self, logcat_found):
+        if not logcat_found:
+            return
 
-            # Search for loose URLs not captured above
-            urls = url_regex.findall(line_content)
-            for url in urls:
-                if len(url) > 10 and "android.com" not in url and "schemas.android.com" not in url:
-                    # Look if we already captured this in intent
-                    if not any(f['data'] == url for f in findings if f['type'] == 'INTENT'):
-                        if url not in seen_items:
-                            findings.append({
-                                "type": "URL",
-                                "action": "Discovery",
-                                "data": url,
-                                "component": "N/A",
-                                "line": line_no,
-                                "raw": line_content
-                            })
-                            seen_items.add(url)
+        self.writer.close()
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(findings, f, indent=4)
-    
-    print(f"Hunted down {len(findings)} intents/URLs.")
+        print(f"Hunted down {self.writer.count} intents/URLs.")
+
+def analyze_intents(logs_dir="logs", output_file="logs/intent_hunter.json"):
+    run_plugin(IntentPlugin(logs_dir, output_file), logs_dir)
 
 if __name__ == "__main__":
     analyze_intents()
@@ -0,0 +1,72 @@
+"""
+interval_join.py
+
+Time-window join primitive for correlating event streams.
+Both streams are sorted once by timestamp and matched with a two-pointer
+sweep, so a join costs O((n + m) log(n + m) + matches) instead of n × m.
+"""
+
+from datetime import timedelta
+
+
+class JoinSpec:
+    """
+    One correlation expressed as a join:
+    left stream × right stream, matched when |t_left - t_right| <= window.
+    """
+
+    def __init__(self, name, left, right, window_seconds, left_time, right_time, predicate=None):
+        self.name = name
+        self.left = left
+        self.right = right
+        self.window = timedelta(seconds=window_seconds)
+        self.left_time = left_time      # item -> datetime or None (None = skip item)
+        self.right_time = right_time
+        self.predicate = predicate      # (left_item, right_item, time_diff_seconds) -> bool
+
+
+def _timed(items, time_fn):
+    """[(time, original_index, item)] sorted by time, dropping items without a time."""
+    timed = []
+    for idx, item in enumerate(items):
+        t = time_fn(item)
+        if t is not None:
+            timed.append((t, idx, item))
+    timed.sort(key=lambda entry: (entry[0], entry[1]))
+    return timed
+
+
+def window_join(spec):
+    """
+    Yield (left_item, right_item, time_diff_seconds) for every pair within the window.
+
+    time_diff_seconds is abs(t_left - t_right). Pairs come out in the same order
+    as the equivalent nested loop (left stream order, then right stream order).
+    """
+    left = _timed(spec.left, spec.left_time)
+    right = _timed(spec.right, spec.right_time)
+    if not left or not right:
+        return
+
+    # Two-pointer sweep over both sorted streams: right[lo:hi] is the window for each left
+    ranges = {}
+    lo = hi = 0
+    for t, idx, _ in left:
+        while lo < len(right) and right[lo][0] < t - spec.window:
+            lo += 1
+        if hi < lo:
+            hi = lo
+        while hi < len(right) and right[hi][0] <= t + spec.window:
+            hi += 1
+        if lo < hi:
+            ranges[idx] = (lo, hi)
+
+    # Emit in original left order, matches in original right order
+    for t, idx, left_item in sorted(left, key=lambda entry: entry[1]):
+        window = ranges.get(idx)
+        if window is None:
+            continue
+        for rt, _, right_item in sorted(right[window[0]:window[1]], key=lambda entry: entry[1]):
+            time_diff = abs((t - rt).total_seconds())
+            if spec.predicate is None or spec.predicate(left_item, right_item, time_diff):
+                yield left_item, right_item, time_diff
@@ -0,0 +1,178 @@
+"""
+Single-Pass Logcat Engine - Shared Log Reader
+Reads android_logcat.txt once and dispatches every line to registered analyzer plugins
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_segments import LogcatSegmentStore
+from logcat_parser import LogcatParser, timestamp_prefix
+
+class LogRecord:
+    """
+    One logcat line, parsed lazily and at most once.
+
+    Plugins receive the same record object, so the stripped content, the
+    timestamp and the parsed fields are computed by whichever plugin asks first
+    and cached for the rest.
+    """
+    __slots__ = ("line_no", "line", "_content", "_ts_str", "_timestamp", "_parsed", "_parser")
+
+    _UNSET = object()
+
+    def __init__(self, line_no, line, parser):
+        self.line_no = line_no
+        self.line = line
+        self._parser = parser
+        self._content = None
+        self._ts_str = LogRecord._UNSET
+        self._timestamp = LogRecord._UNSET
+        self._parsed = LogRecord._UNSET
+
+    @property
+    def content(self):
+        """Line with surrounding whitespace removed."""
+        if self._content is None:
+            self._content = self.line.strip()
+        return self._content
+
+    @property
+    def ts_str(self):
+        """Raw 'MM-DD HH:MM:SS.mmm' prefix, or None if the line has none."""
+        if self._ts_str is LogRecord._UNSET:
+            self._ts_str = timestamp_prefix(self.line)
+        return self._ts_str
+
+    @property
+    def timestamp(self):
+        """Timestamp as a datetime in the current year, or None if unparseable."""
+        if self._timestamp is LogRecord._UNSET:
+            self._timestamp = self._parser.decoder.datetime(self.ts_str) if self.ts_str else None
+        return self._timestamp
+
+    @property
+    def parsed(self):
+        """logcat_parser.LogcatLine (priority, tag, pid, message, ...), or None."""
+        if self._parsed is LogRecord._UNSET:
+            self._parsed = self._parser.parse(self.line, self.line_no)
+        return self._parsed
+
+
+class LogcatPlugin:
+    """
+    Base class for analyzers driven by LogcatEngine.
+
+    Subclasses keep their own state, implement feed() for per-line work and
+    finish() to build and write their JSON output. Plugins that emit records
+    as they go open self.writer (an ArtifactWriter) in start(), write to it
+    from feed() and close it in finish().
+    """
+    name = "Logcat Plugin"
+
+    def __init__(self, logs_dir="logs", output_file=None):
+        self.logs_dir = logs_dir
+        self.output_file = output_file
+        self.writer = None
+
+    def start(self):
+        """Called once before the first line, only when the logcat exists."""
+        pass
+
+    def feed(self, record):
+        """Process a single LogRecord."""
+        pass
+
+    def finish(self, logcat_found):
+        """Called once after the last line; logcat_found is False if the file was missing."""
+        pass
+
+    def abort(self):
+        """Called when the plugin raised; closes the writer so the file is not left half-open."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class LogcatEngine:
+    """
+    Reads the logcat file exactly once and fans each line out to every plugin.
+
+    A plugin that raises is disabled and its error recorded, the remaining
+    plugins keep running.
+
+    Usage:
+        engine = LogcatEngine("logs")
+        engine.register(PrivacyPlugin("logs", "logs/privacy_profile.json"))
+        engine.run()
+    """
+
+    def __init__(self, logs_dir="logs", logcat_file="android_logcat.txt"):
+        self.logs_dir = logs_dir
+        self.logcat_path = os.path.join(logs_dir, logcat_file)
+        self.plugins = []
+        self.errors = {}
+        self.lines_processed = 0
+
+    def register(self, plugin):
+        self.plugins.append(plugin)
+        return plugin
+
+    def _fail(self, plugin, exc):
+        print(f"  ❌ {plugin.name} failed: {exc}")
+        self.errors[plugin.name] = exc
+        try:
+            plugin.abort()
+        except Exception:
+            pass
+
+    def _lines(self):
+        """(line number, line) from the raw logcat, or from the segment store once the raw file was dropped."""
+        if os.path.exists(self.logcat_path):
+            with open(self.logcat_path, "r", encoding="utf-8", errors="replace") as f:
+                yield from enumerate(f, 1)
+        else:
+            yield from LogcatSegmentStore(self.logs_dir, os.path.basename(self.logcat_path)).iter_lines()
+
+    def run(self):
+        """Run all registered plugins. Returns {plugin name: exception} for failed plugins."""
+        logcat_found = os.path.exists(self.logcat_path) or \
+            LogcatSegmentStore(self.logs_dir, os.path.basename(self.logcat_path)).exists()
+        active = list(self.plugins)
+        parser = LogcatParser()
+
+        if logcat_found and active:
+            print(f"📖 Reading logcat once for {len(active)} analyzer(s): {self.logcat_path}")
+            for plugin in list(active):
+                try:
+                    plugin.start()
+                except Exception as e:
+                    self._fail(plugin, e)
+                    active = [p for p in active if p is not plugin]
+            for line_no, line in self._lines():
+                record = LogRecord(line_no, line, parser)
+                for plugin in active:
+                    try:
+                        plugin.feed(record)
+                    except Exception as e:
+                        self._fail(plugin, e)
+                        active = [p for p in active if p is not plugin]
+                self.lines_processed = line_no
+
+        for plugin in active:
+            try:
+                plugin.finish(logcat_found)
+            except Exception as e:
+                self._fail(plugin, e)
+
+        return self.errors
+
+
+def run_plugin(plugin, logs_dir="logs"):
+    """Run a single plugin on its own; used by the per-module entry points."""
+    engine = LogcatEngine(logs_dir)
+    engine.register(plugin)
+    errors = engine.run()
+    if plugin.name in errors:
+        raise errors[plugin.name]
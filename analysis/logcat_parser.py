@@ -0,0 +1,323 @@
+"""
+logcat_parser.py
+
+Shared logcat line parser.
+
+Understands the `adb logcat -v` formats the extraction scripts produce:
+
+    threadtime  01-20 22:59:42.046  1234  5678 I Tag     : message
+    time        01-20 22:59:42.046 I/Tag( 1234): message
+    brief       I/Tag( 1234): message
+    long        [ 01-20 22:59:42.046  1234: 5678 I/Tag ]
+                message
+                <blank line>
+
+The format is detected from a sample of lines (detect_format), and lines that
+do not match it are tried against the others, so merged dumps still parse.
+
+Timestamps carry no year. TimestampDecoder reads the fixed-width
+"MM-DD HH:MM:SS.mmm" fields with int() on slices instead of strptime, and
+caches the datetime of every second it has seen, so a busy second costs one
+datetime construction however many lines share it.
+
+Usage:
+    parser = LogcatParser()                      # format detected from the first lines
+    for record in parser.iter_records(lines):
+        print(record.ts, parser.decoder.epoch(record.ts), record.tag, record.message)
+
+    batch = parser.parse_batch(lines)            # column lists, epoch as array('d')
+
+line_time() dates any log line (logcat, call, SMS) and carry_times() gives
+lines without a time the time of the closest timed line before them (the
+first timed line's, for lines ahead of it). The filter, the search index and
+the segment store all date lines this way, so a time range selects the same
+lines whichever of them answers it.
+"""
+
+import re
+from array import array
+from collections import Counter
+from datetime import datetime
+
+FORMATS = ("threadtime", "time", "long", "brief")
+SAMPLE_SIZE = 200
+BANNER_PREFIX = "--------- "
+
+# "MM-DD HH:MM:SS.mmm" at the start of time/threadtime lines
+TS_RE = re.compile(r"^(\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3})")
+# Long format header "[ MM-DD HH:MM:SS.mmm ..."
+LONG_TS_RE = re.compile(r"^\[ (\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3})")
+# Call/SMS content provider rows: date=<epoch ms>; parsed SMS exports: YYYY-MM-DD HH:MM:SS
+DATE_RE = re.compile(r"date=(\d{10,13})")
+ISO_RE = re.compile(r"(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)")
+# Logcat time anywhere in a line
+ANY_TS_RE = re.compile(r"(\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+
+FORMAT_PATTERNS = {
+    # ts, pid, tid, priority, tag, message
+    "threadtime": re.compile(
+        r"^(\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3})\s+(\d+)\s+(\d+)\s+([VDIWEFA])\s+([^:]+):\s+(.*)$"),
+    # ts, priority, tag, pid, message
+    "time": re.compile(
+        r"^(\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3})\s+([VDIWEFA])/([^(:]+)(?:\(\s*(\d+)\))?:?\s+(.*)$"),
+    # ts, pid, tid, priority, tag (message follows on the next lines)
+    "long": re.compile(
+        r"^\[ (\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3})\s+(?:\d+:\s*)?(\d+):\s*(\d+)\s+([VDIWEFA])/(.*?)\s*\]$"),
+    # priority, tag, pid, message
+    "brief": re.compile(r"^([VDIWEFA])/([^(:]+)(?:\(\s*(\d+)\))?:?\s+(.*)$"),
+}
+
+
+class LogcatLine:
+    """One parsed logcat entry. ts is the raw "MM-DD HH:MM:SS.mmm" string (None for brief)."""
+    __slots__ = ("line_no", "ts", "pid", "tid", "priority", "tag", "message")
+
+    def __init__(self, line_no, ts, pid, tid, priority, tag, message):
+        self.line_no = line_no
+        self.ts = ts
+        self.pid = pid
+        self.tid = tid
+        self.priority = priority
+        self.tag = tag
+        self.message = message
+
+    def __repr__(self):
+        return f"LogcatLine({self.line_no}, {self.ts!r}, {self.priority}/{self.tag}: {self.message[:40]!r})"
+
+
+class TimestampDecoder:
+    """
+    Year-less logcat timestamps -> datetime / epoch seconds.
+
+    year defaults to the current one. With rollover=True a timestamp later
+    than now is taken to be from the previous year (a December log read in
+    January). Accepts "MM-DD HH:MM:SS" with or without ".mmm".
+    """
+    CACHE_LIMIT = 1 << 16
+
+    def __init__(self, year=None, rollover=False, now=None):
+        self.now = now or datetime.now()
+        self.year = year or self.now.year
+        self.rollover = rollover
+        self._seconds = {}
+
+    def _second(self, ts):
+        """(datetime, epoch) of the whole second, or False if ts is not a valid date."""
+        key = ts[:14]
+        entry = self._seconds.get(key)
+        if entry is None:
+            try:
+                dt = datetime(self.year, int(ts[0:2]), int(ts[3:5]),
+                              int(ts[6:8]), int(ts[9:11]), int(ts[12:14]))
+                if self.rollover and dt > self.now:
+                    dt = dt.replace(year=self.year - 1)
+                entry = (dt, dt.timestamp())
+            except ValueError:
+                entry = False
+            if len(self._seconds) >= self.CACHE_LIMIT:
+                self._seconds.clear()
+            self._seconds[key] = entry
+        return entry
+
+    def datetime(self, ts):
+        """datetime (with milliseconds), or None if ts is not a valid timestamp."""
+        entry = self._second(ts)
+        if not entry:
+            return None
+        if len(ts) >= 18:
+            try:
+                return entry[0].replace(microsecond=int(ts[15:18]) * 1000)
+            except ValueError:
+                return None
+        return entry[0]
+
+    def epoch(self, ts):
+        """Epoch seconds (float, local time), or None if ts is not a valid timestamp."""
+        entry = self._second(ts)
+        if not entry:
+            return None
+        if len(ts) >= 18:
+            try:
+                return entry[1] + int(ts[15:18]) / 1000
+            except ValueError:
+                return None
+        return entry[1]
+
+
+def timestamp_prefix(line):
+    """The "MM-DD HH:MM:SS.mmm" a time/threadtime line starts with, or None."""
+    match = TS_RE.match(line)
+    return match.group(1) if match else None
+
+
+def record_epoch(line):
+    """Epoch seconds of a call/SMS line (ISO date, else date=<ms>), or None."""
+    match = ISO_RE.search(line)
+    if match:
+        try:
+            return datetime(*map(int, match.groups())).timestamp()
+        except ValueError:
+            pass
+    match = DATE_RE.search(line)
+    return int(match.group(1)[:10]) if match else None
+
+
+def line_time(line, decoder):
+    """
+    Epoch seconds of a log line, or None: the logcat timestamp it starts with
+    (or a long-format header's), else a call/SMS date, else a logcat time
+    anywhere in it.
+    """
+    match = TS_RE.match(line) or LONG_TS_RE.match(line)
+    if match:
+        return decoder.epoch(match.group(1))
+    epoch = record_epoch(line)
+    if epoch is not None:
+        return epoch
+    match = ANY_TS_RE.search(line)
+    return decoder.epoch(match.group(1)) if match else None
+
+
+def carry_times(lines, decoder, last=None):
+    """
+    (epoch, line) for each line, in order. A line without a time gets the
+    time of the closest timed line before it: last (carried in from earlier
+    input) until the first one, and if last is None, the lines before the
+    first timed line get its time (they are held until it is seen). Lines of
+    an input without any time get None.
+    """
+    held = []
+    for line in lines:
+        epoch = line_time(line, decoder)
+        if epoch is not None:
+            for line_before in held:
+                yield epoch, line_before
+            held = []
+            last = epoch
+        elif last is None:
+            held.append(line)
+            continue
+        yield last, line
+    for line_before in held:
+        yield None, line_before
+
+
+def detect_format(lines):
+    """Most common logcat format among the sample lines, or None if none matches."""
+    counts = Counter()
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith(BANNER_PREFIX):
+            continue
+        for fmt in FORMATS:
+            if FORMAT_PATTERNS[fmt].match(line):
+                counts[fmt] += 1
+                break
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _record(fmt, match, line_no):
+    if fmt == "threadtime":
+        ts, pid, tid, priority, tag, message = match.groups()
+        return LogcatLine(line_no, ts, pid, tid, priority, tag.strip(), message)
+    if fmt == "time":
+        ts, priority, tag, pid, message = match.groups()
+        return LogcatLine(line_no, ts, pid, None, priority, tag.strip(), message)
+    if fmt == "long":
+        ts, pid, tid, priority, tag = match.groups()
+        return LogcatLine(line_no, ts, pid, tid, priority, tag, "")
+    priority, tag, pid, message = match.groups()
+    return LogcatLine(line_no, None, pid, None, priority, tag.strip(), message)
+
+
+class LogcatParser:
+    """
+    Line parser for one logcat stream.
+
+    fmt: one of FORMATS, or None to detect it from the first SAMPLE_SIZE
+    lines passed to iter_records/parse_batch (parse() then tries all formats
+    until one is set). year/rollover are passed to the TimestampDecoder.
+    """
+
+    def __init__(self, fmt=None, year=None, rollover=False):
+        self.decoder = TimestampDecoder(year=year, rollover=rollover)
+        self.set_format(fmt)
+
+    def set_format(self, fmt):
+        if fmt is not None and fmt not in FORMAT_PATTERNS:
+            raise ValueError(f"Unknown logcat format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        self.format = fmt
+        order = [fmt] if fmt else []
+        self._order = [(name, FORMAT_PATTERNS[name]) for name in order + [f for f in FORMATS if f != fmt]]
+
+    def parse(self, line, line_no=0):
+        """LogcatLine for one line, or None (banner, continuation or unparseable line)."""
+        line = line.rstrip("\r\n")
+        for fmt, pattern in self._order:
+            match = pattern.match(line)
+            if match:
+                return _record(fmt, match, line_no)
+        return None
+
+    def _detect_from(self, lines):
+        """Sniff the format from the head of an iterator; yields the consumed lines back in order."""
+        head = []
+        for line in lines:
+            head.append(line)
+            if len(head) >= SAMPLE_SIZE:
+                break
+        if self.format is None:
+            self.set_format(detect_format(head))
+        yield from head
+        yield from lines
+
+    def iter_records(self, lines, start=1):
+        """
+        LogcatLines for an iterable of lines (line numbers from start).
+
+        In long format the message lines following a header are joined with
+        "\\n" and the record is emitted when the entry ends.
+        """
+        lines = self._detect_from(iter(lines))
+        pending = None
+        for line_no, line in enumerate(lines, start):
+            if pending is not None:
+                text = line.rstrip("\r\n")
+                if text == "" or text.startswith(BANNER_PREFIX):
+                    yield pending
+                    pending = None
+                    continue
+                if not text.startswith("[ ") or not FORMAT_PATTERNS["long"].match(text):
+                    pending.message = f"{pending.message}\n{text}" if pending.message else text
+                    continue
+                yield pending
+                pending = None
+            record = self.parse(line, line_no)
+            if record is None:
+                continue
+            if record.message == "" and line.startswith("[ "):
+                pending = record
+            else:
+                yield record
+        if pending is not None:
+            yield pending
+
+    def parse_batch(self, lines, start=1):
+        """
+        Column-wise parse: {line_no, epoch, priority, tag, message}.
+
+        epoch is an array('d') of epoch seconds (NaN for entries without a
+        usable timestamp); the other columns are lists of equal length.
+        """
+        line_nos, epochs, priorities, tags, messages = array("q"), array("d"), [], [], []
+        nan = float("nan")
+        epoch = self.decoder.epoch
+        for record in self.iter_records(lines, start):
+            line_nos.append(record.line_no)
+            value = epoch(record.ts) if record.ts else None
+            epochs.append(nan if value is None else value)
+            priorities.append(record.priority)
+            tags.append(record.tag)
+            messages.append(record.message)
+        return {"line_no": line_nos, "epoch": epochs, "priority": priorities, "tag": tags, "message": messages}
+
@@ -0,0 +1,434 @@
+"""
+logcat_segments.py
+
+Segmented, compressed logcat storage with a seekable index.
+
+android_logcat.txt is cut into time-ordered segments of about SEGMENT_SIZE
+uncompressed bytes, each compressed as a single zstd frame (gzip member when
+zstandard is not installed):
+
+    logs/logcat_segments/index.json
+    logs/logcat_segments/seg_00000.log.zst
+    logs/logcat_segments/seg_00001.log.zst
+    ...
+
+The index holds, per segment: first/last timestamp (and epoch seconds), the
+number of leading untimed lines and the times of its first and last timed
+lines in file order (lines without a time take the time of the timed line
+before them, see logcat_parser.carry_times), first line number, line count, raw/compressed size, SHA-256 of the raw bytes and a
+bloom filter over the tags ("T:<tag>", lower case) and priorities ("P:E").
+Readers pick only the segments that can match a time range, tag or priority
+and decompress just those. The index also records the SHA-256 of the whole
+source file, so the original evidence hash can be re-derived after the raw
+file is dropped (build --drop-raw).
+
+Bloom bit positions are the four little-endian uint32 words of
+md5(key) modulo BLOOM_BITS (web/includes/logcat_segments.php does the same).
+
+Usage:
+  python logcat_segments.py build [--drop-raw] [--segment-mb 64]
+  python logcat_segments.py info
+  python logcat_segments.py cat [--since "MM-DD HH:MM:SS"] [--until ...] [--tag T] [--priority E]
+  python logcat_segments.py verify
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import shutil
+import struct
+import hashlib
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_parser import TimestampDecoder, line_time
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+INDEX_VERSION = 2
+SEGMENT_DIR = "logcat_segments"
+INDEX_FILE = "index.json"
+SEGMENT_SIZE = 64 * 1024 * 1024
+BLOOM_BITS = 32768
+BLOOM_HASHES = 4
+
+# time/brief ("I/Tag( 123): msg") and threadtime ("  123  456 I Tag     : msg") after the timestamp
+LINE_RE = re.compile(
+    rb"^(\d\d-\d\d \d\d:\d\d:\d\d\.\d{3})\s+"
+    rb"(?:([VDIWEFA])/([^(:]*?)\s*[(:]|\d+\s+\d+\s+([VDIWEFA]) (.*?)\s*: )"
+)
+# Same as logcat_parser.TS_RE; other lines are dated with logcat_parser.line_time
+TIME_RE = re.compile(rb"^(\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3})")
+
+
+def bloom_positions(key):
+    return [word % BLOOM_BITS for word in struct.unpack("<4I", hashlib.md5(key).digest())[:BLOOM_HASHES]]
+
+
+def bloom_contains(bloom, key):
+    return all(bloom[pos >> 3] >> (pos & 7) & 1 for pos in bloom_positions(key))
+
+
+def parse_since(value):
+    """'MM-DD HH:MM[:SS]' (current year rules) or epoch seconds -> epoch seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        ts = (value + ":00.000")[:18] if len(value) == 11 else (value + ".000")[:18]
+        return TimestampDecoder(rollover=True).epoch(ts)
+
+
+def _compress(data, codec):
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec):
+    if codec == "zst":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read .zst segments (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def split_lines(data):
+    """
+    Decode segment bytes into lines (ends kept), breaking on "\n" only as the
+    index counts them; str.splitlines() would also break on \r, \x1c-\x1e,
+    \x85 and \u2028 and shift every later line number.
+    """
+    lines = data.decode("utf-8", errors="replace").split("\n")
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+class LogcatSegmentStore:
+    """
+    Usage:
+        store = LogcatSegmentStore("logs")
+        store.build()
+        for line_no, line in store.iter_lines(start=epoch, priorities=["E"]):
+            ...
+    """
+
+    def __init__(self, logs_dir="logs", source="android_logcat.txt"):
+        self.logs_dir = logs_dir
+        self.source_path = os.path.join(logs_dir, source)
+        self.segment_dir = os.path.join(logs_dir, SEGMENT_DIR)
+        self.index_path = os.path.join(self.segment_dir, INDEX_FILE)
+        self.index = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                return index
+            if index.get("version") == 1:
+                # Before head_untimed/tail_epoch: readable (the raw file may be gone), rebuilt when it isn't
+                for segment in index["segments"]:
+                    segment.setdefault("head_untimed", None)
+                    segment.setdefault("lead_epoch", segment["first_epoch"])
+                    segment.setdefault("tail_epoch", segment["last_epoch"])
+                return index
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def exists(self):
+        return self.index is not None
+
+    def up_to_date(self):
+        """Index built from the current source file (or the source was dropped after building)."""
+        if not self.exists():
+            return False
+        if not os.path.exists(self.source_path):
+            return True
+        if self.index["version"] != INDEX_VERSION:
+            return False
+        st = os.stat(self.source_path)
+        return self.index["source_size"] == st.st_size and self.index["source_mtime_ns"] == st.st_mtime_ns
+
+    # ---- Building ----
+
+    def build(self, segment_size=SEGMENT_SIZE, codec=None, drop_raw=False):
+        """Cut the source file into compressed segments and write the index. Returns the index."""
+        codec = codec or ("zst" if ZSTD_AVAILABLE else "gz")
+        if codec == "zst" and not ZSTD_AVAILABLE:
+            print("⚠️  zstandard not available (pip install zstandard), using gzip segments")
+            codec = "gz"
+
+        st = os.stat(self.source_path)
+        tmp_dir = self.segment_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        now = datetime.now()
+        # Current year; times later than now are from last year
+        decoder = TimestampDecoder(rollover=True, now=now)
+        source_sha = hashlib.sha256()
+        segments = []
+        state = {"lines": [], "size": 0, "first_line": 1}
+
+        def flush():
+            if not state["lines"]:
+                return
+            data = b"".join(state["lines"])
+            segments.append(self._write_segment(tmp_dir, len(segments), data, state["lines"],
+                                                state["first_line"], codec, decoder))
+            state["first_line"] += len(state["lines"])
+            state["lines"], state["size"] = [], 0
+
+        with open(self.source_path, "rb") as f:
+            for line in f:
+                source_sha.update(line)
+                state["lines"].append(line)
+                state["size"] += len(line)
+                if state["size"] >= segment_size:
+                    flush()
+            flush()
+
+        index = {
+            "version": INDEX_VERSION,
+            "source": os.path.basename(self.source_path),
+            "source_size": st.st_size,
+            "source_mtime_ns": st.st_mtime_ns,
+            "source_sha256": source_sha.hexdigest(),
+            "codec": codec,
+            "segment_size": segment_size,
+            "bloom_bits": BLOOM_BITS,
+            "bloom_hashes": BLOOM_HASHES,
+            "created": now.isoformat(),
+            "lines": state["first_line"] - 1,
+            "compressed_bytes": sum(s["compressed_bytes"] for s in segments),
+            "segments": segments
+        }
+        with open(os.path.join(tmp_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1)
+
+        shutil.rmtree(self.segment_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.segment_dir)
+        self.index = index
+
+        if drop_raw:
+            os.remove(self.source_path)
+        return index
+
+    def _write_segment(self, directory, number, data, lines, first_line, codec, decoder):
+        bloom = bytearray(BLOOM_BITS // 8)
+        first_time = last_time = None
+        first_epoch = last_epoch = None
+        keys = set()
+        head_untimed = 0
+        lead_epoch = tail_epoch = None
+        for line in lines:
+            match = LINE_RE.match(line)
+            if match:
+                priority = match.group(2) or match.group(4)
+                tag = match.group(3) if match.group(2) else match.group(5)
+                keys.add(b"P:" + priority)
+                keys.add(b"T:" + tag.strip().lower())
+            match = TIME_RE.match(line)
+            if match:
+                ts = match.group(1).decode()
+                epoch = decoder.epoch(ts)
+            else:
+                epoch = line_time(line.decode("utf-8", errors="replace"), decoder)
+                ts = datetime.fromtimestamp(epoch).strftime("%m-%d %H:%M:%S.%f")[:18] if epoch is not None else None
+            if epoch is None:
+                if tail_epoch is None:
+                    head_untimed += 1
+                continue
+            if tail_epoch is None:
+                lead_epoch = epoch
+            tail_epoch = epoch
+            # Min/max rather than first/last: merged buffers are only roughly ordered
+            if first_epoch is None or epoch < first_epoch:
+                first_epoch, first_time = epoch, ts
+            if last_epoch is None or epoch > last_epoch:
+                last_epoch, last_time = epoch, ts
+        for key in keys:
+            for pos in bloom_positions(key):
+                bloom[pos >> 3] |= 1 << (pos & 7)
+
+        name = f"seg_{number:05d}.log.{codec}"
+        compressed = _compress(data, codec)
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(compressed)
+        return {
+            "file": name,
+            "first_line": first_line,
+            "lines": len(lines),
+            "raw_bytes": len(data),
+            "compressed_bytes": len(compressed),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "first_time": first_time,
+            "last_time": last_time,
+            "first_epoch": first_epoch,
+            "last_epoch": last_epoch,
+            # File order, for dating untimed lines (see segments())
+            "head_untimed": head_untimed,
+            "lead_epoch": lead_epoch,
+            "tail_epoch": tail_epoch,
+            "bloom": bloom.hex()
+        }
+
+    # ---- Reading ----
+
+    def segments(self, start=None, end=None, tags=None, priorities=None):
+        """
+        Index entries of the segments that can contain matching lines (any of tags, any of priorities).
+
+        A line without a time counts as the time of the closest timed line before it
+        (or of the first timed line of the file, when it comes before that), as in
+        logcat_parser.carry_times. So a segment whose leading lines are untimed is kept
+        when the time they carry in is in range (or the file has no times). Each entry
+        gets "carry_epoch", that carried-in time (or None).
+        """
+        if not self.exists():
+            return []
+        selected = []
+        carry = next((s["lead_epoch"] for s in self.index["segments"] if s["lead_epoch"] is not None), None)
+        for segment in self.index["segments"]:
+            before = carry
+            if segment["tail_epoch"] is not None:
+                carry = segment["tail_epoch"]
+            # head_untimed is None (unknown) in indexes from before it was recorded
+            head_in_range = segment["head_untimed"] != 0 and (
+                before is None or ((start is None or before >= start) and (end is None or before <= end)))
+            if not head_in_range:
+                if segment["last_epoch"] is None:
+                    continue
+                if start is not None and segment["last_epoch"] < start:
+                    continue
+                if end is not None and segment["first_epoch"] > end:
+                    continue
+            if tags or priorities:
+                bloom = bytes.fromhex(segment["bloom"])
+                if tags and not any(bloom_contains(bloom, b"T:" + t.lower().encode()) for t in tags):
+                    continue
+                if priorities and not any(bloom_contains(bloom, b"P:" + p.upper().encode()) for p in priorities):
+                    continue
+            selected.append(dict(segment, carry_epoch=before))
+        return selected
+
+    def read_segment(self, segment, verify=False):
+        """Raw bytes of one segment."""
+        with open(os.path.join(self.segment_dir, segment["file"]), "rb") as f:
+            data = _decompress(f.read(), self.index["codec"])
+        if verify and hashlib.sha256(data).hexdigest() != segment["sha256"]:
+            raise ValueError(f"Segment {segment['file']} does not match its index hash")
+        return data
+
+    def iter_lines(self, start=None, end=None, tags=None, priorities=None):
+        """(line number, text line) for every line of the selected segments."""
+        for segment in self.segments(start, end, tags, priorities):
+            for offset, line in enumerate(split_lines(self.read_segment(segment))):
+                yield segment["first_line"] + offset, line
+
+    def verify(self):
+        """Re-derive every segment hash and the source file hash. Returns a list of problems."""
+        problems = []
+        source_sha = hashlib.sha256()
+        for segment in self.index["segments"]:
+            try:
+                data = self.read_segment(segment, verify=True)
+            except (OSError, ValueError, RuntimeError) as e:
+                problems.append(str(e))
+                continue
+            source_sha.update(data)
+        if not problems and source_sha.hexdigest() != self.index["source_sha256"]:
+            problems.append("Concatenated segments do not match the source SHA-256")
+        return problems
+
+
+def open_logcat_lines(logs_dir="logs", start=None, end=None, tags=None, priorities=None):
+    """
+    Lines of android_logcat.txt for readers: from the segment store when it is
+    current (skipping segments that cannot match), otherwise from the raw file.
+    Yields (line number, line).
+    """
+    store = LogcatSegmentStore(logs_dir)
+    if store.up_to_date():
+        yield from store.iter_lines(start, end, tags, priorities)
+        return
+    if not os.path.exists(store.source_path):
+        return
+    with open(store.source_path, "r", encoding="utf-8", errors="replace") as f:
+        yield from enumerate(f, 1)
+
+
+def build_segments(logs_dir="logs"):
+    """Orchestrator entry point: (re)build the store when the raw logcat changed."""
+    store = LogcatSegmentStore(logs_dir)
+    if not os.path.exists(store.source_path):
+        print("⚠️  No android_logcat.txt, nothing to segment")
+        return
+    if store.up_to_date():
+        print(f"✅ Logcat segments up to date ({len(store.index['segments'])} segment(s))")
+        return
+    index = store.build()
+    ratio = index["source_size"] / max(index["compressed_bytes"], 1)
+    print(f"✅ Logcat segmented: {len(index['segments'])} segment(s), {index['lines']:,} lines, "
+          f"{index['source_size'] / 1048576:.1f} MB -> {index['compressed_bytes'] / 1048576:.1f} MB "
+          f"({ratio:.1f}x, {index['codec']})")
+
+
+def main():
+    logs_dir = "logs"
+    args = sys.argv[1:]
+    if not args or args[0] not in ("build", "info", "cat", "verify"):
+        print("Usage:")
+        print("  python logcat_segments.py build [--drop-raw] [--segment-mb 64]  - Segment and compress android_logcat.txt")
+        print("  python logcat_segments.py info                                - Show the segment index")
+        print("  python logcat_segments.py cat [--since T] [--until T] [--tag X] [--priority E]")
+        print("  python logcat_segments.py verify                              - Check segment and source hashes")
+        return
+
+    def option(name):
+        return args[args.index(name) + 1] if name in args else None
+
+    store = LogcatSegmentStore(logs_dir)
+    command = args[0]
+    if command == "build":
+        segment_mb = option("--segment-mb")
+        index = store.build(segment_size=int(float(segment_mb) * 1048576) if segment_mb else SEGMENT_SIZE,
+                            drop_raw="--drop-raw" in args)
+        print(f"Segments: {len(index['segments'])}, lines: {index['lines']:,}, "
+              f"{index['source_size']:,} -> {index['compressed_bytes']:,} bytes ({index['codec']})")
+        return
+
+    if not store.exists():
+        print("No segment index found; run: python logcat_segments.py build")
+        return
+    if command == "info":
+        for s in store.index["segments"]:
+            print(f"{s['file']}: lines {s['first_line']:,}+{s['lines']:,}, {s['first_time']} - {s['last_time']}, "
+                  f"{s['raw_bytes']:,} -> {s['compressed_bytes']:,} bytes")
+        print(f"Source SHA-256: {store.index['source_sha256']}")
+    elif command == "cat":
+        since, until = option("--since"), option("--until")
+        tag, priority = option("--tag"), option("--priority")
+        start = parse_since(since) if since else None
+        end = parse_since(until) if until else None
+        for _, line in store.iter_lines(start, end, [tag] if tag else None, [priority] if priority else None):
+            sys.stdout.write(line)
+    else:
+        problems = store.verify()
+        for problem in problems:
+            print(f"✗ {problem}")
+        print("✓ All segments intact" if not problems else f"✗ {len(problems)} problem(s)")
+
+
+if __name__ == "__main__":
+    main()
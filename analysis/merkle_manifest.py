@@ -0,0 +1,323 @@
+"""
+merkle_manifest.py
+
+Chunked Merkle manifest for evidence files.
+
+Every file is split into fixed-size chunks. Each chunk hash is a leaf, the
+leaves form a Merkle tree with one root per file, and the case master hash is
+the Merkle root over all file roots. A one-byte change then costs one chunk
+re-hash to pin down, and verification reports exactly which byte and line
+ranges of the sealed file changed.
+
+logs/evidence_manifest.json:
+    {"version": 1, "chunk_size": 1048576, "master_root": "...",
+     "files": {"android_logcat.txt": {"size": ..., "root": "...", "sha256": "...",
+                                      "leaves": ["..."], "lines": [[first, last], ...],
+                                      "seals": [{"time": ..., "size": ..., "root": ..., "mode": "full"}]}}}
+
+Appends from repeated extractions can be sealed incrementally (seal --append):
+only the last partial chunk and the new data are read. Earlier leaves are kept
+as they were, so a later verify still catches changes to the earlier data.
+
+Usage:
+  python merkle_manifest.py seal [file ...] [--append]
+  python merkle_manifest.py verify [file ...] [--chunks 3,4]
+  python merkle_manifest.py master
+"""
+
+import os
+import sys
+import json
+import hashlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "evidence_manifest.json"
+CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Domain separation between leaves and inner nodes (as in RFC 6962)
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data):
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def merkle_root(leaves):
+    """Root of a list of leaf digests (bytes); an odd node is promoted to the next level."""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    level = list(leaves)
+    while len(level) > 1:
+        nxt = [hashlib.sha256(NODE_PREFIX + level[i] + level[i + 1]).digest()
+               for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def chunk_lines(data, first_line):
+    """(first line, last line) touched by a chunk starting at first_line, and the next chunk's first line."""
+    newlines = data.count(b"\n")
+    if data.endswith(b"\n"):
+        return (first_line, first_line + newlines - 1), first_line + newlines
+    return (first_line, first_line + newlines), first_line + newlines
+
+
+def coalesce(indices):
+    """Sorted chunk indices -> [(first, last)] runs of consecutive chunks."""
+    runs = []
+    for i in sorted(indices):
+        if runs and i == runs[-1][1] + 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [tuple(run) for run in runs]
+
+
+class MerkleManifest:
+    """Per-file chunk hashes, file roots and the case master root."""
+
+    def __init__(self, logs_dir="logs", chunk_size=CHUNK_SIZE, max_workers=HASH_WORKERS):
+        self.logs_dir = logs_dir
+        self.path = os.path.join(logs_dir, MANIFEST_FILE)
+        self.max_workers = max_workers
+        self.data = self._load()
+        # An existing manifest keeps its chunk size so old leaves stay comparable
+        self.chunk_size = self.data.get("chunk_size") or chunk_size
+        self.data["chunk_size"] = self.chunk_size
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"version": MANIFEST_VERSION, "files": {}}
+
+    def save(self):
+        self.data["master_root"] = self.master_root()
+        self.data["updated"] = datetime.now().isoformat()
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp, self.path)
+
+    # ---- Sealing ----
+
+    def seal(self, filepath, incremental=False):
+        """
+        Record chunk hashes and root for a file. Returns the record.
+
+        incremental=True is for files that are only appended to: if the file did
+        not shrink and its last sealed chunk still matches, earlier chunks are
+        not re-read and only that chunk and the new data are hashed.
+        """
+        name = os.path.basename(filepath)
+        size = os.path.getsize(filepath)
+        old = self.data["files"].get(name)
+        cs = self.chunk_size
+
+        leaves, lines = [], []
+        start_chunk, next_line, mode = 0, 1, "full"
+        file_sha = hashlib.sha256()
+
+        with open(filepath, "rb") as f:
+            if incremental and old and old["leaves"] and size >= old["size"]:
+                # Re-check the last sealed chunk before extending from it
+                last = len(old["leaves"]) - 1
+                f.seek(last * cs)
+                if leaf_hash(f.read(old["size"] - last * cs)).hex() == old["leaves"][last]:
+                    start_chunk = last
+                    leaves = [bytes.fromhex(h) for h in old["leaves"][:last]]
+                    lines = [list(span) for span in old["lines"][:last]]
+                    next_line = old["lines"][last][0]
+                    mode = "append"
+                    file_sha = None
+
+            f.seek(start_chunk * cs)
+            while True:
+                data = f.read(cs)
+                if not data:
+                    break
+                if file_sha is not None:
+                    file_sha.update(data)
+                leaves.append(leaf_hash(data))
+                span, next_line = chunk_lines(data, next_line)
+                lines.append(list(span))
+
+        root = merkle_root(leaves).hex()
+        record = {
+            "size": size,
+            "root": root,
+            "leaves": [leaf.hex() for leaf in leaves],
+            "lines": lines,
+            "seals": (old or {}).get("seals", [])
+        }
+        if file_sha is not None:
+            # Whole-file SHA-256 comes for free on a full pass
+            record["sha256"] = file_sha.hexdigest()
+        if not record["seals"] or record["seals"][-1]["root"] != root:
+            # Earlier seals stay in the history, so a reseal of changed data is visible
+            record["seals"] = record["seals"] + [{
+                "time": datetime.now().isoformat(), "size": size, "root": root, "mode": mode
+            }]
+        self.data["files"][name] = record
+        return record
+
+    def seal_files(self, filepaths, incremental=False):
+        """Seal several files in parallel. Returns {filepath: record or None if unreadable}."""
+        def safe_seal(filepath):
+            try:
+                return self.seal(filepath, incremental)
+            except OSError as e:
+                print(f"Error sealing {filepath}: {e}")
+                return None
+
+        filepaths = list(filepaths)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            return dict(zip(filepaths, pool.map(safe_seal, filepaths)))
+
+    def master_root(self, names=None):
+        """Merkle root over the file roots (sorted by file name)."""
+        files = self.data["files"]
+        names = sorted(files if names is None else [n for n in names if n in files])
+        leaves = [leaf_hash(name.encode("utf-8") + b"\0" + bytes.fromhex(files[name]["root"]))
+                  for name in names]
+        return merkle_root(leaves).hex()
+
+    # ---- Verification ----
+
+    def _hash_chunks(self, filepath, indices, sealed_size):
+        """Current leaf hashes of the given chunks, limited to their sealed extent."""
+        cs = self.chunk_size
+        current_size = os.path.getsize(filepath)
+
+        def stripe(part):
+            out = {}
+            with open(filepath, "rb") as f:
+                for i in part:
+                    start = i * cs
+                    length = min(cs, sealed_size - start)
+                    if start + length > current_size:
+                        out[i] = None  # truncated
+                        continue
+                    f.seek(start)
+                    out[i] = leaf_hash(f.read(length)).hex()
+            return out
+
+        indices = list(indices)
+        workers = max(1, min(self.max_workers, len(indices)))
+        # Contiguous stripes keep each worker's reads sequential
+        step = -(-len(indices) // workers) if indices else 1
+        parts = [indices[i:i + step] for i in range(0, len(indices), step)]
+        result = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for out in pool.map(stripe, parts):
+                result.update(out)
+        return result
+
+    def verify(self, name, chunks=None):
+        """
+        Verify one sealed file, optionally only some chunk indices (e.g. earlier suspects).
+
+        Returns a dict with status intact | appended | tampered | missing | unsealed,
+        and for tampered files the changed ranges:
+            {"chunks": [first, last], "bytes": [start, end), "lines": [first, last]}
+        """
+        record = self.data["files"].get(name)
+        filepath = os.path.join(self.logs_dir, name)
+        if record is None:
+            return {"file": name, "status": "unsealed"}
+        if not os.path.exists(filepath):
+            return {"file": name, "status": "missing"}
+
+        cs = self.chunk_size
+        indices = range(len(record["leaves"])) if chunks is None else \
+            [i for i in chunks if 0 <= i < len(record["leaves"])]
+        current = self._hash_chunks(filepath, indices, record["size"])
+        changed = [i for i in indices if current[i] != record["leaves"][i]]
+
+        size = os.path.getsize(filepath)
+        report = {"file": name, "checked_chunks": len(indices), "sealed_size": record["size"], "size": size}
+        report["changed"] = [{
+            "chunks": [first, last],
+            "bytes": [first * cs, min((last + 1) * cs, record["size"])],
+            "lines": [record["lines"][first][0], record["lines"][last][1]],
+            "truncated": any(current[i] is None for i in range(first, last + 1))
+        } for first, last in coalesce(changed)]
+
+        if changed:
+            report["status"] = "tampered"
+        elif size > record["size"]:
+            report["status"] = "appended"
+            report["appended_bytes"] = [record["size"], size]
+        elif size < record["size"]:
+            report["status"] = "tampered"
+        else:
+            report["status"] = "intact"
+        return report
+
+    def verify_all(self, names=None):
+        names = sorted(self.data["files"] if names is None else names)
+        return [self.verify(name) for name in names]
+
+
+def print_report(report):
+    status = report["status"]
+    icons = {"intact": "✓", "appended": "➕", "tampered": "✗", "missing": "⚠", "unsealed": "?"}
+    print(f"{icons.get(status, '?')} {status.upper()}: {report['file']}")
+    for change in report.get("changed", []):
+        suffix = " (truncated)" if change["truncated"] else ""
+        print(f"    bytes {change['bytes'][0]:,}-{change['bytes'][1]:,}, "
+              f"lines {change['lines'][0]:,}-{change['lines'][1]:,} "
+              f"(chunks {change['chunks'][0]}-{change['chunks'][1]}){suffix}")
+    if status == "appended":
+        print(f"    {report['appended_bytes'][1] - report['appended_bytes'][0]:,} new bytes after the sealed data")
+
+
+def main():
+    logs_dir = "logs"
+    args = sys.argv[1:]
+    if not args or args[0] not in ("seal", "verify", "master"):
+        print("Usage:")
+        print("  python merkle_manifest.py seal [file ...] [--append]      - Seal files (all of logs/ by default)")
+        print("  python merkle_manifest.py verify [file ...] [--chunks 3,4] - Verify and localize changes")
+        print("  python merkle_manifest.py master                         - Print the case master root")
+        return
+
+    command, args = args[0], args[1:]
+    incremental = "--append" in args
+    args = [a for a in args if a != "--append"]
+    chunks = None
+    if "--chunks" in args:
+        pos = args.index("--chunks")
+        chunks = [int(c) for c in args[pos + 1].split(",") if c]
+        args = args[:pos] + args[pos + 2:]
+
+    manifest = MerkleManifest(logs_dir)
+    if command == "seal":
+        names = args or [n for n in sorted(os.listdir(logs_dir))
+                         if os.path.isfile(os.path.join(logs_dir, n)) and not n.startswith(("evidence_", ".", "logcat_state.json"))]
+        records = manifest.seal_files((os.path.join(logs_dir, n) for n in names), incremental)
+        manifest.save()
+        for path, record in records.items():
+            if record is None:
+                continue
+            print(f"Sealed: {os.path.basename(path)} ({len(record['leaves'])} chunks, root {record['root'][:16]}...)")
+        print(f"\nMaster root: {manifest.data['master_root']}")
+    elif command == "verify":
+        for name in (args or sorted(manifest.data["files"])):
+            print_report(manifest.verify(name, chunks))
+    else:
+        print(manifest.master_root())
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,12 @@ Recovers banking alerts from notification buffer even if SMS was deleted
 
 import os
 import re
-import json
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from artifact_io import write_artifact
+
 # Financial patterns (same as unified_timeline.py)
 FINANCIAL_PATTERNS = {
     "OTP": re.compile(r'\b(?:OTP|otp|one.time.password|verification.code|auth.code)\b.*?\d{4,6}', re.I),
@@ -104,18 +107,17 @@ def parse_notification_buffer(notification_file="logs/notification_history.txt")
 
     return notifications
 
-def save_notification_timeline(output_file="logs/notification_timeline.json"):
+def save_notification_timeline(logs_dir="logs", output_file="logs/notification_timeline.json"):
     """
     Save parsed notifications to JSON for timeline integration
     """
-    notifications = parse_notification_buffer()
+    notifications = parse_notification_buffer(os.path.join(logs_dir, "notification_history.txt"))
     
     if notifications is None:
          print("⚠️ No notification data to process. Skipping save to avoid overwriting existing timeline.")
          return
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(notifications, f, indent=4)
+    write_artifact(output_file, notifications)
     
     print(f"📊 Parsed {len(notifications)} financial notifications")
     print(f"   Saved to: {output_file}")
@@ -0,0 +1,407 @@
+"""
+orchestrator.py
+
+In-process DAG orchestrator for the analysis pipeline.
+
+Every analysis step is declared once as a Task naming the function to call
+and the files it reads and writes. Dependencies are derived from those
+declarations (a task waits for whichever task produces one of its inputs),
+independent tasks run concurrently on a process pool, and every task gets a
+wall-time / peak-RSS record and a timeout that scales with its input size.
+
+Usage:
+    orch = Orchestrator("logs")
+    orch.add(Task("social_graph", "social_graph", "generate_social_graph",
+                  inputs=["sms_logs.txt", "call_logs.txt"], outputs=["social_graph.json"]))
+    results = orch.run()
+"""
+
+import os
+import io
+import sys
+import time
+import importlib
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from artifact_io import find_artifact
+
+# Timeout = TIMEOUT_BASE + TIMEOUT_PER_MB * (size of the task's inputs in MB)
+TIMEOUT_BASE = 60
+TIMEOUT_PER_MB = 10
+
+MB = 1024 * 1024
+
+
+# ---- Measurement ----
+
+def _reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux >= 4.0) so a reused worker measures one task."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it cannot be measured."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KB elsewhere
+        return round(peak / (MB if sys.platform == "darwin" else 1024), 1)
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / MB, 1)
+    return None
+
+
+def _run_task(module, func, kwargs):
+    """
+    Worker entry point: import one analysis function and call it.
+
+    Stdout is captured so concurrent tasks do not interleave their output.
+    Returns a plain dict (it crosses the process boundary).
+    """
+    _reset_peak_rss()
+    output = io.StringIO()
+    error = None
+    result = None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        try:
+            result = getattr(importlib.import_module(module), func)(**kwargs)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = f"Exit code {e.code}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return {
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "output": output.getvalue(),
+        "error": error,
+        # Tasks can report partial failures as {"failed": {name: error}}
+        "failed": result.get("failed", {}) if isinstance(result, dict) else {}
+    }
+
+
+# ---- DAG ----
+
+class Task:
+    """
+    One node of the analysis DAG.
+
+    Args:
+        name: Unique task id (also used in the run summary)
+        module, func: Function to call in a worker, imported by module name
+        inputs: Files the task reads, relative to logs_dir
+        outputs: Files the task writes, relative to logs_dir
+        after: Extra task names that must finish first
+        kwargs: Keyword arguments for the function
+        timeout_base, timeout_per_mb: Timeout scaling; timeout_base=None disables the timeout
+        cacheable: Reuse previous outputs when code, inputs and parameters are unchanged
+    """
+
+    def __init__(self, name, module, func, inputs=(), outputs=(), after=(), kwargs=None,
+                 title=None, timeout_base=TIMEOUT_BASE, timeout_per_mb=TIMEOUT_PER_MB, cacheable=True):
+        self.name = name
+        self.module = module
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        self.kwargs = kwargs or {}
+        self.title = title or name
+        self.timeout_base = timeout_base
+        self.timeout_per_mb = timeout_per_mb
+        self.cacheable = cacheable
+
+
+class Orchestrator:
+    """
+    Runs Tasks in dependency order on a process pool.
+
+    max_workers=0 runs every task inline in this process (no timeouts), which
+    is handy for debugging. With a ResultCache, tasks whose code, inputs and
+    parameters are unchanged are restored from the cache instead of run.
+    """
+
+    def __init__(self, logs_dir="logs", max_workers=None, cache=None):
+        self.logs_dir = logs_dir
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.cache = cache
+        self.tasks = {}
+        self.results = {}
+        self._keys = {}
+
+    def add(self, task):
+        if task.name in self.tasks:
+            raise ValueError(f"Duplicate task: {task.name}")
+        self.tasks[task.name] = task
+        return task
+
+    # -- Graph --
+
+    def dependencies(self):
+        """{task: set of tasks that must finish first} (producers of its inputs plus `after`)."""
+        producers = {}
+        for task in self.tasks.values():
+            for output in task.outputs:
+                producers[output] = task.name
+
+        deps = {}
+        for task in self.tasks.values():
+            deps[task.name] = {producers[i] for i in task.inputs if i in producers} | set(task.after)
+            deps[task.name].discard(task.name)
+            unknown = deps[task.name] - set(self.tasks)
+            if unknown:
+                raise ValueError(f"Task {task.name} runs after unknown task(s): {', '.join(sorted(unknown))}")
+        return deps
+
+    def order(self):
+        """Topological order (declaration order among ready tasks); raises on cycles."""
+        deps = self.dependencies()
+        done = set()
+        ordered = []
+        while len(ordered) < len(self.tasks):
+            ready = [name for name in self.tasks
+                     if name not in done and deps[name] <= done]
+            if not ready:
+                cycle = [name for name in self.tasks if name not in done]
+                raise ValueError(f"Dependency cycle between tasks: {', '.join(cycle)}")
+            ordered.extend(ready)
+            done.update(ready)
+        return ordered
+
+    # -- Timeouts --
+
+    def _input_path(self, name):
+        path = os.path.join(self.logs_dir, name)
+        if path.endswith(".json"):
+            return find_artifact(path)
+        return path if os.path.exists(path) else None
+
+    def input_size(self, task):
+        """Total size of the task's existing inputs, in bytes."""
+        total = 0
+        for name in task.inputs:
+            path = self._input_path(name)
+            if path:
+                total += os.path.getsize(path)
+        return total
+
+    def timeout_for(self, task):
+        if task.timeout_base is None:
+            return None
+        return round(task.timeout_base + task.timeout_per_mb * self.input_size(task) / MB, 1)
+
+    # -- Running --
+
+    def _record(self, task, status, info=None, timeout=None, error=None):
+        info = info or {}
+        result = {
+            "name": task.name,
+            "title": task.title,
+            "status": status,
+            "wall_seconds": info.get("wall_seconds"),
+            "peak_rss_mb": info.get("peak_rss_mb"),
+            "timeout_seconds": timeout,
+            "input_mb": round(self.input_size(task) / MB, 2),
+            "error": error or info.get("error"),
+            "failed": info.get("failed", {})
+        }
+        if status == "cached":
+            result["saved_seconds"] = info.get("saved_seconds")
+        self.results[task.name] = result
+        if status == "success" and not result["failed"] and task.name in self._keys:
+            try:
+                self.cache.store(task, self._keys[task.name], info)
+            except OSError as e:
+                print(f"⚠️  Could not cache {task.name}: {e}")
+        self._report(task, result, info.get("output", ""))
+        return result
+
+    def _report(self, task, result, output):
+        print(f"\n[{len(self.results)}/{len(self.tasks)}] {task.title}")
+        print("-" * 60)
+        for line in output.rstrip().splitlines():
+            print(f"  {line}")
+        if result["status"] == "cached":
+            print(f"  ♻️  CACHED: inputs unchanged, reused previous output (saved {result['saved_seconds'] or 0:.2f}s)")
+        elif result["status"] == "success":
+            rss = f", peak {result['peak_rss_mb']} MB" if result["peak_rss_mb"] is not None else ""
+            print(f"  ✅ SUCCESS in {result['wall_seconds']:.2f}s{rss}")
+            for name, error in result["failed"].items():
+                print(f"  ❌ {name} failed: {error}")
+        elif result["status"] == "timeout":
+            print(f"  ⏱️  TIMEOUT: exceeded {result['timeout_seconds']}s limit")
+        else:
+            print(f"  ❌ FAILED: {result['error']}")
+
+    def run(self):
+        """Run every task. Returns {task name: result dict}."""
+        self.order()  # validate the graph before starting anything
+        deps = self.dependencies()
+        self.results = {}
+        self._keys = {}
+        if self.max_workers <= 0:
+            self._run_inline(deps)
+        else:
+            self._run_pool(deps)
+        if self.cache is not None:
+            self.cache.save()
+        return self.results
+
+    def _ready(self, pending, deps):
+        """
+        Take the pending tasks whose dependencies have all finished, in declaration order.
+
+        A failed dependency does not block its dependents: every analyzer tolerates
+        missing inputs, as it did when the scripts ran one after another.
+        """
+        ready = [name for name in pending if deps[name] <= set(self.results)]
+        for name in ready:
+            pending.remove(name)
+        return [name for name in ready if not self._from_cache(self.tasks[name])]
+
+    def _from_cache(self, task):
+        """Restore a task from the cache if possible; otherwise remember its key for storing."""
+        if self.cache is None or not task.cacheable:
+            return False
+        try:
+            key = self.cache.key(task)
+            entry = self.cache.restore(task, key)
+        except OSError as e:
+            print(f"⚠️  Cache lookup failed for {task.name}: {e}")
+            return False
+        if entry is None:
+            self._keys[task.name] = key
+            return False
+        self._record(task, "cached", {"saved_seconds": entry.get("wall_seconds")})
+        return True
+
+    def _run_inline(self, deps):
+        pending = [name for name in self.tasks]
+        while pending:
+            ready = self._ready(pending, deps)
+            for name in ready:
+                task = self.tasks[name]
+                info = _run_task(task.module, task.func, task.kwargs)
+                self._record(task, "failed" if info["error"] else "success", info)
+
+    def _run_pool(self, deps):
+        pending = [name for name in self.tasks]
+        queue = []
+        running = {}  # future -> (task, deadline, timeout)
+        restarts = {}
+        executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        def submit(task):
+            # At most max_workers tasks are in flight, so a task starts as soon as it is submitted
+            timeout = self.timeout_for(task)
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            running[executor.submit(_run_task, task.module, task.func, task.kwargs)] = (task, deadline, timeout)
+
+        try:
+            while pending or queue or running:
+                queue.extend(self._ready(pending, deps))
+                while queue and len(running) < self.max_workers:
+                    submit(self.tasks[queue.pop(0)])
+                if not running:
+                    continue
+
+                deadlines = [d for _, d, _ in running.values() if d is not None]
+                wait_for = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+                finished, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                broken = False
+                for future in finished:
+                    task, _, timeout = running[future]
+                    try:
+                        info = future.result()
+                    except BrokenProcessPool:
+                        # A worker died; every task in flight is lost with the pool
+                        broken = True
+                        continue
+                    except Exception as e:
+                        del running[future]
+                        self._record(task, "failed", timeout=timeout, error=str(e))
+                        continue
+                    del running[future]
+                    self._record(task, "failed" if info["error"] else "success", info, timeout)
+
+                now = time.monotonic()
+                expired = [f for f, (_, d, _) in running.items() if d is not None and d <= now]
+                for future in expired:
+                    task, _, timeout = running.pop(future)
+                    self._record(task, "timeout", timeout=timeout)
+
+                if expired or broken:
+                    # A running call cannot be cancelled: replace the pool and resubmit the other tasks.
+                    # Only a dead worker counts as a restart; which task it ran is unknown, so all of
+                    # them are charged. Tasks merely evicted for another task's timeout are not.
+                    lost = [task for task, _, _ in running.values()]
+                    running.clear()
+                    self._kill(executor)
+                    executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    for task in lost:
+                        if broken:
+                            restarts[task.name] = restarts.get(task.name, 0) + 1
+                        if restarts.get(task.name, 0) > 2:
+                            self._record(task, "failed", error="Worker process died")
+                        else:
+                            submit(task)
+        finally:
+            if running:
+                self._kill(executor)
+            else:
+                executor.shutdown(wait=True)
+
+    @staticmethod
+    def _kill(executor):
+        # ProcessPoolExecutor has no public way to stop a running call
+        processes = list(getattr(executor, "_processes", {}).values())
+        for process in processes:
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        for process in processes:
+            process.join()
+        # With the workers gone the pool's management thread exits on its own; waiting for it
+        # keeps its pipes from being closed under it at interpreter exit
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def print_run_summary(results):
+    """Per-task table of status, wall time, peak RSS and timeout."""
+    print(f"\n  {'Module':<24} {'Status':<9} {'Wall (s)':>9} {'Peak RSS (MB)':>14} {'Timeout (s)':>12}")
+    print(f"  {'-' * 24} {'-' * 9} {'-' * 9} {'-' * 14} {'-' * 12}")
+    for result in results.values():
+        wall = f"{result['wall_seconds']:.2f}" if result["wall_seconds"] is not None else "-"
+        rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "-"
+        timeout = f"{result['timeout_seconds']:.0f}" if result["timeout_seconds"] is not None else "-"
+        print(f"  {result['name']:<24} {result['status']:<9} {wall:>9} {rss:>14} {timeout:>12}")
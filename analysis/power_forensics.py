@@ -1,57 +1,59 @@
-
 import os
-import json
+import sys
 import re
-from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_engine import LogcatPlugin, run_plugin
+from artifact_io import ArtifactWriter
+
+# Regex for power events
+POWER_PATTERNS = {
+    "SCREEN_ON": r'android.intent.action.SCREEN_ON|DisplayPowerController: Screening on',
+    "SCREEN_OFF": r'android.intent.action.SCREEN_OFF|DisplayPowerController: Screening off',
+    "USER_PRESENT": r'android.intent.action.USER_PRESENT|Keyguard: keyguardGoingAway',
+    "PLUGGED_AC": r'BatteryService: update:.*plugged: ac|BatteryService: Power source is AC',
+    "PLUGGED_USB": r'BatteryService: update:.*plugged: usb|BatteryService: Power source is USB',
+    "UNPLUGGED": r'BatteryService: update:.*plugged: none|BatteryService: Power source is battery',
+    "SHUTDOWN": r'ShutdownThread: Running shutdown',
+    "BOOT": r'SystemServer: Entered the Android system server'
+}
+_COMPILED_POWER = {event_type: re.compile(pattern, re.I) for event_type, pattern in POWER_PATTERNS.items()}
+
+class PowerPlugin(LogcatPlugin):
+    name = "Power Forensics"
+
+    def __init__(self, logs_dir="logs", output_file="logs/power_forensics.json"):
+        super().__init__(logs_dir, output_file)
+
+    def start(self):
+        # Events are written in log order, which is already chronological
+        self.writer = ArtifactWriter(self.output_file)
+
+    def feed(self, record):
+        ts = record.timestamp
+        if ts is None:
+            return
+
+        for event_type, pattern in _COMPILED_POWER.items():
+            if pattern.search(record.line):
+                self.writer.write({
+                    "timestamp": ts.isoformat(),
+                    "event": event_type,
+                    "raw": record.content
+                })
+                # One event per line usually enough for power states
+                break
+
+    def finish(self, logcat_found):
+        if not logcat_found:
+            return
+
+        self.writer.close()
+
+        print(f"Extracted {self.writer.count} power usage events.")
 
 def analyze_power(logs_dir="logs", output_file="logs/power_forensics.json"):
-    logcat_path = os.path.join(logs_dir, "android_logcat.txt")
-    if not os.path.exists(logcat_path):
-        return
-
-    events = []
-    
-    # Regex for power events
-    patterns = {
-        "SCREEN_ON": r'android.intent.action.SCREEN_ON|DisplayPowerController: Screening on',
-        "SCREEN_OFF": r'android.intent.action.SCREEN_OFF|DisplayPowerController: Screening off',
-        "USER_PRESENT": r'android.intent.action.USER_PRESENT|Keyguard: keyguardGoingAway',
-        "PLUGGED_AC": r'BatteryService: update:.*plugged: ac|BatteryService: Power source is AC',
-        "PLUGGED_USB": r'BatteryService: update:.*plugged: usb|BatteryService: Power source is USB',
-        "UNPLUGGED": r'BatteryService: update:.*plugged: none|BatteryService: Power source is battery',
-        "SHUTDOWN": r'ShutdownThread: Running shutdown',
-        "BOOT": r'SystemServer: Entered the Android system server'
-    }
-
-    # Timestamp regex
-    TS_REGEX = re.compile(r'^(\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}\.\d{3})')
-
-    with open(logcat_path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            ts_match = TS_REGEX.match(line)
-            if ts_match:
-                current_year = datetime.now().year
-                try:
-                    ts = datetime.strptime(f"{current_year}-{ts_match.group(1)}", "%Y-%m-%d %H:%M:%S.%f")
-                    
-                    for event_type, pattern in patterns.items():
-                        if re.search(pattern, line, re.I):
-                            events.append({
-                                "timestamp": ts.isoformat(),
-                                "event": event_type,
-                                "raw": line.strip()
-                            })
-                            # One event per line usually enough for power states
-                            break 
-                except: continue
-
-    # Sort
-    events.sort(key=lambda x: x["timestamp"])
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(events, f, indent=4)
-    
-    print(f"Extracted {len(events)} power usage events.")
+    run_plugin(PowerPlugin(logs_dir, output_file), logs_dir)
 
 if __name__ == "__main__":
     analyze_power()
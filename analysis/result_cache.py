@@ -0,0 +1,269 @@
+"""
+result_cache.py
+
+Content-addressed cache of analysis results.
+
+A task's cache key is the SHA-256 of (task name, code version, SHA-256 of
+every declared input file, parameters). The code version hashes the task's
+module and every local module it imports, so editing an analyzer invalidates
+its results. Outputs are stored once per content hash:
+
+    logs/.cache/objects/<sha256>        - output file contents
+    logs/.cache/entries/<key>.json      - outputs of one task run + its stats
+    logs/.cache/file_hashes.json        - (size, mtime) -> SHA-256 memo for inputs
+
+When the key matches a stored entry, the outputs are restored (only if they
+changed on disk) and the module is not run.
+"""
+
+import os
+import ast
+import sys
+import json
+import shutil
+import hashlib
+import importlib.util
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from evidence_hasher import EvidenceHasher
+from artifact_io import find_artifact, output_format
+
+CACHE_VERSION = 1
+# Entries kept per task; older ones (and objects nobody references) are pruned
+MAX_ENTRIES_PER_TASK = 3
+
+
+class ResultCache:
+    """
+    Usage:
+        cache = ResultCache("logs")
+        key = cache.key(task)
+        if not cache.restore(task, key):
+            ... run the task ...
+            cache.store(task, key, info)
+    """
+
+    def __init__(self, logs_dir="logs", cache_dir=None):
+        self.logs_dir = logs_dir
+        self.cache_dir = cache_dir or os.path.join(logs_dir, ".cache")
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.entries_dir = os.path.join(self.cache_dir, "entries")
+        self.memo_file = os.path.join(self.cache_dir, "file_hashes.json")
+        self.hasher = EvidenceHasher(logs_dir)
+        self.memo = self._load_memo()
+        self._code_versions = {}
+        self.stats = {"hits": 0, "misses": 0, "saved_seconds": 0.0, "restored_files": 0}
+
+    # ---- Hashing ----
+
+    def _load_memo(self):
+        try:
+            with open(self.memo_file, "r", encoding="utf-8") as f:
+                memo = json.load(f)
+            if memo.get("version") == CACHE_VERSION:
+                return memo["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def file_hash(self, path):
+        """SHA-256 of a file, memoized on (size, mtime) so unchanged inputs are not re-read."""
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        cached = self.memo.get(os.path.abspath(path))
+        if cached and cached[:2] == stamp:
+            return cached[2]
+        digest = self.hasher.hash_file(path)
+        if digest:
+            self.memo[os.path.abspath(path)] = stamp + [digest]
+        return digest
+
+    def _resolve(self, name):
+        """Existing file for a declared input/output name (any artifact variant for .json)."""
+        path = os.path.join(self.logs_dir, name)
+        if path.endswith(".json"):
+            return find_artifact(path)
+        return path if os.path.exists(path) else None
+
+    def code_version(self, module):
+        """Hash of a module's source and of every module it imports from the same directory."""
+        if module in self._code_versions:
+            return self._code_versions[module]
+
+        spec = importlib.util.find_spec(module)
+        if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+            return None
+        local_dir = os.path.dirname(spec.origin)
+
+        sha256 = hashlib.sha256()
+        seen = set()
+        todo = [spec.origin]
+        while todo:
+            path = todo.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            with open(path, "rb") as f:
+                source = f.read()
+            sha256.update(os.path.basename(path).encode() + b"\0" + hashlib.sha256(source).digest())
+            try:
+                tree = ast.parse(source)
+            except SyntaxError:
+                continue
+            for node in ast.walk(tree):
+                names = []
+                if isinstance(node, ast.Import):
+                    names = [alias.name for alias in node.names]
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    names = [node.module]
+                for name in names:
+                    candidate = os.path.join(local_dir, name.split(".")[0] + ".py")
+                    if os.path.isfile(candidate):
+                        todo.append(candidate)
+            # Visit dependencies in a stable order so the digest is deterministic
+            todo.sort(reverse=True)
+
+        self._code_versions[module] = sha256.hexdigest()
+        return self._code_versions[module]
+
+    def key(self, task):
+        """Cache key for a task given the current state of its inputs."""
+        inputs = {}
+        for name in task.inputs:
+            path = self._resolve(name)
+            inputs[name] = self.file_hash(path) if path else None
+        material = {
+            "cache_version": CACHE_VERSION,
+            "task": task.name,
+            "function": f"{task.module}.{task.func}",
+            "code": self.code_version(task.module),
+            "inputs": inputs,
+            "params": task.kwargs,
+            # Output format changes the files a task writes
+            "output_format": output_format()
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).hexdigest()
+
+    # ---- Entries ----
+
+    def _entry_path(self, key):
+        return os.path.join(self.entries_dir, key + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def lookup(self, key):
+        """Stored entry for a key, or None if missing or incomplete."""
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for output in entry["outputs"].values():
+            if not os.path.exists(self._object_path(output["hash"])):
+                return None
+        return entry
+
+    def restore(self, task, key):
+        """Put a cached task's outputs back in place. Returns the entry on a hit, None on a miss."""
+        entry = self.lookup(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        for rel_path, output in entry["outputs"].items():
+            path = os.path.join(self.logs_dir, rel_path)
+            if os.path.exists(path) and self.file_hash(path) == output["hash"]:
+                continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            shutil.copyfile(self._object_path(output["hash"]), path)
+            self.file_hash(path)
+            self.stats["restored_files"] += 1
+
+        self.stats["hits"] += 1
+        self.stats["saved_seconds"] += entry.get("wall_seconds") or 0
+        return entry
+
+    def store(self, task, key, info):
+        """Record the outputs of a successful run under its key."""
+        outputs = {}
+        for name in task.outputs:
+            path = self._resolve(name)
+            if not path:
+                continue
+            digest = self.file_hash(path)
+            if not digest:
+                return False
+            obj = self._object_path(digest)
+            if not os.path.exists(obj):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                shutil.copyfile(path, obj + ".tmp")
+                os.replace(obj + ".tmp", obj)
+            outputs[os.path.relpath(path, self.logs_dir)] = {"hash": digest, "size": os.path.getsize(path)}
+
+        entry = {
+            "task": task.name,
+            "created": datetime.now().isoformat(),
+            "wall_seconds": info.get("wall_seconds"),
+            "peak_rss_mb": info.get("peak_rss_mb"),
+            "outputs": outputs
+        }
+        os.makedirs(self.entries_dir, exist_ok=True)
+        tmp = self._entry_path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=4)
+        os.replace(tmp, self._entry_path(key))
+        return True
+
+    # ---- Housekeeping ----
+
+    def save(self):
+        """Persist the input hash memo and drop stale entries and unreferenced objects."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        memo = {path: value for path, value in self.memo.items() if os.path.exists(path)}
+        tmp = self.memo_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": memo}, f)
+        os.replace(tmp, self.memo_file)
+        self.prune()
+
+    def prune(self, keep=MAX_ENTRIES_PER_TASK):
+        if not os.path.isdir(self.entries_dir):
+            return
+        by_task = {}
+        for name in os.listdir(self.entries_dir):
+            path = os.path.join(self.entries_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                os.remove(path)
+                continue
+            by_task.setdefault(entry.get("task"), []).append((entry.get("created", ""), path, entry))
+
+        referenced = set()
+        for entries in by_task.values():
+            entries.sort(reverse=True)
+            for i, (_, path, entry) in enumerate(entries):
+                if i < keep:
+                    referenced.update(output["hash"] for output in entry["outputs"].values())
+                else:
+                    os.remove(path)
+
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                folder = os.path.join(self.objects_dir, prefix)
+                for digest in os.listdir(folder):
+                    if digest not in referenced:
+                        os.remove(os.path.join(folder, digest))
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.memo = {}
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(self.stats, lookups=lookups,
+                    hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                    saved_seconds=round(self.stats["saved_seconds"], 3))
@@ -1,101 +1,218 @@
 
-import subprocess
 import os
 import sys
+import json
+import time
+import argparse
 from datetime import datetime
 
-def run_all_analysis():
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from logcat_engine import LogcatEngine
+from unified_timeline import TimelinePlugin
+from privacy_analyzer import PrivacyPlugin
+from pii_detector import PIIPlugin
+from network_analyzer import NetworkPlugin
+from power_forensics import PowerPlugin
+from intent_hunter import IntentPlugin
+from beacon_map import BeaconPlugin
+from clipboard_forensics import ClipboardPlugin
+from app_sessionizer import AppSessionPlugin
+from evidence_hasher import EvidenceHasher
+from orchestrator import Orchestrator, Task, print_run_summary
+from result_cache import ResultCache
+
+LOGS_DIR = "logs"
+
+# Logcat-driven analyzers: (plugin class, output file)
+LOGCAT_PLUGINS = [
+    (TimelinePlugin, "unified_timeline.json"),
+    (PrivacyPlugin, "privacy_profile.json"),
+    (PIIPlugin, "pii_leaks.json"),
+    (NetworkPlugin, "network_activity.json"),
+    (PowerPlugin, "power_forensics.json"),
+    (IntentPlugin, "intent_hunter.json"),
+    (BeaconPlugin, "beacon_map.json"),
+    (ClipboardPlugin, "clipboard_forensics.json"),
+    (AppSessionPlugin, "app_sessions.json"),
+]
+
+
+def run_logcat_plugins(logs_dir=LOGS_DIR):
+    """All logcat-driven analyzers on a single read of android_logcat.txt."""
+    plugins = [cls(logs_dir, os.path.join(logs_dir, output)) for cls, output in LOGCAT_PLUGINS]
+    engine = LogcatEngine(logs_dir)
+    for plugin in plugins:
+        engine.register(plugin)
+
+    start = time.time()
+    errors = engine.run()
+    if len(errors) == len(plugins):
+        raise RuntimeError("All logcat analyzers failed")
+    print(f"✅ {engine.lines_processed:,} lines processed by {len(plugins)} analyzers in {time.time() - start:.2f}s")
+    return {"lines": engine.lines_processed, "failed": {name: str(e) for name, e in errors.items()}}
+
+
+def hash_evidence(logs_dir=LOGS_DIR):
+    """Register SHA-256 hashes of every file in logs_dir."""
+    return EvidenceHasher(logs_dir).hash_all_logs()
+
+
+def analysis_tasks(logs_dir=LOGS_DIR):
+    """
+    The analysis DAG. Dependencies follow from inputs/outputs, e.g. unified_timeline
+    (logcat_engine) reads notification_timeline.json, and apk_tracker reads
+    intent_hunter.json and unified_timeline.json.
+    """
+    def out(name):
+        return os.path.join(logs_dir, name)
+
+    tasks = [
+        Task("notification_parser", "notification_parser", "save_notification_timeline",
+             title="Notification Parser",
+             inputs=["notification_history.txt"],
+             outputs=["notification_timeline.json"],
+             kwargs={"logs_dir": logs_dir, "output_file": out("notification_timeline.json")}),
+        Task("dual_space_analyzer", "dual_space_analyzer", "analyze_dual_space",
+             title="Dual Space Analyzer",
+             inputs=["dual_space_apps.txt", "full_package_dump.txt"],
+             outputs=["dual_space_analysis.json"],
+             kwargs={"logs_dir": logs_dir, "output_file": out("dual_space_analysis.json")}),
+        Task("logcat_engine", "run_analysis", "run_logcat_plugins",
+             title=f"Single-pass logcat engine ({len(LOGCAT_PLUGINS)} analyzers)",
+             inputs=["android_logcat.txt", "sms_logs.txt", "call_logs.txt", "notification_timeline.json",
+                     "dual_space_analysis.json", "package_dump.txt", "full_package_dump.txt",
+                     "full_package_dump_utf8.txt"],
+             outputs=[output for _, output in LOGCAT_PLUGINS] + [
+                 "ghost_gaps.json", "unified_timeline.sorted.ndjson", "unified_timeline.tidx",
+                 "unified_timeline.typx", "unified_timeline.idx.json"],
+             kwargs={"logs_dir": logs_dir}),
+        Task("apk_tracker", "apk_tracker", "analyze_apk_movements",
+             title="APK Tracker",
+             inputs=["intent_hunter.json", "unified_timeline.json", "android_logcat.txt", "dump_package.txt"],
+             outputs=["apk_analysis.json"],
+             kwargs={"logs_dir": logs_dir, "output_file": out("apk_analysis.json")}),
+        Task("social_graph", "social_graph", "generate_social_graph",
+             title="Social Link Graph",
+             inputs=["contacts.json", "sms_logs.txt", "call_logs.txt"],
+             outputs=["social_graph.json"],
+             kwargs={"logs_dir": logs_dir, "output_file": out("social_graph.json")}),
+        Task("fake_log_detector", "fake_log_detector", "main",
+             title="Fake Log Detector",
+             inputs=["android_logcat_radio.txt", "android_logcat.txt", "call_logs.txt", "sms_logs.txt"],
+             outputs=["fake_log_report.json"],
+             kwargs={"logs_dir": logs_dir}),
+        # The certificate carries the acquisition time and a fresh custody signature, and
+        # the evidence manifest is resealed, so it is regenerated on every run
+        Task("device_identifiers", "device_identifiers", "generate_section_65b_data",
+             title="Section 65B Device Identifiers",
+             inputs=["device_identifiers.txt", "android_logcat.txt", "call_logs.txt", "sms_logs.txt",
+                     "notification_history.txt", "dual_space_apps.txt", "usage_stats.txt"],
+             outputs=["section_65b_data.json"],
+             kwargs={"logs_dir": logs_dir},
+             cacheable=False),
+        # Compressed, indexed copy of the logcat for time/tag/priority-scoped readers;
+        # rebuilt only when android_logcat.txt changed, so not cached
+        Task("logcat_segments", "logcat_segments", "build_segments",
+             title="Logcat Segment Store",
+             inputs=["android_logcat.txt"],
+             kwargs={"logs_dir": logs_dir},
+             cacheable=False),
+        # Full-text index for the GUI and web filters; reads the segments when the raw
+        # logcat was dropped, so it runs after them
+        Task("search_index", "search_index", "build_search_index",
+             title="Full-Text Search Index",
+             inputs=["android_logcat.txt", "call_logs.txt", "sms_logs.txt", "location_logs.txt"],
+             after=["logcat_segments"],
+             kwargs={"logs_dir": logs_dir},
+             cacheable=False),
+    ]
+
+    # Evidence hashes cover every artifact, so they are generated last
+    tasks.append(Task("evidence_hasher", "run_analysis", "hash_evidence",
+                      title="Evidence Hashes",
+                      after=[task.name for task in tasks],
+                      outputs=["evidence_metadata.json"],
+                      kwargs={"logs_dir": logs_dir},
+                      cacheable=False))
+    return tasks
+
+
+def run_all_analysis(logs_dir=LOGS_DIR, max_workers=None, use_cache=True, clear_cache=False):
     print("=" * 60)
     print("  ANDROID FORENSIC TOOL - Analysis Orchestrator")
     print("  Starting comprehensive forensic analysis...")
     print("=" * 60)
     print(f"\nStarted at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    
-    scripts = [
-        {"path": "analysis/unified_timeline.py", "name": "Unified Timeline Generator"},
-        {"path": "analysis/privacy_analyzer.py", "name": "Privacy Profiler"},
-        {"path": "analysis/pii_detector.py", "name": "PII Leak Detector"},
-        {"path": "analysis/network_analyzer.py", "name": "Network Analyzer"},
-        {"path": "analysis/social_graph.py", "name": "Social Link Graph"},
-        {"path": "analysis/power_forensics.py", "name": "Power Forensics"},
-        {"path": "analysis/intent_hunter.py", "name": "Intent & URL Hunter"},
-        {"path": "analysis/beacon_map.py", "name": "WiFi & Bluetooth Beacon Map"},
-        {"path": "analysis/clipboard_forensics.py", "name": "Clipboard Reconstruction"},
-        {"path": "analysis/app_sessionizer.py", "name": "App Usage Sessionizer"}
-    ]
-    
-    results = {"success": [], "failed": [], "total": len(scripts)}
-    
-    for idx, script in enumerate(scripts, 1):
-        print(f"\n[{idx}/{len(scripts)}] Running: {script['name']}")
-        print("-" * 60)
-        
-        try:
-            # Get absolute path
-            abs_path = os.path.abspath(script['path'])
-            
-            if not os.path.exists(abs_path):
-                print(f"  ⚠️  WARNING: Script not found: {abs_path}")
-                results["failed"].append({"name": script['name'], "error": "Script not found"})
-                continue
-            
-            # Run script and capture output
-            result = subprocess.run(
-                [sys.executable, abs_path],
-                capture_output=True,
-                text=True,
-                timeout=60  # 60 second timeout per script
-            )
-            
-            # Print output
-            if result.stdout:
-                for line in result.stdout.strip().split('\n'):
-                    print(f"  {line}")
-            
-            # Check for errors
-            if result.returncode != 0:
-                print(f"  ❌ FAILED with exit code {result.returncode}")
-                if result.stderr:
-                    print(f"  Error details: {result.stderr[:200]}")
-                results["failed"].append({"name": script['name'], "error": f"Exit code {result.returncode}"})
-            else:
-                print(f"  ✅ SUCCESS")
-                results["success"].append(script['name'])
-                
-        except subprocess.TimeoutExpired:
-            print(f"  ⏱️  TIMEOUT: Script exceeded 60 second limit")
-            results["failed"].append({"name": script['name'], "error": "Timeout"})
-        except Exception as e:
-            print(f"  ❌ ERROR: {str(e)}")
-            results["failed"].append({"name": script['name'], "error": str(e)})
-    
+
+    cache = ResultCache(logs_dir) if use_cache else None
+    if cache and clear_cache:
+        cache.clear()
+        print("🧹 Result cache cleared")
+
+    orchestrator = Orchestrator(logs_dir, max_workers, cache)
+    for task in analysis_tasks(logs_dir):
+        orchestrator.add(task)
+
+    print(f"Running {len(orchestrator.tasks)} modules on {max(orchestrator.max_workers, 1)} worker(s)")
+    print(f"Order: {' -> '.join(orchestrator.order())}")
+
+    start = time.time()
+    results = orchestrator.run()
+    elapsed = time.time() - start
+
+    # Partial logcat-engine failures count per analyzer
+    failed = []
+    for result in results.values():
+        if result["status"] not in ("success", "cached"):
+            failed.append({"name": result["title"], "error": result["error"] or result["status"].title()})
+        failed.extend({"name": name, "error": error} for name, error in result["failed"].items())
+    total = len(results) - 1 + len(LOGCAT_PLUGINS)
+
     # Print summary
     print("\n" + "=" * 60)
     print("  ANALYSIS SUMMARY")
     print("=" * 60)
-    print(f"\n  Total Scripts:  {results['total']}")
-    print(f"  ✅ Successful:  {len(results['success'])}")
-    print(f"  ❌ Failed:      {len(results['failed'])}")
-    
-    if results['failed']:
+    print_run_summary(results)
+    print(f"\n  Total Modules:  {total}")
+    print(f"  ✅ Successful:  {total - len(failed)}")
+    print(f"  ❌ Failed:      {len(failed)}")
+
+    if failed:
         print(f"\n  Failed modules:")
-        for failure in results['failed']:
+        for failure in failed:
             print(f"    - {failure['name']}: {failure['error']}")
-    
-    print(f"\n  Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if cache:
+        stats = cache.summary()
+        print(f"\n  ♻️  Cache:      {stats['hits']} hit(s), {stats['misses']} miss(es)"
+              f" ({stats['hit_rate']:.0%} hit rate, ~{stats['saved_seconds']:.1f}s saved,"
+              f" {stats['restored_files']} file(s) restored)")
+    print(f"\n  Wall time:     {elapsed:.2f}s")
+    print(f"  Completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
-    
-    # Generate hash verification (if evidence_hasher exists)
-    if os.path.exists("analysis/evidence_hasher.py"):
-        print("\n[Post-Analysis] Generating evidence hashes...")
-        try:
-            subprocess.run([sys.executable, "analysis/evidence_hasher.py", "hash"], timeout=30)
-            print("  ✅ Evidence hashes generated")
-        except Exception as e:
-            print(f"  ⚠️  Hash generation failed: {e}")
-    
-    return len(results['failed']) == 0
+
+    run_summary = {
+        "started": datetime.fromtimestamp(start).isoformat(),
+        "wall_seconds": round(elapsed, 3),
+        "workers": orchestrator.max_workers,
+        "cache": cache.summary() if cache else None,
+        "modules": list(results.values())
+    }
+    try:
+        with open(os.path.join(logs_dir, "analysis_run.json"), "w", encoding="utf-8") as f:
+            json.dump(run_summary, f, indent=4)
+    except OSError as e:
+        print(f"⚠️  Could not save run summary: {e}")
+
+    return len(failed) == 0
 
 if __name__ == "__main__":
-    success = run_all_analysis()
+    parser = argparse.ArgumentParser(description="Run every analysis module")
+    parser.add_argument("--logs-dir", default=LOGS_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count, 0 = run inline)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every module")
+    parser.add_argument("--clear-cache", action="store_true", help="Drop cached results first")
+    args = parser.parse_args()
+    success = run_all_analysis(args.logs_dir, args.workers, not args.no_cache, args.clear_cache)
     sys.exit(0 if success else 1)
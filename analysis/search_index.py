@@ -0,0 +1,442 @@
+"""
+search_index.py
+
+Persistent full-text search index over the text logs (SQLite FTS5).
+
+Filtering used to re-read and regex every line of a log on every request.
+This index is built once after extraction:
+
+    logs/search_index/index.db
+
+    sources    one row per indexed file: size/mtime it was built from, line count
+    lines      source, line_no, epoch (local epoch seconds; a line without a
+               time has the closest earlier one, or the first one when it comes
+               before it; NULL when the file has none), priority
+               (logcat V/D/I/W/E/F/A or NULL), tag, categories (bitmask of
+               config.LOG_TYPES matches, bit order in meta "categories"), content
+    lines_fts  FTS5 trigram index over lines.content (external content,
+               detail=none), queried with LIKE, so a keyword is a case-insensitive
+               substring match, like the scans
+    blocks     time buckets: per source and run of BLOCK_LINES line ids, the
+               id and epoch range, so a time range narrows the ids to scan
+
+Queries combine keyword, time range, priorities and a LOG_TYPES category and
+are paginated by line id (keyset cursor), so a page costs the same no matter
+how deep it is. Keywords shorter than 3 characters cannot use the trigram
+index and fall back to LIKE over the other constraints.
+
+A source whose size or mtime changed is no longer "current" and readers fall
+back to scanning the file until the index is rebuilt (the orchestrator task
+search_index does that after every extraction). An android_logcat.txt that
+was dropped after segmenting is indexed from logs/logcat_segments.
+web/includes/search_index.php reads the same database.
+
+Usage:
+    python search_index.py build [--force]
+    python search_index.py search KEYWORD [--since "MM-DD HH:MM"] [--priority E] [--category Network]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import itertools
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logcat_parser import LogcatParser, carry_times
+from logcat_segments import LogcatSegmentStore, open_logcat_lines, parse_since
+from config import LOG_TYPES
+
+INDEX_VERSION = 2
+INDEX_DIR = "search_index"
+INDEX_FILE = "index.db"
+LOGCAT_SOURCE = "android_logcat.txt"
+SOURCES = (LOGCAT_SOURCE, "call_logs.txt", "sms_logs.txt", "location_logs.txt")
+PAGE_SIZE = 1000
+INSERT_BATCH = 50000
+BLOCK_SHIFT = 12  # 4096 lines per time bucket
+
+
+def pattern_literals(pattern):
+    """
+    Lower-case literals, one per alternative of a simple "a|b.*c|d" regex, that
+    a matching line must contain; None if some alternative has no literal prefix.
+    """
+    if "(" in pattern:
+        return None
+    literals = []
+    for alternative in pattern.split("|"):
+        literal, i = "", 0
+        while i < len(alternative):
+            ch = alternative[i]
+            if ch == "\\" and i + 1 < len(alternative) and not alternative[i + 1].isalnum():
+                literal += alternative[i + 1]
+                i += 2
+                continue
+            if ch in "?*{":
+                literal = literal[:-1]  # the previous character is optional
+                break
+            if ch in ".+[]^$\\":
+                break
+            literal += ch
+            i += 1
+        if not literal:
+            return None
+        literals.append(literal.lower())
+    return literals
+
+
+CATEGORY_NAMES = list(LOG_TYPES)
+# (compiled pattern, literals for a cheap substring pre-check or None)
+CATEGORY_MATCHERS = [(re.compile(info["pattern"], re.IGNORECASE), pattern_literals(info["pattern"]))
+                     for info in LOG_TYPES.values()]
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE sources (
+    id INTEGER PRIMARY KEY, name TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, mtime INTEGER,
+    lines INTEGER, built TEXT
+);
+CREATE TABLE lines (
+    id INTEGER PRIMARY KEY, source INTEGER, line_no INTEGER, epoch REAL, priority TEXT, tag TEXT,
+    categories INTEGER, content TEXT
+);
+"""
+INDEXES = """
+CREATE INDEX lines_source_epoch ON lines (source, epoch);
+CREATE INDEX lines_source_priority ON lines (source, priority);
+CREATE INDEX blocks_source ON blocks (source, first_id);
+"""
+BLOCKS = f"""
+CREATE TABLE blocks (
+    source INTEGER, first_id INTEGER, last_id INTEGER, min_epoch REAL, max_epoch REAL, untimed INTEGER
+);
+INSERT INTO blocks
+SELECT source, MIN(id), MAX(id), MIN(epoch), MAX(epoch), SUM(epoch IS NULL)
+FROM lines GROUP BY source, id >> {BLOCK_SHIFT};
+"""
+
+
+def category_bits(line):
+    """Bitmask of the LOG_TYPES categories whose pattern matches the line."""
+    lower = line.lower()
+    bits = 0
+    for bit, (pattern, literals) in enumerate(CATEGORY_MATCHERS):
+        if literals is not None and not any(literal in lower for literal in literals):
+            continue
+        if pattern.search(line):
+            bits |= 1 << bit
+    return bits
+
+
+def like_pattern(keyword):
+    return "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class LogSearchIndex:
+    """
+    Usage:
+        index = LogSearchIndex("logs")
+        index.build()
+        page = index.search(["android_logcat.txt"], keyword="wifi", start=epoch, priorities=["E"])
+        next_page = index.search(..., after=page["next_cursor"])
+    """
+
+    def __init__(self, logs_dir="logs"):
+        self.logs_dir = logs_dir
+        self.index_dir = os.path.join(logs_dir, INDEX_DIR)
+        self.db_path = os.path.join(self.index_dir, INDEX_FILE)
+        self._conn = None
+
+    # ---- State ----
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def meta(self):
+        return dict(self.connect().execute("SELECT key, value FROM meta"))
+
+    def source_stat(self, name):
+        """(size, mtime_ns) the index should match, or None if the source is gone entirely."""
+        path = os.path.join(self.logs_dir, name)
+        if os.path.exists(path):
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        if name == LOGCAT_SOURCE:
+            # Raw file dropped after segmenting: the segment index remembers what it was
+            store = LogcatSegmentStore(self.logs_dir)
+            if store.exists():
+                return store.index["source_size"], store.index["source_mtime_ns"]
+        return None
+
+    def current_sources(self):
+        """{source name: source id} of indexed sources that still match their files."""
+        if not self.exists():
+            return {}
+        try:
+            if self.meta().get("version") != str(INDEX_VERSION):
+                return {}  # built by an older layout; rebuilt by the next build()
+            rows = self.connect().execute("SELECT id, name, size, mtime_ns FROM sources").fetchall()
+        except sqlite3.Error:
+            return {}
+        return {name: source_id for source_id, name, size, mtime_ns in rows
+                if self.source_stat(name) == (size, mtime_ns)}
+
+    def up_to_date(self, sources=SOURCES):
+        current = self.current_sources()
+        return all(name in current for name in sources if self.source_stat(name) is not None)
+
+    # ---- Building ----
+
+    def _source_lines(self, name):
+        if name == LOGCAT_SOURCE:
+            return open_logcat_lines(self.logs_dir)
+        path = os.path.join(self.logs_dir, name)
+
+        def lines():
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                yield from enumerate(f, 1)
+        return lines()
+
+    def _rows(self, source_id, name):
+        is_logcat = name == LOGCAT_SOURCE
+        parser = LogcatParser(rollover=True)
+        numbered = ((line_no, line.rstrip("\r\n")) for line_no, line in self._source_lines(name))
+        numbers, texts = itertools.tee((line_no, line) for line_no, line in numbered if line)
+        # Lines without a time are dated like the filter dates them (logcat_parser.carry_times)
+        dated = carry_times((line for _, line in texts), parser.decoder)
+        for (line_no, _), (epoch, line) in zip(numbers, dated):
+            priority = tag = None
+            if is_logcat:
+                record = parser.parse(line)
+                if record is not None:
+                    priority, tag = record.priority, record.tag
+            yield source_id, line_no, epoch, priority, tag, category_bits(line), line
+
+    def build(self, force=False):
+        """(Re)build the database when any source changed. Returns {source: lines} or None if current."""
+        present = [name for name in SOURCES if self.source_stat(name) is not None]
+        if not force and self.exists() and self.up_to_date(present):
+            return None
+        self.close()
+
+        tmp_dir = self.index_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        conn = sqlite3.connect(os.path.join(tmp_dir, INDEX_FILE))
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        try:
+            # detail='none' keeps the index about the size of the text; LIKE re-checks the candidates
+            conn.execute("CREATE VIRTUAL TABLE lines_fts USING fts5(content, content='lines', "
+                         "content_rowid='id', tokenize='trigram', detail='none')")
+            fts = "trigram"
+        except sqlite3.OperationalError:
+            print("⚠️  SQLite without the FTS5 trigram tokenizer (needs 3.34+), keywords will use LIKE scans")
+            fts = "none"
+
+        counts = {}
+        for source_id, name in enumerate(present, 1):
+            size, mtime_ns = self.source_stat(name)
+            rows = self._rows(source_id, name)
+            total = 0
+            while True:
+                batch = [row for _, row in zip(range(INSERT_BATCH), rows)]
+                if not batch:
+                    break
+                conn.executemany("INSERT INTO lines (source, line_no, epoch, priority, tag, categories, content) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                total += len(batch)
+            conn.execute("INSERT INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (source_id, name, size, mtime_ns, mtime_ns // 1_000_000_000, total,
+                          datetime.now().isoformat()))
+            counts[name] = total
+
+        if fts == "trigram":
+            conn.execute("INSERT INTO lines_fts (rowid, content) SELECT id, content FROM lines")
+            conn.execute("INSERT INTO lines_fts (lines_fts) VALUES ('optimize')")
+        conn.executescript(BLOCKS)
+        conn.executescript(INDEXES)
+        meta = {"version": INDEX_VERSION, "fts": fts, "categories": json.dumps(CATEGORY_NAMES),
+                "created": datetime.now().isoformat()}
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.index_dir)
+        return counts
+
+    # ---- Querying ----
+
+    def search(self, sources, keyword=None, start=None, end=None, priorities=None, category=None,
+               after=0, limit=PAGE_SIZE):
+        """
+        One page of matching lines, in file order.
+
+        sources: source names; only current ones are searched (see current_sources)
+        start/end: epoch seconds; lines without a time are dated as in
+                   logcat_parser.carry_times (and match when their file has no times)
+        priorities: logcat priority letters (lines of other sources have none and are excluded)
+        category: a config.LOG_TYPES name
+        after: cursor from the previous page (0 for the first)
+
+        Returns {"rows": [(source, line_no, epoch, priority, content)], "next_cursor": id or None,
+                 "sources": [searched source names], "seconds": query time}
+        """
+        started = time.monotonic()
+        current = self.current_sources()
+        searched = [name for name in sources if name in current]
+        if not searched:
+            return {"rows": [], "next_cursor": None, "sources": [], "seconds": 0.0}
+        names = {current[name]: name for name in searched}
+
+        source_list = ",".join("?" * len(names))
+        where = [f"l.source IN ({source_list})"]
+        params = list(names)
+        low, high = after, None
+        if start is not None or end is not None:
+            low, high = self._id_bounds(source_list, list(names), start, end)
+            if low is None:
+                return {"rows": [], "next_cursor": None, "sources": searched,
+                        "seconds": round(time.monotonic() - started, 4)}
+            low = max(low - 1, after)
+        if start is not None:
+            where.append("(l.epoch IS NULL OR l.epoch >= ?)")
+            params.append(start)
+        if end is not None:
+            where.append("(l.epoch IS NULL OR l.epoch <= ?)")
+            params.append(end)
+        if priorities:
+            where.append(f"l.priority IN ({','.join('?' * len(priorities))})")
+            params += list(priorities)
+        if category:
+            bit = next((i for i, name in enumerate(json.loads(self.meta()["categories"]))
+                        if name.lower() == category.lower()), None)
+            if bit is None:
+                raise ValueError(f"Unknown log category {category!r}")
+            where.append("(l.categories & ?) != 0")
+            params.append(1 << bit)
+
+        table, order = "lines l", "l.id"
+        keyword = keyword or ""
+        if keyword and len(keyword) >= 3 and self.meta().get("fts") == "trigram":
+            # LIKE on the trigram table is answered from the index; keep its rowid order so
+            # SQLite can stop after one page instead of sorting every candidate
+            table, order = "lines_fts f JOIN lines l ON l.id = f.rowid", "f.rowid"
+            where.insert(0, "f.content LIKE ? ESCAPE '\\'")
+            params.insert(0, like_pattern(keyword))
+        elif keyword:
+            where.append("l.content LIKE ? ESCAPE '\\'")
+            params.append(like_pattern(keyword))
+        where.append(f"{order} > ?")
+        params.append(low)
+        if high is not None:
+            where.append(f"{order} <= ?")
+            params.append(high)
+
+        sql = (f"SELECT l.id, l.source, l.line_no, l.epoch, l.priority, l.content FROM {table} "
+               f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?")
+        rows = self.connect().execute(sql, params + [limit + 1]).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "rows": [(names[source], line_no, epoch, priority, content)
+                     for _, source, line_no, epoch, priority, content in rows],
+            "next_cursor": rows[-1][0] if more else None,
+            "sources": searched,
+            "seconds": round(time.monotonic() - started, 4)
+        }
+
+    def _id_bounds(self, source_list, source_ids, start, end):
+        """First and last line id of the time buckets that can hold lines in [start, end]."""
+        where, params = [f"source IN ({source_list})"], list(source_ids)
+        if start is not None:
+            where.append("(max_epoch >= ? OR untimed > 0)")
+            params.append(start)
+        if end is not None:
+            where.append("(min_epoch <= ? OR untimed > 0)")
+            params.append(end)
+        return self.connect().execute(
+            f"SELECT MIN(first_id), MAX(last_id) FROM blocks WHERE {' AND '.join(where)}", params).fetchone()
+
+    def iter_search(self, sources, **kwargs):
+        """Every matching row, page by page."""
+        after = 0
+        while True:
+            page = self.search(sources, after=after, **kwargs)
+            yield from page["rows"]
+            if page["next_cursor"] is None:
+                return
+            after = page["next_cursor"]
+
+
+def build_search_index(logs_dir="logs"):
+    """Orchestrator entry point: rebuild the index when a source log changed."""
+    index = LogSearchIndex(logs_dir)
+    start = time.time()
+    counts = index.build()
+    if counts is None:
+        print("✅ Search index up to date")
+        return
+    if not counts:
+        print("⚠️  No logs to index")
+        return
+    size = os.path.getsize(index.db_path) / 1048576
+    print(f"✅ Search index built in {time.time() - start:.1f}s: "
+          + ", ".join(f"{name} {lines:,}" for name, lines in counts.items()) + f" lines ({size:.1f} MB)")
+
+
+def main():
+    logs_dir = "logs"
+    args = sys.argv[1:]
+    if not args or args[0] not in ("build", "search"):
+        print("Usage:")
+        print("  python search_index.py build [--force]")
+        print("  python search_index.py search KEYWORD [--since T] [--until T] [--priority E] "
+              "[--category C] [--source android_logcat.txt]")
+        return
+
+    if args[0] == "build":
+        counts = LogSearchIndex(logs_dir).build(force="--force" in args)
+        print("✅ Search index up to date" if counts is None else f"✅ Indexed {counts}")
+        return
+
+    def option(name):
+        return args[args.index(name) + 1] if name in args else None
+
+    index = LogSearchIndex(logs_dir)
+    if not index.exists():
+        print("❌ No search index, run: python search_index.py build")
+        sys.exit(1)
+    keyword = args[1] if len(args) > 1 and not args[1].startswith("--") else None
+    since, until = option("--since"), option("--until")
+    page = index.search([option("--source") or LOGCAT_SOURCE], keyword=keyword,
+                        start=parse_since(since) if since else None, end=parse_since(until) if until else None,
+                        priorities=[option("--priority")] if option("--priority") else None,
+                        category=option("--category"))
+    for source, line_no, _, _, content in page["rows"]:
+        print(f"{line_no}: {content}")
+    more = " (more)" if page["next_cursor"] else ""
+    print(f"\n{len(page['rows'])} line(s){more} in {page['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
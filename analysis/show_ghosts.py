@@ -1,8 +1,7 @@
-import json
+from artifact_io import load_artifact
 
 # Load timeline
-with open('logs/unified_timeline.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+data = load_artifact('logs/unified_timeline.json', [])
 
 # Find GHOST events
 ghosts = [e for e in data if e.get('type') == 'GHOST']
@@ -1,9 +1,8 @@
 
-import json
+from artifact_io import load_artifact
 
 def show_security_events(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_artifact(file_path, [])
     
     security_events = [x for x in data if x.get('type') == 'SECURITY']
     print(f"Found {len(security_events)} SECURITY events.")
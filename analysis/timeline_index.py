@@ -0,0 +1,254 @@
+"""
+timeline_index.py
+
+Indexed sidecar for the unified timeline, plus a query CLI for the web UI.
+
+generate_timeline() writes, next to unified_timeline.json:
+  unified_timeline.sorted.ndjson - events sorted by time, one compact JSON object per line
+  unified_timeline.tidx          - fixed-size records (ts_ms, byte offset) for every event, in file order
+  unified_timeline.typx          - the same records grouped by event type (each group in file order)
+  unified_timeline.idx.json      - metadata: event count, record format, type -> [first record, count]
+
+Both index files are binary-searchable by seeking to record_number * RECORD_SIZE,
+so a time window or page is answered without reading the whole timeline.
+
+Usage:
+  python timeline_index.py --logs-dir logs --start 2024-01-20T10:00:00 --end 2024-01-20T11:00:00 --types SMS,CALL --limit 100
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import struct
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from timeline_store import NO_TIME, NUMPY_AVAILABLE, EPOCH
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+INDEX_VERSION = 1
+RECORD_FORMAT = "<qq"  # (timestamp epoch ms, byte offset into the NDJSON file)
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# Events without a usable timestamp sort last in the sidecar
+NO_TIME_KEY = 2 ** 63 - 1
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 5000
+
+
+def sidecar_paths(base_path):
+    """File names of the sidecar for a timeline path without extension (e.g. logs/unified_timeline)."""
+    return {
+        "ndjson": base_path + ".sorted.ndjson",
+        "time_index": base_path + ".tidx",
+        "type_index": base_path + ".typx",
+        "meta": base_path + ".idx.json"
+    }
+
+
+# ---- Writing ----
+
+def write_timeline_index(store, base_path):
+    """Write the sorted NDJSON + offset indexes for a TimelineStore."""
+    paths = sidecar_paths(base_path)
+    count = len(store)
+
+    # Numeric time order (stable); rows without a timestamp go last
+    if NUMPY_AVAILABLE:
+        ts = np.frombuffer(store.ts, dtype=np.int64)
+        keys = np.where(ts == NO_TIME, NO_TIME_KEY, ts // 1000)
+        order = np.argsort(keys, kind='stable').tolist()
+        keys = keys.tolist()
+    else:
+        keys = [NO_TIME_KEY if us == NO_TIME else us // 1000 for us in store.ts]
+        order = sorted(range(count), key=keys.__getitem__)
+
+    by_type = {}
+    offset = 0
+    with open(paths["ndjson"], "wb") as out, open(paths["time_index"], "wb") as tidx:
+        for row in order:
+            line = (json.dumps(store.record(row), separators=(",", ":")) + "\n").encode("utf-8")
+            record = struct.pack(RECORD_FORMAT, keys[row], offset)
+            tidx.write(record)
+            by_type.setdefault(store.type_codes[row], []).append(record)
+            out.write(line)
+            offset += len(line)
+
+    types = {}
+    position = 0
+    with open(paths["type_index"], "wb") as typx:
+        for code in sorted(by_type, key=lambda c: str(store.types.values[c])):
+            records = by_type[code]
+            typx.write(b"".join(records))
+            types[str(store.types.values[code])] = [position, len(records)]
+            position += len(records)
+
+    timed = [keys[row] for row in order if keys[row] != NO_TIME_KEY]
+    meta = {
+        "version": INDEX_VERSION,
+        "events": count,
+        "record_format": RECORD_FORMAT,
+        "record_size": RECORD_SIZE,
+        "start_ms": timed[0] if timed else None,
+        "end_ms": timed[-1] if timed else None,
+        "types": types,
+        "files": {name: os.path.basename(path) for name, path in paths.items() if name != "meta"}
+    }
+    with open(paths["meta"], "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4)
+    return meta
+
+
+# ---- Querying ----
+
+def to_epoch_ms(value):
+    """Accept epoch milliseconds or an ISO timestamp (naive, as in the timeline)."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        dt = datetime.fromisoformat(str(value))
+        return (dt.replace(tzinfo=None) - EPOCH) // timedelta(milliseconds=1)
+
+
+class _RecordFile:
+    """Random access to fixed-size index records."""
+
+    def __init__(self, path):
+        self.f = open(path, "rb")
+
+    def read(self, i):
+        self.f.seek(i * RECORD_SIZE)
+        return struct.unpack(RECORD_FORMAT, self.f.read(RECORD_SIZE))
+
+    def lower_bound(self, lo, hi, field, value):
+        """First record in [lo, hi) whose field (0=ts, 1=offset) is >= value."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.read(mid)[field] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def scan(self, lo, hi, batch=4096):
+        """Yield records lo..hi-1 sequentially."""
+        self.f.seek(lo * RECORD_SIZE)
+        while lo < hi:
+            n = min(batch, hi - lo)
+            data = self.f.read(n * RECORD_SIZE)
+            yield from struct.iter_unpack(RECORD_FORMAT, data)
+            lo += n
+
+    def close(self):
+        self.f.close()
+
+
+def _slice_records(records, lo, hi, start_ms, end_ms, cursor):
+    """Records of one index slice inside the window, starting at the cursor."""
+    if start_ms is not None:
+        lo = max(lo, records.lower_bound(lo, hi, 0, start_ms))
+    if cursor is not None:
+        lo = max(lo, records.lower_bound(lo, hi, 1, cursor))
+    for ts_ms, offset in records.scan(lo, hi):
+        if end_ms is not None and ts_ms > end_ms:
+            return
+        yield offset
+
+
+def query_timeline(logs_dir="logs", start=None, end=None, types=None, limit=DEFAULT_LIMIT, cursor=None,
+                   base_name="unified_timeline"):
+    """
+    Return one page of timeline events without loading the whole file.
+
+    Args:
+        start, end: Inclusive window (epoch ms or ISO timestamp); None = open
+        types: List of event types to include; None = all
+        limit: Page size (capped at MAX_LIMIT)
+        cursor: next_cursor from the previous page
+
+    Returns:
+        dict with 'events', 'count', 'next_cursor', 'total', 'elapsed_ms'
+    """
+    started = time.perf_counter()
+    paths = sidecar_paths(os.path.join(logs_dir, base_name))
+    if not os.path.exists(paths["meta"]):
+        return {"error": "Timeline index not found. Run unified_timeline.py first."}
+
+    with open(paths["meta"], "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    start_ms = to_epoch_ms(start)
+    end_ms = to_epoch_ms(end)
+    cursor = int(cursor) if cursor not in (None, "") else None
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+
+    if types:
+        # One reader per type slice; offsets are file order, so merging them keeps time order
+        readers = []
+        streams = []
+        for evt_type in dict.fromkeys(types):
+            if evt_type in meta["types"]:
+                first, count = meta["types"][evt_type]
+                reader = _RecordFile(paths["type_index"])
+                readers.append(reader)
+                streams.append(_slice_records(reader, first, first + count, start_ms, end_ms, cursor))
+        offsets = heapq.merge(*streams)
+    else:
+        readers = [_RecordFile(paths["time_index"])]
+        offsets = _slice_records(readers[0], 0, meta["events"], start_ms, end_ms, cursor)
+
+    # Take one extra offset to know where the next page starts
+    page = []
+    for offset in offsets:
+        page.append(offset)
+        if len(page) > limit:
+            break
+    for reader in readers:
+        reader.close()
+
+    next_cursor = None
+    if len(page) > limit:
+        next_cursor = str(page.pop())
+
+    events = []
+    with open(paths["ndjson"], "rb") as f:
+        for offset in page:
+            f.seek(offset)
+            events.append(json.loads(f.readline()))
+
+    return {
+        "events": events,
+        "count": len(events),
+        "next_cursor": next_cursor,
+        "total": meta["events"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the indexed unified timeline")
+    parser.add_argument("--logs-dir", default="logs")
+    parser.add_argument("--start", help="Window start (epoch ms or ISO timestamp)")
+    parser.add_argument("--end", help="Window end (epoch ms or ISO timestamp)")
+    parser.add_argument("--types", help="Comma-separated event types")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--cursor", help="next_cursor from the previous page")
+    args = parser.parse_args()
+
+    try:
+        result = query_timeline(
+            args.logs_dir, args.start, args.end,
+            [t for t in args.types.split(",") if t] if args.types else None,
+            args.limit, args.cursor
+        )
+    except ValueError as e:
+        result = {"error": str(e)}
+    print(json.dumps(result))
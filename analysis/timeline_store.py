@@ -0,0 +1,279 @@
+"""
+timeline_store.py
+
+Columnar in-memory event store for the unified timeline.
+Events are kept as parallel columns instead of one dict per event:
+an int64 epoch-microsecond timestamp column, categorical codes for
+type/subtype/severity and an interned string table for content.
+Sorting, windowing and gap detection run on the columns (NumPy when
+available) and records are only rebuilt as dicts while exporting.
+"""
+
+import os
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from artifact_io import ArtifactWriter
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Timestamp column value for rows whose timestamp is not a naive ISO datetime
+NO_TIME = -(2 ** 63)
+
+
+def iso_to_us(ts_str):
+    """Parse an ISO timestamp into naive epoch microseconds, or None."""
+    try:
+        dt = datetime.fromisoformat(ts_str)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        return None
+    return (dt - EPOCH) // ONE_MICROSECOND
+
+
+def us_to_iso(us):
+    """Inverse of iso_to_us, formatted like datetime.isoformat()."""
+    return (EPOCH + timedelta(microseconds=us)).isoformat()
+
+
+class Categorical:
+    """Maps repeated string values to small integer codes."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class TimelineStore:
+    """
+    Columnar timeline: append events, then sort/export in bulk.
+
+    The five standard keys (timestamp, type, subtype, content, severity) live
+    in columns; any other keys (e.g. VoIP "metadata") are kept sparsely per row.
+    Timestamps that are not the isoformat() of a naive datetime are kept
+    verbatim in a side table so exports are unchanged.
+    """
+
+    FIELDS = ("timestamp", "type", "subtype", "content", "severity")
+
+    def __init__(self):
+        self.ts = array('q')
+        self.type_codes = array('i')
+        self.subtype_codes = array('i')
+        self.severity_codes = array('i')
+        self.content_ids = array('i')
+
+        self.types = Categorical()
+        self.subtypes = Categorical()
+        self.severities = Categorical()
+        self.contents = Categorical()
+
+        # Sparse per-row data
+        self.raw_ts = {}
+        self.extras = {}
+
+    def __len__(self):
+        return len(self.ts)
+
+    # ---- Building ----
+
+    def add(self, timestamp, evt_type, subtype, content, severity, extras=None):
+        """Append one event; returns its row number. Events without a timestamp are dropped."""
+        if not timestamp:
+            return None
+
+        row = len(self.ts)
+        us = iso_to_us(timestamp)
+        if us is None:
+            self.ts.append(NO_TIME)
+            self.raw_ts[row] = timestamp
+        else:
+            self.ts.append(us)
+            # Keep non-canonical spellings (e.g. '2024-01-01 10:00:00') as written
+            if us_to_iso(us) != timestamp:
+                self.raw_ts[row] = timestamp
+
+        self.type_codes.append(self.types.code(evt_type))
+        self.subtype_codes.append(self.subtypes.code(subtype))
+        self.content_ids.append(self.contents.code(content))
+        self.severity_codes.append(self.severities.code(severity))
+        if extras:
+            self.extras[row] = extras
+        return row
+
+    def append(self, event):
+        """Append an event dict in the legacy timeline format."""
+        extras = {k: v for k, v in event.items() if k not in self.FIELDS}
+        return self.add(event.get("timestamp"), event.get("type"), event.get("subtype"),
+                        event.get("content"), event.get("severity"), extras or None)
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    # ---- Row access ----
+
+    def timestamp(self, row):
+        raw = self.raw_ts.get(row)
+        return raw if raw is not None else us_to_iso(self.ts[row])
+
+    def record(self, row):
+        """Rebuild the event dict for one row."""
+        evt = {
+            "timestamp": self.timestamp(row),
+            "type": self.types.values[self.type_codes[row]],
+            "subtype": self.subtypes.values[self.subtype_codes[row]],
+            "content": self.contents.values[self.content_ids[row]],
+            "severity": self.severities.values[self.severity_codes[row]]
+        }
+        extras = self.extras.get(row)
+        if extras:
+            evt.update(extras)
+        return evt
+
+    def rows_equal(self, a, b):
+        """True if two rows would export to equal dicts."""
+        return (a == b or (
+            self.ts[a] == self.ts[b]
+            and self.raw_ts.get(a) == self.raw_ts.get(b)
+            and self.type_codes[a] == self.type_codes[b]
+            and self.subtype_codes[a] == self.subtype_codes[b]
+            and self.content_ids[a] == self.content_ids[b]
+            and self.severity_codes[a] == self.severity_codes[b]
+            and self.extras.get(a, {}) == self.extras.get(b, {})))
+
+    def metadata(self, row):
+        """Mutable metadata dict for a row (created on first use)."""
+        return self.extras.setdefault(row, {}).setdefault("metadata", {})
+
+    # ---- Column queries ----
+
+    def rows_of_type(self, evt_type):
+        """Row numbers with this exact type, in insertion order."""
+        code = self.types.codes.get(evt_type)
+        if code is None:
+            return []
+        if NUMPY_AVAILABLE:
+            return np.flatnonzero(np.frombuffer(self.type_codes, dtype=np.int32) == code).tolist()
+        return [row for row, c in enumerate(self.type_codes) if c == code]
+
+    def rows_with_type_prefix(self, prefix):
+        """Row numbers whose type starts with prefix, in insertion order."""
+        codes = [code for code, value in enumerate(self.types.values)
+                 if isinstance(value, str) and value.startswith(prefix)]
+        if NUMPY_AVAILABLE:
+            return np.flatnonzero(np.isin(np.frombuffer(self.type_codes, dtype=np.int32), codes)).tolist()
+        codes = set(codes)
+        return [row for row, c in enumerate(self.type_codes) if c in codes]
+
+    def _raw_position(self, ordered, raw):
+        """Number of rows in ordered (canonical rows in time order) whose ISO timestamp sorts before raw."""
+        lo, hi = 0, len(ordered)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if us_to_iso(self.ts[ordered[mid]]) < raw:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _order(self, rows=None):
+        """sort_order() as an int64 array (NumPy) or list."""
+        if rows is None:
+            rows = np.arange(len(self.ts), dtype=np.int64) if NUMPY_AVAILABLE else range(len(self.ts))
+
+        # Canonical rows order by the timestamp column (same as their ISO strings);
+        # only the few rows with a verbatim timestamp are compared as strings
+        if NUMPY_AVAILABLE:
+            idx = np.asarray(rows, dtype=np.int64)
+            if self.raw_ts:
+                is_raw = np.zeros(len(self.ts), dtype=bool)
+                is_raw[np.fromiter(self.raw_ts, dtype=np.int64, count=len(self.raw_ts))] = True
+                is_raw = is_raw[idx]
+                raw_rows, idx = idx[is_raw].tolist(), idx[~is_raw]
+            else:
+                raw_rows = []
+            ts = np.frombuffer(self.ts, dtype=np.int64)
+            ordered = idx[np.argsort(ts[idx], kind='stable')]
+        else:
+            raw_rows = [row for row in rows if row in self.raw_ts]
+            ordered = sorted((row for row in rows if row not in self.raw_ts), key=self.ts.__getitem__)
+
+        if not raw_rows:
+            return ordered
+
+        # A verbatim timestamp never equals a canonical one, so the insertion
+        # point is unambiguous; raw rows at one point keep their string order
+        raw_rows.sort(key=self.raw_ts.__getitem__)
+        positions = [self._raw_position(ordered, self.raw_ts[row]) for row in raw_rows]
+        if NUMPY_AVAILABLE:
+            return np.insert(ordered, positions, raw_rows)
+        for offset, (pos, row) in enumerate(zip(positions, raw_rows)):
+            ordered.insert(pos + offset, row)
+        return ordered
+
+    def sort_order(self, rows=None):
+        """
+        Stable time order of rows (all rows by default), matching a sort on the
+        ISO timestamp strings.
+        """
+        order = self._order(rows)
+        return order.tolist() if NUMPY_AVAILABLE else order
+
+    def sort(self):
+        """Reorder all columns into time order."""
+        order = self._order()
+        n = len(self.ts)
+        if NUMPY_AVAILABLE:
+            if n < 2 or bool((order[1:] > order[:-1]).all()):
+                return
+            for name, code, dtype in (("ts", 'q', np.int64), ("type_codes", 'i', np.int32),
+                                      ("subtype_codes", 'i', np.int32), ("severity_codes", 'i', np.int32),
+                                      ("content_ids", 'i', np.int32)):
+                column = array(code)
+                column.frombytes(np.take(np.frombuffer(getattr(self, name), dtype=dtype), order).tobytes())
+                setattr(self, name, column)
+            position = np.empty(n, dtype=np.int64)
+            position[order] = np.arange(n, dtype=np.int64)
+            position = position.tolist()
+        else:
+            if order == list(range(n)):
+                return
+            position = {old: new for new, old in enumerate(order)}
+            self.ts = array('q', (self.ts[row] for row in order))
+            self.type_codes = array('i', (self.type_codes[row] for row in order))
+            self.subtype_codes = array('i', (self.subtype_codes[row] for row in order))
+            self.severity_codes = array('i', (self.severity_codes[row] for row in order))
+            self.content_ids = array('i', (self.content_ids[row] for row in order))
+        self.raw_ts = {position[row]: value for row, value in self.raw_ts.items()}
+        self.extras = {position[row]: value for row, value in self.extras.items()}
+
+    # ---- Export ----
+
+    def write_records(self, output_file, fmt=None):
+        """Stream all rows through an ArtifactWriter (JSON output is identical to json.dump(..., indent=4))."""
+        with ArtifactWriter(output_file, fmt) as writer:
+            for row in range(len(self.ts)):
+                writer.write(self.record(row))
+        return writer.path
@@ -1,13 +1,12 @@
 
-import json
 from collections import Counter
 from datetime import datetime
 
+from artifact_io import load_artifact
+
 def analyze_timeline(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except FileNotFoundError:
+    data = load_artifact(file_path)
+    if data is None:
         print(f"File not found: {file_path}")
         return
 
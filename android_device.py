@@ -7,10 +7,15 @@ Wraps existing Android functionality into the unified device interface.
 
 import subprocess
 import os
+import sys
 from device_interface import DeviceInterface
 from scripts.android_logs import get_logcat, get_call_logs, get_sms_logs
 from scripts.detect_log_buffer import get_device_info as get_android_device_info
 
+# Same module name the scripts use, so everything shares one set of shell pools
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from adb_shell_pool import get_shell_pool
+
 
 class AndroidDevice(DeviceInterface):
     """Android device implementation."""
@@ -70,6 +75,14 @@ class AndroidDevice(DeviceInterface):
         except Exception as e:
             return {'error': str(e)}
     
+    def shell(self, command: str, timeout: float = 10):
+        """Run a shell command over a pooled persistent adb shell (milliseconds per query)."""
+        return get_shell_pool(self.device_id).run(command, timeout=timeout)
+    
+    def close(self) -> None:
+        """Close this device's persistent shells."""
+        get_shell_pool(self.device_id).close()
+    
     def extract_system_logs(self, output_path: str) -> bool:
         """Extract Android logcat."""
         try:
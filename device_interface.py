@@ -64,6 +64,24 @@ class DeviceInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    def shell(self, command: str, timeout: float = 10):
+        """
+        Run a shell command on the device.
+        
+        Args:
+            command: Shell command line
+            timeout: Seconds before subprocess.TimeoutExpired is raised
+        
+        Returns:
+            subprocess.CompletedProcess with stdout, stderr and returncode
+        """
+        pass
+    
+    def close(self) -> None:
+        """Release device connections (persistent shells etc.)."""
+        pass
+    
     def get_platform(self) -> str:
         """Get platform name (android)."""
         return self.__class__.__name__.replace('Device', '').lower()
@@ -2,147 +2,594 @@ import tkinter as tk  # <-- Added so we can reference tk.END, tk.* etc.
 import re
 from datetime import datetime, timedelta
 import os
+import io
+import heapq
+import multiprocessing
 from tkinter import messagebox
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 import threading
+from analysis.logcat_segments import LogcatSegmentStore, split_lines
+from analysis.logcat_parser import LogcatParser, TimestampDecoder, line_time, carry_times
+from analysis.search_index import LogSearchIndex, LOGCAT_SOURCE
+from config import COMPILED_LOG_PATTERNS
 
-def filter_logs(input_file, keyword=None, time_range=None, severity=None, subtype=None, output_file="logs/filtered_logs.txt"):
-    try:
-        # Check if the input file exists; if not, create an empty one to avoid errors.
-        if not os.path.exists(input_file):
-            with open(input_file, "w", encoding="utf-8") as f_temp:
-                f_temp.write("")
-        with open(input_file, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
-        now = datetime.now()
-        filtered_lines = []
-        
-        # PERFORMANCE: Pre-compile patterns once
-        severity_patterns = {
-            "Error": re.compile(r'E/|ERROR|Exception|FATAL', re.IGNORECASE),
-            "Warning": re.compile(r'W/|WARN|WARNING', re.IGNORECASE),
-            "Info": re.compile(r'I/|INFO', re.IGNORECASE),
-            "Debug": re.compile(r'D/|DEBUG', re.IGNORECASE),
-            "Verbose": re.compile(r'V/|VERBOSE', re.IGNORECASE)
-        }
-        
-        subtype_patterns = {
-            "Activity": re.compile(r'Activity|startActivity', re.IGNORECASE),
-            "Fragment": re.compile(r'Fragment', re.IGNORECASE),
-            "View": re.compile(r'View|Inflate', re.IGNORECASE),
-            "Lifecycle": re.compile(r'onCreate|onStart|onResume|onPause|onStop|onDestroy', re.IGNORECASE),
-            
-            "Boot": re.compile(r'boot|start up|startup|starting', re.IGNORECASE),
-            "Memory": re.compile(r'memory|heap|ram', re.IGNORECASE),
-            "CPU": re.compile(r'cpu|processor', re.IGNORECASE),
-            "Battery": re.compile(r'battery|power', re.IGNORECASE),
-            
-            "NullPointer": re.compile(r'NullPointerException', re.IGNORECASE),
-            "OutOfMemory": re.compile(r'OutOfMemoryError', re.IGNORECASE),
-            "IllegalState": re.compile(r'IllegalStateException', re.IGNORECASE),
-            "ANR": re.compile(r'ANR|Not Responding', re.IGNORECASE),
-            
-            "WiFi": re.compile(r'wifi|wlan', re.IGNORECASE),
-            "Mobile": re.compile(r'mobile|cellular|data connection', re.IGNORECASE),
-            "HTTP": re.compile(r'http|https|URL', re.IGNORECASE),
-            "Socket": re.compile(r'socket|tcp|udp', re.IGNORECASE),
-            
-            "Dalvik GC": re.compile(r'dalvikvm.*GC', re.IGNORECASE),
-            "ART GC": re.compile(r'art.*GC', re.IGNORECASE),
-            "Explicit GC": re.compile(r'Explicit GC', re.IGNORECASE),
-            "Concurrent GC": re.compile(r'Concurrent GC', re.IGNORECASE),
-            
-            "System": re.compile(r'android\.intent\.action|system broadcast', re.IGNORECASE),
-            "App": re.compile(r'com\.', re.IGNORECASE),
-            "Sticky": re.compile(r'sticky|registerReceiver', re.IGNORECASE),
-            "Ordered": re.compile(r'ordered broadcast', re.IGNORECASE),
-            
-            "Start": re.compile(r'startService', re.IGNORECASE),
-            "Stop": re.compile(r'stopService', re.IGNORECASE),
-            "Bind": re.compile(r'bindService|onBind', re.IGNORECASE),
-            "Unbind": re.compile(r'unbindService|onUnbind', re.IGNORECASE),
-            
-            "Power": re.compile(r'power|PowerManager|wake|sleep', re.IGNORECASE),
-            "Sensor": re.compile(r'sensor|Sensor', re.IGNORECASE),
-            "Camera": re.compile(r'camera|Camera', re.IGNORECASE),
-            "Location": re.compile(r'location|LocationManager|GPS', re.IGNORECASE)
-        }
-        
+TIME_RANGE_WINDOWS = {
+    "Past 1 Hour": timedelta(hours=1),
+    "Past 24 Hours": timedelta(hours=24),
+    "Past 7 Days": timedelta(days=7)
+}
+
+# Logcat priority letters per severity choice (parsed priority field, as in the search index)
+SEVERITY_PRIORITIES = {
+    "Error": ["E", "F", "A"],
+    "Warning": ["W"],
+    "Info": ["I"],
+    "Debug": ["D"],
+    "Verbose": ["V"]
+}
+
+# Severity of call/SMS lines, which have no priority field
+SEVERITY_PATTERNS = {
+    "Error": re.compile(r'E/|ERROR|Exception|FATAL', re.IGNORECASE),
+    "Warning": re.compile(r'W/|WARN|WARNING', re.IGNORECASE),
+    "Info": re.compile(r'I/|INFO', re.IGNORECASE),
+    "Debug": re.compile(r'D/|DEBUG', re.IGNORECASE),
+    "Verbose": re.compile(r'V/|VERBOSE', re.IGNORECASE)
+}
+
+SUBTYPE_PATTERNS = {
+    "Activity": re.compile(r'Activity|startActivity', re.IGNORECASE),
+    "Fragment": re.compile(r'Fragment', re.IGNORECASE),
+    "View": re.compile(r'View|Inflate', re.IGNORECASE),
+    "Lifecycle": re.compile(r'onCreate|onStart|onResume|onPause|onStop|onDestroy', re.IGNORECASE),
+
+    "Boot": re.compile(r'boot|start up|startup|starting', re.IGNORECASE),
+    "Memory": re.compile(r'memory|heap|ram', re.IGNORECASE),
+    "CPU": re.compile(r'cpu|processor', re.IGNORECASE),
+    "Battery": re.compile(r'battery|power', re.IGNORECASE),
+
+    "NullPointer": re.compile(r'NullPointerException', re.IGNORECASE),
+    "OutOfMemory": re.compile(r'OutOfMemoryError', re.IGNORECASE),
+    "IllegalState": re.compile(r'IllegalStateException', re.IGNORECASE),
+    "ANR": re.compile(r'ANR|Not Responding', re.IGNORECASE),
+
+    "WiFi": re.compile(r'wifi|wlan', re.IGNORECASE),
+    "Mobile": re.compile(r'mobile|cellular|data connection', re.IGNORECASE),
+    "HTTP": re.compile(r'http|https|URL', re.IGNORECASE),
+    "Socket": re.compile(r'socket|tcp|udp', re.IGNORECASE),
+
+    "Dalvik GC": re.compile(r'dalvikvm.*GC', re.IGNORECASE),
+    "ART GC": re.compile(r'art.*GC', re.IGNORECASE),
+    "Explicit GC": re.compile(r'Explicit GC', re.IGNORECASE),
+    "Concurrent GC": re.compile(r'Concurrent GC', re.IGNORECASE),
+
+    "System": re.compile(r'android\.intent\.action|system broadcast', re.IGNORECASE),
+    "App": re.compile(r'com\.', re.IGNORECASE),
+    "Sticky": re.compile(r'sticky|registerReceiver', re.IGNORECASE),
+    "Ordered": re.compile(r'ordered broadcast', re.IGNORECASE),
+
+    "Start": re.compile(r'startService', re.IGNORECASE),
+    "Stop": re.compile(r'stopService', re.IGNORECASE),
+    "Bind": re.compile(r'bindService|onBind', re.IGNORECASE),
+    "Unbind": re.compile(r'unbindService|onUnbind', re.IGNORECASE),
+
+    "Power": re.compile(r'power|PowerManager|wake|sleep', re.IGNORECASE),
+    "Sensor": re.compile(r'sensor|Sensor', re.IGNORECASE),
+    "Camera": re.compile(r'camera|Camera', re.IGNORECASE),
+    "Location": re.compile(r'location|LocationManager|GPS', re.IGNORECASE)
+}
+
+LOGCAT_PREFIX_RE = re.compile(rb'^(\d\d-\d\d \d\d:\d\d:\d\d\.\d{3})')
+
+STREAM_BATCH = 500      # matches per on_match call
+CANCEL_CHECK = 4096     # lines read between cancel checks
+SEEK_PROBES = 16        # evenly spaced samples that must be in time order before bisecting
+SEEK_WINDOW = 64 * 1024 # bisection stops at this many bytes; the time stage does the rest
+SHARD_BYTES = 16 * 1024 * 1024  # byte range per process-pool task
+DEBOUNCE_SECONDS = 0.3  # a filter job starts this long after the last change
+
+def segment_lines(input_file, start, decoder):
+    """
+    Logcat lines from the segmented store, or None when there is no current
+    store for input_file. With a start time only lines in range come back:
+    segments with nothing at or after start are not decompressed, and each
+    other one is filtered with the time it carries in (see in_time_range).
+    """
+    if os.path.basename(input_file) != LOGCAT_SOURCE:
+        return None
+    store = LogcatSegmentStore(os.path.dirname(input_file) or ".")
+    if not store.up_to_date():
+        return None
+
+    def lines():
+        for segment in store.segments(start=start):
+            text = split_lines(store.read_segment(segment))
+            if start is None:
+                yield from text
+            else:
+                yield from in_time_range(text, start, decoder, last=segment["carry_epoch"])
+    return lines()
+
+def index_lines(input_file, keyword=None, start=None, severity=None, category=None):
+    """
+    Lines matching keyword, time range, category and (for logcat) severity,
+    answered from the search index. None means the index doesn't cover
+    input_file as it is now and the caller must scan it.
+    """
+    name = os.path.basename(input_file)
+    index = LogSearchIndex(os.path.dirname(input_file) or ".")
+    if name not in index.current_sources():
+        index.close()
+        return None
+    rows = index.iter_search(
+        [name],
+        keyword=keyword if keyword and keyword.strip() else None,
+        start=start,
+        priorities=SEVERITY_PRIORITIES.get(severity) if name == LOGCAT_SOURCE else None,
+        category=category
+    )
+
+    def lines():
+        try:
+            for row in rows:
+                yield row[4] + "\n"
+        finally:
+            index.close()
+    return lines()
+
+def sorted_start_offset(input_file, start, decoder):
+    """
+    (byte offset, ordered) for reading a logcat from start on. The offset is
+    found by bisection when the file is in time order, sampled at SEEK_PROBES
+    points; otherwise it is 0 and the file is scanned whole.
+    """
+    with open(input_file, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+
+        def first_time_after(offset):
+            f.seek(offset)
+            if offset:
+                f.readline()  # finish the line offset points into
+            for line in f:
+                match = LOGCAT_PREFIX_RE.match(line)
+                if match:
+                    epoch = decoder.epoch(match.group(1).decode("ascii"))
+                    if epoch is not None:
+                        return epoch
+            return None
+
+        samples = [first_time_after(size * i // SEEK_PROBES) for i in range(SEEK_PROBES)]
+        samples = [epoch for epoch in samples if epoch is not None]
+        if not samples or samples != sorted(samples):
+            return 0, False
+
+        lo, hi = 0, size
+        while hi - lo > SEEK_WINDOW:
+            mid = (lo + hi) // 2
+            epoch = first_time_after(mid)
+            if epoch is not None and epoch < start:
+                lo = mid
+            else:
+                hi = mid
+        if lo:
+            f.seek(lo)
+            f.readline()
+            lo = f.tell()
+        return lo, True
+
+def time_before(input_file, offset, decoder):
+    """Time of the closest timed line before byte offset (the start of a line), or None."""
+    with open(input_file, "rb") as f:
+        end, tail = offset, b""
+        while end > 0:
+            begin = max(0, end - SEEK_WINDOW)
+            f.seek(begin)
+            lines = (f.read(end - begin) + tail).split(b"\n")
+            # The first piece may be cut at begin; it is completed by the next block
+            tail = lines.pop(0) if begin else b""
+            for line in reversed(lines):
+                epoch = line_time(line.decode("utf-8", errors="replace"), decoder)
+                if epoch is not None:
+                    return epoch
+            end = begin
+    return None
+
+def file_lines(input_file, offset=0, end=None):
+    """Text lines of input_file from a byte offset (the start of a line) up to end."""
+    with open(input_file, "rb") as raw:
+        raw.seek(offset)
+        if end is not None:
+            raw = io.BytesIO(raw.read(end - offset))
+        with io.TextIOWrapper(raw, encoding="utf-8", errors="replace") as f:
+            yield from f
+
+def cancellable(lines, cancel):
+    """Stops the pipeline once cancel (a threading.Event) is set."""
+    for i, line in enumerate(lines):
+        if not i % CANCEL_CHECK and cancel.is_set():
+            return
+        yield line
+
+def in_time_range(lines, start, decoder, ordered=False, last=None):
+    """
+    Lines at or after start. A line without a time has the time of the closest
+    timed line before it (last is the one carried in from before lines; without
+    it, lines ahead of the first timed line get that line's time) and passes
+    when there is none. The search index and the segment store date lines the
+    same way (logcat_parser.carry_times). In ordered input everything after the
+    first line in range passes.
+    """
+    lines = iter(lines)
+    for epoch, line in carry_times(lines, decoder, last):
+        if epoch is None or epoch >= start:
+            yield line
+            if ordered and epoch is not None:
+                yield from lines
+                return
+
+def matching(lines, pattern):
+    return (line for line in lines if pattern.search(line))
+
+def containing(lines, keyword):
+    """Case-insensitive substring stage (str.lower + in is several times faster than a re.IGNORECASE search)."""
+    needle = keyword.lower()
+    return (line for line in lines if needle in line.lower())
+
+def with_priority(lines, priorities):
+    """Logcat lines whose parsed priority letter is one of priorities (banners and continuations have none)."""
+    parser = LogcatParser()
+    wanted = set(priorities)
+    for line in lines:
+        record = parser.parse(line)
+        if record is not None and record.priority in wanted:
+            yield line
+
+def filter_stages(lines, input_file, keyword=None, start=None, severity=None, subtype=None, category=None,
+                  decoder=None, indexed=False, ordered=False, last=None):
+    """Chain the filter stages onto a line iterator; checks the search index already applied are skipped."""
+    if not indexed:
+        if start is not None:
+            lines = in_time_range(lines, start, decoder, ordered, last)
+        if keyword and keyword.strip():
+            lines = containing(lines, keyword)
+        if category in COMPILED_LOG_PATTERNS:
+            lines = matching(lines, COMPILED_LOG_PATTERNS[category])
+    # Logcat severity is the priority field on every path; the index has already checked it
+    if os.path.basename(input_file) == LOGCAT_SOURCE:
+        if severity in SEVERITY_PRIORITIES and not indexed:
+            lines = with_priority(lines, SEVERITY_PRIORITIES[severity])
+    elif severity in SEVERITY_PATTERNS:
+        lines = matching(lines, SEVERITY_PATTERNS[severity])
+    if subtype in SUBTYPE_PATTERNS:
+        lines = matching(lines, SUBTYPE_PATTERNS[subtype])
+    return lines
+
+def write_matches(lines, output_file, on_match=None, cancel=None):
+    """Sink of the pipeline: write the lines to output_file, hand them to on_match in batches, return the count."""
+    # Ensure the output directory exists
+    output_dir = os.path.dirname(output_file)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+
+    count = 0
+    batch = []
+    with open(output_file, "w", encoding="utf-8") as f:
         for line in lines:
-            include = True
-            
-            # Apply time filter
-            if time_range and time_range != "All Time":
-                date_match = re.search(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', line)
-                unix_match = re.search(r'date=(\d+)', line)
-                logcat_match = re.search(r'(\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                
-                has_timestamp = False
-                if date_match:
-                    try:
-                        ts = datetime.strptime(date_match.group(), "%Y-%m-%d %H:%M:%S")
-                        has_timestamp = True
-                    except:
-                        pass
-                elif unix_match:
-                    try:
-                        ts = datetime.fromtimestamp(int(unix_match.group(1)) / 1000)
-                        has_timestamp = True
-                    except:
-                        pass
-                elif logcat_match:
-                    try:
-                        today = datetime.now()
-                        date_str = f"{today.year}-{logcat_match.group(1)}"
-                        ts = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                        if ts > today:
-                            ts = ts.replace(year=today.year - 1)
-                        has_timestamp = True
-                    except:
-                        pass
-                
-                if has_timestamp:
-                    if time_range == "Past 1 Hour" and (now - ts) > timedelta(hours=1):
-                        include = False
-                    elif time_range == "Past 24 Hours" and (now - ts) > timedelta(hours=24):
-                        include = False
-                    elif time_range == "Past 7 Days" and (now - ts) > timedelta(days=7):
-                        include = False
-            
-            # Apply keyword filter
-            if include and keyword and keyword.strip():
-                if keyword.lower() not in line.lower():
-                    include = False
-            
-            # Apply severity filter (using compiled patterns)
-            if include and severity and severity != "All":
-                pattern = severity_patterns.get(severity)
-                if pattern and not pattern.search(line):
-                    include = False
-            
-            # Apply subtype filter (using compiled patterns)
-            if include and subtype and subtype != "All":
-                pattern = subtype_patterns.get(subtype)
-                if pattern and not pattern.search(line):
-                    include = False
-            
-            if include:
-                filtered_lines.append(line)
-        
-        # Ensure the output directory exists
-        output_dir = os.path.dirname(output_file)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir, exist_ok=True)
-        
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.writelines(filtered_lines)
-        
-        return len(filtered_lines)
+            f.write(line)
+            count += 1
+            if on_match is not None:
+                batch.append(line)
+                if len(batch) >= STREAM_BATCH:
+                    if cancel is not None and cancel.is_set():
+                        break
+                    on_match(batch)
+                    batch = []
+    if batch and not (cancel is not None and cancel.is_set()):
+        on_match(batch)
+    return count
+
+def time_range_start(time_range):
+    """Epoch seconds a "Past ..." choice starts at, or None for all time."""
+    window = TIME_RANGE_WINDOWS.get(time_range)
+    return (datetime.now() - window).timestamp() if window else None
+
+def filter_logs(input_file, keyword=None, time_range=None, severity=None, subtype=None, category=None,
+                output_file="logs/filtered_logs.txt", on_match=None, cancel=None):
+    """
+    Write the lines of input_file that match every criterion to output_file
+    and return how many there are.
+
+    The lines flow through generator stages (source, time, keyword, severity,
+    category, sub-type) straight into output_file; nothing holds the whole
+    log. The source is the search index when it is current for input_file,
+    else the file itself when it is a time-ordered logcat (bisected to the
+    start of the time range) or when there is no time range, else the logcat
+    segments inside the time range. Checks the index already applied are
+    skipped. All sources date untimed lines the same way (see in_time_range).
+
+    on_match(lines) receives the matches in batches of STREAM_BATCH as they
+    are found. Once cancel (a threading.Event) is set, reading stops and
+    on_match is not called again; output_file then holds the matches so far.
+    """
+    try:
+        decoder = TimestampDecoder(rollover=True)
+        start = time_range_start(time_range)
+        lines = index_lines(input_file, keyword, start, severity, category)
+        indexed = lines is not None
+        ordered = False
+        last = None
+        if lines is None:
+            exists = os.path.exists(input_file)
+            offset = 0
+            if start is not None and exists and os.path.basename(input_file) == LOGCAT_SOURCE:
+                offset, ordered = sorted_start_offset(input_file, start, decoder)
+            if not ordered and (start is not None or not exists):
+                # Unordered (or dropped) raw logcat: the segment store skips what's out of range
+                lines = segment_lines(input_file, start, decoder)
+                if lines is not None:
+                    start = None  # already applied segment by segment
+        if lines is None:
+            # Check if the input file exists; if not, create an empty one to avoid errors.
+            if not os.path.exists(input_file):
+                with open(input_file, "w", encoding="utf-8") as f_temp:
+                    f_temp.write("")
+            if offset:
+                last = time_before(input_file, offset, decoder)
+            lines = file_lines(input_file, offset)
+
+        if cancel is not None:
+            lines = cancellable(lines, cancel)
+        lines = filter_stages(lines, input_file, keyword, start, severity, subtype, category,
+                              decoder, indexed, ordered, last)
+        return write_matches(lines, output_file, on_match, cancel)
     
     except Exception as e:
         print(f"Error filtering logs: {e}")
         raise
 
+def stream_to_widget(filter_output_widget, cancel=None):
+    """
+    on_match callback for filter_logs: appends numbered lines to the output
+    widget from the Tk event loop (the filter itself runs in a worker thread).
+    """
+    shown = 0
+
+    def on_match(lines):
+        nonlocal shown
+        text = "".join(f"{shown + i + 1}: {line}" for i, line in enumerate(lines))
+        shown += len(lines)
+
+        def insert():
+            if cancel is None or not cancel.is_set():
+                filter_output_widget.insert(tk.END, text)
+        filter_output_widget.after(0, insert)
+
+    filter_output_widget.after(0, lambda: filter_output_widget.delete(1.0, tk.END))
+    return on_match
+
+def show_filter_summary(filter_output_widget, count, cancel=None):
+    """Closing line of a streamed filter run (nothing if it was cancelled)."""
+    def insert():
+        if cancel is not None and cancel.is_set():
+            return
+        if not count:
+            filter_output_widget.insert(tk.END, "No logs match the selected filters.\n")
+        else:
+            filter_output_widget.insert(tk.END, f"\n\n✅ Found {count} matching log entries.\n")
+    filter_output_widget.after(0, insert)
+
+def shard_ranges(input_file, offset, size, shard_bytes=SHARD_BYTES):
+    """Newline-aligned (start, end) byte ranges of about shard_bytes covering offset..size."""
+    bounds = [offset]
+    with open(input_file, "rb") as f:
+        target = offset + shard_bytes
+        while target < size:
+            f.seek(target - 1)
+            f.readline()  # to the byte after the next newline
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+            target = pos + shard_bytes
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def filter_shard(input_file, start_byte, end_byte, keyword=None, start=None, severity=None, subtype=None,
+                 category=None, ordered=False):
+    """Process-pool task: the matching lines of one byte range of input_file."""
+    decoder = TimestampDecoder(rollover=True)
+    lines = file_lines(input_file, start_byte, end_byte)
+    last = time_before(input_file, start_byte, decoder) if start is not None and start_byte else None
+    return list(filter_stages(lines, input_file, keyword, start, severity, subtype, category,
+                              decoder, ordered=ordered, last=last))
+
+def timed_lines(lines, decoder):
+    """(epoch, line) pairs; lines without a time take the time of the line before them."""
+    for epoch, line in carry_times(lines, decoder, float("-inf")):
+        yield epoch, line if line.endswith("\n") else line + "\n"
+
+def time_ordered(path, decoder):
+    """(epoch, line) pairs of a match file in time order; sorted in memory only if the file isn't already."""
+    last = float("-inf")
+    for epoch, _ in timed_lines(file_lines(path), decoder):
+        if epoch < last:
+            return iter(sorted(timed_lines(file_lines(path), decoder), key=lambda item: item[0]))
+        last = epoch
+    return timed_lines(file_lines(path), decoder)
+
+class FilterExecutor:
+    """
+    Runs the GUI's filter jobs off the Tk thread, one at a time.
+
+    submit() is debounced: the job starts DEBOUNCE_SECONDS after the last
+    submit, and every submit cancels the job in flight (its cancel event is
+    set, the pipeline stops at its next check and its results are dropped).
+    Several input files ("All") are filtered on their own threads and the
+    matches merged in timestamp order. A raw file the search index doesn't
+    cover is split into SHARD_BYTES ranges filtered in a process pool when
+    there is more than one CPU.
+
+    Usage:
+        executor = FilterExecutor()
+        executor.submit(["logs/android_logcat.txt"], {"keyword": "wifi", "time_range": "Past 1 Hour"},
+                        on_start=lambda cancel: stream_to_widget(widget, cancel),
+                        on_done=lambda count: show_filter_summary(widget, count))
+    """
+
+    def __init__(self, debounce=DEBOUNCE_SECONDS, max_workers=None):
+        self.debounce = debounce
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._timer = None
+        self._cancel = None
+        # One job at a time: a new job queues behind the cancelled one, which stops within CANCEL_CHECK lines
+        self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="filter-job")
+        self._scans = ThreadPoolExecutor(max_workers=4, thread_name_prefix="filter-scan")
+        self._processes = None
+
+    def submit(self, input_files, criteria, output_file="logs/filtered_logs.txt", on_start=None, on_done=None):
+        """
+        Schedule a filter job and return its cancel event.
+
+        criteria: filter_logs keyword arguments (keyword, time_range, severity, subtype, category)
+        on_start(cancel): called when the job starts; may return an on_match callback
+        on_done(count): called when the job finished without being cancelled
+        """
+        with self._lock:
+            self._cancel_current()
+            cancel = threading.Event()
+            self._cancel = cancel
+            self._timer = threading.Timer(self.debounce, self._jobs.submit,
+                                          (self._run, list(input_files), dict(criteria), output_file,
+                                           cancel, on_start, on_done))
+            self._timer.daemon = True
+            self._timer.start()
+        return cancel
+
+    def cancel(self):
+        with self._lock:
+            self._cancel_current()
+
+    def shutdown(self):
+        self.cancel()
+        self._jobs.shutdown(wait=False)
+        self._scans.shutdown(wait=False)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    def _cancel_current(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def _run(self, input_files, criteria, output_file, cancel, on_start, on_done):
+        if cancel.is_set():
+            return
+        try:
+            on_match = on_start(cancel) if on_start else None
+            if len(input_files) == 1:
+                count = self.filter_file(input_files[0], criteria, output_file, on_match, cancel)
+            else:
+                count = self.filter_merged(input_files, criteria, output_file, on_match, cancel)
+        except Exception as e:
+            print(f"Error filtering logs: {e}")
+            return
+        if not cancel.is_set() and on_done:
+            on_done(count)
+
+    def filter_file(self, input_file, criteria, output_file, on_match=None, cancel=None):
+        """filter_logs, sharded across the process pool when the file is large enough."""
+        if self._shardable(input_file, criteria):
+            try:
+                return self._filter_sharded(input_file, criteria, output_file, on_match, cancel)
+            except BrokenProcessPool:
+                self._processes = None
+                print("⚠️ Filter worker pool broke, filtering in one process")
+        return filter_logs(input_file, output_file=output_file, on_match=on_match, cancel=cancel, **criteria)
+
+    def filter_merged(self, input_files, criteria, output_file, on_match=None, cancel=None):
+        """Filter each file on its own thread, then merge the matches in timestamp order."""
+        parts = [f"{output_file}.{i}.part" for i in range(len(input_files))]
+        try:
+            futures = [self._scans.submit(self.filter_file, input_file, criteria, part, None, cancel)
+                       for input_file, part in zip(input_files, parts)]
+            for future in futures:
+                future.result()
+            if cancel is not None and cancel.is_set():
+                return 0
+            decoder = TimestampDecoder(rollover=True)
+            merged = heapq.merge(*(time_ordered(part, decoder) for part in parts), key=lambda item: item[0])
+            lines = (line for _, line in merged)
+            if cancel is not None:
+                lines = cancellable(lines, cancel)
+            return write_matches(lines, output_file, on_match, cancel)
+        finally:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+
+    def _shardable(self, input_file, criteria):
+        if self.max_workers < 2:
+            return False
+        if not os.path.exists(input_file) or os.path.getsize(input_file) < 2 * SHARD_BYTES:
+            return False
+        index = LogSearchIndex(os.path.dirname(input_file) or ".")
+        try:
+            return os.path.basename(input_file) not in index.current_sources()
+        finally:
+            index.close()
+
+    def _process_pool(self):
+        if self._processes is None:
+            # spawn on every platform: forking the multi-threaded Tk process is unsafe, and
+            # main.py only builds the GUI under __main__, so workers can re-import it
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        return self._processes
+
+    def _filter_sharded(self, input_file, criteria, output_file, on_match, cancel):
+        start = time_range_start(criteria.get("time_range"))
+        offset, ordered = 0, False
+        if start is not None and os.path.basename(input_file) == LOGCAT_SOURCE:
+            offset, ordered = sorted_start_offset(input_file, start, TimestampDecoder(rollover=True))
+        ranges = shard_ranges(input_file, offset, os.path.getsize(input_file))
+        if len(ranges) < 2:
+            return filter_logs(input_file, output_file=output_file, on_match=on_match, cancel=cancel, **criteria)
+
+        pool = self._process_pool()
+        shard_criteria = {key: criteria.get(key) for key in ("keyword", "severity", "subtype", "category")}
+        pending = iter(ranges)
+        in_flight = []
+
+        def top_up():
+            # At most two shards per worker wait to be written, which bounds memory
+            while len(in_flight) < 2 * self.max_workers:
+                shard = next(pending, None)
+                if shard is None:
+                    return
+                in_flight.append(pool.submit(filter_shard, input_file, *shard, start=start, ordered=ordered,
+                                             **shard_criteria))
+
+        def shard_lines():
+            top_up()
+            while in_flight:
+                future = in_flight[0]
+                while not future.done():
+                    if cancel is not None and cancel.is_set():
+                        return
+                    wait([future], timeout=0.2)
+                in_flight.pop(0)
+                top_up()
+                yield from future.result()
+
+        try:
+            return write_matches(shard_lines(), output_file, on_match, cancel)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
 def load_filtered_logs(filter_output_widget):
     try:
         # We reference tk here
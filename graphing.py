@@ -7,6 +7,7 @@ import os
 import pandas as pd
 from fpdf import FPDF  # Correct import for FPDF
 from tkinter import messagebox
+from analysis.logcat_parser import TimestampDecoder
 
 def get_timestamps_from_file(filepath):
     try:
@@ -17,6 +18,8 @@ def get_timestamps_from_file(filepath):
     
     timestamps = []
     all_lines = []
+    # Logcat times carry no year: current year, future times belong to last year
+    logcat_decoder = TimestampDecoder(rollover=True)
     for line in lines:
         # Try standard datetime format
         date_match = re.search(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', line)
@@ -40,16 +43,10 @@ def get_timestamps_from_file(filepath):
         # Try logcat timestamp format
         logcat_match = re.search(r'(\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
         if logcat_match:
-            try:
-                today = datetime.now()
-                date_str = f"{today.year}-{logcat_match.group(1)}"
-                ts = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                if ts > today:
-                    ts = ts.replace(year=today.year - 1)
+            ts = logcat_decoder.datetime(logcat_match.group(1))
+            if ts is not None:
                 timestamps.append(ts)
                 all_lines.append(line)
-            except Exception:
-                pass
     return all_lines, timestamps
 
 def apply_time_filter(timestamps, lines, time_range):
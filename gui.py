@@ -154,7 +154,7 @@ def create_filter_controls(tab_filter):
     
     tk.Label(frame, text="Log Type", bg=BG_COLOR, fg=FG_COLOR, font=FONT).grid(row=0, column=0, padx=5, pady=5)
     from config import LOG_TYPES
-    filter_types = ["Logcat", "Calls", "SMS"] + list(LOG_TYPES.keys())
+    filter_types = ["Logcat", "Calls", "SMS", "All"] + list(LOG_TYPES.keys())
     logtype_combo = ttk.Combobox(frame, values=filter_types, width=15)
     logtype_combo.set("Logcat")
     logtype_combo.grid(row=0, column=1, padx=5, pady=5)
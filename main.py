@@ -13,21 +13,13 @@ from gui import (create_main_window, setup_style, create_tabs, create_widgets,
                  create_filter_controls, create_filter_output, create_export_frame, create_menu)
 from log_monitor import start_monitoring, stop_monitoring
 from graphing import plot_graph, plot_frequent_callers, export_chart, export_graph_data
-from filtering import filter_logs, load_filtered_logs, save_filtered_logs
+from filtering import FilterExecutor, save_filtered_logs, stream_to_widget, show_filter_summary
 from reporting import export_full_report
 from scripts.android_logs import get_logcat, get_call_logs, get_sms_logs, get_location_logs, get_contacts
 
 # Initialize log queue
 log_queue = queue.Queue()
 
-# Create main window and set style
-root = create_main_window()
-setup_style(root)
-
-# Create main tabs and widgets
-tabs, tab_control = create_tabs(root)
-widgets = create_widgets(tabs)
-
 # -------------------------------------------------------------------
 # Dictionary to store references to Analysis Notebook text widgets
 # -------------------------------------------------------------------
@@ -163,12 +155,14 @@ def extract_logs():
     
     widgets["output_text"].see(tk.END)
     
-    # Remove try/except so errors cause a crash (as requested)
-    buffer_result = get_logcat()
-    get_call_logs()
-    get_sms_logs()
-    get_location_logs()
-    get_contacts()  # Extract contact names
+    # Core and enhanced extraction run concurrently over adb (logcat first)
+    from scripts.adb_scheduler import AdbScheduler, PRIORITY_LOGCAT, PRIORITY_QUERY, PRIORITY_DUMPSYS
+    scheduler = AdbScheduler()
+    scheduler.add("logcat", run=get_logcat, priority=PRIORITY_LOGCAT)
+    scheduler.add("call logs", run=get_call_logs, priority=PRIORITY_QUERY)
+    scheduler.add("sms logs", run=get_sms_logs, priority=PRIORITY_QUERY)
+    scheduler.add("location logs", run=get_location_logs, priority=PRIORITY_DUMPSYS)
+    scheduler.add("contacts", run=get_contacts, priority=PRIORITY_QUERY)  # Extract contact names
     
     # Enhanced forensic data extraction
     widgets["output_text"].insert(tk.END, "\n🔬 Enhanced Forensic Data Collection...\n")
@@ -180,23 +174,27 @@ def extract_logs():
             get_notification_history, get_device_identifiers, get_dual_space_apps
         )
         
-        get_usage_stats()
-        get_recent_tasks()
-        get_wifi_networks()
-        get_bluetooth_devices()
-        get_battery_history()
-        get_network_stats()
-        
-        # 🆕 Android 13/14 Advanced Forensics
-        widgets["output_text"].insert(tk.END, "\n🆕 Android 13/14 Advanced Forensics...\n")
-        widgets["output_text"].see(tk.END)
-        get_notification_history()
-        get_device_identifiers()
-        get_dual_space_apps()
-        
-        widgets["output_text"].insert(tk.END, "✅ Enhanced data collection complete\n")
+        for name, func in [("usage stats", get_usage_stats), ("recent tasks", get_recent_tasks),
+                           ("wifi networks", get_wifi_networks), ("bluetooth", get_bluetooth_devices),
+                           ("battery history", get_battery_history), ("network stats", get_network_stats),
+                           # 🆕 Android 13/14 Advanced Forensics
+                           ("notification history", get_notification_history)]:
+            scheduler.add(name, run=func, priority=PRIORITY_DUMPSYS)
+        scheduler.add("device identifiers", run=get_device_identifiers, priority=PRIORITY_QUERY)
+        scheduler.add("dual space apps", run=get_dual_space_apps, priority=PRIORITY_QUERY)
     except Exception as e:
         widgets["output_text"].insert(tk.END, f"⚠️ Enhanced extraction error: {str(e)}\n")
+    
+    results = scheduler.run()
+    # Keep the old behaviour: a core extraction error stops the run
+    for name in ("logcat", "call logs", "sms logs", "location logs", "contacts"):
+        if results[name]["status"] != "success":
+            raise RuntimeError(f"{name} extraction failed: {results[name].get('error')}")
+    failed = [name for name, r in results.items() if r["status"] != "success"]
+    if failed:
+        widgets["output_text"].insert(tk.END, f"⚠️ Enhanced extraction errors: {', '.join(failed)}\n")
+    widgets["output_text"].insert(tk.END,
+        f"✅ Data collection complete ({len(results)} artifacts in {scheduler.total_seconds:.1f}s)\n")
     widgets["output_text"].see(tk.END)
     
     # Run all analyzers
@@ -346,27 +344,6 @@ def extract_logs_threaded():
     thread = threading.Thread(target=extract_logs, daemon=True)
     thread.start()
 
-extract_button = tk.Button(tabs["Extract"], text="Extract Logs", bg="gray", fg="black", command=extract_logs_threaded)
-extract_button.pack(pady=5)
-
-# -------------------------------------------------------------------
-# Create live monitoring buttons and assign commands
-# -------------------------------------------------------------------
-start_btn, stop_btn = create_live_monitoring_buttons(tabs["Live"])
-# This part is already well-designed with a queue, so no changes are needed here.
-start_btn.configure(command=lambda: start_monitoring(lambda log: log_queue.put(('update', log)), log_queue))
-stop_btn.configure(command=lambda: stop_monitoring(lambda log: log_queue.put(('update', log))))
-
-# -------------------------------------------------------------------
-# Create graph controls and set up matplotlib figure and canvas
-# -------------------------------------------------------------------
-graph_controls = create_graph_controls(tabs["Graphs"])
-graph_controls["logtype_combo"]["values"] = ["Call Logs", "SMS Logs", "Logcat Activity"]
-graph_controls["logtype_combo"].set("Call Logs")
-graph_fig, graph_ax = plt.subplots(figsize=(7, 4))
-graph_canvas = FigureCanvasTkAgg(graph_fig, master=tabs["Graphs"])
-graph_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=10)
-
 # --- THREADED FUNCTION WRAPPERS for plotting ---
 def plot_graph_threaded():
     """Runs plot_graph in a thread to prevent freezing."""
@@ -382,14 +359,6 @@ def plot_frequent_callers_threaded():
     thread = threading.Thread(target=plot_frequent_callers, args=(graph_ax, graph_canvas, time_range), daemon=True)
     thread.start()
 
-graph_controls["graph_btn"].configure(command=plot_graph_threaded)
-graph_controls["freq_btn"].configure(command=plot_frequent_callers_threaded)
-
-# -------------------------------------------------------------------
-# Create export frame and assign export commands
-# -------------------------------------------------------------------
-export_controls = create_export_frame(root)
-
 # --- THREADED FUNCTION WRAPPERS for exporting ---
 def export_full_report_threaded():
     """Runs export_full_report in a thread."""
@@ -408,73 +377,34 @@ def export_graph_data_threaded():
     thread = threading.Thread(target=export_graph_data, args=(graph_ax, time_range, log_type), daemon=True)
     thread.start()
 
-export_controls["full"].configure(command=export_full_report_threaded)
-export_controls["png"].configure(command=lambda: export_chart_threaded("png"))
-export_controls["pdf"].configure(command=lambda: export_chart_threaded("pdf"))
-export_controls["csv"].configure(command=export_graph_data_threaded)
+# Log files behind each Filter tab log type
+FILTER_INPUTS = {
+    "Logcat": ["logs/android_logcat.txt"],
+    "Calls": ["logs/call_logs.txt"],
+    "SMS": ["logs/sms_logs.txt"],
+    "All": ["logs/android_logcat.txt", "logs/call_logs.txt", "logs/sms_logs.txt"]
+}
 
-# -------------------------------------------------------------------
-# Create filter controls and output widget; assign filter button commands
-# -------------------------------------------------------------------
-filter_controls = create_filter_controls(tabs["Filter"])
-filter_output_widget = create_filter_output(tabs["Filter"])
-def apply_filter():
+def apply_filter(event=None):
     chosen_logtype = filter_controls["logtype"].get()
-    chosen_time_range = filter_controls["time"].get()
-    chosen_severity = filter_controls["severity"].get()
-    chosen_subtype = filter_controls["subtype"].get()
-    chosen_keyword = filter_controls["keyword"].get()
-
-    if chosen_logtype == "Logcat":
-        input_file = "logs/android_logcat.txt"
-    elif chosen_logtype == "Calls":
-        input_file = "logs/call_logs.txt"
-    elif chosen_logtype == "SMS":
-        input_file = "logs/sms_logs.txt"
-    else:
-        input_file = "logs/android_logcat.txt"
-
-    filter_logs(
-        input_file,
-        keyword=chosen_keyword,
-        time_range=chosen_time_range,
-        severity=chosen_severity,
-        subtype=chosen_subtype,
-        output_file="logs/filtered_logs.txt"
+    criteria = {
+        "keyword": filter_controls["keyword"].get(),
+        "time_range": filter_controls["time"].get(),
+        "severity": filter_controls["severity"].get(),
+        "subtype": filter_controls["subtype"].get(),
+        # A LOG_TYPES entry filters the logcat by that category
+        "category": chosen_logtype if chosen_logtype in LOG_TYPES else None
+    }
+    input_files = FILTER_INPUTS.get(chosen_logtype, FILTER_INPUTS["Logcat"])
+
+    # Matches appear in the output widget while the filter is still reading
+    filter_executor.submit(
+        input_files,
+        criteria,
+        output_file="logs/filtered_logs.txt",
+        on_start=lambda cancel: stream_to_widget(filter_output_widget, cancel),
+        on_done=lambda count: show_filter_summary(filter_output_widget, count)
     )
-    load_filtered_logs(filter_output_widget)
-
-# --- THREADED FUNCTION WRAPPER for filtering ---
-def apply_filter_threaded():
-    """Runs apply_filter in a thread."""
-    thread = threading.Thread(target=apply_filter, daemon=True)
-    thread.start()
-
-filter_controls["apply"].configure(command=apply_filter_threaded)
-filter_controls["save"].configure(command=save_filtered_logs) # Saving is usually fast, but can be threaded if needed
-
-# -------------------------------------------------------------------
-# Create main menu
-# -------------------------------------------------------------------
-menu = create_menu(root, tab_control)
-
-# Fix "Import Logs" command to use the threaded function
-for i in range(menu.index("end") + 1):
-    try:
-        entry_label = menu.entrycget(i, "label")
-    except tk.TclError:
-        continue
-    if entry_label == "File":
-        file_menu_name = menu.entrycget(i, "menu")
-        file_menu = menu.nametowidget(file_menu_name)
-        for j in range(file_menu.index("end") + 1):
-            try:
-                if file_menu.entrycget(j, "label") == "Import Logs":
-                    file_menu.entryconfigure(j, command=extract_logs_threaded)
-                    break
-            except tk.TclError:
-                continue
-        break
 
 # -------------------------------------------------------------------
 # Define update_live_monitor to update the live_text widget
@@ -515,44 +445,128 @@ def process_log_queue():
     if root.winfo_exists():
         root.after(100, process_log_queue)
 
-process_log_queue()
 
 # -------------------------------------------------------------------
-# (Optional) Create a secondary notebook for analysis if desired.
+# Build the GUI only when run as a script: filtering's worker processes
+# re-import this module (spawn) and must not open windows
 # -------------------------------------------------------------------
-from tkinter import scrolledtext
-
-analysis_notebook = ttk.Notebook(root)
-
-tab_call_log = tk.Frame(analysis_notebook)
-tab_sms = tk.Frame(analysis_notebook)
-tab_logcat_secondary = tk.Frame(analysis_notebook)
-tab_filter_secondary = tk.Frame(analysis_notebook)
-
-call_log_text = scrolledtext.ScrolledText(tab_call_log, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
-call_log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-analysis_widgets["call_log_text"] = call_log_text
-
-sms_text = scrolledtext.ScrolledText(tab_sms, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
-sms_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-analysis_widgets["sms_text"] = sms_text
-
-logcat_text = scrolledtext.ScrolledText(tab_logcat_secondary, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
-logcat_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-analysis_widgets["logcat_text"] = logcat_text
-
-filter_analysis_text = scrolledtext.ScrolledText(tab_filter_secondary, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
-filter_analysis_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-analysis_widgets["filter_text"] = filter_analysis_text
-
-analysis_notebook.add(tab_call_log, text="Call Logs")
-analysis_notebook.add(tab_sms, text="SMS")
-analysis_notebook.add(tab_logcat_secondary, text="Logcat")
-analysis_notebook.add(tab_filter_secondary, text="Filter")
-
-analysis_notebook.pack(expand=True, fill='both')
-
 if __name__ == "__main__":
+    # Create main window and set style
+    root = create_main_window()
+    setup_style(root)
+
+    # Create main tabs and widgets
+    tabs, tab_control = create_tabs(root)
+    widgets = create_widgets(tabs)
+
+    extract_button = tk.Button(tabs["Extract"], text="Extract Logs", bg="gray", fg="black", command=extract_logs_threaded)
+    extract_button.pack(pady=5)
+
+    # -------------------------------------------------------------------
+    # Create live monitoring buttons and assign commands
+    # -------------------------------------------------------------------
+    start_btn, stop_btn = create_live_monitoring_buttons(tabs["Live"])
+    # This part is already well-designed with a queue, so no changes are needed here.
+    start_btn.configure(command=lambda: start_monitoring(lambda log: log_queue.put(('update', log)), log_queue))
+    stop_btn.configure(command=lambda: stop_monitoring(lambda log: log_queue.put(('update', log))))
+
+    # -------------------------------------------------------------------
+    # Create graph controls and set up matplotlib figure and canvas
+    # -------------------------------------------------------------------
+    graph_controls = create_graph_controls(tabs["Graphs"])
+    graph_controls["logtype_combo"]["values"] = ["Call Logs", "SMS Logs", "Logcat Activity"]
+    graph_controls["logtype_combo"].set("Call Logs")
+    graph_fig, graph_ax = plt.subplots(figsize=(7, 4))
+    graph_canvas = FigureCanvasTkAgg(graph_fig, master=tabs["Graphs"])
+    graph_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=10)
+
+    graph_controls["graph_btn"].configure(command=plot_graph_threaded)
+    graph_controls["freq_btn"].configure(command=plot_frequent_callers_threaded)
+
+    # -------------------------------------------------------------------
+    # Create export frame and assign export commands
+    # -------------------------------------------------------------------
+    export_controls = create_export_frame(root)
+
+    export_controls["full"].configure(command=export_full_report_threaded)
+    export_controls["png"].configure(command=lambda: export_chart_threaded("png"))
+    export_controls["pdf"].configure(command=lambda: export_chart_threaded("pdf"))
+    export_controls["csv"].configure(command=export_graph_data_threaded)
+
+    # -------------------------------------------------------------------
+    # Create filter controls and output widget; assign filter button commands
+    # -------------------------------------------------------------------
+    filter_controls = create_filter_controls(tabs["Filter"])
+    filter_output_widget = create_filter_output(tabs["Filter"])
+    # One filter job at a time, restarted (debounced) whenever the criteria change
+    filter_executor = FilterExecutor()
+
+    filter_controls["apply"].configure(command=apply_filter)
+    for control in ("logtype", "time", "severity", "subtype"):
+        filter_controls[control].bind("<<ComboboxSelected>>", apply_filter)
+    filter_controls["keyword"].bind("<KeyRelease>", apply_filter)
+    filter_controls["save"].configure(command=save_filtered_logs) # Saving is usually fast, but can be threaded if needed
+
+    # -------------------------------------------------------------------
+    # Create main menu
+    # -------------------------------------------------------------------
+    menu = create_menu(root, tab_control)
+
+    # Fix "Import Logs" command to use the threaded function
+    for i in range(menu.index("end") + 1):
+        try:
+            entry_label = menu.entrycget(i, "label")
+        except tk.TclError:
+            continue
+        if entry_label == "File":
+            file_menu_name = menu.entrycget(i, "menu")
+            file_menu = menu.nametowidget(file_menu_name)
+            for j in range(file_menu.index("end") + 1):
+                try:
+                    if file_menu.entrycget(j, "label") == "Import Logs":
+                        file_menu.entryconfigure(j, command=extract_logs_threaded)
+                        break
+                except tk.TclError:
+                    continue
+            break
+
+    process_log_queue()
+
+    # -------------------------------------------------------------------
+    # (Optional) Create a secondary notebook for analysis if desired.
+    # -------------------------------------------------------------------
+    from tkinter import scrolledtext
+
+    analysis_notebook = ttk.Notebook(root)
+
+    tab_call_log = tk.Frame(analysis_notebook)
+    tab_sms = tk.Frame(analysis_notebook)
+    tab_logcat_secondary = tk.Frame(analysis_notebook)
+    tab_filter_secondary = tk.Frame(analysis_notebook)
+
+    call_log_text = scrolledtext.ScrolledText(tab_call_log, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
+    call_log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    analysis_widgets["call_log_text"] = call_log_text
+
+    sms_text = scrolledtext.ScrolledText(tab_sms, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
+    sms_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    analysis_widgets["sms_text"] = sms_text
+
+    logcat_text = scrolledtext.ScrolledText(tab_logcat_secondary, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
+    logcat_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    analysis_widgets["logcat_text"] = logcat_text
+
+    filter_analysis_text = scrolledtext.ScrolledText(tab_filter_secondary, wrap=tk.WORD, bg="black", fg="#00FF00", font=("Consolas", 10))
+    filter_analysis_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    analysis_widgets["filter_text"] = filter_analysis_text
+
+    analysis_notebook.add(tab_call_log, text="Call Logs")
+    analysis_notebook.add(tab_sms, text="SMS")
+    analysis_notebook.add(tab_logcat_secondary, text="Logcat")
+    analysis_notebook.add(tab_filter_secondary, text="Filter")
+
+    analysis_notebook.pack(expand=True, fill='both')
+
     os.makedirs("logs", exist_ok=True)
     os.makedirs("logs/logcat_types", exist_ok=True)
     os.makedirs("logs/exports", exist_ok=True)
@@ -562,4 +576,4 @@ if __name__ == "__main__":
         "This tool helps you analyze Android logs for forensic investigation. "
         "Start by importing logs using the 'Import Logs' option in the File menu.")
 
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
@@ -1,20 +1,202 @@
 """
 modern_viewers.py - Modern table viewers for SMS and Call logs
+
+The tables are virtual: the Treeview holds only the rows that fit on screen
+and they are refilled from the (filtered) records as the view scrolls, so
+loading or searching 100k records costs the same as a screenful. Search
+runs on a lower-case corpus built once per load, and the header counters
+are cached per result set.
 """
 
 import tkinter as tk
 from tkinter import ttk
 import os
+from bisect import bisect_right
+from collections import Counter
 from config import *
 
+FIELD_SEP = "\x1f"   # between the searchable fields of a record
+RECORD_SEP = "\x00"  # between records in the search corpus
+
+
+class RecordSearchIndex:
+    """
+    Case-insensitive substring search over some fields of a record list.
+
+    The lower-cased fields of all records are joined into one corpus, so a
+    query is a str.find scan at C speed plus a bisect per hit rather than a
+    str(...).lower() per field and record. A query that extends the previous
+    one (typing) only re-checks the previous hits.
+    """
+
+    def __init__(self, records, fields):
+        self.haystacks = [FIELD_SEP.join(str(r.get(field, '')).lower() for field in fields).replace(RECORD_SEP, ' ')
+                          for r in records]
+        self.corpus = RECORD_SEP.join(self.haystacks)
+        self.starts = []
+        offset = 0
+        for text in self.haystacks:
+            self.starts.append(offset)
+            offset += len(text) + 1
+        self._last = ("", None)
+
+    def search(self, query):
+        """Ids of the matching records in record order, or None for an empty query (everything)."""
+        query = query.lower()
+        if not query:
+            self._last = ("", None)
+            return None
+        last_query, last_ids = self._last
+        if last_ids is not None and last_query in query:
+            ids = [i for i in last_ids if query in self.haystacks[i]]
+        else:
+            ids = []
+            count = len(self.starts)
+            pos = self.corpus.find(query)
+            while pos != -1:
+                i = bisect_right(self.starts, pos) - 1
+                ids.append(i)
+                if i + 1 >= count:
+                    break
+                pos = self.corpus.find(query, self.starts[i + 1])
+        self._last = (query, ids)
+        return ids
+
+
+class VirtualTable:
+    """
+    Drives a Treeview as a window onto `count` rows.
+
+    Only as many items as fit on screen exist; scrolling (scrollbar, wheel,
+    keys) changes which rows they show. row_values(i) returns the column
+    values of row i. The selected row is remembered across scrolling.
+
+    render() re-selects items as rows move, which fires <<TreeviewSelect>>
+    on every scroll; bind <<RecordSelect>> instead to hear only when the
+    selected record changes.
+    """
+
+    def __init__(self, tree, scrollbar, row_values):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.count = 0
+        self.first = 0
+        self.visible = 1
+        self.items = []
+        self.selected = None
+        self.announced = None
+
+        tree.configure(yscrollcommand='')
+        scrollbar.configure(command=self.yview)
+        tree.bind('<Configure>', self._on_resize)
+        tree.bind('<MouseWheel>', lambda e: self._scroll_event(-1 if e.delta > 0 else 1))
+        tree.bind('<Button-4>', lambda e: self._scroll_event(-1))
+        tree.bind('<Button-5>', lambda e: self._scroll_event(1))
+        tree.bind('<Up>', lambda e: self._step(-1))
+        tree.bind('<Down>', lambda e: self._step(1))
+        tree.bind('<Prior>', lambda e: self._scroll_event(-self.visible))
+        tree.bind('<Next>', lambda e: self._scroll_event(self.visible))
+        tree.bind('<Home>', lambda e: self._jump(0))
+        tree.bind('<End>', lambda e: self._jump(self.count))
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+
+    def set_count(self, count, reset=False):
+        """Show `count` rows (the first ones if reset, else keep the scroll position)."""
+        self.count = count
+        if reset:
+            self.first = 0
+            self.selected = self.announced = None
+        self.render()
+
+    def render(self):
+        self.first = max(0, min(self.first, self.count - self.visible))
+        shown = min(self.visible, self.count - self.first)
+        while len(self.items) < shown:
+            self.items.append(self.tree.insert('', tk.END))
+        while len(self.items) > shown:
+            self.tree.delete(self.items.pop())
+        for offset, item in enumerate(self.items):
+            self.tree.item(item, values=self.row_values(self.first + offset))
+
+        # Keep the selection on its record
+        wanted = ()
+        if self.selected is not None and self.first <= self.selected < self.first + shown:
+            wanted = (self.items[self.selected - self.first],)
+        if tuple(self.tree.selection()) != wanted:
+            self.tree.selection_set(wanted)
+
+        if self.count:
+            self.scrollbar.set(self.first / self.count, (self.first + shown) / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, rows):
+        self.first += rows
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units' | 'pages')."""
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * self.count)
+            self.render()
+        elif args[0] == 'scroll':
+            rows = int(args[1]) * (self.visible if args[2] == 'pages' else 1)
+            self.scroll(rows)
+
+    def _scroll_event(self, rows):
+        self.scroll(rows)
+        return 'break'
+
+    def _jump(self, row):
+        self.first = row
+        self.render()
+        return 'break'
+
+    def _step(self, rows):
+        """Arrow keys: move the selection, scrolling at the edges of the window."""
+        if self.selected is None:
+            return None
+        row = max(0, min(self.count - 1, self.selected + rows))
+        if row < self.first:
+            self.first = row
+        elif row >= self.first + self.visible:
+            self.first = row - self.visible + 1
+        self.selected = row
+        self.render()
+        self.tree.focus(self.items[row - self.first])
+        return 'break'
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            self.selected = self.first + self.items.index(selection[0])
+            if self.selected != self.announced:
+                self.announced = self.selected
+                self.tree.event_generate('<<RecordSelect>>')
+
+    def _on_resize(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup('Treeview', 'rowheight') or 20)
+        self.visible = max(1, (event.height - row_height - 4) // row_height)
+        self.render()
+        # Correct the estimate: the last item must be fully on screen
+        while len(self.items) > 1 and not self.tree.bbox(self.items[-1]):
+            self.visible -= 1
+            self.render()
+
 
 class ModernSMSViewer(tk.Frame):
     """Professional SMS viewer with table and search."""
+    SEARCH_FIELDS = ('contact', 'message', 'date')
     
     def __init__(self, parent):
         super().__init__(parent, bg=PRIMARY_BG)
         self.sms_data = []
         self.filtered_data = []
+        self.search_index = RecordSearchIndex([], self.SEARCH_FIELDS)
+        self.stat_keys = []
+        self.total_counts = self.counts = Counter()
         self.create_widgets()
     
     def create_widgets(self):
@@ -60,7 +242,7 @@ class ModernSMSViewer(tk.Frame):
         # Treeview
         columns = ('type', 'contact', 'date', 'time', 'message')
         self.tree = ttk.Treeview(table_frame, columns=columns, show='headings',
-                                yscrollcommand=vsb.set, selectmode='browse')
+                                selectmode='browse')
         
         self.tree.heading('type', text='Type')
         self.tree.heading('contact', text='Contact')
@@ -75,7 +257,7 @@ class ModernSMSViewer(tk.Frame):
         self.tree.column('message', width=400, minwidth=200)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.config(command=self.tree.yview)
+        self.table = VirtualTable(self.tree, vsb, self.row_values)
         
         # Apply styling
         style = ttk.Style()
@@ -91,36 +273,36 @@ class ModernSMSViewer(tk.Frame):
         """Load SMS data into table."""
         self.sms_data = sms_records
         self.filtered_data = sms_records
+        self.search_index = RecordSearchIndex(sms_records, self.SEARCH_FIELDS)
+        self.stat_keys = [r.get('type') for r in sms_records]
+        self.total_counts = self.counts = Counter(self.stat_keys)
         self.refresh_table()
         self.update_stats()
     
+    def row_values(self, index):
+        record = self.filtered_data[index]
+        return (
+            record.get('type', ''),
+            record.get('contact', ''),
+            record.get('date', ''),
+            record.get('time', ''),
+            record.get('message', '')[:100]  # Limit message length
+        )
+    
     def refresh_table(self):
-        """Refresh table display."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for record in self.filtered_data:
-            self.tree.insert('', tk.END, values=(
-                record.get('type', ''),
-                record.get('contact', ''),
-                record.get('date', ''),
-                record.get('time', ''),
-                record.get('message', '')[:100]  # Limit message length
-            ))
+        """Refresh table display (only the visible rows are materialized)."""
+        self.table.set_count(len(self.filtered_data), reset=True)
     
     def do_search(self):
         """Filter data based on search query."""
-        query = self.search_var.get().lower()
+        ids = self.search_index.search(self.search_var.get())
         
-        if not query:
+        if ids is None:
             self.filtered_data = self.sms_data
+            self.counts = self.total_counts
         else:
-            self.filtered_data = [
-                r for r in self.sms_data
-                if query in str(r.get('contact', '')).lower() or
-                   query in str(r.get('message', '')).lower() or
-                   query in str(r.get('date', '')).lower()
-            ]
+            self.filtered_data = [self.sms_data[i] for i in ids]
+            self.counts = Counter(self.stat_keys[i] for i in ids)
         
         self.refresh_table()
         self.update_stats()
@@ -128,18 +310,22 @@ class ModernSMSViewer(tk.Frame):
     def update_stats(self):
         """Update statistics label."""
         total = len(self.filtered_data)
-        received = sum(1 for r in self.filtered_data if r.get('type') == 'Received')
-        sent = sum(1 for r in self.filtered_data if r.get('type') == 'Sent')
+        received = self.counts['Received']
+        sent = self.counts['Sent']
         self.stats_label.config(text=f"Total: {total}  |  Received: {received}  |  Sent: {sent}")
 
 
 class ModernCallViewer(tk.Frame):
     """Professional call log viewer with table and search."""
+    SEARCH_FIELDS = ('contact', 'type', 'date')
     
     def __init__(self, parent):
         super().__init__(parent, bg=PRIMARY_BG)
         self.call_data = []
         self.filtered_data = []
+        self.search_index = RecordSearchIndex([], self.SEARCH_FIELDS)
+        self.stat_keys = []
+        self.total_counts = self.counts = Counter()
         self.create_widgets()
     
     def create_widgets(self):
@@ -185,7 +371,7 @@ class ModernCallViewer(tk.Frame):
         # Treeview
         columns = ('type', 'contact', 'date', 'time', 'duration')
         self.tree = ttk.Treeview(table_frame, columns=columns, show='headings',
-                                yscrollcommand=vsb.set, selectmode='browse')
+                                selectmode='browse')
         
         self.tree.heading('type', text='Call Type')
         self.tree.heading('contact', text='Contact')
@@ -200,7 +386,7 @@ class ModernCallViewer(tk.Frame):
         self.tree.column('duration', width=80, minwidth=60)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.config(command=self.tree.yview)
+        self.table = VirtualTable(self.tree, vsb, self.row_values)
         
         # Apply styling
         style = ttk.Style()
@@ -216,36 +402,36 @@ class ModernCallViewer(tk.Frame):
         """Load call data into table."""
         self.call_data = call_records
         self.filtered_data = call_records
+        self.search_index = RecordSearchIndex(call_records, self.SEARCH_FIELDS)
+        self.stat_keys = [r.get('type') for r in call_records]
+        self.total_counts = self.counts = Counter(self.stat_keys)
         self.refresh_table()
         self.update_stats()
     
+    def row_values(self, index):
+        record = self.filtered_data[index]
+        return (
+            record.get('type', ''),
+            record.get('contact', ''),
+            record.get('date', ''),
+            record.get('time', ''),
+            record.get('duration', '')
+        )
+    
     def refresh_table(self):
-        """Refresh table display."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for record in self.filtered_data:
-            self.tree.insert('', tk.END, values=(
-                record.get('type', ''),
-                record.get('contact', ''),
-                record.get('date', ''),
-                record.get('time', ''),
-                record.get('duration', '')
-            ))
+        """Refresh table display (only the visible rows are materialized)."""
+        self.table.set_count(len(self.filtered_data), reset=True)
     
     def do_search(self):
         """Filter data based on search query."""
-        query = self.search_var.get().lower()
+        ids = self.search_index.search(self.search_var.get())
         
-        if not query:
+        if ids is None:
             self.filtered_data = self.call_data
+            self.counts = self.total_counts
         else:
-            self.filtered_data = [
-                r for r in self.call_data
-                if query in str(r.get('contact', '')).lower() or
-                   query in str(r.get('type', '')).lower() or
-                   query in str(r.get('date', '')).lower()
-            ]
+            self.filtered_data = [self.call_data[i] for i in ids]
+            self.counts = Counter(self.stat_keys[i] for i in ids)
         
         self.refresh_table()
         self.update_stats()
@@ -253,9 +439,9 @@ class ModernCallViewer(tk.Frame):
     def update_stats(self):
         """Update statistics label."""
         total = len(self.filtered_data)
-        incoming = sum(1 for r in self.filtered_data if r.get('type') == 'Incoming')
-        outgoing = sum(1 for r in self.filtered_data if r.get('type') == 'Outgoing')
-        missed = sum(1 for r in self.filtered_data if r.get('type') == 'Missed')
+        incoming = self.counts['Incoming']
+        outgoing = self.counts['Outgoing']
+        missed = self.counts['Missed']
         self.stats_label.config(
             text=f"Total: {total}  |  Incoming: {incoming}  |  Outgoing: {outgoing}  |  Missed: {missed}"
         )
@@ -263,16 +449,20 @@ class ModernCallViewer(tk.Frame):
 
 class ModernLocationViewer(tk.Frame):
     """Professional location viewer with table and search."""
+    SEARCH_FIELDS = ('provider', 'time', 'context')
     
     def __init__(self, parent, map_widget=None):
         super().__init__(parent, bg=PRIMARY_BG)
         self.location_data = []
         self.filtered_data = []
+        self.search_index = RecordSearchIndex([], self.SEARCH_FIELDS)
+        self.stat_keys = []
+        self.total_counts = self.counts = Counter()
         self.map_widget = map_widget
         self.create_widgets()
         
-        # Bind selection event
-        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        # Bind selection event (only when the selected record changes, not on scroll)
+        self.tree.bind('<<RecordSelect>>', self.on_select)
     
     def create_widgets(self):
         """Create viewer UI."""
@@ -327,7 +517,7 @@ class ModernLocationViewer(tk.Frame):
         # Treeview
         columns = ('time', 'provider', 'context', 'lat', 'lon', 'accuracy')
         self.tree = ttk.Treeview(table_frame, columns=columns, show='headings',
-                                yscrollcommand=vsb.set, selectmode='browse')
+                                selectmode='browse')
         
         self.tree.heading('time', text='Time')
         self.tree.heading('provider', text='Provider')
@@ -344,7 +534,7 @@ class ModernLocationViewer(tk.Frame):
         self.tree.column('accuracy', width=80, minwidth=60)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        vsb.config(command=self.tree.yview)
+        self.table = VirtualTable(self.tree, vsb, self.row_values)
         
         # Apply styling
         style = ttk.Style()
@@ -356,41 +546,47 @@ class ModernLocationViewer(tk.Frame):
         style.map('Treeview', background=[('selected', ACCENT_BLUE)],
                  foreground=[('selected', '#11111b')])
     
+    @staticmethod
+    def provider_key(record):
+        """Counter key of a record: which of gps / network its provider mentions."""
+        provider = str(record.get('provider', '')).lower()
+        return ('gps' in provider, 'network' in provider)
+    
     def load_data(self, location_records):
         """Load location data into table."""
         self.location_data = location_records
         self.filtered_data = location_records
+        self.search_index = RecordSearchIndex(location_records, self.SEARCH_FIELDS)
+        self.stat_keys = [self.provider_key(r) for r in location_records]
+        self.total_counts = self.counts = Counter(self.stat_keys)
         self.refresh_table()
         self.update_stats()
     
+    def row_values(self, index):
+        record = self.filtered_data[index]
+        return (
+            record.get('time', ''),
+            record.get('provider', ''),
+            record.get('context', ''),
+            record.get('latitude', ''),
+            record.get('longitude', ''),
+            record.get('accuracy', '')
+        )
+    
     def refresh_table(self):
-        """Refresh table display."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for record in self.filtered_data:
-            self.tree.insert('', tk.END, values=(
-                record.get('time', ''),
-                record.get('provider', ''),
-                record.get('context', ''),
-                record.get('latitude', ''),
-                record.get('longitude', ''),
-                record.get('accuracy', '')
-            ))
+        """Refresh table display (only the visible rows are materialized)."""
+        self.table.set_count(len(self.filtered_data), reset=True)
     
     def do_search(self):
         """Filter data based on search query."""
-        query = self.search_var.get().lower()
+        ids = self.search_index.search(self.search_var.get())
         
-        if not query:
+        if ids is None:
             self.filtered_data = self.location_data
+            self.counts = self.total_counts
         else:
-            self.filtered_data = [
-                r for r in self.location_data
-                if query in str(r.get('provider', '')).lower() or
-                   query in str(r.get('time', '')).lower() or
-                   query in str(r.get('context', '')).lower()
-            ]
+            self.filtered_data = [self.location_data[i] for i in ids]
+            self.counts = Counter(self.stat_keys[i] for i in ids)
         
         self.refresh_table()
         self.update_stats()
@@ -398,8 +594,8 @@ class ModernLocationViewer(tk.Frame):
     def update_stats(self):
         """Update statistics label."""
         total = len(self.filtered_data)
-        gps = sum(1 for r in self.filtered_data if 'gps' in str(r.get('provider', '')).lower())
-        network = sum(1 for r in self.filtered_data if 'network' in str(r.get('provider', '')).lower())
+        gps = sum(n for (is_gps, _), n in self.counts.items() if is_gps)
+        network = sum(n for (_, is_network), n in self.counts.items() if is_network)
         self.stats_label.config(
             text=f"Total: {total}  |  GPS: {gps}  |  Network: {network}"
         )
@@ -9,6 +9,7 @@ and statistical analysis of large log files.
 try:
     import numpy as np
     import pandas as pd
+    from numpy.lib.stride_tricks import sliding_window_view
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
@@ -18,56 +19,185 @@ from datetime import datetime, timedelta
 import re
 from collections import Counter
 
+from analysis.logcat_parser import TimestampDecoder
+
 
 def is_available():
     """Check if NumPy is available."""
     return NUMPY_AVAILABLE
 
 
-def parse_timestamps_vectorized(log_lines, pattern=r'(\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})'):
+# Fixed-width "MM-DD HH:MM:SS[.mmm]" prefix: digit columns and separator columns
+TS_WINDOW = 20  # 18 timestamp bytes, plus room for the "[ " of long format headers
+TS_DIGIT_COLUMNS = [0, 1, 3, 4, 6, 7, 9, 10, 12, 13]
+TS_MS_COLUMNS = [15, 16, 17]
+TS_SEPARATOR_COLUMNS = [2, 5, 8, 11]
+TS_SEPARATORS = np.frombuffer(b"- ::", dtype=np.uint8) if NUMPY_AVAILABLE else None
+READ_CHUNK = 64 * 1024 * 1024
+NAT_MS = -2 ** 63  # int64 value of NaT; viewing the result as datetime64[ms] gives NaT
+
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 (proleptic Gregorian, H. Hinnant's algorithm)."""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+
+def _month_tables(year):
+    """Epoch day of the 1st of each month and month lengths, indexed by month (1-12)."""
+    firsts = [_days_from_civil(year, month, 1) for month in range(1, 13)] + [_days_from_civil(year + 1, 1, 1)]
+    first = np.array([0] + firsts[:12], dtype=np.int64)
+    length = np.array([0] + [b - a for a, b in zip(firsts, firsts[1:])], dtype=np.int64)
+    return first, length
+
+
+def logcat_epoch_ms(data, year=None, now=None, rollover=True):
+    """
+    Timestamps of every line in a logcat byte buffer as int64 epoch milliseconds.
+
+    Lines must start with "MM-DD HH:MM:SS[.mmm]" (time/threadtime) or "[ MM-DD ..."
+    (long headers). Digits are read as byte columns and combined arithmetically,
+    so no Python object is created per line. Times are naive wall-clock like the
+    log itself. Lines without a valid timestamp get NAT_MS.
+
+    Args:
+        data: bytes or np.uint8 array of whole lines
+        year: Year to assume (default: current year)
+        now: datetime for rollover (default: datetime.now())
+        rollover: Times later than now belong to the previous year
+
+    Returns:
+        np.int64 array with one entry per line
+    """
+    buf = np.frombuffer(data, dtype=np.uint8) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    if len(buf) == 0:
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(buf == 10) + 1
+    starts = np.concatenate(([0], starts[starts < len(buf)]))
+    size = len(buf)
+    if starts[-1] + TS_WINDOW > size:
+        # Short last line: pad so every line has a full window
+        buf = np.concatenate((buf, np.zeros(TS_WINDOW, dtype=np.uint8)))
+
+    # One (lines x TS_WINDOW) byte matrix; long format headers are shifted past "[ "
+    windows = sliding_window_view(buf, TS_WINDOW)
+    bracket = (buf[starts] == ord('[')) & (buf[starts + 1] == ord(' '))
+    cols = windows[starts + 2 * bracket]
+
+    # A short line has its '\n' inside the window, which fails the digit/separator checks
+    # (uint8 arithmetic: anything below '0' wraps around to > 9)
+    digits = cols[:, TS_DIGIT_COLUMNS] - np.uint8(48)
+    valid = (cols[:, TS_SEPARATOR_COLUMNS] == TS_SEPARATORS).all(axis=1) & (digits <= 9).all(axis=1)
+    ms_digits = cols[:, TS_MS_COLUMNS] - np.uint8(48)
+    has_ms = (cols[:, 14] == ord('.')) & (ms_digits <= 9).all(axis=1)
+
+    pairs = digits[:, 0::2].astype(np.int64) * 10 + digits[:, 1::2]
+    month, day, hour, minute, second = pairs.T
+    millis = np.where(has_ms, ms_digits[:, 0].astype(np.int64) * 100 + ms_digits[:, 1] * 10 + ms_digits[:, 2], 0)
+    valid &= (month >= 1) & (month <= 12) & (hour < 24) & (minute < 60) & (second < 60)
+    month = np.where(valid, month, 1)
+
+    now = now or datetime.now()
+    year = year or now.year
+    time_of_day = ((hour * 60 + minute) * 60 + second) * 1000 + millis
+    first, length = _month_tables(year)
+    epoch_ms = (first[month] + day - 1) * 86400000 + time_of_day
+    valid &= (day >= 1) & (day <= length[month])
+    if rollover:
+        now_ms = _days_from_civil(now.year, now.month, now.day) * 86400000 + \
+            ((now.hour * 60 + now.minute) * 60 + now.second) * 1000 + now.microsecond // 1000
+        # Compare whole seconds, like the per-line parsers
+        future = valid & (epoch_ms // 1000 > now_ms // 1000)
+        if future.any():
+            first, length = _month_tables(year - 1)
+            epoch_ms[future] = (first[month[future]] + day[future] - 1) * 86400000 + time_of_day[future]
+    epoch_ms[~valid] = NAT_MS
+    return epoch_ms
+
+
+def parse_logcat_file_vectorized(filepath, year=None, now=None, rollover=True, chunk_size=READ_CHUNK):
+    """
+    Read a logcat file as bytes and return int64 epoch-ms per line (NAT_MS without a timestamp).
+
+    The file is processed in chunks cut at line boundaries, so memory stays
+    bounded by chunk_size. Use .view('datetime64[ms]') for a datetime64 array.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    now = now or datetime.now()
+    parts = []
+    with open(filepath, "rb") as f:
+        rest = b""
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                rest = block
+                continue
+            rest = block[cut:]
+            parts.append(logcat_epoch_ms(block[:cut], year, now, rollover))
+        if rest:
+            parts.append(logcat_epoch_ms(rest, year, now, rollover))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def parse_timestamps_vectorized(log_lines, pattern=None):
     """
     Parse timestamps from log lines using vectorized operations.
     
     Args:
         log_lines: List of log line strings
-        pattern: Regex pattern for timestamp matching
+        pattern: Regex pattern for timestamp matching. None (default) reads the
+            fixed-width logcat prefix with NumPy; a custom pattern is matched per line
     
     Returns:
-        numpy array of datetime objects (or None if NumPy unavailable)
+        numpy datetime64[s] array aligned with log_lines, NaT where no timestamp
+        (or None if NumPy unavailable)
     """
     if not NUMPY_AVAILABLE:
         return None
     
+    if pattern is None:
+        # Every line newline-terminated, so the result stays aligned with log_lines
+        data = "".join(line.rstrip("\r\n") + "\n" for line in log_lines).encode("utf-8", errors="replace")
+        epoch_ms = logcat_epoch_ms(data)
+        return epoch_ms.view('datetime64[ms]').astype('datetime64[s]')
+    
     timestamps = []
-    current_year = datetime.now().year
+    # Current year; timestamps in the future belong to last year (rollover)
+    decoder = TimestampDecoder(rollover=True)
+    regex = re.compile(pattern)
     
     for line in log_lines:
-        match = re.search(pattern, line)
-        if match:
-            try:
-                ts_str = match.group(1)
-                ts = datetime.strptime(f"{current_year}-{ts_str}", "%Y-%m-%d %H:%M:%S")
-                
-                # Handle year rollover
-                if ts > datetime.now():
-                    ts = ts.replace(year=current_year - 1)
-                
-                timestamps.append(ts)
-            except:
-                timestamps.append(None)
-        else:
-            timestamps.append(None)
+        match = regex.search(line)
+        timestamps.append(decoder.datetime(match.group(1)) if match else None)
     
     return np.array(timestamps, dtype='datetime64[s]')
 
 
+def _as_datetime64(timestamps):
+    """datetime64[ms] array without NaT; int64 input is taken as epoch milliseconds."""
+    arr = np.asarray(timestamps)
+    if arr.dtype == np.int64:
+        arr = arr.view('datetime64[ms]')
+    else:
+        arr = arr.astype('datetime64[ms]')
+    return arr[~np.isnat(arr)]
+
+
 def time_series_binning(timestamps, bin_size='1H'):
     """
     Bin timestamps into time intervals for time-series visualization.
     Much faster than Python loops for large datasets.
     
     Args:
-        timestamps: numpy array of timestamps
+        timestamps: numpy datetime64 array, or int64 epoch-ms (parse_logcat_file_vectorized)
         bin_size: Pandas frequency string ('1H', '30T', '1D', etc.)
     
     Returns:
@@ -76,8 +206,8 @@ def time_series_binning(timestamps, bin_size='1H'):
     if not NUMPY_AVAILABLE or timestamps is None:
         return None, None
     
-    # Convert to pandas Series for easy binning
-    ts_series = pd.Series(1, index=pd.to_datetime(timestamps))
+    # Convert to pandas Series for easy binning (NaT dropped)
+    ts_series = pd.Series(1, index=pd.DatetimeIndex(_as_datetime64(timestamps)))
     
     # Resample and count
     binned = ts_series.resample(bin_size).count()
@@ -235,26 +365,25 @@ def activity_heatmap_data(timestamps, bin_by_hour=True):
     Generate heatmap data for activity analysis.
     
     Args:
-        timestamps: numpy array of timestamps
+        timestamps: numpy datetime64 array, or int64 epoch-ms (parse_logcat_file_vectorized)
         bin_by_hour: If True, bin by hour of day, else by day of week
     
     Returns:
         dict with heatmap data
     """
-    if not NUMPY_AVAILABLE or len(timestamps) == 0:
+    if not NUMPY_AVAILABLE or timestamps is None or len(timestamps) == 0:
         return {}
     
-    df = pd.DataFrame({'timestamp': pd.to_datetime(timestamps)})
-    df['count'] = 1
+    epoch_ms = _as_datetime64(timestamps).astype(np.int64)
     
     if bin_by_hour:
-        df['hour'] = df['timestamp'].dt.hour
-        heatmap = df.groupby('hour')['count'].sum().to_dict()
-    else:
-        df['day'] = df['timestamp'].dt.day_name()
-        heatmap = df.groupby('day')['count'].sum().to_dict()
+        counts = np.bincount((epoch_ms // 3600000) % 24, minlength=24)
+        return {hour: int(count) for hour, count in enumerate(counts) if count}
     
-    return heatmap
+    # 1970-01-01 was a Thursday
+    counts = np.bincount((epoch_ms // 86400000 + 3) % 7, minlength=7)
+    names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    return {name: int(counts[i]) for i, name in sorted(enumerate(names), key=lambda item: item[1]) if counts[i]}
 
 
 # Example usage and benchmarking
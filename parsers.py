@@ -5,6 +5,8 @@ parsers.py - Simple log parsers for Android forensic data
 import re
 from datetime import datetime
 
+from analysis.logcat_parser import TimestampDecoder
+
 
 def parse_sms_logs(log_content):
     """Parse SMS logs into readable records."""
@@ -135,6 +137,8 @@ def parse_location_logs(log_content):
     
     # Regex for Xiaomi MI LMS logs
     # Example: ... getLastLocation, packageName=..., provider=... permitted: true
+    # MI LMS times carry no year: current year assumed
+    decoder = TimestampDecoder()
     mi_lms_pattern = re.compile(r'(\d{2}-\d{2}\s\d{2}:\d{2}:\d{2}\.\d{3})\s+-\s+=MI LMS=\s+getLastLocation,\s+packageName=([^,]+)(?:,\s+provider=([^,\s]+))?.*?(?:permitted:\s+(true|false))?')
 
     # Regex for timestamp in some dumpsys outputs
@@ -203,12 +207,8 @@ def parse_location_logs(log_content):
                 context += f" (Permitted: {permitted})"
             
             # Add current year to timestamp if missing
-            current_year = datetime.now().year
-            try:
-                dt = datetime.strptime(f"{current_year}-{timestamp_str}", "%Y-%m-%d %H:%M:%S.%f")
-                timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except:
-                timestamp = timestamp_str
+            dt = decoder.datetime(timestamp_str)
+            timestamp = dt.strftime("%Y-%m-%d %H:%M:%S") if dt else timestamp_str
 
             record = {
                 'provider': provider,
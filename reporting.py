@@ -6,6 +6,7 @@ from collections import Counter
 from tkinter import messagebox
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 import sys
+from analysis.artifact_io import find_artifact
 
 # Fix Windows encoding issues with emoji characters
 if sys.platform == 'win32':
@@ -322,7 +323,10 @@ def _calculate_file_hashes():
     
     hashes = []
     for filepath in evidence_files:
-        if os.path.exists(filepath):
+        if filepath.endswith(".json"):
+            # Analyzer artifacts may be written as .ndjson[.gz|.zst]; hash the file that exists
+            filepath = find_artifact(filepath)
+        if filepath and os.path.exists(filepath):
             sha256 = hashlib.sha256()
             file_size = 0
             
@@ -0,0 +1,231 @@
+"""
+adb_scheduler.py
+
+Concurrent scheduler for adb extraction jobs.
+
+adbd serves several shell sessions at once and most extraction time is spent
+waiting on the device, so independent artifacts are pulled in parallel:
+
+- At most max_parallel jobs run at a time (ADB_PARALLELISM env var, default 4)
+- Jobs start in priority order (lower first): volatile logcat before heavy
+  dumps such as `dumpsys package` and `dumpsys dropbox`
+- Jobs that fail transiently (device offline, closed connection, timeout)
+  are retried with exponential backoff. Extraction functions that catch
+  their own errors report them by returning {'success': False, 'error': ...}
+- Timing per artifact is written to logs/extraction_timing.json
+
+Usage:
+    scheduler = AdbScheduler(progress=(10, 40))
+    scheduler.add("logcat", run=get_logcat_dump, priority=PRIORITY_LOGCAT)
+    scheduler.add("dumpsys alarm", cmd=["adb", "shell", "dumpsys", "alarm"], output="logs/dump_alarm.txt")
+    results = scheduler.run()
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from stream_extract import stream_command_to_file, write_progress, PROGRESS_FILE
+
+ADB_PARALLELISM = int(os.environ.get("ADB_PARALLELISM", "4"))
+TIMING_FILE = os.path.join("logs", "extraction_timing.json")
+
+# Priorities: lower runs first
+PRIORITY_LOGCAT = 0
+PRIORITY_QUERY = 20
+PRIORITY_DUMPSYS = 50
+PRIORITY_HEAVY = 90
+
+RETRY_BACKOFF = 1.0  # seconds before the first retry, doubled for each further one
+
+# stderr fragments that mean "try again", not "this command is wrong"
+TRANSIENT_ERRORS = (
+    "device offline",
+    "error: closed",
+    "protocol fault",
+    "connection reset",
+    "broken pipe",
+    "device still authorizing",
+    "device still connecting",
+    "timed out",
+)
+
+
+def is_transient(stderr):
+    stderr = (stderr or "").lower()
+    return any(fragment in stderr for fragment in TRANSIENT_ERRORS)
+
+
+class AdbJob:
+    """One artifact: either an adb command streamed to a file, or a callable extraction function."""
+
+    def __init__(self, name, cmd=None, output=None, run=None, priority=PRIORITY_DUMPSYS,
+                 timeout=60, retries=2):
+        if (cmd is None) == (run is None):
+            raise ValueError(f"Job {name}: give exactly one of cmd or run")
+        if cmd is not None and not output:
+            raise ValueError(f"Job {name}: command jobs need an output file")
+        self.name = name
+        self.cmd = cmd
+        self.output = output
+        self.run = run
+        self.priority = priority
+        self.timeout = timeout
+        self.retries = retries
+
+
+def _run_job(job):
+    """Run one attempt of a job. Returns (status, info) with status success | failed | transient."""
+    if job.run is not None:
+        try:
+            result = job.run()
+        except Exception as e:
+            return ("transient" if is_transient(str(e)) else "failed"), {"error": str(e)}
+        if isinstance(result, dict) and result.get("success") is False:
+            error = str(result.get("error") or "failed")
+            return ("transient" if is_transient(error) else "failed"), {"error": error}
+        return "success", {"result": result}
+
+    # Stream into a temp file so a failed attempt never replaces an earlier good artifact
+    partial = job.output + ".part"
+    try:
+        result = stream_command_to_file(job.cmd, partial, label=job.name, percent=None, timeout=job.timeout)
+    except OSError as e:
+        return "failed", {"error": str(e)}
+
+    info = {"bytes": result["bytes"], "lines": result["lines"], "sha256": result["sha256"]}
+    if result["returncode"] == 0 and not result["timed_out"]:
+        os.replace(partial, job.output)
+        return "success", info
+
+    os.remove(partial)
+    if result["timed_out"]:
+        info["error"] = f"Timed out after {job.timeout}s"
+        return "transient", info
+    info["error"] = result["stderr"][:200] or f"exit code {result['returncode']}"
+    return ("transient" if is_transient(result["stderr"]) else "failed"), info
+
+
+class AdbScheduler:
+    """Runs AdbJobs concurrently with a parallelism limit, priorities and retry/backoff."""
+
+    def __init__(self, max_parallel=None, progress=None, progress_file=PROGRESS_FILE,
+                 timing_file=TIMING_FILE):
+        self.max_parallel = max(1, max_parallel or ADB_PARALLELISM)
+        self.progress = progress  # (start percent, end percent) or None
+        self.progress_file = progress_file
+        self.timing_file = timing_file
+        self.jobs = []
+
+    def add(self, name, **kwargs):
+        job = AdbJob(name, **kwargs)
+        self.jobs.append(job)
+        return job
+
+    def _report_progress(self, done, name):
+        if not self.progress:
+            return
+        start, end = self.progress
+        percent = start + (end - start) * done // max(len(self.jobs), 1)
+        write_progress(self.progress_file, percent, f"Extracted {name} ({done}/{len(self.jobs)})")
+
+    def run(self):
+        """Run all jobs. Returns {name: {status, attempts, seconds, started, ...}}."""
+        results = {}
+        start = time.monotonic()
+        # Heap of (not-before time, priority, insertion order, job); retries re-enter with a delay
+        queue = [(0.0, job.priority, i, job) for i, job in enumerate(self.jobs)]
+        heapq.heapify(queue)
+        attempts = {job.name: 0 for job in self.jobs}
+        first_start = {}
+        running = {}
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            while queue or running:
+                now = time.monotonic()
+                # Fill free slots with the highest-priority job whose backoff has expired
+                while len(running) < self.max_parallel:
+                    ready = [entry for entry in queue if entry[0] <= now]
+                    if not ready:
+                        break
+                    entry = min(ready, key=lambda e: (e[1], e[2]))
+                    queue.remove(entry)
+                    heapq.heapify(queue)
+                    job = entry[3]
+                    attempts[job.name] += 1
+                    first_start.setdefault(job.name, now - start)
+                    running[pool.submit(_run_job, job)] = (job, now, entry[2])
+
+                if not running:
+                    # Everything left is waiting out a backoff
+                    time.sleep(max(0.0, min(entry[0] for entry in queue) - now))
+                    continue
+
+                wait_for = None
+                if queue:
+                    wait_for = max(0.05, min(entry[0] for entry in queue) - now)
+                finished, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job, started, order = running.pop(future)
+                    status, info = future.result()
+                    elapsed = time.monotonic() - started
+
+                    if status == "transient" and attempts[job.name] <= job.retries:
+                        delay = RETRY_BACKOFF * 2 ** (attempts[job.name] - 1)
+                        print(f"   🔁 {job.name}: {info.get('error')} - retrying in {delay:.0f}s")
+                        heapq.heappush(queue, (time.monotonic() + delay, job.priority, order, job))
+                        continue
+
+                    done += 1
+                    results[job.name] = dict(
+                        info,
+                        status="success" if status == "success" else "failed",
+                        attempts=attempts[job.name],
+                        priority=job.priority,
+                        started=round(first_start[job.name], 3),
+                        seconds=round(elapsed, 3),
+                        output=job.output
+                    )
+                    self._report_progress(done, job.name)
+
+        self.total_seconds = time.monotonic() - start
+        self.save_timing(results)
+        return results
+
+    def save_timing(self, results):
+        if not self.timing_file:
+            return
+        timing = {
+            "timestamp": datetime.now().isoformat(),
+            "max_parallel": self.max_parallel,
+            "total_seconds": round(self.total_seconds, 3),
+            # Serial time is what the same jobs would have cost one after another
+            "serial_seconds": round(sum(r["seconds"] for r in results.values()), 3),
+            "jobs": {name: {k: v for k, v in r.items() if k != "result"} for name, r in results.items()}
+        }
+        try:
+            os.makedirs(os.path.dirname(self.timing_file) or ".", exist_ok=True)
+            tmp = self.timing_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(timing, f, indent=4, default=str)
+            os.replace(tmp, self.timing_file)
+        except OSError as e:
+            print(f"⚠️ Could not save extraction timing: {e}")
+
+
+def print_timing_summary(results, total_seconds):
+    """Per-artifact timing table, slowest first."""
+    print(f"\n{'Artifact':<28} {'Status':<8} {'Tries':>5} {'Start':>8} {'Time':>8}")
+    print("-" * 61)
+    for name, r in sorted(results.items(), key=lambda item: -item[1]["seconds"]):
+        print(f"{name:<28} {r['status']:<8} {r['attempts']:>5} {r['started']:>7.1f}s {r['seconds']:>7.1f}s")
+    serial = sum(r["seconds"] for r in results.values())
+    print("-" * 61)
+    print(f"⏱️  {total_seconds:.1f}s wall for {serial:.1f}s of adb work "
+          f"({serial / total_seconds if total_seconds else 1:.1f}x)")
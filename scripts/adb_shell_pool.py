@@ -0,0 +1,306 @@
+"""
+adb_shell_pool.py
+
+Pool of persistent `adb shell` sessions.
+
+Each `adb shell ...` call starts a host adb process and a new shell on the
+device, which costs hundreds of ms. Here a few long-lived shells are kept open
+and commands are written to their stdin. The end of each command's output is
+marked by a random sentinel line that carries the exit code, so small queries
+(getprop, ls, which su) come back in milliseconds.
+
+Devices with shell_v2 get `adb shell -T` (no PTY, separate stderr). Older
+devices always attach a PTY to an interactive shell: echo and prompts are
+switched off when the session starts, \r\n is turned back into \n and any
+echoed input is dropped, and stderr arrives merged into stdout.
+
+Results are subprocess.CompletedProcess objects (text stdout/stderr,
+returncode), so callers read them like subprocess.run output. A timeout raises
+subprocess.TimeoutExpired and the session is discarded.
+
+Usage:
+    from adb_shell_pool import adb_shell
+    result = adb_shell("getprop ro.build.version.release", timeout=10)
+    print(result.returncode, result.stdout.strip())
+
+The adb executable can be swapped (ADB_PATH env or AdbShellPool(adb=...)),
+e.g. for a local stub that runs /bin/sh.
+"""
+
+import os
+import time
+import uuid
+import queue
+import atexit
+import threading
+import subprocess
+
+ADB_PATH = os.environ.get("ADB_PATH", "adb")
+ADB_SHELL_POOL_SIZE = int(os.environ.get("ADB_SHELL_POOL_SIZE", "4"))
+READ_SIZE = 64 * 1024
+
+
+class AdbShellError(Exception):
+    """The shell session ended unexpectedly (device gone, adb server restarted, ...)."""
+
+
+def _pump(stream, chunks):
+    """Reader thread: move everything from a pipe into a queue; None marks EOF."""
+    try:
+        while True:
+            data = stream.read(READ_SIZE)
+            if not data:
+                break
+            chunks.put(data)
+    except (OSError, ValueError):
+        pass
+    chunks.put(None)
+
+
+def _adb_cmd(serial=None, adb=None):
+    cmd = [adb or ADB_PATH]
+    if serial:
+        cmd += ["-s", serial]
+    return cmd
+
+
+def supports_shell_v2(serial=None, adb=None):
+    """True/False from `adb features`, None if it could not be asked (adb or device missing)."""
+    try:
+        result = subprocess.run(_adb_cmd(serial, adb) + ["features"], stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return "shell_v2" in result.stdout.split()
+
+
+class AdbShellSession:
+    """One persistent `adb shell` process."""
+
+    def __init__(self, serial=None, adb=None, shell_v2=None):
+        if shell_v2 is None:
+            shell_v2 = supports_shell_v2(serial, adb)
+        self.legacy = not shell_v2
+        cmd = _adb_cmd(serial, adb) + ["shell"]
+        if not self.legacy:
+            # No PTY: no echo, no \r\n, stderr kept apart
+            cmd.append("-T")
+        # Raises FileNotFoundError when adb is not installed, like subprocess.run
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, bufsize=0)
+        # Reader threads keep both pipes drained and make timeouts portable (no select() on Windows pipes)
+        self.stdout_chunks = queue.Queue()
+        self.stderr_chunks = queue.Queue()
+        for stream, chunks in ((self.proc.stdout, self.stdout_chunks), (self.proc.stderr, self.stderr_chunks)):
+            threading.Thread(target=_pump, args=(stream, chunks), daemon=True).start()
+        self.broken = False
+        if self.legacy:
+            try:
+                self._quiet_pty()
+            except Exception:
+                self.proc.kill()
+                self.proc.wait()
+                raise
+
+    def _quiet_pty(self, timeout=10):
+        """Legacy shells run on a PTY: turn off echo, \n -> \r\n and prompts, then skip the banner."""
+        token = uuid.uuid4().hex
+        # The marker is assembled by printf so the echoed line itself never matches it
+        script = (f"stty -echo -onlcr 2>/dev/null; PS1=''; PS2=''; "
+                  f"printf '__ADB_POOL_%s__\\n' {token}\n")
+        try:
+            self.proc.stdin.write(script.encode("utf-8"))
+            self.proc.stdin.flush()
+        except OSError as e:
+            self.broken = True
+            raise AdbShellError(self._drain_stderr() or str(e))
+        out = bytearray()
+        deadline = time.monotonic() + timeout
+        pos = self._read_until(self.stdout_chunks, out, f"__ADB_POOL_{token}__".encode(), deadline, "stty", timeout)
+        self._read_until(self.stdout_chunks, out, b"\n", deadline, "stty", timeout, start=pos)
+
+    def _read_until(self, chunks, buffer, marker, deadline, command, timeout, start=0):
+        """Read from chunks into buffer until marker appears (at or after start). Returns its index."""
+        pos = buffer.find(marker, start)
+        while pos < 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.broken = True
+                raise subprocess.TimeoutExpired(command, timeout)
+            try:
+                data = chunks.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if data is None:
+                self.broken = True
+                raise AdbShellError(self._drain_stderr() or "adb shell session closed")
+            buffer += data
+            # Only the new data (and a marker split across the chunk boundary) can hold it
+            pos = buffer.find(marker, max(start, len(buffer) - len(data) - len(marker) + 1))
+        return pos
+
+    def _drain_stderr(self):
+        data = bytearray()
+        while True:
+            try:
+                chunk = self.stderr_chunks.get_nowait()
+            except queue.Empty:
+                break
+            if chunk:
+                data += chunk
+        return data.decode("utf-8", errors="replace").strip()
+
+    def run(self, command, timeout=10):
+        sentinel = f"__ADB_POOL_{uuid.uuid4().hex}__".encode()
+        # The subshell keeps cd/export/exit from leaking into (or ending) the pooled shell, and
+        # stdin is /dev/null so a command can never swallow the commands after it.
+        # The stderr sentinel goes first: without shell_v2 stderr is merged into stdout and it
+        # then shows up there, ahead of the exit code line. The leading \n puts the exit code
+        # line on its own line even without trailing newline output.
+        script = (f"( {command}\n) </dev/null; __adb_pool_rc=$?; printf '%s\\n' {sentinel.decode()} >&2; "
+                  f"printf '\\n%s %d\\n' {sentinel.decode()} $__adb_pool_rc\n")
+        try:
+            self.proc.stdin.write(script.encode("utf-8"))
+            self.proc.stdin.flush()
+        except OSError as e:
+            self.broken = True
+            raise AdbShellError(self._drain_stderr() or str(e))
+
+        deadline = time.monotonic() + timeout
+        out = bytearray()
+        marker = b"\n" + sentinel + b" "
+        pos = self._read_until(self.stdout_chunks, out, marker, deadline, command, timeout)
+        end = self._read_until(self.stdout_chunks, out, b"\n", deadline, command, timeout, start=pos + len(marker))
+        returncode = int(out[pos + len(marker):end])
+
+        if self.legacy:
+            # Without stty (old toolbox builds) the PTY still echoes the script and writes \r\n
+            out = out[:end + 1].replace(b"\r\n", b"\n")
+            pos = out.rfind(marker)
+            echo = script.encode("utf-8")
+            if out.startswith(echo):
+                out, pos = out[len(echo):], pos - len(echo)
+
+        merged = out.rfind(sentinel + b"\n", 0, pos + 1)
+        if merged >= 0:
+            # Legacy device (no shell_v2): stderr arrived interleaved with stdout
+            stdout, stderr = out[:merged], b""
+        else:
+            err = bytearray()
+            epos = self._read_until(self.stderr_chunks, err, sentinel + b"\n", deadline, command, timeout)
+            stdout, stderr = out[:pos], err[:epos]
+        return subprocess.CompletedProcess(
+            command, returncode,
+            stdout=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace")
+        )
+
+    def close(self):
+        try:
+            # A PTY shell does not end on stdin EOF
+            self.proc.stdin.write(b"exit\n")
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class AdbShellPool:
+    """Up to size persistent shells to one device, shared between threads."""
+
+    def __init__(self, serial=None, size=ADB_SHELL_POOL_SIZE, adb=None):
+        self.serial = serial
+        self.size = max(1, size)
+        self.adb = adb
+        self.shell_v2 = None
+        self.idle = []
+        self.count = 0
+        self.condition = threading.Condition()
+
+    def _acquire(self):
+        with self.condition:
+            while not self.idle and self.count >= self.size:
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.count += 1
+        try:
+            if self.shell_v2 is None:
+                # Asked once per pool; left unknown while adb or the device is missing
+                self.shell_v2 = supports_shell_v2(self.serial, self.adb)
+            return AdbShellSession(self.serial, self.adb, shell_v2=bool(self.shell_v2))
+        except Exception:
+            self._release(None)
+            raise
+
+    def _release(self, session):
+        with self.condition:
+            if session is None or session.broken:
+                self.count -= 1
+            else:
+                self.idle.append(session)
+            self.condition.notify()
+
+    def run(self, command, timeout=10, check=False):
+        """
+        Run a shell command on the device. Returns subprocess.CompletedProcess.
+
+        Raises subprocess.TimeoutExpired, subprocess.CalledProcessError (check=True
+        and nonzero exit), AdbShellError (no device / session lost) and
+        FileNotFoundError (adb missing).
+        """
+        session = self._acquire()
+        try:
+            result = session.run(command, timeout)
+        finally:
+            if session.broken:
+                session.proc.kill()
+                session.proc.wait()
+            self._release(session)
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+        return result
+
+    def close(self):
+        with self.condition:
+            sessions, self.idle = self.idle, []
+            self.count -= len(sessions)
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_shell_pool(serial=None):
+    """Shared pool for a device (None = adb's default device)."""
+    with _pools_lock:
+        if serial not in _pools:
+            _pools[serial] = AdbShellPool(serial)
+        return _pools[serial]
+
+
+def adb_shell(command, timeout=10, check=False, serial=None):
+    """Run one shell command through the shared pool."""
+    return get_shell_pool(serial).run(command, timeout=timeout, check=check)
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -12,14 +12,19 @@ if sys.platform == 'win32':
         import io
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from adb_shell_pool import adb_shell
+from incremental_logcat import capture_logcat, print_capture
+
 # Ensure logs directory exists
 os.makedirs("logs", exist_ok=True)
 
-def get_logcat():
+def get_logcat(incremental=False):
     """
     Extract Android logcat logs using auto-detected buffer duration.
     Detects the oldest available log and extracts all available logs.
     Falls back to 7 days if detection fails.
+    incremental=True only pulls entries newer than the previous extraction.
     """
     from scripts.detect_log_buffer import detect_buffer
     
@@ -38,112 +43,104 @@ def get_logcat():
             print(f"⚠️ Could not detect buffer duration: {buffer_info.get('error', 'Unknown error')}")
             print(f"   Using fallback: 7 days")
         
-        with open("logs/android_logcat.txt", "w", encoding="utf-8") as f:
-            # Extract ALL available logs with -b all to capture main, system, radio, events, crash
-            subprocess.run(["adb", "logcat", "-b", "all", "-d", "-v", "time"],
-                           stdout=f, check=True)
+        # Extract ALL available logs with -b all to capture main, system, radio, events, crash
+        result = capture_logcat(["all"], "logs/android_logcat.txt", fmt="time",
+                                incremental=incremental, label="logcat (all buffers)")
+        if result["returncode"] != 0:
+            raise subprocess.CalledProcessError(result["returncode"], ["adb", "logcat", "-b", "all"], stderr=result["stderr"])
+        print_capture(result)
         
+        buffer_info['lines'] = result['total_lines']
+        buffer_info['sha256'] = result['sha256']
+        # 'success' reports the extraction (the scheduler checks it); 'detected' the buffer detection
+        buffer_info['detected'] = buffer_info['success']
+        buffer_info['success'] = True
         return buffer_info  # Return info for GUI display
     
+    # The working file is left alone on failure: it may hold the history an
+    # incremental capture appends to, and its size is checked before resuming
     except FileNotFoundError:
-        error_msg = "⚠️ ADB not found. Please install Android SDK Platform Tools.\n"
-        print(error_msg)
-        with open("logs/android_logcat.txt", "w", encoding="utf-8") as f:
-            f.write(error_msg)
+        print("⚠️ ADB not found. Please install Android SDK Platform Tools.\n")
         return {'success': False, 'error': 'ADB not found'}
     
     except Exception as e:
-        error_msg = f"⚠️ Failed to extract logcat: {str(e)}\n"
-        print(error_msg)
-        with open("logs/android_logcat.txt", "w", encoding="utf-8") as f:
-            f.write(error_msg)
+        print(f"⚠️ Failed to extract logcat: {str(e)}\n")
         return {'success': False, 'error': str(e)}
 
 def get_call_logs():
     """
     Extract Android call logs using the adb content query command.
     """
+    error = None
     try:
-        result = subprocess.run(
-            ["adb", "shell", "content", "query", "--uri", "content://call_log/calls"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True
-        )
+        result = adb_shell("content query --uri content://call_log/calls", timeout=120, check=True)
         output = result.stdout if result.stdout else "⚠️ No call logs found."
     except Exception as e:
         output = f"⚠️ Failed to extract call logs: {str(e)}"
+        error = str(e)
     with open("logs/call_logs.txt", "w", encoding="utf-8") as f:
         f.write(output)
+    if error:
+        # The placeholder is written for the viewers; the scheduler retries or reports the failure
+        return {'success': False, 'error': error}
 
 def get_sms_logs():
     """
     Extract Android SMS logs using the adb content query command.
     """
+    error = None
     try:
-        result = subprocess.run(
-            ["adb", "shell", "content", "query", "--uri", "content://sms"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True
-        )
+        result = adb_shell("content query --uri content://sms", timeout=120, check=True)
         output = result.stdout if result.stdout else "⚠️ No SMS logs found."
     except Exception as e:
         output = f"⚠️ Failed to extract SMS logs: {str(e)}"
+        error = str(e)
     print("🔍 STDOUT:\n", output)
     with open("logs/sms_logs.txt", "w", encoding="utf-8") as f:
         f.write(output)
+    if error:
+        return {'success': False, 'error': error}
 
 def get_location_logs():
     """
     Extract Android location history using dumpsys location.
     """
+    error = None
     try:
         # dumpsys location provides last known locations and other location state
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "location"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True
-        )
+        result = adb_shell("dumpsys location", timeout=120, check=True)
         output = result.stdout if result.stdout else "⚠️ No location logs found."
     except Exception as e:
         output = f"⚠️ Failed to extract location logs: {str(e)}"
+        error = str(e)
     
     with open("logs/location_logs.txt", "w", encoding="utf-8") as f:
         f.write(output)
+    if error:
+        return {'success': False, 'error': error}
 
 def get_contacts():
     """
     Extract Android contacts using the adb content query command.
     Retrieves contact names, phone numbers, and email addresses.
     """
+    error = None
     try:
-        result = subprocess.run(
-            ["adb", "shell", "content", "query", "--uri", "content://com.android.contacts/data"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30  # Add timeout to prevent hanging
-        )
+        result = adb_shell("content query --uri content://com.android.contacts/data", timeout=30, check=True)  # Add timeout to prevent hanging
         output = result.stdout if result.stdout else "⚠️ No contacts found."
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
         output = "⚠️ Contact extraction timed out. This may happen on devices with many contacts."
+        error = str(e)
     except Exception as e:
         output = f"⚠️ Failed to extract contacts: {str(e)}"
+        error = str(e)
     
     with open("logs/contacts.txt", "w", encoding="utf-8") as f:
         f.write(output)
     
     print(f"📇 Contact extraction complete")
+    if error:
+        return {'success': False, 'error': error}
 
 def trigger_location_update():
     """
@@ -8,9 +8,13 @@ the time span of available logs.
 
 import subprocess
 import re
+import os
 from datetime import datetime, timedelta
 import sys
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from adb_shell_pool import adb_shell
+
 # Fix Windows encoding issues with emoji characters
 if sys.platform == 'win32':
     try:
@@ -153,29 +157,15 @@ def get_device_info():
         }
     """
     try:
+        # Small queries go over the pooled persistent shell
         # Get device model
-        model_result = subprocess.run(
-            ['adb', 'shell', 'getprop', 'ro.product.model'],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
+        model_result = adb_shell('getprop ro.product.model', timeout=15)
         
         # Get Android version
-        version_result = subprocess.run(
-            ['adb', 'shell', 'getprop', 'ro.build.version.release'],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
+        version_result = adb_shell('getprop ro.build.version.release', timeout=15)
         
         # Get Kernel version
-        kernel_result = subprocess.run(
-            ['adb', 'shell', 'uname', '-r'],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
+        kernel_result = adb_shell('uname -r', timeout=15)
         
         device_model = model_result.stdout.strip() if model_result.returncode == 0 else 'Unknown'
         android_version = version_result.stdout.strip() if version_result.returncode == 0 else 'Unknown'
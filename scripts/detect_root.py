@@ -7,18 +7,16 @@ Detects if the connected Android device is rooted using multiple detection metho
 import subprocess
 import json
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from adb_shell_pool import adb_shell
+
 def run_adb_command(command):
-    """Execute ADB command and return output"""
+    """Execute ADB shell command (over a pooled persistent shell) and return output"""
     try:
-        result = subprocess.run(
-            f"adb shell {command}",
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        result = adb_shell(command, timeout=10)
         return {
             "success": True,
             "output": result.stdout.strip(),
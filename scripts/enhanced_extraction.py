@@ -6,6 +6,13 @@ Adds dumpsys commands for App Sessionizer, Beacon Map, and Power Forensics
 import subprocess
 import os
 import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from adb_shell_pool import adb_shell
+from incremental_logcat import capture_logcat
+from adb_scheduler import (AdbScheduler, print_timing_summary,
+                           PRIORITY_LOGCAT, PRIORITY_QUERY, PRIORITY_DUMPSYS, PRIORITY_HEAVY)
 
 # Force UTF-8 encoding for stdout to prevent Windows cp1252 errors
 if sys.platform == "win32" and hasattr(sys.stdout, 'reconfigure'):
@@ -18,20 +25,13 @@ def get_usage_stats():
     """
     try:
         print("📊 Extracting usage statistics...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "usagestats"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys usagestats", timeout=30, check=True)
         with open("logs/usage_stats.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ Usage statistics extracted")
     except Exception as e:
         print(f"⚠️  Failed to extract usage stats: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_recent_tasks():
     """
@@ -40,20 +40,13 @@ def get_recent_tasks():
     """
     try:
         print("📋 Extracting recent tasks...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "activity", "recents"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys activity recents", timeout=30, check=True)
         with open("logs/recent_tasks.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ Recent tasks extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract recent tasks: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_wifi_networks():
     """
@@ -62,20 +55,13 @@ def get_wifi_networks():
     """
     try:
         print("📡 Extracting WiFi networks...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "wifi"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys wifi", timeout=30, check=True)
         with open("logs/wifi_dump.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ WiFi data extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract WiFi data: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_bluetooth_devices():
     """
@@ -84,20 +70,13 @@ def get_bluetooth_devices():
     """
     try:
         print("🔵 Extracting Bluetooth devices...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "bluetooth_manager"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys bluetooth_manager", timeout=30, check=True)
         with open("logs/bluetooth_dump.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ Bluetooth data extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract Bluetooth data: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_battery_history():
     """
@@ -106,20 +85,13 @@ def get_battery_history():
     """
     try:
         print("🔋 Extracting battery history...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "batterystats"],
-           capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys batterystats", timeout=30, check=True)
         with open("logs/battery_history.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ Battery history extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract battery history: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_network_stats():
     """
@@ -128,20 +100,13 @@ def get_network_stats():
     """
     try:
         print("🌐 Extracting network statistics...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "netstats"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys netstats", timeout=30, check=True)
         with open("logs/network_stats.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ Network statistics extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract network stats: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_notification_history():
     """
@@ -151,20 +116,13 @@ def get_notification_history():
     """
     try:
         print("🔔 Extracting notification history (Android 13/14)...")
-        result = subprocess.run(
-            ["adb", "shell", "dumpsys", "notification", "--noredact"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=30
-        )
+        result = adb_shell("dumpsys notification --noredact", timeout=30, check=True)
         with open("logs/notification_history.txt", "w", encoding="utf-8") as f:
             f.write(result.stdout)
         print("✅ Notification history extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract notification history: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_device_identifiers():
     """
@@ -175,26 +133,10 @@ def get_device_identifiers():
         print("📱 Extracting device identifiers (IMEI, Serial)...")
         
         # Get IMEI via dumpsys iphonesubinfo
-        imei_result = subprocess.run(
-            ["adb", "shell", "dumpsys", "iphonesubinfo"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=10
-        )
+        imei_result = adb_shell("dumpsys iphonesubinfo", timeout=10, check=True)
         
         # Get device properties
-        props_result = subprocess.run(
-            ["adb", "shell", "getprop"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=10
-        )
+        props_result = adb_shell("getprop", timeout=10, check=True)
         
         # Save both outputs
         with open("logs/device_identifiers.txt", "w", encoding="utf-8") as f:
@@ -206,6 +148,7 @@ def get_device_identifiers():
         print("✅ Device identifiers extracted")
     except Exception as e:
         print(f"⚠️ Failed to extract device identifiers: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_dual_space_apps():
     """
@@ -216,37 +159,13 @@ def get_dual_space_apps():
         print("👥 Detecting dual space / cloned apps...")
         
         # Get apps in main profile (user 0)
-        result_main = subprocess.run(
-            ["adb", "shell", "pm", "list", "packages", "--user", "0"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=True,
-            timeout=15
-        )
+        result_main = adb_shell("pm list packages --user 0", timeout=15, check=True)
         
         # Get apps in secondary profiles (user 10, 999)
         # User 999 is commonly used for "Dual Apps" on Xiaomi/Samsung
-        result_dual_999 = subprocess.run(
-            ["adb", "shell", "pm", "list", "packages", "--user", "999"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=False,  # Don't fail if user doesn't exist
-            timeout=15
-        )
+        result_dual_999 = adb_shell("pm list packages --user 999", timeout=15, check=False)  # Don't fail if user doesn't exist
         
-        result_dual_10 = subprocess.run(
-            ["adb", "shell", "pm", "list", "packages", "--user", "10"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=False,
-            timeout=15
-        )
+        result_dual_10 = adb_shell("pm list packages --user 10", timeout=15, check=False)
         
         # Save all results
         with open("logs/dual_space_apps.txt", "w", encoding="utf-8") as f:
@@ -259,6 +178,7 @@ def get_dual_space_apps():
         print("✅ Dual space detection complete")
     except Exception as e:
         print(f"⚠️ Failed to detect dual space apps: {e}")
+        return {"success": False, "error": str(e)}
 
 def get_all_packages_with_uids():
     """
@@ -267,30 +187,14 @@ def get_all_packages_with_uids():
     """
     try:
         print("📦 Extracting full package list with UIDs...")
-        result = subprocess.run(
-            ["adb", "shell", "pm", "list", "packages", "-f", "-U"],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            check=False, # Verify manually
-            timeout=20
-        )
+        result = adb_shell("pm list packages -f -U", timeout=20, check=False)  # Verify manually
         
         output_content = result.stdout.strip()
         
         # Fallback if empty or failed
         if result.returncode != 0 or not output_content:
             print("⚠️ Complex package list failed (empty/error). Trying simple fallback...")
-            result_fallback = subprocess.run(
-                ["adb", "shell", "pm", "list", "packages"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                check=True,
-                timeout=20
-            )
+            result_fallback = adb_shell("pm list packages", timeout=20, check=True)
             output_content = result_fallback.stdout.strip()
             
         if not output_content:
@@ -302,14 +206,18 @@ def get_all_packages_with_uids():
         print(f"✅ Full package list extracted ({len(output_content.splitlines())} entries)")
     except Exception as e:
         print(f"⚠️ Failed to extract full package list: {e}")
+        return {"success": False, "error": str(e)}
 
-def get_detailed_system_dump():
+def get_detailed_system_dump(scheduler=None):
     """
     EXTREME EXTRACTION: Pulls deep system state
     - System Properties (getprop)
     - Process List (ps -A)
     - Settings (System/Secure/Global)
     - Dumpsys: Window, Alarm, Package, Location, Account, Clipboard, Content, Mount, JobScheduler
+    
+    The commands are queued on scheduler if given (run by the caller),
+    otherwise they run concurrently here.
     """
     print("\n" + "-"*60)
     print("🛠️ DEEP SYSTEM STATE EXTRACTION")
@@ -338,27 +246,39 @@ def get_detailed_system_dump():
         ("dumpsys input", ["adb", "shell", "dumpsys", "input"], "dump_input.txt"),
         ("dumpsys dropbox", ["adb", "shell", "dumpsys", "dropbox", "--print"], "dump_dropbox.txt") # Crash history
     ]
+    # The two big dumps go last so they don't hold up the quick ones
+    heavy = {"dumpsys package", "dumpsys dropbox"}
 
+    own_scheduler = scheduler is None
+    if own_scheduler:
+        scheduler = AdbScheduler()
     for name, cmd, outfile in commands:
-        try:
-            print(f"📥 Extracting {name}...")
-            res = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors="replace", check=False, timeout=60)
-            if res.returncode == 0:
-                with open(os.path.join("logs", outfile), "w", encoding="utf-8") as f:
-                    f.write(res.stdout)
-                print(f"   ✅ Saved to {outfile}")
-            else:
-                print(f"   ⚠️ Command failed: {res.stderr[:100]}...")
-        except Exception as e:
-            print(f"   ❌ Error executing {name}: {e}")
+        priority = PRIORITY_HEAVY if name in heavy else \
+            PRIORITY_DUMPSYS if cmd[2] == "dumpsys" else PRIORITY_QUERY
+        scheduler.add(name, cmd=cmd, output=os.path.join("logs", outfile), priority=priority, timeout=60)
+    
+    if own_scheduler:
+        results = scheduler.run()
+        report_scheduled_results(results)
+        return results
+
+def report_scheduled_results(results):
+    """Print one line per scheduled artifact."""
+    for name, r in results.items():
+        if r["status"] == "success":
+            if r.get("output"):
+                print(f"   ✅ {name}: saved to {os.path.basename(r['output'])}")
+        else:
+            print(f"   ⚠️ {name} failed after {r['attempts']} attempt(s): {r.get('error', '')[:100]}")
 
-def get_logcat_dump():
+def get_logcat_dump(percent=34, incremental=False):
     """
     Extract Android Logcat for Fake Log Detection
     Captures:
     - Main (App crashes, system messages)
     - Radio (Telephony, Call states)
     - Events (Activity manager, screen on/off)
+    incremental=True only pulls entries newer than the previous extraction.
     """
     try:
         print("📜 Extracting System Logs (Logcat)...")
@@ -368,23 +288,34 @@ def get_logcat_dump():
             ("events", "android_logcat_events.txt")
         ]
         
+        results = {}
         for buffer_name, outfile in buffers:
             print(f"   - Dumping {buffer_name} buffer...")
-            result = subprocess.run(
-                ["adb", "logcat", "-b", buffer_name, "-d"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                check=False,
-                timeout=15
+            # Streamed to disk; only a stalled adb (no output for 15s) is killed
+            result = capture_logcat(
+                [buffer_name],
+                os.path.join("logs", outfile),
+                incremental=incremental,
+                label=f"{buffer_name} buffer",
+                percent=percent,
+                idle_timeout=15
             )
-            with open(os.path.join("logs", outfile), "w", encoding="utf-8") as f:
-                f.write(result.stdout)
+            results[buffer_name] = result
+            status = " (stalled, partial)" if result["timed_out"] else ""
+            new = "new " if result["mode"] == "incremental" else ""
+            print(f"     {result['lines']:,} {new}lines, {result['bytes'] / 1024:.1f} KB, "
+                  f"SHA-256 {result['sha256'][:16]}...{status}")
+            if result.get("gap_possible"):
+                print(f"     ⚠️ No overlap with the previous {buffer_name} capture, entries may be missing")
+        
+        # Line counts and hashes for the pipeline stats (no need to re-read the files)
+        with open(os.path.join("logs", "logcat_extraction.json"), "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
                 
         print("✅ Logcat extracted successfully")
     except Exception as e:
         print(f"⚠️ Failed to extract logcat: {e}")
+        return {"success": False, "error": str(e)}
 def update_progress(percent, message):
     """
     Update extraction progress for frontend smooth bar
@@ -405,60 +336,47 @@ def update_progress(percent, message):
         with open("logs/python_progress_error.txt", "a") as f:
             f.write(f"Error updating progress: {e}\n")
 
-def extract_all_enhanced_data():
+def extract_all_enhanced_data(incremental=False):
     """
     Main function to extract all enhanced forensic data
     Call this during log extraction phase
+    incremental=True appends only new logcat entries to the previous extraction
     """
     print("\n" + "="*60)
     print("🔬 ENHANCED FORENSIC DATA EXTRACTION")
     print("="*60 + "\n")
     
-    update_progress(10, "Extracting App Usage Stats...")
-    # App Sessionizer enhancements
-    get_usage_stats()
+    # Independent adb queries run concurrently; the scheduler moves the
+    # progress bar from 10% to 40% as artifacts complete
+    update_progress(10, "Extracting enhanced forensic data...")
+    scheduler = AdbScheduler(progress=(10, 40))
     
-    update_progress(12, "Extracting Recent Tasks...")
-    get_recent_tasks()
+    # Logcat first: the ring buffer keeps rotating while we extract
+    scheduler.add("logcat", run=lambda: get_logcat_dump(percent=None, incremental=incremental), priority=PRIORITY_LOGCAT)
     
-    update_progress(15, "Scanning WiFi Networks...")
+    # App Sessionizer enhancements
+    scheduler.add("usage stats", run=get_usage_stats, priority=PRIORITY_DUMPSYS)
+    scheduler.add("recent tasks", run=get_recent_tasks, priority=PRIORITY_DUMPSYS)
     # Beacon Map enhancements
-    get_wifi_networks()
-    
-    update_progress(18, "Scanning Bluetooth Devices...")
-    get_bluetooth_devices()
-    
-    update_progress(20, "Extracting Battery History...")
+    scheduler.add("wifi networks", run=get_wifi_networks, priority=PRIORITY_DUMPSYS)
+    scheduler.add("bluetooth", run=get_bluetooth_devices, priority=PRIORITY_DUMPSYS)
     # Power Forensics enhancements
-    get_battery_history()
-    
-    update_progress(22, "Extracting Network Stats...")
+    scheduler.add("battery history", run=get_battery_history, priority=PRIORITY_DUMPSYS)
     # Network Intelligence enhancements
-    get_network_stats()
+    scheduler.add("network stats", run=get_network_stats, priority=PRIORITY_DUMPSYS)
     
     # 🆕 ANDROID 13/14 ENHANCEMENTS
-    print("\n" + "-"*60)
-    print("🆕 FOOL-PROOF FORENSICS")
-    print("-" * 60 + "\n")
-    
-    update_progress(25, "Extracting Notification History...")
-    get_notification_history()  # UPI/OTP Correlator
-    
-    update_progress(28, "Extracting Device Identifiers...")
-    get_device_identifiers()    # Section 65B Certificate
-    
-    update_progress(30, "Detecting Dual Space Apps...")
-    get_dual_space_apps()       # Mule Account Scanner
-    
-    update_progress(32, "Extracting Full Package List...")
-    get_all_packages_with_uids() # 🆕 Full Package Dump (The Fix)
-    
-    update_progress(34, "Extracting System Logs (Ghost Detection)...")
-    get_logcat_dump()
+    scheduler.add("notification history", run=get_notification_history, priority=PRIORITY_DUMPSYS)  # UPI/OTP Correlator
+    scheduler.add("device identifiers", run=get_device_identifiers, priority=PRIORITY_QUERY)       # Section 65B Certificate
+    scheduler.add("dual space apps", run=get_dual_space_apps, priority=PRIORITY_QUERY)             # Mule Account Scanner
+    scheduler.add("package list", run=get_all_packages_with_uids, priority=PRIORITY_QUERY)         # 🆕 Full Package Dump (The Fix)
     
     # 🔥 PULL EVERYTHING (Deep Dump)
-    update_progress(35, "Creating Deep System Dump...")
-    get_detailed_system_dump()
+    get_detailed_system_dump(scheduler)
+    
+    results = scheduler.run()
+    report_scheduled_results(results)
+    print_timing_summary(results, scheduler.total_seconds)
     
     update_progress(40, "Enhanced Extraction Complete")
     
@@ -468,4 +386,4 @@ def extract_all_enhanced_data():
 
 if __name__ == "__main__":
     os.makedirs("logs", exist_ok=True)
-    extract_all_enhanced_data()
+    extract_all_enhanced_data(incremental="--incremental" in sys.argv[1:])
@@ -10,6 +10,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from stream_extract import stream_command_to_file
+
 class TimelineLogExtractor:
     def __init__(self, output_dir="logs/timeline"):
         self.output_dir = output_dir
@@ -100,24 +103,24 @@ class TimelineLogExtractor:
             # -b main,system,events,radio: all relevant buffers
             # -d: dump and exit
             # -v threadtime: timestamp format for parsing
-            result = subprocess.run(
+            result = stream_command_to_file(
                 ["adb", "logcat", "-b", "main", "-b", "system", "-b", "events", "-b", "radio", "-d", "-v", "threadtime"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30
+                str(output_file),
+                label="logcat (all buffers)",
+                percent=None,
+                idle_timeout=30
             )
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(result.stdout)
+            if result["timed_out"]:
+                print(f"  ❌ Timeout extracting logcat ({result['lines']} lines saved)")
+                return False
+            if result["returncode"] != 0:
+                print(f"  ❌ Error extracting logcat: adb exited with {result['returncode']} {result['stderr'][:200]}")
+                return False
             
-            line_count = len(result.stdout.split('\n'))
-            print(f"  ✓ Saved logcat: {line_count} lines")
+            print(f"  ✓ Saved logcat: {result['lines']} lines (SHA-256 {result['sha256'][:16]}...)")
             return True
             
-        except subprocess.TimeoutExpired:
-            print("  ❌ Timeout extracting logcat")
-            return False
         except Exception as e:
             print(f"  ❌ Error extracting logcat: {e}")
             return False
@@ -0,0 +1,304 @@
+"""
+incremental_logcat.py
+
+Incremental logcat acquisition.
+
+A full dump re-reads the whole ring buffer on every extraction. In incremental
+mode the last captured timestamp and the fingerprints of the lines carrying
+that timestamp are remembered per output file; the next run asks adb only for
+entries since then (`logcat -T`), drops the overlap with the previous capture,
+and then:
+
+- writes the new entries to their own capture file
+  (android_logcat.capture_<YYYYmmdd_HHMMSS>.txt), hashed while it is written
+  and registered with EvidenceHasher
+- appends them to the working file (android_logcat.txt), so every reader sees
+  the whole history; if the working file is already in the evidence ledger or
+  Merkle manifest, its entries are updated (the manifest seal is incremental)
+
+If no overlap with the previous capture is found, the ring buffer rotated past
+it and entries in between may be lost; the capture is flagged gap_possible.
+
+State: logs/logcat_state.json
+
+Usage:
+    python incremental_logcat.py [--full] [--buffers main,system,...]
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "analysis"))
+from stream_extract import stream_command_to_file
+from evidence_hasher import EvidenceHasher
+from merkle_manifest import MerkleManifest
+
+STATE_FILE = "logcat_state.json"
+TAIL_WINDOW = 64 * 1024
+
+# "MM-DD HH:MM:SS.mmm" prefix shared by the time, threadtime and brief-with-time formats
+TIME_RE = re.compile(rb"^(\d\d-\d\d \d\d:\d\d:\d\d\.\d{3})")
+
+
+def line_time(line):
+    match = TIME_RE.match(line)
+    return match.group(1).decode() if match else None
+
+
+def fingerprint(line):
+    return hashlib.sha1(line.rstrip(b"\r\n")).hexdigest()[:16]
+
+
+def is_after(ts, last):
+    """ts later than last; logcat times carry no year, so Dec -> Jan counts as later."""
+    month, last_month = int(ts[:2]), int(last[:2])
+    if month < last_month - 6:
+        return True
+    if month > last_month + 6:
+        return False
+    return ts > last
+
+
+def read_tail_state(path):
+    """Last timestamp in a logcat file and the fingerprints of all lines with that timestamp."""
+    size = os.path.getsize(path)
+    window = TAIL_WINDOW
+    with open(path, "rb") as f:
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            lines = f.read().splitlines(keepends=True)
+            if start > 0:
+                lines = lines[1:]  # first line may be cut
+            last, boundary, complete = None, set(), start == 0
+            for line in reversed(lines):
+                ts = line_time(line)
+                if ts is None:
+                    continue
+                if last is None:
+                    last = ts
+                if ts != last:
+                    complete = True
+                    break
+                boundary.add(fingerprint(line))
+            if complete:
+                return {"last_time": last, "boundary": sorted(boundary)}
+            window *= 4
+
+
+def capture_file_name(output_file, when):
+    base, ext = os.path.splitext(output_file)
+    name = f"{base}.capture_{when:%Y%m%d_%H%M%S}{ext}"
+    n = 1
+    while os.path.exists(name):
+        n += 1
+        name = f"{base}.capture_{when:%Y%m%d_%H%M%S}_{n}{ext}"
+    return name
+
+
+class IncrementalLogcat:
+    """
+    Usage:
+        acquirer = IncrementalLogcat("logs")
+        result = acquirer.capture(["all"], "logs/android_logcat.txt", fmt="time")
+    """
+
+    def __init__(self, logs_dir="logs"):
+        self.logs_dir = logs_dir
+        self.state_file = os.path.join(logs_dir, STATE_FILE)
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        os.makedirs(self.logs_dir, exist_ok=True)
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(tmp, self.state_file)
+
+    def capture(self, buffers, output_file, fmt=None, incremental=True, label=None,
+                percent=None, idle_timeout=None):
+        """
+        Dump logcat buffers into output_file, incrementally when possible.
+
+        Returns the stream result (bytes, lines, sha256, returncode, ...) plus
+        mode (full | incremental), total_lines, and for incremental runs
+        capture_file, duplicates_skipped and gap_possible.
+        """
+        cmd = ["adb", "logcat"]
+        for buffer in buffers:
+            cmd += ["-b", buffer]
+        cmd.append("-d")
+        if fmt:
+            cmd += ["-v", fmt]
+
+        key = os.path.basename(output_file)
+        entry = self.state.get(key)
+        resumable = (incremental and entry and entry.get("last_time")
+                     and entry.get("cmd") == cmd and os.path.exists(output_file)
+                     and os.path.getsize(output_file) == entry.get("size"))
+        if incremental and not resumable:
+            print(f"   ℹ️ No resumable state for {key}, taking a full dump")
+
+        if not resumable:
+            # Dump next to the working file so a failed run leaves the previous one intact
+            part = output_file + ".part"
+            try:
+                result = stream_command_to_file(cmd, part, label=label or key, percent=percent,
+                                                idle_timeout=idle_timeout)
+            except FileNotFoundError:
+                if os.path.exists(part):
+                    os.remove(part)
+                raise
+            result["mode"] = "full"
+            result["total_lines"] = result["lines"]
+            if result["returncode"] != 0 and not result["timed_out"]:
+                os.remove(part)
+                return result
+            # A stalled dump still replaces the file (reported as partial) but is not resumable
+            os.replace(part, output_file)
+            result["file"] = output_file
+            if result["timed_out"]:
+                return result
+            self.state[key] = dict(read_tail_state(output_file), cmd=cmd, size=os.path.getsize(output_file),
+                                   lines=result["lines"], updated=datetime.now().isoformat(), captures=[])
+            self.save()
+            return result
+
+        delta = output_file + ".delta"
+        result = stream_command_to_file(cmd + ["-T", entry["last_time"]], delta, label=label,
+                                        percent=percent, idle_timeout=idle_timeout)
+        result["mode"] = "incremental"
+        if result["returncode"] != 0 or result["timed_out"]:
+            os.remove(delta)
+            result["total_lines"] = entry["lines"]
+            return result
+
+        result.update(self._append_delta(delta, output_file, entry))
+        os.remove(delta)
+        return result
+
+    def _append_delta(self, delta, output_file, entry):
+        """Drop the overlap with the previous capture, write the rest to a capture file and the working file."""
+        last, boundary = entry["last_time"], set(entry["boundary"])
+        capture = capture_file_name(output_file, datetime.now())
+        sha256 = hashlib.sha256()
+        new_lines = new_bytes = duplicates = 0
+        overlap_seen, started = False, False
+        tail_time, tail_boundary = last, set(boundary)
+
+        with open(output_file, "rb+") as base, open(delta, "rb") as src, open(capture, "wb") as cap:
+            base.seek(0, os.SEEK_END)
+            if base.tell():
+                base.seek(-1, os.SEEK_END)
+                if base.read(1) != b"\n":
+                    base.write(b"\n")
+            for line in src:
+                ts = line_time(line)
+                if not started:
+                    # Buffer banners and entries we already have
+                    if ts is None:
+                        continue
+                    if (ts == last and fingerprint(line) in boundary) or (ts != last and not is_after(ts, last)):
+                        duplicates += 1
+                        overlap_seen = True
+                        continue
+                    started = True
+                cap.write(line)
+                base.write(line)
+                sha256.update(line)
+                new_lines += 1
+                new_bytes += len(line)
+                if ts is not None:
+                    if ts != tail_time:
+                        tail_time, tail_boundary = ts, set()
+                    tail_boundary.add(fingerprint(line))
+
+        info = {
+            "lines": new_lines,
+            "bytes": new_bytes,
+            "sha256": sha256.hexdigest(),
+            "duplicates_skipped": duplicates,
+            "gap_possible": new_lines > 0 and not overlap_seen,
+            "total_lines": entry["lines"] + new_lines,
+            "capture_file": None
+        }
+        if not new_lines:
+            os.remove(capture)
+        else:
+            info["capture_file"] = capture
+            self._register(capture, info["sha256"], output_file)
+
+        entry.update(last_time=tail_time, boundary=sorted(tail_boundary), size=os.path.getsize(output_file),
+                     lines=info["total_lines"], updated=datetime.now().isoformat())
+        if new_lines:
+            entry.setdefault("captures", []).append({
+                "file": os.path.basename(capture), "time": entry["updated"], "lines": new_lines,
+                "bytes": new_bytes, "sha256": info["sha256"], "duplicates_skipped": duplicates,
+                "gap_possible": info["gap_possible"]
+            })
+        self.save()
+        return info
+
+    def _register(self, capture, digest, output_file):
+        """Hash ledger and Merkle manifest for a new capture (and the grown working file, if tracked)."""
+        logs_dir = os.path.dirname(capture) or "."
+        hasher = EvidenceHasher(logs_dir)
+        hasher.register_file(capture, "Incremental logcat capture", file_hash=digest)
+        if os.path.basename(output_file) in hasher.metadata["files"]:
+            hasher.register_file(output_file, hasher.get_file_description(os.path.basename(output_file)))
+
+        manifest = MerkleManifest(logs_dir)
+        manifest.seal(capture)
+        if os.path.basename(output_file) in manifest.data["files"]:
+            manifest.seal(output_file, incremental=True)
+        manifest.save()
+
+
+def capture_logcat(buffers, output_file, fmt=None, incremental=True, **kwargs):
+    """One capture with the state kept next to the output file."""
+    acquirer = IncrementalLogcat(os.path.dirname(output_file) or ".")
+    return acquirer.capture(buffers, output_file, fmt=fmt, incremental=incremental, **kwargs)
+
+
+def print_capture(result):
+    if result["mode"] == "full":
+        print(f"📜 Full dump: {result['lines']:,} lines, SHA-256 {result['sha256'][:16]}...")
+        return
+    if not result.get("capture_file"):
+        print(f"📜 No new entries ({result.get('duplicates_skipped', 0):,} already captured)")
+        return
+    print(f"📜 +{result['lines']:,} new lines -> {os.path.basename(result['capture_file'])} "
+          f"(SHA-256 {result['sha256'][:16]}..., {result['duplicates_skipped']:,} overlap lines skipped, "
+          f"{result['total_lines']:,} total)")
+    if result["gap_possible"]:
+        print("⚠️ No overlap with the previous capture: the log buffer rotated in between, entries may be missing")
+
+
+def main():
+    args = sys.argv[1:]
+    buffers = ["all"]
+    if "--buffers" in args:
+        buffers = args[args.index("--buffers") + 1].split(",")
+    os.makedirs("logs", exist_ok=True)
+    result = capture_logcat(buffers, os.path.join("logs", "android_logcat.txt"), fmt="time",
+                            incremental="--full" not in args, label="logcat")
+    if result["returncode"] != 0:
+        print(f"❌ adb logcat failed: {result['stderr']}")
+        sys.exit(1)
+    print_capture(result)
+
+
+if __name__ == "__main__":
+    main()
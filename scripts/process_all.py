@@ -4,6 +4,9 @@ import sys
 import subprocess
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "analysis"))
+from run_analysis import run_all_analysis
+
 def run_script(script_name, cwd=None):
     """Run a python script and wait for it to complete."""
     print(f"\n[+] Running {script_name}...")
@@ -47,30 +50,11 @@ def main():
     # or just assume logs are present/extracted via main UI. 
     # The user said "pull everything", so let's try to run the basic extractors too if they exist as scripts.
     
-    # 2. Parsing & Analysis
-    print("\n>>> PHASE 2: PARSING & ANALYSIS")
-    
-    # Notifications
-    run_script("analysis/notification_parser.py")
-    
-    # Dual Space / Mule Detection
-    run_script("analysis/dual_space_analyzer.py")
-    
-    # Privacy Profiler
-    run_script("analysis/privacy_analyzer.py") # Make sure this exists
-    
-    # Device Identifiers / 65B
-    run_script("analysis/device_identifiers.py")
-    
-    # Social Graph
-    run_script("analysis/social_graph.py")
-    
-    # Fake Log Detector (Ghost Tags) 🆕
-    run_script("analysis/fake_log_detector.py")
-    
-    # 3. Timeline Generation (Aggregator)
-    print("\n>>> PHASE 3: TIMELINE GENERATION")
-    run_script("analysis/unified_timeline.py")
+    # 2. Parsing, Analysis & Timeline Generation
+    # One in-process DAG run: notification parsing and dual space analysis feed the
+    # timeline, independent modules run concurrently (see analysis/run_analysis.py)
+    print("\n>>> PHASE 2: PARSING, ANALYSIS & TIMELINE GENERATION")
+    run_all_analysis(os.path.join(base_dir, "logs"))
     
     print("\n" + "="*50)
     print("✅ PROCESSING COMPLETE")
@@ -69,7 +69,17 @@ if ($extractLocation) {
 }
 
 // Update Stats so far
-if (file_exists(LOGS_PATH . '/android_logcat.txt')) $stats['logcat'] = count(file(LOGS_PATH . '/android_logcat.txt'));
+// Logcat line count comes from the streaming extractor; fall back to counting without loading the file
+$extraction = @json_decode(@file_get_contents(LOGS_PATH . '/logcat_extraction.json'), true);
+if (isset($extraction['main']['lines'])) {
+    // Incremental runs report only the new lines; total_lines covers all captures
+    $stats['logcat'] = $extraction['main']['total_lines'] ?? $extraction['main']['lines'];
+} elseif (file_exists(LOGS_PATH . '/android_logcat.txt')) {
+    $stats['logcat'] = 0;
+    $fh = fopen(LOGS_PATH . '/android_logcat.txt', 'r');
+    while (fgets($fh) !== false) $stats['logcat']++;
+    fclose($fh);
+}
 if (file_exists(LOGS_PATH . '/sms_logs.txt')) $stats['sms'] = substr_count(file_get_contents(LOGS_PATH . '/sms_logs.txt'), 'Row:');
 if (file_exists(LOGS_PATH . '/call_logs.txt')) $stats['calls'] = substr_count(file_get_contents(LOGS_PATH . '/call_logs.txt'), 'Row:');
 
@@ -0,0 +1,147 @@
+"""
+stream_extract.py
+
+Streaming extraction primitive: runs an adb command and copies its stdout
+straight to disk in large binary blocks, hashing (SHA-256) and counting lines
+as the data goes by. Nothing is held in memory beyond one block, so a
+multi-hundred-MB logcat costs the same RAM as a small one.
+
+Progress (bytes, lines, bytes/s) is written to logs/extraction_progress.json
+in the same {"progress", "status"} shape the web UI already polls.
+
+Usage:
+    from stream_extract import stream_command_to_file
+    result = stream_command_to_file(["adb", "logcat", "-d"], "logs/android_logcat.txt",
+                                    label="main buffer", percent=34)
+    print(result["lines"], result["sha256"])
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import subprocess
+
+STREAM_BLOCK_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.5  # seconds between progress file updates
+PROGRESS_FILE = os.path.join("logs", "extraction_progress.json")
+
+
+def format_bytes(num):
+    for unit in ("B", "KB", "MB", "GB"):
+        if num < 1024 or unit == "GB":
+            return f"{num:.1f} {unit}" if unit != "B" else f"{num} B"
+        num /= 1024
+
+
+def write_progress(progress_file, percent, status, **extra):
+    """Atomically replace the progress file (readers never see a half-written file)."""
+    if not progress_file:
+        return
+    try:
+        os.makedirs(os.path.dirname(progress_file) or ".", exist_ok=True)
+        data = {"progress": percent, "status": status}
+        data.update(extra)
+        tmp = progress_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, progress_file)
+    except OSError:
+        pass
+
+
+def stream_command_to_file(cmd, output_file, label=None, percent=None, progress_file=PROGRESS_FILE,
+                           timeout=None, idle_timeout=None, block_size=STREAM_BLOCK_SIZE):
+    """
+    Run cmd and stream its stdout into output_file.
+
+    Args:
+        label: Name used in progress messages (default: output file name)
+        percent: Overall progress value to report while streaming (None = leave the file alone)
+        timeout: Kill the command after this many seconds in total
+        idle_timeout: Kill the command if it produces no output for this many seconds
+
+    Returns:
+        dict with file, bytes, lines, sha256, seconds, bytes_per_second,
+        returncode, timed_out and stderr (first 2 KB).
+
+    Raises FileNotFoundError if the command (adb) is not installed.
+    """
+    label = label or os.path.basename(output_file)
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+
+    sha256 = hashlib.sha256()
+    total = 0
+    lines = 0
+    last_byte = b""
+    start = time.monotonic()
+    state = {"last_data": start, "timed_out": False}
+
+    # stderr goes to a temp file so a chatty stderr can never block the stdout pipe
+    with tempfile.TemporaryFile() as err, open(output_file, "wb") as out:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, bufsize=0)
+
+        def watchdog():
+            while proc.poll() is None:
+                now = time.monotonic()
+                if (timeout and now - start > timeout) or \
+                        (idle_timeout and now - state["last_data"] > idle_timeout):
+                    state["timed_out"] = True
+                    proc.kill()
+                    return
+                time.sleep(0.2)
+
+        if timeout or idle_timeout:
+            threading.Thread(target=watchdog, daemon=True).start()
+
+        buf = bytearray(block_size)
+        view = memoryview(buf)
+        next_report = start + PROGRESS_INTERVAL
+        while True:
+            n = proc.stdout.readinto(buf)
+            if not n:
+                break
+            block = view[:n]
+            out.write(block)
+            sha256.update(block)
+            lines += buf.count(b"\n", 0, n)
+            last_byte = buf[n - 1:n]
+            total += n
+
+            now = time.monotonic()
+            state["last_data"] = now
+            if percent is not None and now >= next_report:
+                rate = total / max(now - start, 1e-6)
+                write_progress(progress_file, percent,
+                               f"Extracting {label}: {format_bytes(total)} ({format_bytes(rate)}/s, {lines:,} lines)",
+                               bytes=total, lines=lines, bytes_per_second=round(rate))
+                next_report = now + PROGRESS_INTERVAL
+
+        proc.stdout.close()
+        returncode = proc.wait()
+        err.seek(0)
+        stderr = err.read(2048).decode("utf-8", errors="replace")
+
+    # A last line without a trailing newline still counts
+    if total and last_byte != b"\n":
+        lines += 1
+
+    seconds = time.monotonic() - start
+    result = {
+        "file": output_file,
+        "bytes": total,
+        "lines": lines,
+        "sha256": sha256.hexdigest(),
+        "seconds": round(seconds, 3),
+        "bytes_per_second": round(total / seconds) if seconds > 0 else total,
+        "returncode": returncode,
+        "timed_out": state["timed_out"],
+        "stderr": stderr.strip()
+    }
+    if percent is not None:
+        write_progress(progress_file, percent,
+                       f"Extracted {label}: {format_bytes(total)}, {lines:,} lines",
+                       bytes=total, lines=lines, bytes_per_second=result["bytes_per_second"])
+    return result
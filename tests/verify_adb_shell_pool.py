@@ -0,0 +1,130 @@
+"""
+Checks scripts/adb_shell_pool.py against a fake adb.
+
+The fake adb answers `adb features` and runs a local /bin/sh for
+`adb shell -T`, so the sentinel framing, exit codes, stderr, timeouts and
+large outputs can be exercised without a device. A second stub merges
+stderr into stdout like adb on devices without shell_v2, and a third runs
+the shell on a PTY that echoes input, prints prompts and writes \r\n, as
+legacy adbd does; it is also run with a failing stty, like old toolbox
+builds, so the echo and \r\n have to be undone on the host. POSIX only.
+"""
+
+import os
+import sys
+import time
+import stat
+import tempfile
+import subprocess
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from adb_shell_pool import AdbShellPool
+
+FAKE_ADB = """#!/bin/sh
+case "$*" in
+    features) echo shell_v2; echo cmd; exit 0 ;;
+    "shell -T") exec /bin/sh ;;
+esac
+echo "unexpected arguments: $*" >&2
+exit 1
+"""
+
+FAKE_LEGACY_ADB = """#!/bin/sh
+case "$*" in
+    features) exit 0 ;;
+    shell) exec /bin/sh 2>&1 ;;
+esac
+echo "error: target doesn't support PTY args -Tt" >&2
+exit 1
+"""
+
+FAKE_PTY_ADB = f"""#!{sys.executable}
+import os, pty, sys
+args = sys.argv[1:]
+if args == ["features"]:
+    sys.exit(0)
+if args != ["shell"]:
+    sys.stderr.write("error: target doesn't support PTY args -Tt\\n")
+    sys.exit(1)
+os.environ["PS1"] = "root@device:/ # "
+if os.environ.get("FAKE_ADB_NO_STTY"):
+    os.environ["PATH"] = os.environ["FAKE_ADB_NO_STTY"] + os.pathsep + os.environ["PATH"]
+pty.spawn(["/bin/sh", "-i"])
+"""
+
+failures = []
+
+
+def check(name, condition, detail=""):
+    print(f"{'PASS' if condition else 'FAIL'}: {name}{' - ' + detail if detail and not condition else ''}")
+    if not condition:
+        failures.append(name)
+
+
+def write_stub(directory, name, body):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(body)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def verify(adb, legacy, label=None):
+    label = label or ("legacy" if legacy else "shell_v2")
+    with AdbShellPool(size=2, adb=adb) as pool:
+        result = pool.run("echo hello")
+        check(f"{label}: stdout", result.stdout == "hello\n" and result.returncode == 0, repr(result.stdout))
+
+        result = pool.run("printf 'no newline'")
+        check(f"{label}: output without trailing newline", result.stdout == "no newline", repr(result.stdout))
+
+        result = pool.run("echo oops >&2; exit 3")
+        check(f"{label}: exit code", result.returncode == 3, str(result.returncode))
+        if legacy:
+            check(f"{label}: stderr merged into stdout", result.stdout == "oops\n" and result.stderr == "",
+                  repr((result.stdout, result.stderr)))
+        else:
+            check(f"{label}: stderr", result.stderr == "oops\n" and result.stdout == "", repr(result.stderr))
+
+        before = pool.run("pwd").stdout
+        pool.run("cd / && cd .. && cd /tmp; export POOL_LEAK=1")
+        result = pool.run("echo \"$POOL_LEAK\"; pwd")
+        check(f"{label}: cd/export stay in the command", result.stdout == "\n" + before, repr(result.stdout))
+
+        pool.run("exit 0")
+        result = pool.run("echo still alive")
+        check(f"{label}: exit does not end the session", result.stdout == "still alive\n" and pool.count == 1,
+              f"{result.stdout!r}, {pool.count} sessions")
+
+        try:
+            pool.run("sleep 5", timeout=0.5)
+            check(f"{label}: timeout", False, "no TimeoutExpired")
+        except subprocess.TimeoutExpired:
+            check(f"{label}: timeout", pool.count == 0, f"{pool.count} sessions left open")
+
+        size_mb = 64
+        started = time.monotonic()
+        result = pool.run(f"head -c {size_mb * 1024 * 1024} /dev/zero | tr '\\0' 'x'", timeout=60)
+        elapsed = time.monotonic() - started
+        check(f"{label}: {size_mb} MB output in {elapsed:.1f}s",
+              len(result.stdout) == size_mb * 1024 * 1024 and elapsed < 20, f"{len(result.stdout)} bytes")
+
+
+if __name__ == "__main__":
+    if os.name != "posix":
+        print("SKIPPED: the fake adb stub needs /bin/sh")
+        sys.exit(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        verify(write_stub(tmp, "adb", FAKE_ADB), legacy=False)
+        verify(write_stub(tmp, "adb_legacy", FAKE_LEGACY_ADB), legacy=True)
+        pty_adb = write_stub(tmp, "adb_pty", FAKE_PTY_ADB)
+        verify(pty_adb, legacy=True, label="legacy PTY")
+        os.environ["FAKE_ADB_NO_STTY"] = os.path.dirname(write_stub(os.path.join(tmp, "bin"), "stty", "#!/bin/sh\nexit 1\n"))
+        verify(pty_adb, legacy=True, label="legacy PTY without stty")
+    if failures:
+        print(f"\nFAILURE: {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\nSUCCESS: adb shell pool works against the fake adb.")
+    sys.exit(0)
@@ -6,18 +6,41 @@ Scans logs against threat signature database and generates security alerts.
 """
 
 from threat_signatures import *
+import os
 import re
+import json
+import heapq
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+PACKAGE_NAME_REGEX = re.compile(r'(com\.[a-z0-9.]+)', re.IGNORECASE)
+
+# Streaming scan defaults
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024   # bytes read per chunk
+STREAM_TOP_N = 50                     # threats kept in memory per category
+
+# Parallel scan: files smaller than this per worker are not worth a process
+PARALLEL_MIN_SHARD = 8 * 1024 * 1024
 
 
 class ThreatScanner:
     """Main threat scanner class."""
     
-    def __init__(self):
+    def __init__(self, signatures=None):
+        # Compiled matcher over threat_signatures (see compile_signatures)
+        self.signatures = signatures if signatures is not None else COMPILED_SIGNATURES
+        self._reset()
+
+    def _reset(self):
+        """Clear results before a new scan."""
         self.threats_found = []
         self.risk_score = 0
         self.scan_stats = defaultdict(int)
+        self.severity_counts = defaultdict(int)
+        self.threat_count = 0
+        self.total_weight = 0
+        self._sink = None
     
     def scan_logs(self, log_file_path):
         """
@@ -29,9 +52,7 @@ class ThreatScanner:
         Returns:
             dict with scan results
         """
-        self.threats_found = []
-        self.risk_score = 0
-        self.scan_stats = defaultdict(int)
+        self._reset()
         
         try:
             with open(log_file_path, 'r', encoding='utf-8', errors='replace') as f:
@@ -42,13 +63,7 @@ class ThreatScanner:
         total_lines = len(lines)
         
         for line_num, line in enumerate(lines, 1):
-            # Scan for each threat category
-            self._scan_malware_packages(line, line_num)
-            self._scan_data_exfiltration(line, line_num)
-            self._scan_privilege_escalation(line, line_num)
-            self._scan_network_threats(line, line_num)
-            self._scan_suspicious_behaviors(line, line_num)
-            self._scan_crashes(line, line_num)
+            self._scan_line(line, line_num)
         
         # Calculate overall risk score
         self._calculate_risk_score()
@@ -61,150 +76,205 @@ class ThreatScanner:
             'stats': dict(self.scan_stats)
         }
     
-    def _scan_malware_packages(self, line, line_num):
-        """Scan for known malware packages."""
-        for package, description in KNOWN_MALWARE_PACKAGES.items():
-            if package in line:
-                # Check if whitelisted
-                if not is_whitelisted(package):
-                    self.threats_found.append({
-                        'line': line_num,
-                        'type': 'MALWARE',
-                        'severity': 'CRITICAL',
-                        'package': package,
-                        'description': description,
-                        'evidence': line.strip(),
-'weight': THREAT_WEIGHTS['malware_package']
-                    })
-                    self.scan_stats['malware'] += 1
-        
-        # Scan for suspicious patterns
-        for pattern, description in SUSPICIOUS_PACKAGE_PATTERNS:
-            if pattern.search(line):
+    def _scan_line(self, line, line_num):
+        """Check one line against every compiled signature at once."""
+        hits = self.signatures.match(line)
+        if not hits:
+            return
+
+        evidence = line.strip()
+        for sig in hits:
+            if sig.package is not None:
+                # Literal malware package hit
+                threat = {
+                    'line': line_num,
+                    'type': sig.threat_type,
+                    'severity': sig.severity,
+                    'package': sig.package,
+                    'description': sig.description,
+                    'evidence': evidence,
+                    'weight': sig.weight
+                }
+            elif sig.extract_package:
                 # Extract package name
-                package_match = re.search(r'(com\.[a-z0-9.]+)', line, re.IGNORECASE)
+                package_match = PACKAGE_NAME_REGEX.search(line)
                 package = package_match.group(1) if package_match else 'Unknown'
-                
-                if not is_whitelisted(package):
-                    self.threats_found.append({
-                        'line': line_num,
-                        'type': 'SUSPICIOUS_PACKAGE',
-                        'severity': 'HIGH',
-                        'package': package,
-                        'description': description,
-                        'evidence': line.strip(),
-                        'weight': THREAT_WEIGHTS['suspicious_package']
-                    })
-                    self.scan_stats['suspicious_packages'] += 1
-    
-    def _scan_data_exfiltration(self, line, line_num):
-        """Scan for data exfiltration indicators."""
-        for pattern, description in DATA_EXFILTRATION_PATTERNS:
-            if pattern.search(line):
-                self.threats_found.append({
+                if is_whitelisted(package):
+                    continue
+                threat = {
                     'line': line_num,
-                    'type': 'DATA_EXFILTRATION',
-                    'severity': 'CRITICAL',
-                    'description': description,
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['data_exfiltration']
-                })
-                self.scan_stats['data_exfiltration'] += 1
-    
-    def _scan_privilege_escalation(self, line, line_num):
-        """Scan for privilege escalation attempts."""
-        for pattern, description in PRIVILEGE_ESCALATION_PATTERNS:
-            if pattern.search(line):
-                self.threats_found.append({
-                    'line': line_num,
-                    'type': 'PRIVILEGE_ESCALATION',
-                    'severity': 'CRITICAL',
-                    'description': description,
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['privilege_escalation']
-                })
-                self.scan_stats['privilege_escalation'] += 1
-    
-    def _scan_network_threats(self, line, line_num):
-        """Scan for suspicious network activity."""
-        # Check for suspicious IPs
-        for ip_prefix in SUSPICIOUS_IPS:
-            if ip_prefix in line:
-                self.threats_found.append({
+                    'type': sig.threat_type,
+                    'severity': sig.severity,
+                    'package': package,
+                    'description': sig.description,
+                    'evidence': evidence,
+                    'weight': sig.weight
+                }
+            else:
+                threat = {
                     'line': line_num,
-                    'type': 'SUSPICIOUS_NETWORK',
-                    'severity': 'HIGH',
-                    'description': f'Connection to suspicious IP: {ip_prefix}',
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['suspicious_network']
-                })
-                self.scan_stats['suspicious_network'] += 1
-        
-        # Check for suspicious domains
-        for domain in SUSPICIOUS_DOMAINS:
-            if domain in line.lower():
-                self.threats_found.append({
-                    'line': line_num,
-                    'type': 'SUSPICIOUS_NETWORK',
-                    'severity': 'MEDIUM',
-                    'description': f'Connection to suspicious domain: {domain}',
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['suspicious_network'] // 2
-                })
-                self.scan_stats['suspicious_network'] += 1
-        
-        # Check for network threat patterns
-        for pattern, description in NETWORK_THREAT_PATTERNS:
-            if pattern.search(line):
-                self.threats_found.append({
-                    'line': line_num,
-                    'type': 'SUSPICIOUS_NETWORK',
-                    'severity': 'HIGH',
-                    'description': description,
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['suspicious_network']
-                })
-                self.scan_stats['suspicious_network'] += 1
-    
-    def _scan_suspicious_behaviors(self, line, line_num):
-        """Scan for suspicious app behaviors."""
-        for pattern, description in SUSPICIOUS_BEHAVIORS:
-            if pattern.search(line):
-                self.threats_found.append({
-                    'line': line_num,
-                    'type': 'SUSPICIOUS_BEHAVIOR',
-                    'severity': 'MEDIUM',
-                    'description': description,
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['suspicious_behavior']
-                })
-                self.scan_stats['suspicious_behavior'] += 1
+                    'type': sig.threat_type,
+                    'severity': sig.severity,
+                    'description': sig.description,
+                    'evidence': evidence,
+                    'weight': sig.weight
+                }
+            self._emit(threat, sig.category)
+
+    def _emit(self, threat, category):
+        """Count a threat and keep it (in-memory scan) or hand it to the stream sink."""
+        self.threat_count += 1
+        self.total_weight += threat['weight']
+        self.scan_stats[category] += 1
+        self.severity_counts[threat['severity']] += 1
+        if self._sink is None:
+            self.threats_found.append(threat)
+        else:
+            self._sink(threat, category)
+
+    def scan_logs_streaming(self, log_file_path, output_file, progress_callback=None,
+                            chunk_size=STREAM_CHUNK_SIZE, top_n=STREAM_TOP_N):
+        """
+        Scan a log file with bounded memory.
+        
+        The file is read in fixed-size binary chunks and every threat is written
+        to output_file as one JSON object per line (NDJSON) as soon as it is found.
+        Only counters and the top_n highest-weight threats per category are kept
+        in memory, so self.threats_found holds samples, not every hit.
+        Lines are numbered by '\\n'; trailing '\\r' characters are dropped.
+        
+        Args:
+            log_file_path: Path to the log file
+            output_file: NDJSON file receiving every threat
+            progress_callback: Optional callable(dict) invoked after each chunk
+            chunk_size: Bytes read per chunk
+            top_n: Threats kept in memory per category
+        
+        Returns:
+            dict with scan results ('threats' are the in-memory samples)
+        """
+        self._reset()
+        
+        try:
+            total_bytes = os.path.getsize(log_file_path)
+        except OSError:
+            return {'error': f'File not found: {log_file_path}'}
+        
+        samples = defaultdict(list)
+        seq = 0
+        
+        def keep_sample(threat, category):
+            # Min-heap on (weight, earlier line first) so the weakest sample is evicted
+            nonlocal seq
+            seq += 1
+            heap = samples[category]
+            item = (threat['weight'], -threat['line'], seq, threat)
+            if len(heap) < top_n:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        
+        line_num = 0
+        with open(output_file, 'w', encoding='utf-8') as out:
+            def sink(threat, category):
+                out.write(json.dumps(threat) + '\n')
+                keep_sample(threat, category)
+            self._sink = sink
+            
+            try:
+                for lines, bytes_done in iter_line_chunks(log_file_path, chunk_size=chunk_size):
+                    for line in lines:
+                        line_num += 1
+                        self._scan_line(line, line_num)
+                    if progress_callback:
+                        progress_callback({
+                            'progress': round(bytes_done * 100 / total_bytes, 1) if total_bytes else 100,
+                            'bytes_scanned': bytes_done,
+                            'total_bytes': total_bytes,
+                            'lines_scanned': line_num,
+                            'threat_count': self.threat_count
+                        })
+            finally:
+                self._sink = None
+        
+        # Back to scan order (line, then emission order within a line)
+        kept = sorted((item for heap in samples.values() for item in heap),
+                      key=lambda item: (-item[1], item[2]))
+        self.threats_found = [item[3] for item in kept]
+        self._calculate_risk_score()
+        
+        return {
+            'threats': self.threats_found,
+            'risk_score': self.risk_score,
+            'threat_count': self.threat_count,
+            'lines_scanned': line_num,
+            'stats': dict(self.scan_stats),
+            'output_file': output_file
+        }
     
-    def _scan_crashes(self, line, line_num):
-        """Scan for crashes (may indicate malware or instability)."""
-        for pattern, description in CRASH_PATTERNS:
-            if pattern.search(line):
-                self.threats_found.append({
-                    'line': line_num,
-                    'type': 'CRASH',
-                    'severity': 'LOW',
-                    'description': description,
-                    'evidence': line.strip(),
-                    'weight': THREAT_WEIGHTS['crash']
-                })
-                self.scan_stats['crashes'] += 1
+    def scan_logs_parallel(self, log_file_path, max_workers=None, min_shard_size=PARALLEL_MIN_SHARD):
+        """
+        Scan a log file on several cores.
+        
+        The file is split into newline-aligned byte ranges, each range is scanned
+        in a ProcessPoolExecutor worker, and the shard results are merged in file
+        order with global line numbers before one risk score pass.
+        Lines are numbered by '\\n', as in scan_logs_streaming().
+        
+        Args:
+            log_file_path: Path to the log file
+            max_workers: Worker processes (default: CPU count)
+            min_shard_size: Smallest byte range worth its own worker
+        
+        Returns:
+            dict with scan results (same shape as scan_logs)
+        """
+        self._reset()
+        
+        try:
+            shards = split_byte_ranges(log_file_path, max_workers or os.cpu_count() or 1, min_shard_size)
+        except OSError:
+            return {'error': f'File not found: {log_file_path}'}
+        
+        # The default matcher is rebuilt on import in each worker; only ship custom ones
+        signatures = None if self.signatures is COMPILED_SIGNATURES else self.signatures
+        
+        if len(shards) <= 1:
+            _init_shard_worker(signatures or self.signatures)
+            shard_results = [_scan_shard(log_file_path, start, end) for start, end in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=len(shards), initializer=_init_shard_worker,
+                                     initargs=(signatures,)) as pool:
+                shard_results = list(pool.map(_scan_shard, [log_file_path] * len(shards),
+                                              [start for start, _ in shards],
+                                              [end for _, end in shards]))
+        
+        # Merge in file order, shifting shard-local line numbers
+        line_offset = 0
+        for hits, line_count in shard_results:
+            for category, threat in hits:
+                threat['line'] += line_offset
+                self._emit(threat, category)
+            line_offset += line_count
+        
+        self._calculate_risk_score()
+        
+        return {
+            'threats': self.threats_found,
+            'risk_score': self.risk_score,
+            'threat_count': self.threat_count,
+            'lines_scanned': line_offset,
+            'stats': dict(self.scan_stats)
+        }
     
     def _calculate_risk_score(self):
         """Calculate overall risk score (0-100)."""
-        if not self.threats_found:
+        if not self.threat_count:
             self.risk_score = 0
             return
         
-        # Sum weighted scores
-        total_weight = sum(threat['weight'] for threat in self.threats_found)
-        
-        # Normalize to 0-100 scale (cap at 100)
-        self.risk_score = min(100, total_weight)
+        # Normalize summed weights to 0-100 scale (cap at 100)
+        self.risk_score = min(100, self.total_weight)
     
     def get_risk_level(self):
         """Get risk level category."""
@@ -229,10 +299,10 @@ class ThreatScanner:
         report.append("=" * 60)
         report.append(f"Scan Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         report.append(f"Risk Level: {icon} {risk_level} (Score: {self.risk_score}/100)")
-        report.append(f"Threats Found: {len(self.threats_found)}")
+        report.append(f"Threats Found: {self.threat_count}")
         report.append("")
         
-        if not self.threats_found:
+        if not self.threat_count:
             report.append("✅ No threats detected!")
             return "\n".join(report)
         
@@ -253,15 +323,17 @@ class ThreatScanner:
         
         for severity_name, threats in [('CRITICAL', critical), ('HIGH', high), ('MEDIUM', medium), ('LOW', low)]:
             if threats:
-                report.append(f"\n{severity_name} THREATS ({len(threats)}):")
+                # Streaming scans only keep samples; counters hold the real totals
+                count = self.severity_counts.get(severity_name, len(threats))
+                report.append(f"\n{severity_name} THREATS ({count}):")
                 for i, threat in enumerate(threats[:10], 1):  # Show top 10 per category
                     report.append(f"\n  [{i}] Line {threat['line']}")
                     report.append(f"      Type: {threat['type']}")
                     report.append(f"      {threat['description']}")
                     report.append(f"      Evidence: {threat['evidence'][:100]}...")
                 
-                if len(threats) > 10:
-                    report.append(f"\n      ... and {len(threats) - 10} more")
+                if count > 10:
+                    report.append(f"\n      ... and {count - 10} more")
         
         report.append("")
         report.append("=" * 60)
@@ -275,7 +347,7 @@ class ThreatScanner:
             report.append("    • Run full antivirus scan")
             report.append("    • Consider factory reset if malware confirmed")
         
-       if medium:
+        if medium:
             report.append("  🟡 INVESTIGATE FURTHER:")
             report.append("    • Review suspicious applications")
             report.append("    • Check app permissions")
@@ -284,6 +356,128 @@ class ThreatScanner:
         return "\n".join(report)
 
 
+def iter_line_chunks(log_file_path, start=0, end=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield (lines, bytes_done) for a file read in fixed-size binary chunks.
+    
+    Chunks are cut at the last newline so no line or UTF-8 sequence is split.
+    start/end restrict reading to a byte range; bytes_done is relative to start.
+    """
+    with open(log_file_path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        carry = b''
+        done = 0
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            block = f.read(size)
+            if not block:
+                break
+            done += len(block)
+            if remaining is not None:
+                remaining -= len(block)
+            block = carry + block
+            cut = block.rfind(b'\n')
+            if cut < 0:
+                carry = block
+                continue
+            carry = block[cut + 1:]
+            text = block[:cut].decode('utf-8', errors='replace')
+            yield [line.rstrip('\r') + '\n' for line in text.split('\n')], done
+        if carry:
+            yield [carry.decode('utf-8', errors='replace').rstrip('\r')], done
+
+
+def split_byte_ranges(log_file_path, parts, min_size=PARALLEL_MIN_SHARD):
+    """Split a file into at most `parts` (start, end) byte ranges that end on a newline."""
+    total = os.path.getsize(log_file_path)
+    if total == 0:
+        return []
+    parts = max(1, min(parts, total // max(1, min_size)))
+    
+    bounds = [0]
+    with open(log_file_path, 'rb') as f:
+        for i in range(1, parts):
+            target = total * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            # Move to the byte after the next newline (target itself if it starts a line)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < total:
+                bounds.append(pos)
+    bounds.append(total)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# Per-process scanner used by parallel shard workers
+_shard_scanner = None
+
+
+def _init_shard_worker(signatures=None):
+    """ProcessPoolExecutor initializer: build one scanner per worker process."""
+    global _shard_scanner
+    _shard_scanner = ThreatScanner(signatures)
+
+
+def _scan_shard(log_file_path, start, end):
+    """Scan one byte range; returns ([(category, threat), ...], line_count) with shard-local lines."""
+    scanner = _shard_scanner
+    hits = []
+    scanner._reset()
+    scanner._sink = lambda threat, category: hits.append((category, threat))
+    line_num = 0
+    try:
+        for lines, _ in iter_line_chunks(log_file_path, start, end):
+            for line in lines:
+                line_num += 1
+                scanner._scan_line(line, line_num)
+    finally:
+        scanner._sink = None
+    return hits, line_num
+
+
+def progress_file_callback(progress_file, status='Scanning logs for threats...'):
+    """
+    Build a progress_callback that writes a JSON file for the web UI to poll,
+    in the same {"progress", "status"} shape as extraction_progress.json.
+    """
+    def callback(info):
+        data = dict(info)
+        data.setdefault('status', f"{status} {info['lines_scanned']:,} lines, {info['threat_count']:,} threats")
+        tmp_path = progress_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        # Atomic swap so a poll never reads a half-written file
+        os.replace(tmp_path, progress_file)
+    return callback
+
+
+def stream_scan(log_file, output_file='logs/threat_scan.ndjson',
+                summary_file='logs/threat_scan_summary.json',
+                progress_file='logs/threat_scan_progress.json'):
+    """Streaming scan helper used by the web UI; writes NDJSON, summary and progress files."""
+    scanner = ThreatScanner()
+    callback = progress_file_callback(progress_file)
+    results = scanner.scan_logs_streaming(log_file, output_file, progress_callback=callback)
+    if 'error' in results:
+        # Final state, so a poller waiting on the progress file stops instead of sitting at 0%
+        callback({'progress': 100, 'lines_scanned': 0, 'threat_count': 0,
+                  'error': results['error'], 'status': f"Scan failed: {results['error']}"})
+        return results
+    
+    risk_level, _ = scanner.get_risk_level()
+    results['risk_level'] = risk_level
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+    
+    callback({'progress': 100, 'lines_scanned': results['lines_scanned'],
+              'threat_count': results['threat_count'],
+              'status': f"Scan complete: {results['threat_count']:,} threats ({risk_level})"})
+    return results
+
+
 def quick_scan(log_file):
     """Quick scan helper function."""
     scanner = ThreatScanner()
@@ -293,12 +487,27 @@ def quick_scan(log_file):
 
 
 if __name__ == '__main__':
+    import sys
+    
     print("Threat Scanner Module Test\n")
     
-    import os
     test_log = 'logs/android_logcat.txt'
     
-    if os.path.exists(test_log):
+    if os.path.exists(test_log) and '--parallel' in sys.argv:
+        print(f"Parallel scan of {test_log}...\n")
+        scanner = ThreatScanner()
+        results = scanner.scan_logs_parallel(test_log)
+        print(f"Threats: {results['threat_count']} in {results['lines_scanned']:,} lines")
+        print(f"Risk Score: {results['risk_score']}/100")
+    elif '--stream' in sys.argv:
+        # Runs even without the log, so the progress file records the failure
+        print(f"Streaming scan of {test_log}...\n")
+        results = stream_scan(test_log)
+        if 'error' in results:
+            print(f"❌ {results['error']}")
+        else:
+            print(f"Threats: {results['threat_count']} (written to {results['output_file']})")
+    elif os.path.exists(test_log):
         print(f"Scanning {test_log}...\n")
         results = quick_scan(test_log)
     else:
@@ -8,6 +8,13 @@ Contains IoC (Indicators of Compromise) database for automated threat detection.
 import re
 import sys
 
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
 # Fix Windows encoding issues with emoji characters
 if sys.platform == 'win32':
     try:
@@ -195,6 +202,285 @@ def get_all_threat_patterns():
     }
 
 
+
+# =========================================================================
+# COMPILED MULTI-PATTERN MATCHER
+# =========================================================================
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class Signature:
+    """One entry of the signature database plus what a hit on it means."""
+    __slots__ = ('sid', 'category', 'threat_type', 'severity', 'weight',
+                 'description', 'package', 'extract_package', 'literal', 'regex')
+
+    def __init__(self, sid, category, threat_type, severity, weight, description,
+                 package=None, extract_package=False):
+        self.sid = sid
+        self.category = category          # scan_stats key
+        self.threat_type = threat_type    # 'type' field of the threat
+        self.severity = severity
+        self.weight = weight
+        self.description = description
+        self.package = package            # fixed package for literal malware hits
+        self.extract_package = extract_package
+        self.literal = None               # case-sensitive literal to confirm
+        self.regex = None                 # compiled pattern for regex signatures
+
+
+class AhoCorasickAutomaton:
+    """
+    Aho-Corasick automaton over literal strings.
+
+    Uses the pyahocorasick C extension when installed and a pure-Python
+    goto/fail automaton otherwise. Either way a line is walked once no
+    matter how many literals are loaded.
+    """
+
+    def __init__(self, case_sensitive=True):
+        self.case_sensitive = case_sensitive
+        self._words = {}
+        self._automaton = None
+
+    def add(self, word, value):
+        """Register a literal; value is returned for every line containing it."""
+        key = word if self.case_sensitive else word.lower()
+        self._words.setdefault(key, []).append(value)
+
+    def build(self):
+        """Freeze the automaton. Must be called after the last add()."""
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for word, values in self._words.items():
+                automaton.add_word(word, values)
+            if self._words:
+                automaton.make_automaton()
+                self._automaton = automaton
+            return self
+
+        goto = [{}]
+        output = [[]]
+        for word, values in self._words.items():
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].extend(values)
+
+        # Breadth-first failure links; outputs of the fail state are merged in
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                output[nxt].extend(output[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        self._automaton = True if self._words else None
+        return self
+
+    def find(self, text):
+        """Return the set of values whose literal occurs anywhere in text."""
+        if self._automaton is None:
+            return set()
+        if not self.case_sensitive:
+            text = text.lower()
+
+        found = set()
+        if AHOCORASICK_AVAILABLE:
+            for _, values in self._automaton.iter(text):
+                found.update(values)
+            return found
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+def _literal_factors(nodes):
+    """
+    Return a set of literals, at least one of which occurs in every match of
+    the parsed regex nodes, or None if no such set can be derived.
+    """
+    candidates = []
+    run = []
+
+    def close_run():
+        if run:
+            candidates.append({''.join(run)})
+            run.clear()
+
+    for op, av in nodes:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        close_run()
+        if op is sre_constants.SUBPATTERN:
+            sub = _literal_factors(av[-1])
+            if sub:
+                candidates.append(sub)
+        elif op is sre_constants.BRANCH:
+            branches = [_literal_factors(branch) for branch in av[1]]
+            if all(branches):
+                candidates.append(set().union(*branches))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            sub = _literal_factors(av[2])
+            if sub:
+                candidates.append(sub)
+    close_run()
+
+    if not candidates:
+        return None
+    # Prefer the set whose shortest literal is longest (fewest false candidates)
+    return max(candidates, key=lambda c: (min(len(x) for x in c), -len(c)))
+
+
+def required_literals(pattern):
+    """Lower-cased literals that must appear in any line the compiled pattern matches."""
+    try:
+        factors = _literal_factors(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None
+    if not factors or any(len(x) < 2 for x in factors):
+        return None
+    return {x.lower() for x in factors}
+
+
+class CompiledSignatures:
+    """
+    All threat signatures compiled into one matcher.
+
+    Literal package names, IPs and domains go into a single Aho-Corasick
+    automaton together with the literal anchors every regex signature
+    requires (e.g. 'query' for '(contacts|sms).*query'). One pass over the
+    line yields all literal hits plus the few regex signatures that can
+    possibly match; only those are evaluated. match(line) returns every
+    signature that fires, in database order.
+    """
+
+    def __init__(self):
+        self.signatures = []
+        self._automaton = AhoCorasickAutomaton(case_sensitive=False)
+        self._unanchored = []   # regex signatures with no usable literal anchor
+
+    def _new(self, *args, **kwargs):
+        sig = Signature(len(self.signatures), *args, **kwargs)
+        self.signatures.append(sig)
+        return sig
+
+    def add_literal(self, literal, category, threat_type, severity, weight, description,
+                    package=None, case_sensitive=True):
+        sig = self._new(category, threat_type, severity, weight, description, package=package)
+        # The automaton runs on the lower-cased line; exact case is re-checked on a hit
+        sig.literal = literal if case_sensitive else None
+        self._automaton.add(literal, sig.sid)
+        return sig
+
+    def add_regex(self, pattern, category, threat_type, severity, weight, description,
+                  extract_package=False):
+        sig = self._new(category, threat_type, severity, weight, description,
+                        extract_package=extract_package)
+        sig.regex = pattern
+        anchors = required_literals(pattern)
+        if anchors:
+            for anchor in anchors:
+                self._automaton.add(anchor, sig.sid)
+        else:
+            self._unanchored.append(sig)
+        return sig
+
+    def build(self):
+        """Compile the automaton. Returns self."""
+        self._automaton.build()
+        return self
+
+    def match(self, line):
+        """Return the Signatures that fire on line, in database order."""
+        hits = []
+        candidates = self._automaton.find(line)
+        if self._unanchored:
+            candidates.update(sig.sid for sig in self._unanchored)
+        for sid in sorted(candidates):
+            sig = self.signatures[sid]
+            if sig.regex is not None:
+                if sig.regex.search(line):
+                    hits.append(sig)
+            elif sig.literal is None or sig.literal in line:
+                hits.append(sig)
+        return hits
+
+    def __len__(self):
+        return len(self.signatures)
+
+
+def compile_signatures():
+    """
+    Compile the signature tables above into a CompiledSignatures matcher.
+
+    Call again after extending the tables (e.g. with a vendor IoC feed).
+    """
+    compiled = CompiledSignatures()
+
+    for package, description in KNOWN_MALWARE_PACKAGES.items():
+        # Whitelisted literals can never produce a threat
+        if not is_whitelisted(package):
+            compiled.add_literal(package, 'malware', 'MALWARE', 'CRITICAL',
+                                 THREAT_WEIGHTS['malware_package'], description, package=package)
+    for pattern, description in SUSPICIOUS_PACKAGE_PATTERNS:
+        compiled.add_regex(pattern, 'suspicious_packages', 'SUSPICIOUS_PACKAGE', 'HIGH',
+                           THREAT_WEIGHTS['suspicious_package'], description, extract_package=True)
+    for pattern, description in DATA_EXFILTRATION_PATTERNS:
+        compiled.add_regex(pattern, 'data_exfiltration', 'DATA_EXFILTRATION', 'CRITICAL',
+                           THREAT_WEIGHTS['data_exfiltration'], description)
+    for pattern, description in PRIVILEGE_ESCALATION_PATTERNS:
+        compiled.add_regex(pattern, 'privilege_escalation', 'PRIVILEGE_ESCALATION', 'CRITICAL',
+                           THREAT_WEIGHTS['privilege_escalation'], description)
+    for ip_prefix in SUSPICIOUS_IPS:
+        compiled.add_literal(ip_prefix, 'suspicious_network', 'SUSPICIOUS_NETWORK', 'HIGH',
+                             THREAT_WEIGHTS['suspicious_network'],
+                             f'Connection to suspicious IP: {ip_prefix}')
+    for domain in SUSPICIOUS_DOMAINS:
+        compiled.add_literal(domain, 'suspicious_network', 'SUSPICIOUS_NETWORK', 'MEDIUM',
+                             THREAT_WEIGHTS['suspicious_network'] // 2,
+                             f'Connection to suspicious domain: {domain}', case_sensitive=False)
+    for pattern, description in NETWORK_THREAT_PATTERNS:
+        compiled.add_regex(pattern, 'suspicious_network', 'SUSPICIOUS_NETWORK', 'HIGH',
+                           THREAT_WEIGHTS['suspicious_network'], description)
+    for pattern, description in SUSPICIOUS_BEHAVIORS:
+        compiled.add_regex(pattern, 'suspicious_behavior', 'SUSPICIOUS_BEHAVIOR', 'MEDIUM',
+                           THREAT_WEIGHTS['suspicious_behavior'], description)
+    for pattern, description in CRASH_PATTERNS:
+        compiled.add_regex(pattern, 'crashes', 'CRASH', 'LOW',
+                           THREAT_WEIGHTS['crash'], description)
+
+    return compiled.build()
+
+
+# Built once at import time and shared by every ThreatScanner
+COMPILED_SIGNATURES = compile_signatures()
+
 if __name__ == '__main__':
     print("Threat Signature Database\n")
     print(f"Known malware packages: {len(KNOWN_MALWARE_PACKAGES)}")
@@ -203,4 +489,6 @@ if __name__ == '__main__':
     print(f"Privilege escalation patterns: {len(PRIVILEGE_ESCALATION_PATTERNS)}")
     print(f"Network threat patterns: {len(NETWORK_THREAT_PATTERNS)}")
     print(f"Suspicious behaviors: {len(SUSPICIOUS_BEHAVIORS)}")
+    print(f"Compiled signatures: {len(COMPILED_SIGNATURES)}"
+          f" (Aho-Corasick backend: {'pyahocorasick' if AHOCORASICK_AVAILABLE else 'pure Python'})")
     print(f"\n✅ Threat signatures loaded!")
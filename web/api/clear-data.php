@@ -63,9 +63,9 @@ try {
         }
     }
 
-    // 2. Clear pattern matches (txt, json)
+    // 2. Clear pattern matches (txt, json and the NDJSON artifact variants)
     if (is_dir($logsPath)) {
-        $patterns = ['*.txt', '*.json', '*.log'];
+        $patterns = ['*.txt', '*.json', '*.ndjson', '*.ndjson.gz', '*.ndjson.zst', '*.log'];
         foreach ($patterns as $pattern) {
             $files = glob($logsPath . '/' . $pattern);
             if ($files) {
@@ -84,6 +84,31 @@ try {
         }
     }
 
+    // 3. Clear the analysis result cache (it holds copies of analysis outputs)
+    //    the compressed logcat segment store and the search index
+    $dataDirs = ['.cache' => 'analysis cache', 'logcat_segments' => 'logcat segments',
+                 'search_index' => 'search index'];
+    foreach ($dataDirs as $dirName => $label) {
+        $dataDir = $logsPath . '/' . $dirName;
+        if (!is_dir($dataDir)) {
+            continue;
+        }
+        $items = new RecursiveIteratorIterator(
+            new RecursiveDirectoryIterator($dataDir, FilesystemIterator::SKIP_DOTS),
+            RecursiveIteratorIterator::CHILD_FIRST
+        );
+        foreach ($items as $item) {
+            if ($item->isDir()) {
+                @rmdir($item->getPathname());
+            } elseif (@unlink($item->getPathname())) {
+                $result['filesDeleted']++;
+            }
+        }
+        if (!@rmdir($dataDir)) {
+            $result['errors'][] = "Failed to remove $label";
+        }
+    }
+
     if (!empty($result['errors'])) {
         // partial success is still success-ish, but let's warn
         // If we deleted nothing and had errors, then false
@@ -7,16 +7,195 @@ header('Content-Type: application/json');
 header('Access-Control-Allow-Origin: *');
 
 require_once '../includes/config.php';
+require_once '../includes/logcat_segments.php';
+require_once '../includes/search_index.php';
 
 // Prevent caching
 header("Cache-Control: no-store, no-cache, must-revalidate, max-age=0");
 header("Cache-Control: post-check=0, pre-check=0", false);
 header("Pragma: no-cache");
 
+/**
+ * Epoch seconds of a line, or null: the logcat time it starts with (or a long
+ * format header's), else a call/SMS date (YYYY-MM-DD HH:MM:SS, date=<ms>), else
+ * a logcat time anywhere. Mirrors line_time in analysis/logcat_parser.py.
+ */
+function filterLineEpoch(string $line): ?int
+{
+    $logcatTime = function (string $ts): ?int {
+        // No year in logcat times: this year, or last year if that would be in the future
+        $epoch = strtotime(date('Y') . '-' . $ts);
+        if ($epoch === false) {
+            return null;
+        }
+        return $epoch > time() ? (int)strtotime((date('Y') - 1) . '-' . $ts) : $epoch;
+    };
+    if (preg_match('/^(?:\[ )?(\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\.\d{3}/', $line, $match)) {
+        return $logcatTime($match[1]);
+    }
+    if (preg_match('/(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})/', $line, $match) && ($epoch = strtotime($match[1])) !== false) {
+        return $epoch;
+    }
+    if (preg_match('/date=(\d{10,13})/', $line, $match)) {
+        return (int)substr($match[1], 0, 10);
+    }
+    if (preg_match('/(\d{2}-\d{2} \d{2}:\d{2}:\d{2})/', $line, $match)) {
+        return $logcatTime($match[1]);
+    }
+    return null;
+}
+
+/**
+ * [line, epoch] pairs: a line without a time has the time of the closest timed
+ * line before it ($last carries one in), lines ahead of the first timed line get
+ * its time, and 0 means the lines have no time at all. Same rule as the search
+ * index and analysis/logcat_parser.py carry_times.
+ */
+function filterCarryTimes(array $lines, int $last = 0): array
+{
+    $dated = [];
+    $held = [];
+    foreach ($lines as $line) {
+        $epoch = filterLineEpoch($line);
+        if ($epoch !== null) {
+            foreach ($held as $lineBefore) {
+                $dated[] = [$lineBefore, $epoch];
+            }
+            $held = [];
+            $last = $epoch;
+        } elseif ($last === 0) {
+            $held[] = $line;
+            continue;
+        }
+        $dated[] = [$line, $last];
+    }
+    foreach ($held as $lineBefore) {
+        $dated[] = [$lineBefore, 0];
+    }
+    return $dated;
+}
+
+/**
+ * Priority letter of a logcat line (threadtime, time, long or brief format), or
+ * null for banners and continuation lines. Mirrors the search index's parsed
+ * priority, so scanned and indexed logcat answer a severity the same way.
+ */
+function logcatLinePriority(string $line): ?string
+{
+    $formats = [
+        '/^\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3}\s+\d+\s+\d+\s+([VDIWEFA])\s+[^:]+:\s/',
+        '/^\d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3}\s+([VDIWEFA])\/[^(:]+(?:\(\s*\d+\))?:?\s/',
+        '/^\[ \d\d-\d\d\s\d\d:\d\d:\d\d\.\d{3}\s+(?:\d+:\s*)?\d+:\s*\d+\s+([VDIWEFA])\/.*?\s*\]$/',
+        '/^([VDIWEFA])\/[^(:]+(?:\(\s*\d+\))?:?\s/'
+    ];
+    foreach ($formats as $format) {
+        if (preg_match($format, $line, $match)) {
+            return $match[1];
+        }
+    }
+    return null;
+}
+
+/**
+ * Display time and level of a line: [display timestamp, level letter]
+ */
+function filterLineMeta(string $line, string $fileType): array
+{
+    $timestamp = '--';
+    $level = 'I'; // Default to Info
+
+    if ($fileType === 'android_logcat') {
+        // Logcat Format: 01-23 13:46:46.045 ... Level/Tag ... or Level Tag
+        // Extract Time
+        if (preg_match('/^(\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)/', $line, $match)) {
+            $timestamp = $match[1];
+        }
+        // Extract Severity (Robust: handle "E/Tag" and " E Tag")
+        if (preg_match('/(?:^|\s)([VDIWEF])(?:\/|\s)/', $line, $match)) {
+            $level = $match[1];
+        }
+    } else {
+        // SMS/Call Logs: date=1770112968852
+        if (preg_match('/date=(\d{10,13})/', $line, $match)) {
+            $timestamp = date('m-d H:i:s', (int)substr($match[1], 0, 10));
+        }
+    }
+
+    return [$timestamp, $level];
+}
+
+/**
+ * Whether a line passes the request's filters (timeThreshold, severityPattern,
+ * category, keyword, caseSensitive, regex)
+ */
+function filterLinePasses(string $line, string $level, int $logTimestamp, array $filters): bool
+{
+    // A. Time Range Filter ($logTimestamp from filterCarryTimes; 0 = the file has no times)
+    if ($filters['timeThreshold'] > 0) {
+        if ($logTimestamp > 0 && $logTimestamp < $filters['timeThreshold']) {
+            return false;
+        }
+    }
+
+    // B. Severity Filter
+    if (!empty($filters['severityPattern'])) {
+        // Map Level char to int for comparison? Or just Regex?
+        // The frontend sends specific levels. 
+        // If User selected 'E', they want 'E' or 'F'.
+        // If User selected 'W', they want 'W', 'E', 'F'.
+        // Simplest is to strict match the provided severity chars if we use checkboxes, 
+        // but here it seems we receive a pattern or single char?
+        // The input 'severity' generates '$severityPattern'.
+
+        // If it's a regex pattern from input:
+        // But wait, $severityPattern might be "/[WEF]/" etc. matches against the LINE.
+        // Better to match against our parsed $level for reliability.
+
+        // Let's rely on the regex pattern provided by backend setup OR manual check.
+        // If checking line for severity pattern:
+        if (!preg_match($filters['severityPattern'], $line)) {
+            // Try matching against the extracted level just in case logic differs
+            if (strpos($filters['severityPattern'], $level) === false) { 
+                return false; 
+            }
+        }
+    }
+
+    // C. Category Filter
+    if ($filters['category'] !== 'all') {
+        global $LOG_TYPES;
+        if (isset($LOG_TYPES[ucfirst($filters['category'])])) {
+            $pattern = $LOG_TYPES[ucfirst($filters['category'])]['pattern'];
+            if (!preg_match($pattern, $line))
+                return false;
+        }
+    }
+
+    // D. Keyword Filter
+    if (!empty($filters['keyword'])) {
+        if ($filters['caseSensitive']) {
+            if (strpos($line, $filters['keyword']) === false) return false;
+        } else {
+            if (stripos($line, $filters['keyword']) === false) return false;
+        }
+    }
+
+    // E. Regex Filter
+    if (!empty($filters['regex'])) {
+        $flags = $filters['caseSensitive'] ? '' : 'i';
+        if (!preg_match("/{$filters['regex']}/$flags", $line))
+            return false;
+    }
+
+    return true;
+}
+
 $response = [
     'success' => false,
     'count' => 0,
     'results' => [],
+    'next_cursor' => null,
+    'indexed' => [],
     'error' => null
 ];
 
@@ -30,6 +209,8 @@ $category = $input['category'] ?? 'all';
 $keyword = $input['keyword'] ?? '';
 $regex = $input['regex'] ?? '';
 $caseSensitive = $input['caseSensitive'] ?? false;
+// Keyset cursor into the search index (next_cursor of the previous page); 0 = first page
+$cursor = (int)($input['cursor'] ?? 0);
 
 $logsPath = getLogsPath();
 $results = [];
@@ -54,6 +235,13 @@ try {
             $files = glob($logsPath . '/*.txt');
     }
 
+    // The logcat may only exist as compressed segments (raw file dropped after segmenting)
+    $segmentIndex = logcatSegmentIndex($logsPath);
+    $logcatFile = $logsPath . '/android_logcat.txt';
+    if ($segmentIndex && in_array($logType, ['logcat', 'all']) && !in_array($logcatFile, $files)) {
+        $files[] = $logcatFile;
+    }
+
     // Calculate time threshold
     $timeThreshold = 0;
     switch ($timeRange) {
@@ -97,122 +285,129 @@ try {
     // Debug logging - log once per request, not per line
     file_put_contents(LOGS_PATH . '/debug_filter_request.log', date('Y-m-d H:i:s') . " - Input: " . json_encode($input) . "\n", FILE_APPEND);
 
-    // Process each file
-    foreach ($files as $file) {
-        if (!file_exists($file))
-            continue;
+    $severityLevels = ['verbose' => 'V', 'debug' => 'D', 'info' => 'I', 'warning' => 'W', 'error' => 'E', 'fatal' => 'F'];
 
-        $lines = file($file, FILE_IGNORE_NEW_LINES | FILE_SKIP_EMPTY_LINES);
-        $fileType = basename($file, '.txt');
+    $filters = compact('timeThreshold', 'severityPattern', 'category', 'keyword', 'caseSensitive', 'regex');
 
-        foreach ($lines as $line) {
-            // --- STEP 1: PARSE METADATA (Time & Level) ---
-            $timestamp = '--';
-            $level = 'I'; // Default to Info
-            $logTimestamp = 0;
-
-            if ($fileType === 'android_logcat') {
-                // Logcat Format: 01-23 13:46:46.045 ... Level/Tag ... or Level Tag
-                // Extract Time
-                if (preg_match('/^(\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)/', $line, $match)) {
-                    $timestamp = $match[1];
-                    $logTimestamp = strtotime(date('Y') . '-' . $timestamp);
-                }
-                // Extract Severity (Robust: handle "E/Tag" and " E Tag")
-                if (preg_match('/(?:^|\s)([VDIWEF])(?:\/|\s)/', $line, $match)) {
-                    $level = $match[1];
-                }
-            } else {
-                // SMS/Call Logs: date=1770112968852
-                if (preg_match('/date=(\d{10,13})/', $line, $match)) {
-                    $ts = $match[1];
-                    // Convert ms to seconds if needed
-                    if (strlen($ts) > 10) $ts = substr($ts, 0, 10);
-                    
-                    $logTimestamp = (int)$ts;
-                    $timestamp = date('m-d H:i:s', $logTimestamp);
-                }
+    // Sources covered by a current search index are answered from it, a page at a time
+    $index = openSearchIndex($logsPath);
+    $indexed = [];
+    $categoryBit = null;
+    if ($index) {
+        $indexMeta = searchIndexMeta($index);
+        if ($category !== 'all' && isset($LOG_TYPES[ucfirst($category)])) {
+            $categoryBit = array_search(ucfirst($category), $indexMeta['categories'], true);
+            if ($categoryBit === false) {
+                $index = null; // built with other categories
             }
+        }
+    }
+    if ($index) {
+        $current = currentIndexedSources($index, $logsPath);
+        foreach ($files as $file) {
+            if (isset($current[basename($file)])) {
+                $indexed[$file] = $current[basename($file)];
+            }
+        }
+        asort($indexed); // source id order, so one cursor walks them all
+        $files = array_values(array_diff($files, array_keys($indexed)));
+    }
 
-            // --- STEP 2: APPLY FILTERS ---
-
-            // A. Time Range Filter
-            if ($timeThreshold > 0) {
-                // If we couldn't parse a time on a meaningful line, skip or keep? 
-                // Usually skip if strict, but if $logTimestamp is 0 it means parse failed.
-                // Let's assume if parse failed we might want to keep it if it's a stack trace following a valid line?
-                // For now, strict: if valid timestamp found, filter it.
-                if ($logTimestamp > 0 && $logTimestamp < $timeThreshold) {
+    // Time range, logcat severity, category and keyword come from the index;
+    // case-sensitivity, regex and call/SMS severity are checked on the candidates
+    $nextCursor = null;
+    $candidateFilters = array_merge($filters, ['timeThreshold' => 0, 'category' => 'all']);
+    foreach ($indexed as $file => $sourceId) {
+        $fileType = basename($file, '.txt');
+        $isLogcat = $fileType === 'android_logcat';
+        $criteria = [
+            'fts' => $indexMeta['fts'],
+            'keyword' => $keyword,
+            'start' => $timeThreshold > 0 ? $timeThreshold : null,
+            'priorities' => $isLogcat && isset($severityLevels[$severity]) ? [$severityLevels[$severity]] : [],
+            'categoryBit' => $categoryBit
+        ];
+        $lineFilters = $isLogcat ? array_merge($candidateFilters, ['severityPattern' => '']) : $candidateFilters;
+        $after = $cursor;
+        do {
+            $page = searchIndexQuery($index, [$sourceId], $criteria, $after);
+            foreach ($page['rows'] as [$id, , , , , $line]) {
+                $after = (int)$id;
+                [$timestamp, $level] = filterLineMeta($line, $fileType);
+                if (!filterLinePasses($line, $level, 0, $lineFilters)) {
                     continue;
                 }
-            }
-
-            // B. Severity Filter
-            if (!empty($severityPattern)) {
-                // Map Level char to int for comparison? Or just Regex?
-                // The frontend sends specific levels. 
-                // If User selected 'E', they want 'E' or 'F'.
-                // If User selected 'W', they want 'W', 'E', 'F'.
-                // Simplest is to strict match the provided severity chars if we use checkboxes, 
-                // but here it seems we receive a pattern or single char?
-                // The input 'severity' generates '$severityPattern'.
-                
-                // If it's a regex pattern from input:
-                // But wait, $severityPattern might be "/[WEF]/" etc. matches against the LINE.
-                // Better to match against our parsed $level for reliability.
-                
-                // Let's rely on the regex pattern provided by backend setup OR manual check.
-                // If checking line for severity pattern:
-                if (!preg_match($severityPattern, $line)) {
-                    // Try matching against the extracted level just in case logic differs
-                    if (strpos($severityPattern, $level) === false) { 
-                        continue; 
-                    }
+                $results[] = [
+                    'timestamp' => $timestamp,
+                    'type' => str_replace('_', ' ', ucfirst($fileType)),
+                    'level' => $level,
+                    'content' => $line
+                ];
+                if (count($results) >= 1000) {
+                    $nextCursor = $after;
+                    break 3;
                 }
             }
+        } while ($page['next_cursor'] !== null);
+    }
 
-            // C. Category Filter
-            if ($category !== 'all') {
-                global $LOG_TYPES;
-                if (isset($LOG_TYPES[ucfirst($category)])) {
-                    $pattern = $LOG_TYPES[ucfirst($category)]['pattern'];
-                    if (!preg_match($pattern, $line))
-                        continue;
+    // Files the index doesn't cover are scanned once, with the last page of indexed results
+    foreach ($nextCursor === null ? $files : [] as $file) {
+        // Runs of lines dated together: [lines, time carried in]
+        $runs = null;
+        // Segmented logcat: only decompress segments inside the time range that hold the severity
+        if ($segmentIndex && $file === $logcatFile
+            && (!file_exists($file) || $timeThreshold > 0 || isset($severityLevels[$severity]))) {
+            $priorities = isset($severityLevels[$severity]) ? [$severityLevels[$severity]] : [];
+            $runs = [];
+            foreach (selectLogcatSegments($segmentIndex, $timeThreshold, $priorities) as $segment) {
+                $segmentLines = readLogcatSegmentLines($logsPath, [$segment]);
+                if ($segmentLines === null) {
+                    $runs = null;
+                    break;
                 }
+                $runs[] = [$segmentLines, (int)($segment['carry_epoch'] ?? 0)];
             }
+        }
+        if ($runs === null) {
+            if (!file_exists($file))
+                continue;
+            $runs = [[file($file, FILE_IGNORE_NEW_LINES | FILE_SKIP_EMPTY_LINES), 0]];
+        }
+        $fileType = basename($file, '.txt');
+        // Logcat severity is the parsed priority, as in the index
+        $priority = $file === $logcatFile ? ($severityLevels[$severity] ?? null) : null;
+        $lineFilters = $file === $logcatFile ? array_merge($filters, ['severityPattern' => '']) : $filters;
 
-            // D. Keyword Filter
-            if (!empty($keyword)) {
-                if ($caseSensitive) {
-                    if (strpos($line, $keyword) === false) continue;
-                } else {
-                    if (stripos($line, $keyword) === false) continue;
+        foreach ($runs as [$lines, $carry]) {
+            foreach (filterCarryTimes($lines, $carry) as [$line, $logTimestamp]) {
+                [$timestamp, $level] = filterLineMeta($line, $fileType);
+                if (!filterLinePasses($line, $level, $logTimestamp, $lineFilters)) {
+                    continue;
                 }
-            }
-
-            // E. Regex Filter
-            if (!empty($regex)) {
-                $flags = $caseSensitive ? '' : 'i';
-                if (!preg_match("/$regex/$flags", $line))
+                if ($priority !== null && logcatLinePriority($line) !== $priority) {
                     continue;
-            }
+                }
 
-            $results[] = [
-                'timestamp' => $timestamp,
-                'type' => str_replace('_', ' ', ucfirst($fileType)),
-                'level' => $level,
-                'content' => $line // No truncation - send full line
-            ];
+                $results[] = [
+                    'timestamp' => $timestamp,
+                    'type' => str_replace('_', ' ', ucfirst($fileType)),
+                    'level' => $level,
+                    'content' => $line // No truncation - send full line
+                ];
 
-            // Limit results
-            if (count($results) >= 1000)
-                break 2;
+                // Limit results
+                if (count($results) >= 1000)
+                    break 3;
+            }
         }
     }
 
     $response['success'] = true;
     $response['count'] = count($results);
     $response['results'] = $results;
+    $response['next_cursor'] = $nextCursor;
+    $response['indexed'] = array_map('basename', array_keys($indexed));
 
 } catch (Exception $e) {
     $response['error'] = $e->getMessage();
@@ -90,8 +90,8 @@ foreach ($stats as $label => $count) {
 
 foreach ($modules as $label => $file) {
     $filepath = $logsPath . '/' . $file;
-    if (file_exists($filepath)) {
-        $data = json_decode(file_get_contents($filepath), true);
+    if (findArtifact($filepath)) {
+        $data = loadArtifactFields($filepath);
         if (isset($data['summary'])) {
             foreach ($data['summary'] as $key => $value) {
                 if (is_numeric($value)) {
@@ -1,12 +1,13 @@
 <?php
 header('Content-Type: application/json');
+require_once __DIR__ . '/../includes/artifacts.php';
 
 $baseDir = dirname(dirname(__DIR__));
 $scriptPath = $baseDir . '/analysis/apk_tracker.py';
 
 // Check if intent_hunter needs to run first
 $intentHunterJson = $baseDir . '/logs/intent_hunter.json';
-if (!file_exists($intentHunterJson)) {
+if (!findArtifact($intentHunterJson)) {
     $intentHunterScript = $baseDir . '/analysis/intent_hunter.py';
     exec("python \"$intentHunterScript\" 2>&1", $output1, $returnCode1);
 }
@@ -2,6 +2,39 @@
 header('Content-Type: application/json');
 
 $baseDir = dirname(dirname(__DIR__));
+$progressFile = $baseDir . '/logs/threat_scan_progress.json';
+
+// Poll progress of a streaming scan
+if (($_GET['action'] ?? '') === 'progress') {
+    header("Cache-Control: no-store, no-cache, must-revalidate, max-age=0");
+    if (file_exists($progressFile)) {
+        readfile($progressFile);
+    } else {
+        echo json_encode(['progress' => 0, 'status' => 'Waiting for scan...']);
+    }
+    exit;
+}
+
+// Streaming scan for large logs: runs in background, writes NDJSON + progress file
+if (($_GET['mode'] ?? '') === 'stream') {
+    file_put_contents($progressFile, json_encode(['progress' => 0, 'status' => 'Starting...']));
+
+    // Scanner uses paths relative to the project root
+    chdir($baseDir);
+    $scannerPath = $baseDir . '/threat_scanner.py';
+    $logPath = $baseDir . '/logs/threat_scan_debug.log';
+    // Windows: start /B python script.py
+    $cmd = "start /B python \"$scannerPath\" --stream > \"$logPath\" 2>&1";
+    pclose(popen($cmd, "r"));
+
+    echo json_encode([
+        'success' => true,
+        'message' => 'Streaming threat scan started in background.',
+        'progress_url' => 'api/run_threat_scan.php?action=progress'
+    ]);
+    exit;
+}
+
 $scriptPath = $baseDir . '/analysis/threat_detector.py';
 $outputFile = $baseDir . '/logs/threat_report.json';
 
@@ -91,8 +91,9 @@ if (file_exists($dualSpaceFile)) {
 
 // Read App Session Analysis (Installed Banking Apps)
 $appSessionFile = $logsPath . '/app_sessions.json';
-if (file_exists($appSessionFile)) {
-    $sessionData = json_decode(file_get_contents($appSessionFile), true);
+if (findArtifact($appSessionFile)) {
+    // Only the summary is needed, not the sessions
+    $sessionData = loadArtifactFields($appSessionFile);
     if ($sessionData && isset($sessionData['summary'])) {
         $response['muleStats']['totalBankingApps'] = $sessionData['summary']['unique_banking_apps'] ?? 0;
         
@@ -47,12 +47,15 @@ function extractTimeline()
     // Check if json file exists
     $jsonFile = $baseDir . '/logs/unified_timeline.json';
 
-    if (file_exists($jsonFile)) {
-        // Read to count events
-        $data = json_decode(file_get_contents($jsonFile), true);
+    if (findArtifact($jsonFile)) {
+        // Count events one at a time (any artifact format)
+        $totalEvents = 0;
+        foreach (iterArtifact($jsonFile) as $event) {
+            $totalEvents++;
+        }
         echo json_encode([
             'success' => true,
-            'total_events' => count($data),
+            'total_events' => $totalEvents,
             'audit_log' => ['Extraction successful', $output],
             'retention_notice' => 'Timeline extracted successfully.'
         ]);
@@ -75,7 +78,7 @@ function getEvents()
     $baseDir = dirname(__DIR__, 2);
     $jsonFile = $baseDir . '/logs/unified_timeline.json';
 
-    if (!file_exists($jsonFile)) {
+    if (!findArtifact($jsonFile)) {
         echo json_encode([
             'success' => true,
             'events' => [],
@@ -84,7 +87,7 @@ function getEvents()
         return;
     }
 
-    $rawData = json_decode(file_get_contents($jsonFile), true);
+    $rawData = iterArtifact($jsonFile);
 
     // Transform Data to match TimelineViewer.js expectations
     // Input: { timestamp, type, subtype, content, severity }
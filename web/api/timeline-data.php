@@ -5,11 +5,42 @@ header('Content-Type: application/json');
 
 $logsPath = getLogsPath();
 $timelineFile = $logsPath . '/unified_timeline.json';
+$indexFile = $logsPath . '/unified_timeline.idx.json';
 
-if (file_exists($timelineFile)) {
-    readfile($timelineFile);
+// Paged/windowed query: ?start=&end=&types=SMS,CALL&limit=100&cursor=
+// Served from the indexed NDJSON sidecar written by unified_timeline.py
+$queryParams = ['start', 'end', 'types', 'limit', 'cursor'];
+$isQuery = false;
+foreach ($queryParams as $param) {
+    if (isset($_GET[$param])) {
+        $isQuery = true;
+    }
+}
+
+if ($isQuery && file_exists($indexFile)) {
+    $scriptPath = dirname(__DIR__, 2) . '/analysis/timeline_index.py';
+    $cmd = "python " . escapeshellarg($scriptPath) . " --logs-dir " . escapeshellarg($logsPath);
+    foreach ($queryParams as $param) {
+        if (isset($_GET[$param]) && $_GET[$param] !== '') {
+            $cmd .= " --$param " . escapeshellarg($_GET[$param]);
+        }
+    }
+    passthru($cmd);
+} elseif ($isQuery) {
+    echo json_encode(['events' => [], 'count' => 0, 'next_cursor' => null, 'error' => 'Timeline index not found. Re-run analysis.']);
+} elseif (($artifact = findArtifact($timelineFile)) && substr($artifact, -5) === '.json') {
+    readfile($artifact);
+} elseif ($artifact) {
+    // NDJSON artifact: stream it out as a JSON array without loading it
+    echo '[';
+    $first = true;
+    foreach (iterArtifact($timelineFile) as $event) {
+        echo ($first ? '' : ',') . json_encode($event);
+        $first = false;
+    }
+    echo ']';
 } else {
     // Return empty array instead of 404 to avoid frontend crash
     echo json_encode([]);
 }
-?>
\ No newline at end of file
+?>
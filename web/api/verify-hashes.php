@@ -13,8 +13,10 @@ $auditLogger = getAuditLogger();
 
 try {
     // Execute Python hash verification script
+    // mode=fast only re-hashes files whose size/mtime/inode changed; the default is a full re-hash
+    $fastMode = isset($_GET['mode']) && $_GET['mode'] === 'fast';
     $script_path = dirname(__DIR__, 2) . '/analysis/evidence_hasher.py';
-    $command = escapeshellcmd("python \"$script_path\" verify");
+    $command = escapeshellcmd("python \"$script_path\" verify" . ($fastMode ? ' --fast' : ''));
 
     exec($command . ' 2>&1', $output, $return_code);
 
@@ -40,7 +42,7 @@ try {
     // Log the verification
     $auditLogger->log(
         'HASH_VERIFICATION',
-        "Verified: $verified, Tampered: $tampered, Missing: $missing",
+        "Verified: $verified, Tampered: $tampered, Missing: $missing" . ($fastMode ? ' (fast mode)' : ''),
         $tampered > 0 ? 'CRITICAL' : 'INFO'
     );
 
@@ -50,6 +52,7 @@ try {
         'verified' => $verified,
         'tampered' => $tampered,
         'missing' => $missing,
+        'mode' => $fastMode ? 'fast' : 'full',
         'timestamp' => date('Y-m-d H:i:s'),
         'details' => implode("\n", $output)
     ]);
@@ -0,0 +1,158 @@
+<?php
+/**
+ * Analyzer Artifact Reader
+ * Reads artifacts written by analysis/artifact_io.py in any supported format:
+ * JSON (pretty list/object) or NDJSON with a {"_meta": {...}} header line,
+ * optionally gzip (.ndjson.gz) or zstd (.ndjson.zst, needs the zstd extension).
+ */
+
+define('ARTIFACT_FORMATS', ['json', 'ndjson', 'ndjson.gz', 'ndjson.zst']);
+
+/**
+ * logs/x.json -> logs/x.ndjson.gz
+ */
+function artifactVariantPath(string $path, string $format): string
+{
+    $base = substr($path, -5) === '.json' ? substr($path, 0, -5) : $path;
+    return $base . '.' . $format;
+}
+
+/**
+ * Existing file for a canonical ".json" artifact path (newest variant wins), or null
+ */
+function findArtifact(string $path): ?string
+{
+    $found = null;
+    foreach (ARTIFACT_FORMATS as $format) {
+        $candidate = artifactVariantPath($path, $format);
+        if (file_exists($candidate) && ($found === null || filemtime($candidate) > filemtime($found))) {
+            $found = $candidate;
+        }
+    }
+    return $found;
+}
+
+/**
+ * Size in bytes of whichever artifact variant exists (0 if none)
+ */
+function artifactSize(string $path): int
+{
+    $found = findArtifact($path);
+    return $found ? filesize($found) : 0;
+}
+
+/**
+ * Open an NDJSON artifact and return [handle, gets, close] callables
+ */
+function openArtifactLines(string $file): ?array
+{
+    if (substr($file, -3) === '.gz') {
+        $handle = gzopen($file, 'rb');
+        return $handle ? [$handle, 'gzgets', 'gzclose'] : null;
+    }
+    if (substr($file, -4) === '.zst') {
+        if (!function_exists('zstd_uncompress')) {
+            error_log("zstd extension required to read $file");
+            return null;
+        }
+        $handle = fopen('compress.zstd://' . $file, 'rb');
+        return $handle ? [$handle, 'fgets', 'fclose'] : null;
+    }
+    $handle = fopen($file, 'rb');
+    return $handle ? [$handle, 'fgets', 'fclose'] : null;
+}
+
+/**
+ * Header of an NDJSON artifact ([] for plain JSON)
+ */
+function readArtifactMeta(string $path): array
+{
+    $file = findArtifact($path);
+    if (!$file || substr($file, -5) === '.json') {
+        return [];
+    }
+    $reader = openArtifactLines($file);
+    if (!$reader) {
+        return [];
+    }
+    [$handle, $gets, $close] = $reader;
+    $first = json_decode((string) $gets($handle), true);
+    $close($handle);
+    return $first['_meta'] ?? [];
+}
+
+/**
+ * Yield artifact records one at a time.
+ * NDJSON is streamed line by line; plain JSON lists are decoded once and yielded per element.
+ */
+function iterArtifact(string $path): Generator
+{
+    $file = findArtifact($path);
+    if (!$file) {
+        return;
+    }
+
+    if (substr($file, -5) === '.json') {
+        $data = json_decode(file_get_contents($file), true);
+        if (is_array($data) && ($data === [] || array_key_exists(0, $data))) {
+            yield from $data;
+        } elseif ($data !== null) {
+            yield $data;
+        }
+        return;
+    }
+
+    $reader = openArtifactLines($file);
+    if (!$reader) {
+        return;
+    }
+    [$handle, $gets, $close] = $reader;
+    while (($line = $gets($handle)) !== false) {
+        $record = json_decode($line, true);
+        if ($record === null || isset($record['_meta'])) {
+            continue;
+        }
+        yield $record;
+    }
+    $close($handle);
+}
+
+/**
+ * Load an artifact in its original shape (list, or object rebuilt from the NDJSON header)
+ */
+function loadArtifact(string $path, $default = [])
+{
+    $file = findArtifact($path);
+    if (!$file) {
+        return $default;
+    }
+
+    if (substr($file, -5) === '.json') {
+        return json_decode(file_get_contents($file), true);
+    }
+
+    $meta = readArtifactMeta($path);
+    $records = iterator_to_array(iterArtifact($path), false);
+    if (!empty($meta['records_key'])) {
+        $data = [];
+        $fields = $meta['fields'] ?? [];
+        foreach ($meta['keys'] ?? array_merge(array_keys($fields), [$meta['records_key']]) as $key) {
+            $data[$key] = $key === $meta['records_key'] ? $records : ($fields[$key] ?? null);
+        }
+        return $data;
+    }
+    return $records;
+}
+
+/**
+ * The non-record fields of a dict-shaped artifact (summary, statistics, ...).
+ * Taken from the NDJSON header without reading the records; plain JSON is loaded whole.
+ */
+function loadArtifactFields(string $path, $default = [])
+{
+    $meta = readArtifactMeta($path);
+    if (isset($meta['fields'])) {
+        return $meta['fields'];
+    }
+    return findArtifact($path) ? loadArtifact($path, $default) : $default;
+}
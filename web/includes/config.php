@@ -181,3 +181,6 @@ function getBasePath()
     }
     return '';
 }
+
+// Analyzer artifact reader (JSON / NDJSON / compressed NDJSON)
+require_once __DIR__ . '/artifacts.php';
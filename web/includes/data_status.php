@@ -22,16 +22,16 @@ function getDataAvailability()
         'battery_history' => file_exists("$logsPath/battery_history.txt") && filesize("$logsPath/battery_history.txt") > 100,
 
         // Analysis outputs
-        'timeline' => file_exists("$logsPath/unified_timeline.json") && filesize("$logsPath/unified_timeline.json") > 10,
-        'privacy' => file_exists("$logsPath/privacy_profile.json") && filesize("$logsPath/privacy_profile.json") > 10,
-        'network' => file_exists("$logsPath/network_intelligence.json") && filesize("$logsPath/network_intelligence.json") > 10,
-        'pii' => file_exists("$logsPath/pii_leaks.json") && filesize("$logsPath/pii_leaks.json") > 10,
-        'social' => file_exists("$logsPath/social_graph.json") && filesize("$logsPath/social_graph.json") > 10,
-        'power' => file_exists("$logsPath/power_forensics.json") && filesize("$logsPath/power_forensics.json") > 10,
-        'intents' => file_exists("$logsPath/intent_hunter.json") && filesize("$logsPath/intent_hunter.json") > 10,
-        'beacons' => file_exists("$logsPath/beacon_map.json") && filesize("$logsPath/beacon_map.json") > 10,
-        'clipboard' => file_exists("$logsPath/clipboard_forensics.json") && filesize("$logsPath/clipboard_forensics.json") > 10,
-        'sessions' => file_exists("$logsPath/app_sessions.json") && filesize("$logsPath/app_sessions.json") > 10,
+        'timeline' => artifactSize("$logsPath/unified_timeline.json") > 10,
+        'privacy' => artifactSize("$logsPath/privacy_profile.json") > 10,
+        'network' => artifactSize("$logsPath/network_intelligence.json") > 10,
+        'pii' => artifactSize("$logsPath/pii_leaks.json") > 10,
+        'social' => artifactSize("$logsPath/social_graph.json") > 10,
+        'power' => artifactSize("$logsPath/power_forensics.json") > 10,
+        'intents' => artifactSize("$logsPath/intent_hunter.json") > 10,
+        'beacons' => artifactSize("$logsPath/beacon_map.json") > 10,
+        'clipboard' => artifactSize("$logsPath/clipboard_forensics.json") > 10,
+        'sessions' => artifactSize("$logsPath/app_sessions.json") > 10,
     ];
 
     return $status;
@@ -39,12 +39,11 @@ function getDataAvailability()
 
 function hasDataContent($jsonFile)
 {
-    if (!file_exists($jsonFile)) {
+    if (!findArtifact($jsonFile)) {
         return false;
     }
 
-    $content = file_get_contents($jsonFile);
-    $data = json_decode($content, true);
+    $data = loadArtifact($jsonFile);
 
     if (!$data) {
         return false;
@@ -101,7 +100,7 @@ function getDataStatusBadge($feature)
 
     $file = "$logsPath/{$fileMap[$feature]}";
 
-    if (!file_exists($file)) {
+    if (!findArtifact($file)) {
         return '<span class="badge bg-secondary ms-2" title="Data file not found">No Data</span>';
     }
 
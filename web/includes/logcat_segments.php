@@ -0,0 +1,123 @@
+<?php
+/**
+ * Logcat Segment Store Reader
+ * Reads the segmented, compressed logcat written by analysis/logcat_segments.py:
+ * logs/logcat_segments/index.json plus seg_NNNNN.log.gz|.zst segments.
+ * Segments outside a time range or whose bloom filter rules out a
+ * priority/tag are never decompressed.
+ */
+
+require_once __DIR__ . '/artifacts.php';
+
+/**
+ * Segment index, or null if there is none (or it is stale against the raw file)
+ */
+function logcatSegmentIndex(string $logsPath): ?array
+{
+    $indexFile = $logsPath . '/logcat_segments/index.json';
+    if (!file_exists($indexFile)) {
+        return null;
+    }
+    $index = json_decode(file_get_contents($indexFile), true);
+    // Version 1 indexes lack head_untimed/lead_epoch/tail_epoch; see selectLogcatSegments
+    if (!is_array($index) || !in_array($index['version'] ?? 0, [1, 2], true)) {
+        return null;
+    }
+    $raw = $logsPath . '/' . $index['source'];
+    if (file_exists($raw) && filesize($raw) !== $index['source_size']) {
+        return null;
+    }
+    return $index;
+}
+
+/**
+ * Bloom filter test; bit positions are md5(key) as four little-endian uint32 words
+ */
+function logcatBloomContains(string $bloom, string $key, int $bits, int $hashes): bool
+{
+    $words = array_values(unpack('V4', md5($key, true)));
+    for ($i = 0; $i < $hashes; $i++) {
+        $pos = $words[$i] % $bits;
+        if (!((ord($bloom[$pos >> 3]) >> ($pos & 7)) & 1)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+/**
+ * Segments that can hold lines newer than $fromEpoch with one of $priorities.
+ * A line without a time has the time of the closest timed line before it (or of
+ * the file's first timed line when it comes before that), as in
+ * analysis/logcat_parser.py; each selected segment gets 'carry_epoch', the time
+ * its leading untimed lines carry in (null if the file has no times).
+ */
+function selectLogcatSegments(array $index, int $fromEpoch = 0, array $priorities = []): array
+{
+    $carry = null;
+    foreach ($index['segments'] as $segment) {
+        $lead = array_key_exists('lead_epoch', $segment) ? $segment['lead_epoch'] : $segment['first_epoch'];
+        if ($lead !== null) {
+            $carry = $lead;
+            break;
+        }
+    }
+    $selected = [];
+    foreach ($index['segments'] as $segment) {
+        $before = $carry;
+        $tail = array_key_exists('tail_epoch', $segment) ? $segment['tail_epoch'] : $segment['last_epoch'];
+        if ($tail !== null) {
+            $carry = $tail;
+        }
+        // head_untimed is unknown (null) in version 1 indexes
+        $headInRange = ($segment['head_untimed'] ?? null) !== 0
+            && ($before === null || $fromEpoch <= 0 || $before >= $fromEpoch);
+        if (!$headInRange) {
+            if ($segment['last_epoch'] === null) {
+                continue;
+            }
+            if ($fromEpoch > 0 && $segment['last_epoch'] < $fromEpoch) {
+                continue;
+            }
+        }
+        if (!empty($priorities)) {
+            $bloom = hex2bin($segment['bloom']);
+            $match = false;
+            foreach ($priorities as $priority) {
+                if (logcatBloomContains($bloom, 'P:' . $priority, $index['bloom_bits'], $index['bloom_hashes'])) {
+                    $match = true;
+                    break;
+                }
+            }
+            if (!$match) {
+                continue;
+            }
+        }
+        $segment['carry_epoch'] = $before;
+        $selected[] = $segment;
+    }
+    return $selected;
+}
+
+/**
+ * Lines (without newlines) of the selected segments, or null if a segment can't be read
+ */
+function readLogcatSegmentLines(string $logsPath, array $segments): ?array
+{
+    $lines = [];
+    foreach ($segments as $segment) {
+        $reader = openArtifactLines($logsPath . '/logcat_segments/' . $segment['file']);
+        if (!$reader) {
+            return null;
+        }
+        [$handle, $gets, $close] = $reader;
+        while (($line = $gets($handle)) !== false) {
+            $line = rtrim($line, "\r\n");
+            if ($line !== '') {
+                $lines[] = $line;
+            }
+        }
+        $close($handle);
+    }
+    return $lines;
+}
@@ -0,0 +1,179 @@
+<?php
+/**
+ * Log Search Index Reader
+ * Queries the SQLite FTS5 index written by analysis/search_index.py
+ * (logs/search_index/index.db). Keywords are matched with LIKE against the
+ * trigram table, time ranges are narrowed with the per-source time buckets,
+ * and pages are keyed by line id so deep pages cost the same as the first.
+ * A source whose size or mtime changed since the build is not "current" and
+ * callers must scan the file instead.
+ */
+
+require_once __DIR__ . '/logcat_segments.php';
+
+define('SEARCH_INDEX_VERSION', '2');
+
+/**
+ * Read-only connection to the index, or null if there is none (or no pdo_sqlite)
+ */
+function openSearchIndex(string $logsPath): ?PDO
+{
+    $dbFile = $logsPath . '/search_index/index.db';
+    if (!extension_loaded('pdo_sqlite') || !file_exists($dbFile)) {
+        return null;
+    }
+    try {
+        $db = new PDO('sqlite:' . $dbFile, null, null, [
+            PDO::ATTR_ERRMODE => PDO::ERRMODE_EXCEPTION,
+            PDO::SQLITE_ATTR_OPEN_FLAGS => PDO::SQLITE_OPEN_READONLY
+        ]);
+        $meta = $db->query('SELECT key, value FROM meta')->fetchAll(PDO::FETCH_KEY_PAIR);
+    } catch (Exception $e) {
+        return null;
+    }
+    return ($meta['version'] ?? null) === SEARCH_INDEX_VERSION ? $db : null;
+}
+
+/**
+ * Index metadata: version, fts (trigram|none), categories (bit order), created
+ */
+function searchIndexMeta(PDO $db): array
+{
+    $meta = $db->query('SELECT key, value FROM meta')->fetchAll(PDO::FETCH_KEY_PAIR);
+    $meta['categories'] = json_decode($meta['categories'] ?? '[]', true) ?: [];
+    return $meta;
+}
+
+/**
+ * [source name => source id] of indexed sources that still match their files
+ */
+function currentIndexedSources(PDO $db, string $logsPath): array
+{
+    $current = [];
+    foreach ($db->query('SELECT id, name, size, mtime FROM sources') as $row) {
+        $path = $logsPath . '/' . $row['name'];
+        if (file_exists($path)) {
+            clearstatcache(true, $path);
+            $size = filesize($path);
+            $mtime = filemtime($path);
+        } elseif ($row['name'] === 'android_logcat.txt' && ($segments = logcatSegmentIndex($logsPath))) {
+            // Raw file dropped after segmenting: the segment index remembers what it was
+            $size = $segments['source_size'];
+            $mtime = intdiv($segments['source_mtime_ns'], 1000000000);
+        } else {
+            continue;
+        }
+        if ($size === (int)$row['size'] && $mtime === (int)$row['mtime']) {
+            $current[$row['name']] = (int)$row['id'];
+        }
+    }
+    return $current;
+}
+
+/**
+ * Escape a keyword for LIKE ... ESCAPE '\'
+ */
+function searchIndexLikePattern(string $keyword): string
+{
+    return '%' . str_replace(['\\', '%', '_'], ['\\\\', '\\%', '\\_'], $keyword) . '%';
+}
+
+/**
+ * Prepare and run a statement; numbers are bound as integers (execute() would bind them as text)
+ */
+function searchIndexExecute(PDO $db, string $sql, array $params): PDOStatement
+{
+    $stmt = $db->prepare($sql);
+    foreach (array_values($params) as $i => $value) {
+        $stmt->bindValue($i + 1, $value, is_int($value) ? PDO::PARAM_INT : PDO::PARAM_STR);
+    }
+    $stmt->execute();
+    return $stmt;
+}
+
+/**
+ * One page of matching lines of the given source ids, in file order.
+ *
+ * $criteria: keyword (case-insensitive substring), start/end (epoch seconds;
+ * a line without a time has the time of the closest timed line before it, or
+ * of the first one if it comes before it, and matches when its file has no
+ * times), priorities (logcat letters),
+ * categoryBit (bit of a LOG_TYPES category, see searchIndexMeta).
+ * Returns ['rows' => [[id, source, line_no, epoch, priority, content]...], 'next_cursor' => id|null]
+ */
+function searchIndexQuery(PDO $db, array $sourceIds, array $criteria, int $after = 0, int $limit = 1000): array
+{
+    $empty = ['rows' => [], 'next_cursor' => null];
+    if (empty($sourceIds)) {
+        return $empty;
+    }
+    $sourceList = implode(',', array_fill(0, count($sourceIds), '?'));
+    $where = ["l.source IN ($sourceList)"];
+    $params = array_values($sourceIds);
+    $start = isset($criteria['start']) ? (int)$criteria['start'] : null;
+    $end = isset($criteria['end']) ? (int)$criteria['end'] : null;
+    $low = $after;
+    $high = null;
+
+    if ($start !== null || $end !== null) {
+        // Time buckets bound the ids that can hold lines in the range
+        $blockWhere = ["source IN ($sourceList)"];
+        $blockParams = array_values($sourceIds);
+        if ($start !== null) {
+            $blockWhere[] = '(max_epoch >= ? OR untimed > 0)';
+            $blockParams[] = $start;
+            $where[] = '(l.epoch IS NULL OR l.epoch >= ?)';
+            $params[] = $start;
+        }
+        if ($end !== null) {
+            $blockWhere[] = '(min_epoch <= ? OR untimed > 0)';
+            $blockParams[] = $end;
+            $where[] = '(l.epoch IS NULL OR l.epoch <= ?)';
+            $params[] = $end;
+        }
+        $stmt = searchIndexExecute($db, 'SELECT MIN(first_id), MAX(last_id) FROM blocks WHERE '
+            . implode(' AND ', $blockWhere), $blockParams);
+        [$first, $last] = $stmt->fetch(PDO::FETCH_NUM);
+        if ($first === null) {
+            return $empty;
+        }
+        $low = max((int)$first - 1, $after);
+        $high = (int)$last;
+    }
+    if (!empty($criteria['priorities'])) {
+        $where[] = 'l.priority IN (' . implode(',', array_fill(0, count($criteria['priorities']), '?')) . ')';
+        $params = array_merge($params, array_values($criteria['priorities']));
+    }
+    if (isset($criteria['categoryBit'])) {
+        $where[] = '(l.categories & ?) != 0';
+        $params[] = 1 << $criteria['categoryBit'];
+    }
+
+    $table = 'lines l';
+    $order = 'l.id';
+    $keyword = $criteria['keyword'] ?? '';
+    if ($keyword !== '' && strlen($keyword) >= 3 && ($criteria['fts'] ?? '') === 'trigram') {
+        // LIKE on the trigram table is answered from the index, in rowid order
+        $table = 'lines_fts f JOIN lines l ON l.id = f.rowid';
+        $order = 'f.rowid';
+        array_unshift($where, "f.content LIKE ? ESCAPE '\\'");
+        array_unshift($params, searchIndexLikePattern($keyword));
+    } elseif ($keyword !== '') {
+        $where[] = "l.content LIKE ? ESCAPE '\\'";
+        $params[] = searchIndexLikePattern($keyword);
+    }
+    $where[] = "$order > ?";
+    $params[] = $low;
+    if ($high !== null) {
+        $where[] = "$order <= ?";
+        $params[] = $high;
+    }
+    $params[] = $limit + 1;
+
+    $stmt = searchIndexExecute($db, "SELECT l.id, l.source, l.line_no, l.epoch, l.priority, l.content FROM $table "
+        . 'WHERE ' . implode(' AND ', $where) . " ORDER BY $order LIMIT ?", $params);
+    $rows = $stmt->fetchAll(PDO::FETCH_NUM);
+    $more = count($rows) > $limit;
+    $rows = array_slice($rows, 0, $limit);
+    return ['rows' => $rows, 'next_cursor' => $more ? (int)end($rows)[0] : null];
+}
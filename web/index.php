@@ -69,13 +69,10 @@ function getStats()
 
     // Count Notifications
     $notifFile = $logsPath . '/notification_timeline.json';
-    if (file_exists($notifFile)) {
-        $content = @file_get_contents($notifFile);
-        if ($content) {
-            $json = json_decode($content, true);
-            if (is_array($json)) {
-                $stats['notificationCount'] = count($json);
-            }
+    if (findArtifact($notifFile)) {
+        $stats['notificationCount'] = 0;
+        foreach (iterArtifact($notifFile) as $notification) {
+            $stats['notificationCount']++;
         }
     }
 
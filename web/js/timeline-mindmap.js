@@ -21,6 +21,9 @@ class MindMapTimeline {
                 category: 25,
                 event: 8
             },
+            // Pages requested from the indexed timeline (api/timeline-data.php)
+            pageSize: 1000,
+            maxEvents: 5000,
             ...options
         };
 
@@ -29,6 +32,8 @@ class MindMapTimeline {
             allNodes: [],
             filters: new Set(['SMS', 'CALL', 'LOGCAT_APP', 'LOGCAT_NET', 'LOGCAT_SYS', 'VOIP']),
             searchQuery: '',
+            timeRange: 'all',
+            totalEvents: null,
             flaggedIds: new Set(),
             expandedCategories: new Set(['SMS', 'CALL', 'LOGCAT_APP', 'LOGCAT_NET', 'LOGCAT_SYS', 'VOIP']),
             statistics: {}
@@ -92,20 +97,52 @@ class MindMapTimeline {
     }
 
     async loadData(url) {
+        this.dataUrl = url;
         try {
-            const rawData = await d3.json(url);
+            // Windowed pages from the sidecar index; the whole file only when it hasn't been built
+            let rawData = await this.fetchWindow();
+            if (rawData === null) {
+                rawData = await d3.json(url);
+                this.state.totalEvents = null;
+            }
             if (!rawData || rawData.length === 0) {
                 this.showError('No data found. Please extract logs first.');
                 return;
             }
             this.processData(rawData);
-            this.render();
+            this.applyFilters();
         } catch (err) {
             console.error(err);
             this.showError(`Error loading data: ${err.message}`);
         }
     }
 
+    /**
+     * Events of the selected time range, a page at a time (start/limit/cursor),
+     * up to maxEvents. Returns null when the timeline index is missing.
+     */
+    async fetchWindow() {
+        const windows = { '1h': 3600e3, '6h': 6 * 3600e3, '24h': 86400e3, '7d': 7 * 86400e3 };
+        const params = new URLSearchParams({ limit: this.config.pageSize });
+        if (windows[this.state.timeRange]) {
+            // Timeline times are naive local times, so send the start the same way
+            const start = new Date(Date.now() - windows[this.state.timeRange]);
+            params.set('start', new Date(start - start.getTimezoneOffset() * 60e3).toISOString().slice(0, 19));
+        }
+
+        const events = [];
+        let cursor = null;
+        do {
+            if (cursor) params.set('cursor', cursor);
+            const page = await d3.json(`${this.dataUrl}?${params}`);
+            if (!page || page.error) return null;
+            events.push(...page.events);
+            this.state.totalEvents = page.total;
+            cursor = page.next_cursor;
+        } while (cursor && events.length < this.config.maxEvents);
+        return events;
+    }
+
     processData(rawData) {
         // Categorize events
         this.state.allNodes = rawData.map((d, i) => {
@@ -408,7 +445,7 @@ class MindMapTimeline {
 
     updateStatistics() {
         const stats = {
-            total: this.state.allNodes.length,
+            total: this.state.totalEvents ?? this.state.allNodes.length,
             visible: this.state.data.length,
             sms: this.state.data.filter(n => n.category === 'SMS').length,
             calls: this.state.data.filter(n => n.category === 'CALL').length,
@@ -462,6 +499,16 @@ class MindMapTimeline {
             }
         });
 
+        // Time range: request that window from the timeline index
+        const timeRange = document.getElementById('time-range');
+        if (timeRange) {
+            timeRange.addEventListener('change', () => {
+                this.state.timeRange = timeRange.value;
+                this.elements.loadingOverlay.classList.remove('d-none');
+                this.loadData(this.dataUrl);
+            });
+        }
+
         // Search
         const searchInput = document.getElementById('search-input');
         if (searchInput) {
@@ -7,8 +7,8 @@ require_once '../includes/sidebar.php';
 $logsPath = getLogsPath();
 $sessionData = ["sessions" => [], "app_statistics" => [], "summary" => []];
 $sessionFile = $logsPath . '/app_sessions.json';
-if (file_exists($sessionFile)) {
-    $sessionData = json_decode(file_get_contents($sessionFile), true);
+if (findArtifact($sessionFile)) {
+    $sessionData = loadArtifact($sessionFile);
 }
 ?>
 
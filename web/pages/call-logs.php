@@ -161,12 +161,12 @@ function parseCallLogs()
 // Fetch VoIP calls from Unified Timeline (Logcat analysis)
 function getVoipCallsFromTimeline() {
     $timelineFile = dirname(__DIR__, 2) . '/logs/unified_timeline.json';
-    if (!file_exists($timelineFile)) return [];
+    if (!findArtifact($timelineFile)) return [];
 
-    $data = json_decode(file_get_contents($timelineFile), true);
     $voipCalls = [];
 
-    foreach ($data as $evt) {
+    // Streamed one event at a time (NDJSON), so the whole timeline is never in memory
+    foreach (iterArtifact($timelineFile) as $evt) {
         if (($evt['type'] ?? '') === 'VOIP') {
             $metadata = $evt['metadata'] ?? [];
             
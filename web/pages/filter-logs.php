@@ -211,6 +211,9 @@ require_once '../includes/sidebar.php';
                         <i class="fas fa-list me-2"></i>Filtered Results
                     </h3>
                     <div class="card-tools">
+                        <button class="btn btn-sm btn-outline-secondary me-2" id="loadMoreBtn" style="display: none;" onclick="loadMoreResults()">
+                            <i class="fas fa-angle-double-down me-1"></i>Load More
+                        </button>
                         <div class="btn-group">
                             <button class="btn btn-sm btn-outline-primary" onclick="exportFilteredLogs('csv')">
                                 <i class="fas fa-file-csv me-1"></i>CSV
@@ -345,8 +348,18 @@ document.getElementById('filterTimeRange').addEventListener('change', function()
 });
 
 let currentController = null;
+// Paging through search-index results: the last request's filters, its next_cursor and the rows so far
+let lastFilters = null;
+let nextCursor = null;
+let loadedResults = [];
+
+function loadMoreResults() {
+    if (lastFilters && nextCursor !== null) {
+        applyFilters(nextCursor);
+    }
+}
 
-function applyFilters() {
+function applyFilters(cursor = 0) {
     showLoading('Filtering logs...');
     
     // Abort previous request if running
@@ -356,13 +369,17 @@ function applyFilters() {
     currentController = new AbortController();
     const signal = currentController.signal;
     
-    // Clear previous results immediately
-    document.getElementById('filterTableBody').innerHTML = '';
-    document.getElementById('resultStats').style.display = 'none';
+    // Clear previous results immediately (unless loading the next page)
+    if (!cursor) {
+        document.getElementById('filterTableBody').innerHTML = '';
+        document.getElementById('resultStats').style.display = 'none';
+        loadedResults = [];
+    }
+    document.getElementById('loadMoreBtn').style.display = 'none';
     
     const startTime = performance.now();
     
-    const filters = {
+    const filters = cursor ? Object.assign({}, lastFilters, { cursor: cursor }) : {
         logType: document.getElementById('filterLogType').value,
         timeRange: document.getElementById('filterTimeRange').value,
         severity: document.getElementById('filterSeverity').value,
@@ -389,11 +406,17 @@ function applyFilters() {
         const endTime = performance.now();
         
         if (data.success) {
-            displayResults(data.results, filters.keyword);
+            if (!cursor) {
+                lastFilters = filters;
+            }
+            loadedResults = loadedResults.concat(data.results);
+            nextCursor = data.next_cursor ?? null;
+            displayResults(loadedResults, filters.keyword);
+            document.getElementById('loadMoreBtn').style.display = nextCursor !== null ? '' : 'none';
             
             // Show stats
             document.getElementById('resultStats').style.display = 'flex';
-            document.getElementById('resultCount').textContent = data.count;
+            document.getElementById('resultCount').textContent = loadedResults.length + (nextCursor !== null ? '+' : '');
             document.getElementById('processTime').textContent = Math.round(endTime - startTime) + ' ms';
             
             showToast(`Found ${data.count} matching records`, 'success');
@@ -28,13 +28,24 @@ if (!empty($query)) {
     // Search through each file
     foreach ($searchFiles as $filename => $moduleName) {
         $filepath = $logsPath . '/' . $filename;
+        $artifact = findArtifact($filepath);
         
-        if (file_exists($filepath)) {
-            $content = file_get_contents($filepath);
-            $data = json_decode($content, true);
-            
-            // Recursive search in JSON data
-            $matches = searchInArray($data, $query);
+        if ($artifact) {
+            if (substr($artifact, -5) === '.json') {
+                // Recursive search in JSON data (plain JSON is decoded whole anyway)
+                $matches = searchInArray(loadArtifact($filepath), $query);
+            } else {
+                // NDJSON: header fields, then one record at a time
+                $meta = readArtifactMeta($filepath);
+                $matches = searchInArray($meta['fields'] ?? [], $query);
+                $prefix = empty($meta['records_key']) ? '' : $meta['records_key'] . ' → ';
+                foreach (iterArtifact($filepath) as $index => $record) {
+                    $found = is_array($record)
+                        ? searchInArray($record, $query, $prefix . $index)
+                        : searchInArray([$index => $record], $query, rtrim($prefix, ' →'));
+                    $matches = array_merge($matches, $found);
+                }
+            }
             
             if (!empty($matches)) {
                 $results[] = [
@@ -7,8 +7,8 @@ require_once '../includes/sidebar.php';
 $logsPath = getLogsPath();
 $intentData = [];
 $intentFile = $logsPath . '/intent_hunter.json';
-if (file_exists($intentFile)) {
-    $intentData = json_decode(file_get_contents($intentFile), true);
+if (findArtifact($intentFile)) {
+    $intentData = loadArtifact($intentFile);
 }
 ?>
 
@@ -8,7 +8,7 @@ $basePath = '../';
 require_once '../includes/header.php';
 require_once '../includes/sidebar.php';
 
-// Helper to load JSON data
+// Helper to load JSON data (any artifact format written by analysis/artifact_io.py)
 function loadJsonData($filename) {
     global $logsPath;
     
@@ -23,11 +23,8 @@ function loadJsonData($filename) {
     ];
 
     foreach ($possiblePaths as $path) {
-        if (file_exists($path)) {
-            $content = file_get_contents($path);
-            if (!empty($content)) {
-                return json_decode($content, true);
-            }
+        if (findArtifact($path) && artifactSize($path) > 0) {
+            return loadArtifact($path, null);
         }
     }
     return null;
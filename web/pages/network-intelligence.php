@@ -7,8 +7,8 @@ require_once '../includes/sidebar.php';
 $logsPath = getLogsPath();
 $networkData = [];
 $networkFile = $logsPath . '/network_activity.json';
-if (file_exists($networkFile)) {
-    $networkData = json_decode(file_get_contents($networkFile), true);
+if (findArtifact($networkFile)) {
+    $networkData = loadArtifact($networkFile);
 }
 ?>
 
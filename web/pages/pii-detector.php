@@ -7,8 +7,8 @@ require_once '../includes/sidebar.php';
 $logsPath = getLogsPath();
 $leakData = [];
 $leakFile = $logsPath . '/pii_leaks.json';
-if (file_exists($leakFile)) {
-    $leakData = json_decode(file_get_contents($leakFile), true);
+if (findArtifact($leakFile)) {
+    $leakData = loadArtifact($leakFile);
 }
 ?>
 
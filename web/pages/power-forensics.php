@@ -7,8 +7,8 @@ require_once '../includes/sidebar.php';
 $logsPath = getLogsPath();
 $powerData = [];
 $powerFile = $logsPath . '/power_forensics.json';
-if (file_exists($powerFile)) {
-    $powerData = json_decode(file_get_contents($powerFile), true);
+if (findArtifact($powerFile)) {
+    $powerData = loadArtifact($powerFile);
 }
 ?>
 
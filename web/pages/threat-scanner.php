@@ -30,6 +30,10 @@ function loadThreatData() {
 }
 
 $data = loadThreatData();
+
+// Summary of the last streaming logcat signature scan (threat_scanner.py --stream)
+$logScanFile = getLogsPath() . '/threat_scan_summary.json';
+$logScan = file_exists($logScanFile) ? json_decode(file_get_contents($logScanFile), true) : null;
 $riskLevel = $data['risk_level'] ?? 'UNKNOWN';
 $riskScore = $data['risk_score'] ?? 0;
 $threats = $data['threats'] ?? [];
@@ -71,6 +75,9 @@ if ($riskLevel === 'MEDIUM') $bgClass = 'info';
                 </div>
                 <div class="col-sm-6">
                     <div class="float-sm-end">
+                        <button class="btn btn-outline-primary me-2" onclick="runLogScan()" id="logScanBtn">
+                            <i class="fas fa-stream me-1"></i> Scan Logcat
+                        </button>
                         <button class="btn btn-primary" onclick="runThreatScan()" id="scanBtn">
                             <i class="fas fa-radar me-1"></i> Run Deep Scan
                         </button>
@@ -101,6 +108,81 @@ if ($riskLevel === 'MEDIUM') $bgClass = 'info';
                 </div>
             </div>
 
+            <!-- Logcat Signature Scan (streamed, progress polled) -->
+            <div class="row mb-4" id="logScanProgress" style="display: none;">
+                <div class="col-12">
+                    <div class="card">
+                        <div class="card-body">
+                            <div class="d-flex justify-content-between mb-1">
+                                <span id="logScanStatus">Starting...</span>
+                                <span id="logScanPercent">0%</span>
+                            </div>
+                            <div class="progress" style="height: 20px;">
+                                <div class="progress-bar progress-bar-striped progress-bar-animated bg-forensic-blue"
+                                    role="progressbar" id="logScanBar" style="width: 0%; transition: width 0.5s ease;" aria-valuenow="0"
+                                    aria-valuemin="0" aria-valuemax="100"></div>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+
+            <?php if($logScan): ?>
+            <div class="row mb-4">
+                <div class="col-12">
+                    <div class="card">
+                        <div class="card-header">
+                            <h3 class="card-title"><i class="fas fa-stream me-2"></i>Logcat Signature Scan</h3>
+                            <div class="card-tools">
+                                <span class="badge bg-secondary"><?= number_format($logScan['lines_scanned'] ?? 0) ?> lines</span>
+                                <span class="badge bg-<?= in_array($logScan['risk_level'] ?? '', ['CRITICAL', 'HIGH']) ? 'danger' : 'info' ?>">
+                                    <?= htmlspecialchars($logScan['risk_level'] ?? 'UNKNOWN') ?> (<?= $logScan['risk_score'] ?? 0 ?>/100)
+                                </span>
+                            </div>
+                        </div>
+                        <div class="card-body table-responsive p-0">
+                            <p class="px-3 pt-3 mb-2">
+                                <?= number_format($logScan['threat_count'] ?? 0) ?> matches
+                                <?php foreach(($logScan['stats'] ?? []) as $category => $count): ?>
+                                    <span class="badge bg-light text-dark ms-1"><?= htmlspecialchars(ucwords(str_replace('_', ' ', $category))) ?>: <?= number_format($count) ?></span>
+                                <?php endforeach; ?>
+                            </p>
+                            <?php if(!empty($logScan['threats'])): ?>
+                            <table class="table table-hover text-nowrap">
+                                <thead>
+                                    <tr>
+                                        <th>Severity</th>
+                                        <th>Threat Type</th>
+                                        <th>Line</th>
+                                        <th>Detection Detail</th>
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    <?php foreach($logScan['threats'] as $threat): ?>
+                                        <tr>
+                                            <td>
+                                                <span class="badge bg-<?= in_array($threat['severity'], ['CRITICAL', 'HIGH']) ? 'danger' : ($threat['severity'] === 'MEDIUM' ? 'warning' : 'info') ?>">
+                                                    <?= $threat['severity'] ?>
+                                                </span>
+                                            </td>
+                                            <td><strong><?= htmlspecialchars($threat['type']) ?></strong></td>
+                                            <td class="font-monospace"><?= (int)$threat['line'] ?></td>
+                                            <td>
+                                                <?= htmlspecialchars($threat['description']) ?>
+                                                <br>
+                                                <small class="text-muted">Evidence: <?= htmlspecialchars($threat['evidence']) ?></small>
+                                            </td>
+                                        </tr>
+                                    <?php endforeach; ?>
+                                </tbody>
+                            </table>
+                            <?php endif; ?>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            <?php endif; ?>
+
             <!-- Threat List -->
             <div class="row">
                 <div class="col-12">
@@ -182,6 +264,70 @@ function runThreatScan() {
         });
 }
 
+// Large logs: the scan runs in the background and writes a progress file we poll
+let logScanInterval = null;
+
+function resetLogScanButton() {
+    const btn = document.getElementById('logScanBtn');
+    btn.disabled = false;
+    btn.innerHTML = '<i class="fas fa-stream me-1"></i> Scan Logcat';
+}
+
+function updateLogScanProgress(percent, status) {
+    document.getElementById('logScanBar').style.width = percent + '%';
+    document.getElementById('logScanPercent').textContent = Math.round(percent) + '%';
+    document.getElementById('logScanStatus').textContent = status;
+}
+
+function runLogScan() {
+    const btn = document.getElementById('logScanBtn');
+    btn.disabled = true;
+    btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Scanning...';
+    document.getElementById('logScanProgress').style.display = 'flex';
+    updateLogScanProgress(0, 'Starting...');
+
+    fetch('../api/run_threat_scan.php?mode=stream&t=' + new Date().getTime())
+        .then(res => res.json())
+        .then(data => {
+            if (data.success) {
+                pollLogScanProgress();
+            } else {
+                alert('Error: ' + (data.error || 'Scan failed to start'));
+                resetLogScanButton();
+            }
+        })
+        .catch(e => {
+            console.error(e);
+            alert('Network Error');
+            resetLogScanButton();
+        });
+}
+
+function pollLogScanProgress() {
+    if (logScanInterval) clearInterval(logScanInterval);
+    logScanInterval = setInterval(() => {
+        fetch('../api/run_threat_scan.php?action=progress&t=' + new Date().getTime())
+            .then(r => r.json())
+            .then(data => {
+                const percent = data.progress || 0;
+                updateLogScanProgress(percent, data.status || 'Scanning...');
+
+                if (percent >= 100) {
+                    clearInterval(logScanInterval);
+                    logScanInterval = null;
+                    if (data.error) {
+                        alert('Error: ' + data.error);
+                        resetLogScanButton();
+                    } else {
+                        // Summary is written before the final progress state; reload to show it
+                        window.location.href = window.location.href.split('?')[0] + '?refreshed=' + new Date().getTime();
+                    }
+                }
+            })
+            .catch(e => console.error("Progress poll failed", e));
+    }, 500);
+}
+
 <?php if($shouldAutoRun): ?>
 document.addEventListener('DOMContentLoaded', () => {
     runThreatScan();
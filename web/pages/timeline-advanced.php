@@ -234,6 +234,7 @@ require_once '../includes/sidebar.php';
     document.addEventListener('DOMContentLoaded', function () {
         // Initialize Mind Map Timeline
         const timeline = new MindMapTimeline('viz-container');
+        // Requests pages of the selected time range (start/limit/cursor) from the timeline index
         timeline.loadData('../api/timeline-data.php');
 
         // Make available globally for debugging